@@ -1,7 +1,7 @@
 import logging
-from collections.abc import Sequence
+from collections.abc import Iterable, Sequence
 from pathlib import Path
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Union
 
 import gevent
 from more_itertools import peekable
@@ -12,11 +12,14 @@ from rotkehlchen.accounting.pot import AccountingPot
 from rotkehlchen.accounting.structures.types import ActionType
 from rotkehlchen.accounting.types import EventAccountingRuleStatus, MissingPrice
 from rotkehlchen.chain.evm.accounting.aggregator import EVMAccountingAggregators
+from rotkehlchen.db.accounting_snapshots import AccountingSnapshot, DBAccountingSnapshots
 from rotkehlchen.db.reports import DBAccountingReports
 from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.errors.asset import UnknownAsset, UnprocessableTradePair, UnsupportedAsset
-from rotkehlchen.errors.misc import RemoteError
+from rotkehlchen.errors.misc import InputError, RemoteError
 from rotkehlchen.errors.price import NoPriceForGivenTimestamp, PriceQueryUnsupportedAsset
+from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.history.prefetch import prefetch_historical_prices
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.premium.premium import Premium
 from rotkehlchen.types import EVM_CHAIN_IDS_WITH_TRANSACTIONS, Timestamp
@@ -27,6 +30,7 @@ if TYPE_CHECKING:
     from rotkehlchen.accounting.mixins.event import AccountingEventMixin
     from rotkehlchen.chain.aggregator import ChainsAggregator
     from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.history.manager import HistoryEventsStream
 
 
 logger = logging.getLogger(__name__)
@@ -47,6 +51,7 @@ class Accountant:
             msg_aggregator: MessagesAggregator,
             chains_aggregator: 'ChainsAggregator',
             premium: Premium | None,
+            keep_processed_events: bool = True,
     ) -> None:
         self.db = db
         self.msg_aggregator = msg_aggregator
@@ -60,6 +65,7 @@ class Accountant:
                 evm_accounting_aggregators=evm_accounting_aggregators,
                 msg_aggregator=msg_aggregator,
                 is_dummy_pot=False,
+                keep_processed_events=keep_processed_events,
             ),
         ]
 
@@ -89,11 +95,10 @@ class Accountant:
     def _process_skipping_exception(
             self,
             exception: Exception,
-            events: Sequence['AccountingEventMixin'],
+            event: 'AccountingEventMixin',
             count: int,
             reason: str,
     ) -> int:
-        event = events[count]
         ts = event.get_timestamp()
         identifier = event.get_identifier()
         self.msg_aggregator.add_error(
@@ -108,21 +113,70 @@ class Accountant:
         )
         return count + 1
 
+    def _restore_snapshot(
+            self,
+            snapshots: list[AccountingSnapshot],
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+            db_settings: DBSettings,
+            report_id: int,
+    ) -> tuple[AccountingSnapshot, Timestamp, Timestamp] | None:
+        """Restore the pot from the latest snapshot that can be used for this report.
+
+        A snapshot before the start of the report can be used as long as past cost basis is
+        calculated since the cost basis state does not depend on the report range. A snapshot
+        inside the report range can only be used if it was taken for a report with the same
+        start, since then the pnls and the processed events of that report are also valid.
+
+        Returns the restored snapshot along with the first and last processed timestamps
+        at the time of the snapshot or None if processing has to start from the beginning.
+        """
+        for snapshot in snapshots:
+            with_report_events_options = []
+            if snapshot.state.get('start_ts') == start_ts:
+                with_report_events_options.append(True)
+            if snapshot.timestamp <= start_ts and db_settings.calculate_past_cost_basis:
+                with_report_events_options.append(False)
+
+            for with_report_events in with_report_events_options:
+                try:
+                    first_ts, last_ts = self.pots[0].deserialize_state(
+                        data=snapshot.state,
+                        with_report_events=with_report_events,
+                    )
+                except (DeserializationError, InputError) as e:
+                    log.warning(f'Could not restore accounting snapshot at {snapshot.timestamp} due to {e!s}')  # noqa: E501
+                    self.pots[0].reset(settings=db_settings, start_ts=start_ts, end_ts=end_ts, report_id=report_id)  # noqa: E501
+                    continue
+
+                log.debug(f'Restored accounting snapshot at {snapshot.timestamp}')
+                return snapshot, first_ts, last_ts
+
+        return None
+
     def process_history(
             self,
             start_ts: Timestamp,
             end_ts: Timestamp,
-            events: Sequence['AccountingEventMixin'],
+            events: Union[Sequence['AccountingEventMixin'], 'HistoryEventsStream'],
+            snapshot_timestamps: Sequence[Timestamp] = (),
     ) -> int:
         """Processes the entire history of cryptoworld actions in order to determine
         the price and time at which every asset was obtained and also
         the general and taxable profit/loss.
 
         The events history is already expected to be sorted when passed to this function.
+        It can either be a list or a HistoryEventsStream, in which case the events are
+        read lazily from the DB while processing and are never all held in memory.
 
         start_ts here is the timestamp at which to start taking trades and other
         taxable events into account. Not where processing starts from. Processing
-        always starts from the very first event we find in the history.
+        always starts from the very first event we find in the history, unless a snapshot
+        of the accounting state saved by a previous run with the same settings can be
+        restored. Then processing continues from the snapshot.
+
+        A snapshot is saved at the start of the report range, at the end of the report
+        range and at any of the given snapshot_timestamps that is inside the processed events.
 
         Returns the id of the generated report
         """
@@ -136,91 +190,177 @@ class Accountant:
         events_limit = -1 if active_premium else FREE_PNL_EVENTS_LIMIT
         # Ask the DB for the settings once at the start of processing so we got the
         # same settings through the entire task
+        snapshots_db = DBAccountingSnapshots(self.db)
         with self.db.conn.read_ctx() as cursor:
             db_settings = self.db.get_settings(cursor)
-            # Create a new pnl report in the DB to be used to save each event generated
-            dbpnl = DBAccountingReports(self.db)
-            first_ts = Timestamp(0) if len(events) == 0 else events[0].get_timestamp()
-            report_id = dbpnl.add_report(
-                first_processed_timestamp=first_ts,
-                start_ts=start_ts,
-                end_ts=end_ts,
+            ignored_ids_mapping = self.db.get_ignored_action_ids(cursor=cursor, action_type=None)
+            settings_hash = snapshots_db.get_settings_hash(
+                cursor=cursor,
                 settings=db_settings,
+                ignored_ids_mapping=ignored_ids_mapping,
+            )
+            snapshots = snapshots_db.get_snapshots(
+                cursor=cursor,
+                settings_hash=settings_hash,
+                to_ts=Timestamp(end_ts + 1),
             )
-            self.pots[0].reset(settings=db_settings, start_ts=start_ts, end_ts=end_ts, report_id=report_id)  # noqa: E501
-            self.end_ts = end_ts
-            self.csvexporter.reset(start_ts=start_ts, end_ts=end_ts)
-
-            # The first ts is the ts of the first action we have in history or 0 for empty history
-            self.currently_processing_timestamp = first_ts
-            self.first_processed_timestamp = first_ts
-
-            count = 0
-            actions_length = len(events)
-            prev_time = last_event_ts = Timestamp(0)
-            ignored_ids_mapping = self.db.get_ignored_action_ids(cursor=cursor, action_type=None)
 
-        events_iter = peekable(events)
-        while True:
-            try:
-                (
-                    processed_events_num,
-                    prev_time,
-                ) = self._process_event(
-                    events_iterator=events_iter,
-                    start_ts=start_ts,
-                    end_ts=end_ts,
-                    prev_time=prev_time,
-                    db_settings=db_settings,
-                    ignored_ids_mapping=ignored_ids_mapping,
-                )
-            except PriceQueryUnsupportedAsset as e:
-                count = self._process_skipping_exception(
-                    exception=e,
-                    events=events,
-                    count=count,
-                    reason='not being able to find price for an unsupported asset',
-                )
-                continue
-            except NoPriceForGivenTimestamp as e:
-                self.pots[0].cost_basis.missing_prices.add(
-                    MissingPrice(
-                        from_asset=e.from_asset,
-                        to_asset=e.to_asset,
-                        time=e.time,
-                        rate_limited=e.rate_limited,
-                    ),
-                )
-                continue
-            except RemoteError as e:
-                count = self._process_skipping_exception(
-                    exception=e,
-                    events=events,
-                    count=count,
-                    reason='inability to reach an external service at that point in time',
-                )
-                continue
+        # the total counts the entire history even if processing continues from a snapshot
+        actions_length = len(events)
+        # Create a new pnl report in the DB to be used to save each event generated
+        dbpnl = DBAccountingReports(self.db)
+        report_id = dbpnl.add_report(
+            first_processed_timestamp=Timestamp(0),  # will be set at the overview
+            start_ts=start_ts,
+            end_ts=end_ts,
+            settings=db_settings,
+        )
+        self.pots[0].reset(settings=db_settings, start_ts=start_ts, end_ts=end_ts, report_id=report_id)  # noqa: E501
+        self.end_ts = end_ts
+        self.csvexporter.reset(start_ts=start_ts, end_ts=end_ts)
+        count = 0
+        prev_time = last_event_ts = Timestamp(0)
+        snapshot = None
+        if (restored := self._restore_snapshot(
+            snapshots=snapshots,
+            start_ts=start_ts,
+            end_ts=end_ts,
+            db_settings=db_settings,
+            report_id=report_id,
+        )) is None:
+            events_iter = peekable(events)
+            first_event = events_iter.peek(None)
+            first_ts = Timestamp(0) if first_event is None else first_event.get_timestamp()
+            remaining_events: Iterable['AccountingEventMixin'] = events
+        else:
+            snapshot, first_ts, prev_time = restored
+            last_event_ts = prev_time
+            count = snapshot.processed_actions
+            if isinstance(events, Sequence):
+                remaining_events = [x for x in events if x.get_timestamp() >= snapshot.timestamp]
+            else:
+                events.start_from(snapshot.timestamp)
+                remaining_events = events
+            events_iter = peekable(remaining_events)
+
+        prefetch_stats = prefetch_historical_prices(
+            events=remaining_events,
+            accounting=self.pots[0],
+            start_ts=start_ts,
+            end_ts=end_ts,
+            calculate_past_cost_basis=db_settings.calculate_past_cost_basis,
+            ignored_ids_mapping=ignored_ids_mapping,
+            events_limit=-1 if active_premium else max(0, FREE_PNL_EVENTS_LIMIT - count),
+        )
+        log.info(
+            f'Prefetched historical prices for {prefetch_stats.lookups} lookups of '
+            f'{prefetch_stats.unique} pairs and hours. {prefetch_stats.cached} were in the DB and '
+            f'{prefetch_stats.found} of {prefetch_stats.queried} queried were found by the '
+            f'oracles, saving {prefetch_stats.network_calls_saved} network calls',
+        )
 
-            if processed_events_num == 0:
-                break  # we reached the period end
+        # The first ts is the ts of the first action we have in history or 0 for empty history
+        self.currently_processing_timestamp = first_ts
+        self.first_processed_timestamp = first_ts
+        # Timestamps at which to save a snapshot. The end of the range is saved separately
+        pending_snapshots = sorted({start_ts, *snapshot_timestamps}, reverse=True)
+        if snapshot is not None:
+            pending_snapshots = [x for x in pending_snapshots if x > snapshot.timestamp]
+        can_snapshot = True
 
-            last_event_ts = prev_time
-            if count % 500 == 0:
-                # This loop can take a very long time depending on the amount of events
-                # to process. We need to yield to other greenlets or else calls to the
-                # API may time out
-                gevent.sleep(0.5)
-            count += processed_events_num
-            if not active_premium and count >= FREE_PNL_EVENTS_LIMIT:
-                log.debug(
-                    f'PnL reports event processing has hit the event limit of {events_limit}. '
-                    f'Processing stopped and the results will not '
-                    f'take into account subsequent events. Total events were {len(events)}',
-                )
-                break
+        try:
+            while True:
+                # keep the next event to be processed to report it if processing fails
+                next_event = events_iter.peek(None)
+                if next_event is not None:
+                    next_ts = next_event.get_timestamp()
+                    while len(pending_snapshots) != 0 and pending_snapshots[-1] <= next_ts:
+                        snapshot_ts = pending_snapshots.pop()
+                        # events processed together share their timestamp so when the previous
+                        # event is before the snapshot ts, all processed events are before it
+                        if can_snapshot and prev_time < snapshot_ts <= end_ts:
+                            can_snapshot = self._maybe_save_snapshot(
+                                snapshots_db=snapshots_db,
+                                settings_hash=settings_hash,
+                                timestamp=snapshot_ts,
+                                processed_actions=count,
+                                first_processed_timestamp=first_ts,
+                                last_processed_timestamp=last_event_ts,
+                            )
+
+                try:
+                    (
+                        processed_events_num,
+                        prev_time,
+                    ) = self._process_event(
+                        events_iterator=events_iter,
+                        start_ts=start_ts,
+                        end_ts=end_ts,
+                        prev_time=prev_time,
+                        db_settings=db_settings,
+                        ignored_ids_mapping=ignored_ids_mapping,
+                    )
+                except PriceQueryUnsupportedAsset as e:
+                    can_snapshot = False
+                    count = self._process_skipping_exception(
+                        exception=e,
+                        event=next_event,  # type: ignore[arg-type]  # can't be None if processing raised
+                        count=count,
+                        reason='not being able to find price for an unsupported asset',
+                    )
+                    continue
+                except NoPriceForGivenTimestamp as e:
+                    self.pots[0].cost_basis.missing_prices.add(
+                        MissingPrice(
+                            from_asset=e.from_asset,
+                            to_asset=e.to_asset,
+                            time=e.time,
+                            rate_limited=e.rate_limited,
+                        ),
+                    )
+                    continue
+                except RemoteError as e:
+                    can_snapshot = False
+                    count = self._process_skipping_exception(
+                        exception=e,
+                        event=next_event,  # type: ignore[arg-type]  # can't be None if processing raised
+                        count=count,
+                        reason='inability to reach an external service at that point in time',
+                    )
+                    continue
+
+                if processed_events_num == 0:
+                    if can_snapshot:  # reached the period end so everything up to it is processed
+                        self._maybe_save_snapshot(
+                            snapshots_db=snapshots_db,
+                            settings_hash=settings_hash,
+                            timestamp=Timestamp(end_ts + 1),
+                            processed_actions=count,
+                            first_processed_timestamp=first_ts,
+                            last_processed_timestamp=last_event_ts,
+                        )
+                    break  # we reached the period end
+
+                last_event_ts = prev_time
+                if count % 500 == 0:
+                    # This loop can take a very long time depending on the amount of events
+                    # to process. We need to yield to other greenlets or else calls to the
+                    # API may time out
+                    gevent.sleep(0.5)
+                count += processed_events_num
+                if not active_premium and count >= FREE_PNL_EVENTS_LIMIT:
+                    log.debug(
+                        f'PnL reports event processing has hit the event limit of {events_limit}. '
+                        f'Processing stopped and the results will not '
+                        f'take into account subsequent events. Total events were {actions_length}',
+                    )
+                    break
+        finally:  # write the events processed so far even if processing failed
+            self.pots[0].flush_processed_events()
 
         dbpnl.add_report_overview(
             report_id=report_id,
+            first_processed_timestamp=first_ts,
             last_processed_timestamp=last_event_ts,
             processed_actions=count,
             total_actions=actions_length,
@@ -232,6 +372,40 @@ class Accountant:
 
         return report_id
 
+    def _maybe_save_snapshot(
+            self,
+            snapshots_db: DBAccountingSnapshots,
+            settings_hash: str,
+            timestamp: Timestamp,
+            processed_actions: int,
+            first_processed_timestamp: Timestamp,
+            last_processed_timestamp: Timestamp,
+    ) -> bool:
+        """Save a snapshot of the pot state before processing any event at `timestamp`.
+
+        The state is not saved if there are missing prices since then the result of
+        processing the same events again can be different once the prices are found.
+        In that case no snapshot after this one should be saved either.
+
+        Returns whether snapshots can still be saved in this run.
+        """
+        if len(self.pots[0].cost_basis.missing_prices) != 0:
+            return False
+
+        self.pots[0].flush_processed_events()  # the snapshot refers to the events in the DB
+        snapshots_db.add_snapshot(
+            settings_hash=settings_hash,
+            snapshot=AccountingSnapshot(
+                timestamp=timestamp,
+                processed_actions=processed_actions,
+                state=self.pots[0].serialize_state(
+                    first_processed_timestamp=first_processed_timestamp,
+                    last_processed_timestamp=last_processed_timestamp,
+                ),
+            ),
+        )
+        return True
+
     def _process_event(
             self,
             events_iterator: "peekable['AccountingEventMixin']",
@@ -315,17 +489,21 @@ class Accountant:
         If a directory is given, it simply exports all event.csv in the given directory.
         If no directory is given it returns the path to a zip to export
         """
-        if len(self.pots[0].processed_events) == 0:
+        if self.pots[0].processed_events_num == 0:
             return False, 'No history processed in order to perform an export'
 
-        if directory_path is None:
-            return self.csvexporter.create_zip(
-                events=self.pots[0].processed_events,
+        events = self.pots[0].iterate_processed_events()
+        try:
+            if directory_path is None:
+                return self.csvexporter.create_zip(
+                    events=events,
+                    pnls=self.pots[0].pnls,
+                )
+
+            return self.csvexporter.export(
+                events=events,
                 pnls=self.pots[0].pnls,
+                directory=directory_path,
             )
-
-        return self.csvexporter.export(
-            events=self.pots[0].processed_events,
-            pnls=self.pots[0].pnls,
-            directory=directory_path,
-        )
+        except DeserializationError as e:
+            return False, f'Could not read the processed events of the report due to {e!s}'
@@ -14,7 +14,7 @@ from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.fval import FVal
 from rotkehlchen.logging import RotkehlchenLogsAdapter
-from rotkehlchen.serialization.deserialize import deserialize_fval
+from rotkehlchen.serialization.deserialize import deserialize_fval, deserialize_int_from_str
 from rotkehlchen.types import CostBasisMethod, Location, Price, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.mixins.customizable_date import CustomizableDateMixin
@@ -26,6 +26,10 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Index given to acquisitions restored from an accounting snapshot. Their processed
+# event is not part of the report that restored them so it can't be referenced.
+SNAPSHOT_ACQUISITION_INDEX = -1
+
 
 @dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
 class AssetAcquisitionEvent:
@@ -115,7 +119,7 @@ class AssetAcquisitionHeapElement(NamedTuple):
     For HIFO, the amount of the acquisition is used although negated so the
     acquisition with the highest amount comes first.
     """
-    priority: FVal  # This is only used by heapq algorithm and not accessed from our code
+    priority: FVal | int  # This is only used by heapq algorithm and not accessed from our code
     acquisition_event: AssetAcquisitionEvent
 
 
@@ -285,6 +289,51 @@ class BaseCostBasisMethod(metaclass=ABCMeta):
     def __len__(self) -> int:
         return len(self._acquisitions_heap)
 
+    def serialize_state(self) -> dict[str, Any]:
+        """Serialize the acquisitions heap so that it can be saved in an accounting snapshot"""
+        return {'acquisitions': [{
+            'priority': str(entry.priority),
+            'remaining_amount': str(entry.acquisition_event.remaining_amount),
+            **entry.acquisition_event.serialize(),
+        } for entry in self._acquisitions_heap]}
+
+    def deserialize_state(self, data: dict[str, Any], keep_indices: bool) -> None:
+        """Restore the state saved by serialize_state. The heap is saved as a list
+        in heap order so restoring it as is keeps the heap invariant.
+
+        If keep_indices is False the processed events of the acquisitions are not part of
+        the current report so they get the SNAPSHOT_ACQUISITION_INDEX.
+
+        May raise:
+        - DeserializationError if the data is not as expected
+        """
+        acquisitions_heap = []
+        try:
+            for entry in data['acquisitions']:
+                acquisition = AssetAcquisitionEvent(
+                    amount=deserialize_fval(entry['full_amount'], name='full_amount', location='cost_basis'),  # noqa: E501
+                    timestamp=Timestamp(entry['timestamp']),
+                    rate=Price(deserialize_fval(entry['rate'], name='rate', location='cost_basis')),  # noqa: E501
+                    index=entry['index'] if keep_indices else SNAPSHOT_ACQUISITION_INDEX,
+                )
+                acquisition.remaining_amount = deserialize_fval(
+                    value=entry['remaining_amount'],
+                    name='remaining_amount',
+                    location='cost_basis',
+                )
+                acquisitions_heap.append(AssetAcquisitionHeapElement(
+                    priority=self._deserialize_priority(entry['priority']),
+                    acquisition_event=acquisition,
+                ))
+        except KeyError as e:
+            raise DeserializationError(f'Missing key {e!s}') from e
+
+        self._acquisitions_heap = acquisitions_heap
+
+    def _deserialize_priority(self, value: str) -> FVal | int:
+        """May raise DeserializationError"""
+        return deserialize_fval(value, name='priority', location='cost_basis')
+
 
 class FIFOCostBasisMethod(BaseCostBasisMethod):
     """
@@ -293,13 +342,28 @@ class FIFOCostBasisMethod(BaseCostBasisMethod):
     """
     def __init__(self) -> None:
         super().__init__()
-        self._count = ZERO
+        self._count = 0
 
     def add_in_event(self, acquisition: AssetAcquisitionEvent) -> None:
         """Adds an acquisition to the `_acquisitions_heap` using a counter to achieve the FIFO order."""  # noqa: E501
         heapq.heappush(self._acquisitions_heap, AssetAcquisitionHeapElement(self._count, acquisition))  # noqa: E501
         self._count += 1
 
+    def serialize_state(self) -> dict[str, Any]:
+        return super().serialize_state() | {'count': str(self._count)}
+
+    def _deserialize_priority(self, value: str) -> int:
+        """The priority is the counter of the acquisition. May raise DeserializationError"""
+        return deserialize_int_from_str(value, location='cost_basis')
+
+    def deserialize_state(self, data: dict[str, Any], keep_indices: bool) -> None:
+        """May raise DeserializationError"""
+        super().deserialize_state(data, keep_indices)
+        try:
+            self._count = deserialize_int_from_str(data['count'], location='cost_basis')
+        except KeyError as e:
+            raise DeserializationError(f'Missing key {e!s}') from e
+
 
 class LIFOCostBasisMethod(BaseCostBasisMethod):
     """
@@ -308,13 +372,28 @@ class LIFOCostBasisMethod(BaseCostBasisMethod):
     """
     def __init__(self) -> None:
         super().__init__()
-        self._count = ZERO
+        self._count = 0
 
     def add_in_event(self, acquisition: AssetAcquisitionEvent) -> None:
         """Adds an acquisition to the `_acquisitions_heap` using a negated counter to achieve the LIFO order."""  # noqa: E501
         heapq.heappush(self._acquisitions_heap, AssetAcquisitionHeapElement(-self._count, acquisition))  # noqa: E501
         self._count += 1
 
+    def serialize_state(self) -> dict[str, Any]:
+        return super().serialize_state() | {'count': str(self._count)}
+
+    def _deserialize_priority(self, value: str) -> int:
+        """The priority is the counter of the acquisition. May raise DeserializationError"""
+        return deserialize_int_from_str(value, location='cost_basis')
+
+    def deserialize_state(self, data: dict[str, Any], keep_indices: bool) -> None:
+        """May raise DeserializationError"""
+        super().deserialize_state(data, keep_indices)
+        try:
+            self._count = deserialize_int_from_str(data['count'], location='cost_basis')
+        except KeyError as e:
+            raise DeserializationError(f'Missing key {e!s}') from e
+
 
 class HIFOCostBasisMethod(BaseCostBasisMethod):
     """
@@ -345,7 +424,7 @@ class AverageCostBasisMethod(BaseCostBasisMethod):
     """  # noqa: E501
     def __init__(self) -> None:
         super().__init__()
-        self._count = ZERO
+        self._count = 0
         # keeps track of the amount of the asset remaining after every acquisition or spend
         self.current_amount = ZERO
         # the current total cost basis of the asset
@@ -379,6 +458,27 @@ class AverageCostBasisMethod(BaseCostBasisMethod):
         self.current_amount -= used_amount
         super().consume_result(used_amount)
 
+    def serialize_state(self) -> dict[str, Any]:
+        return super().serialize_state() | {
+            'count': str(self._count),
+            'current_amount': str(self.current_amount),
+            'current_total_acb': str(self.current_total_acb),
+        }
+
+    def _deserialize_priority(self, value: str) -> int:
+        """The priority is the counter of the acquisition. May raise DeserializationError"""
+        return deserialize_int_from_str(value, location='cost_basis')
+
+    def deserialize_state(self, data: dict[str, Any], keep_indices: bool) -> None:
+        """May raise DeserializationError"""
+        super().deserialize_state(data, keep_indices)
+        try:
+            self._count = deserialize_int_from_str(data['count'], location='cost_basis')
+            self.current_amount = deserialize_fval(data['current_amount'], name='current_amount', location='cost_basis')  # noqa: E501
+            self.current_total_acb = deserialize_fval(data['current_total_acb'], name='current_total_acb', location='cost_basis')  # noqa: E501
+        except KeyError as e:
+            raise DeserializationError(f'Missing key {e!s}') from e
+
     def calculate_spend_cost_basis(
             self,
             spending_amount: FVal,
@@ -569,6 +669,41 @@ class CostBasisCalculator(CustomizableDateMixin):
         self.missing_acquisitions: list[MissingAcquisition] = []
         self.missing_prices: set[MissingPrice] = set()
 
+    def serialize_state(self) -> dict[str, Any]:
+        """Serialize the state needed to continue processing from this point on.
+
+        Spends and used acquisitions are not saved since they are never read during processing.
+        Missing prices are not saved either as a state with missing prices should not be kept.
+        """
+        return {
+            'acquisitions': {
+                asset.identifier: asset_events.acquisitions_manager.serialize_state()
+                for asset, asset_events in self._events.items()
+            },
+            'missing_acquisitions': [x.serialize() for x in self.missing_acquisitions],
+        }
+
+    def deserialize_state(self, data: dict[str, Any], keep_indices: bool) -> None:
+        """Restore the state saved by serialize_state on top of a freshly reset calculator.
+        For keep_indices check BaseCostBasisMethod.deserialize_state
+
+        May raise:
+        - DeserializationError if the data is not as expected
+        """
+        try:
+            for asset_identifier, acquisitions_state in data['acquisitions'].items():
+                self._events[Asset(asset_identifier)].acquisitions_manager.deserialize_state(acquisitions_state, keep_indices)  # noqa: E501
+            self.missing_acquisitions = [
+                MissingAcquisition(
+                    asset=Asset(entry['asset']),
+                    time=Timestamp(entry['time']),
+                    found_amount=deserialize_fval(entry['found_amount'], name='found_amount', location='cost_basis'),  # noqa: E501
+                    missing_amount=deserialize_fval(entry['missing_amount'], name='missing_amount', location='cost_basis'),  # noqa: E501
+                ) for entry in data['missing_acquisitions']
+            ]
+        except KeyError as e:
+            raise DeserializationError(f'Missing key {e!s}') from e
+
     def get_events(self, asset: Asset) -> CostBasisEvents:
         """Custom getter for events so that we have common cost basis for some assets"""
         if asset == A_WETH:
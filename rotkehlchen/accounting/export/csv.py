@@ -1,12 +1,16 @@
+import itertools
 import json
 import logging
-from collections.abc import Collection
+from collections.abc import Collection, Iterable, Iterator
 from csv import DictWriter
 from pathlib import Path
 from tempfile import mkdtemp
 from typing import TYPE_CHECKING, Any, Literal
 from zipfile import ZIP_DEFLATED, ZipFile
 
+import gevent
+
+from rotkehlchen.accounting.cost_basis.base import SNAPSHOT_ACQUISITION_INDEX
 from rotkehlchen.accounting.pnl import PnlTotals
 from rotkehlchen.accounting.structures.processed_event import AccountingEventExportType
 from rotkehlchen.constants import ZERO
@@ -45,6 +49,8 @@ ACCOUNTING_SETTINGS = (
 )
 
 CSV_INDEX_OFFSET = 2  # skip title row and since counting starts from 1
+# Number of events written to the CSV between yielding to other greenlets
+CSV_EXPORT_YIELD_ROWS = 1000
 
 
 class CSVWriteError(Exception):
@@ -53,25 +59,27 @@ class CSVWriteError(Exception):
 
 def dict_to_csv_file(
         path: Path,
-        dictionary_list: list,
+        dictionary_list: Iterable[dict[str, Any]],
         headers: Collection | None = None,
 ) -> None:
-    """Takes a filepath and a list of dictionaries representing the rows and writes them
-    into the file as a CSV
+    """Takes a filepath and an iterable of dictionaries representing the rows and writes
+    them into the file as a CSV. The rows are written as they are iterated, so they can
+    be generated lazily.
 
     May raise:
     - CSVWriteError if DictWriter.writerow() tried to write a dict contains
     fields not in fieldnames
     """
-    if len(dictionary_list) == 0:
+    rows = iter(dictionary_list)
+    if (first_row := next(rows, None)) is None:
         log.debug(f'Skipping writting empty CSV for {path}')
         return
 
     with open(path, 'w', newline='', encoding='utf-8') as f:
-        w = DictWriter(f, fieldnames=dictionary_list[0].keys() if headers is None else headers)
+        w = DictWriter(f, fieldnames=first_row.keys() if headers is None else headers)
         w.writeheader()
         try:
-            for dic in dictionary_list:
+            for dic in itertools.chain((first_row,), rows):
                 w.writerow(dic)
         except ValueError as e:
             raise CSVWriteError(f'Failed to write {path} CSV due to {e!s}') from e
@@ -183,23 +191,27 @@ class CSVExporter(CustomizableDateMixin):
                     if name == 'free' and acquisition.taxable is True:
                         continue
 
-                    index = acquisition.event.index + CSV_INDEX_OFFSET
                     if cost_basis == '':
                         cost_basis = '='
                     else:
                         cost_basis += '+'
 
-                    cost_basis += f'{acquisition.amount!s}*H{index}'
+                    if acquisition.event.index == SNAPSHOT_ACQUISITION_INDEX:
+                        # acquisition restored from a snapshot. Its row is not in the export
+                        cost_basis += f'{acquisition.amount!s}*{acquisition.event.rate!s}'
+                    else:
+                        index = acquisition.event.index + CSV_INDEX_OFFSET
+                        cost_basis += f'{acquisition.amount!s}*H{index}'
 
         dict_event[f'cost_basis_{name}'] = cost_basis
 
-    def _maybe_add_summary(self, events: list[dict[str, Any]], pnls: PnlTotals) -> None:
-        """Depending on given settings, adds a few summary lines at the end of
-        the all events PnL report"""
+    def _iterate_summary(self, events_num: int, pnls: PnlTotals) -> Iterator[dict[str, Any]]:
+        """Depending on given settings, yields a few summary lines to add at the end of
+        the all events PnL report after the given number of events"""
         if self.settings.pnl_csv_have_summary is False:
             return
 
-        length = len(events) + 1
+        length = events_num + 1
         template: dict[str, Any] = {
             'type': '',
             'notes': '',
@@ -215,12 +227,12 @@ class CSVExporter(CustomizableDateMixin):
             'pnl_free': '',
             'cost_basis_free': '',
         }
-        events.extend((template, template))  # separate with 2 new lines
+        yield from (template, template)  # separate with 2 new lines
 
         entry = template.copy()
         entry['taxable_amount'] = 'TAXABLE'
         entry['price'] = 'FREE'
-        events.append(entry)
+        yield entry
 
         start_sums_index = length + 4
         sums = 0
@@ -242,7 +254,7 @@ class CSVExporter(CustomizableDateMixin):
                 sum_range=f'J2:J{length}',
                 actual_value=value.free,
             )
-            events.append(entry)
+            yield entry
 
         entry = template.copy()
         entry['free_amount'] = 'TOTAL'
@@ -251,23 +263,23 @@ class CSVExporter(CustomizableDateMixin):
             entry['price'] = f'=SUM(H{start_sums_index}:H{start_sums_index + sums - 1})'
         else:
             entry['taxable_amount'] = entry['price'] = 0
-        events.extend((entry, template, template))  # separate with 2 new lines
+        yield from (entry, template, template)  # separate with 2 new lines
 
         version_result = get_current_version()
         entry = template.copy()
         entry['free_amount'] = 'rotki version'
         entry['taxable_amount'] = version_result.our_version
-        events.append(entry)
+        yield entry
 
         for setting in ACCOUNTING_SETTINGS:
             entry = template.copy()
             entry['free_amount'] = setting
             entry['taxable_amount'] = str(getattr(self.settings, setting))
-            events.append(entry)
+            yield entry
 
     def create_zip(
             self,
-            events: list['ProcessedAccountingEvent'],
+            events: Iterable['ProcessedAccountingEvent'],
             pnls: PnlTotals,
     ) -> tuple[bool, str]:
         # TODO: Find a way to properly delete the directory after send is complete
@@ -319,19 +331,40 @@ class CSVExporter(CustomizableDateMixin):
         self._add_pnl_type(event=event, dict_event=dict_event, amount_column='G', name='taxable')
         return dict_event
 
+    def _iterate_rows(
+            self,
+            events: Iterable['ProcessedAccountingEvent'],
+            pnls: PnlTotals,
+    ) -> Iterator[dict[str, Any]]:
+        """Yields the rows of the all events CSV, serializing each event only when it's
+        its turn to be written. Counts the events on the way for the summary rows."""
+        events_num = 0
+        for event in events:
+            yield self.to_csv_entry(event)
+            events_num += 1
+            if events_num % CSV_EXPORT_YIELD_ROWS == 0:
+                gevent.sleep(0)  # let other greenlets run during long exports
+
+        yield from self._iterate_summary(events_num=events_num, pnls=pnls)
+
     def export(
             self,
-            events: list['ProcessedAccountingEvent'],
+            events: Iterable['ProcessedAccountingEvent'],
             pnls: PnlTotals,
             directory: Path,
     ) -> tuple[bool, str]:
-        serialized_events = [self.to_csv_entry(x) for idx, x in enumerate(events)]
-        self._maybe_add_summary(events=serialized_events, pnls=pnls)
+        """Writes the events and the summary to the all events CSV in the given directory.
+        The events are written as they are iterated, so they can be read lazily from the
+        DB and the export does not need to hold them all in memory.
+
+        May raise:
+        - DeserializationError if an event read lazily from the DB can't be deserialized
+        """
         try:
             directory.mkdir(parents=True, exist_ok=True)
             dict_to_csv_file(
                 directory / FILENAME_ALL_CSV,
-                serialized_events,
+                self._iterate_rows(events=events, pnls=pnls),
             )
         except (CSVWriteError, PermissionError) as e:
             return False, str(e)
@@ -4,7 +4,7 @@ from typing import TYPE_CHECKING, Any, TypeVar, cast
 from rotkehlchen.accounting.mixins.event import AccountingEventType
 from rotkehlchen.accounting.rules import AccountingRulesManager
 from rotkehlchen.chain.evm.accounting.structures import BaseEventSettings, TxAccountingTreatment
-from rotkehlchen.constants import ONE
+from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.history.events.structures.base import HistoryBaseEntry
 from rotkehlchen.history.events.structures.evm_event import EvmEvent
 from rotkehlchen.history.events.structures.types import EventDirection, HistoryEventSubType
@@ -16,6 +16,7 @@ if TYPE_CHECKING:
 
     from rotkehlchen.accounting.mixins.event import AccountingEventMixin
     from rotkehlchen.accounting.pot import AccountingPot
+    from rotkehlchen.assets.asset import Asset
     from rotkehlchen.chain.evm.accounting.aggregator import EVMAccountingAggregators
 
 logger = logging.getLogger(__name__)
@@ -45,6 +46,43 @@ class EventsAccountant:
     def reset(self) -> None:
         self.rules_manager.reset()
 
+    def get_assets_to_price(
+            self,
+            event: HistoryBaseEntry,
+            events_iterator: "peekable['AccountingEventMixin']",
+    ) -> tuple[list['Asset'], int]:
+        """Return the assets whose price processing the history base entry looks up and the
+        number of actions consumed from the iterator, without processing it.
+
+        The events that a module callback consumes are not followed here. They are looked
+        at one by one as the iterator goes on.
+        """
+        if event.maybe_get_direction() in (None, EventDirection.NEUTRAL):
+            return [], 1
+
+        event_settings, _ = self.rules_manager.get_event_settings(event)
+        if event_settings is None:
+            return [], 1
+
+        if event_settings.accounting_treatment != TxAccountingTreatment.SWAP:
+            return [event.asset] if event.balance.amount != ZERO else [], 1
+
+        next_event = events_iterator.peek(None)
+        if not isinstance(next_event, HistoryBaseEntry) or next_event.event_identifier != event.event_identifier:  # noqa: E501
+            return [], 1
+        in_event = cast(HistoryBaseEntry, next(events_iterator))  # guaranteed by the if check
+        assets, consumed_events = [event.asset, in_event.asset], 2
+        next_event = events_iterator.peek(None)
+        if next_event and isinstance(next_event, HistoryBaseEntry) and next_event.event_identifier == event.event_identifier and next_event.event_subtype == HistoryEventSubType.FEE:  # noqa: E501
+            fee_event = cast(HistoryBaseEntry, next(events_iterator))  # guaranteed by if check
+            assets.append(fee_event.asset)
+            consumed_events = 3
+
+        if ZERO in (event.balance.amount, in_event.balance.amount):
+            return [], 2  # the swap is skipped without looking up prices
+
+        return assets, consumed_events
+
     def process(
             self,
             event: HistoryBaseEntry,
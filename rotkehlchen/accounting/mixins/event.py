@@ -70,6 +70,19 @@ class AccountingEventMixin(metaclass=ABCMeta):
         Returns the number of events consumed.
         """
 
+    @abstractmethod
+    def get_assets_to_price(
+            self,
+            accounting: 'AccountingPot',
+            events_iterator: "peekable['AccountingEventMixin']",
+    ) -> tuple[list[Asset], int]:
+        """Gets the assets whose price in the profit currency processing the event looks up,
+        without processing it, so that the prices can be queried before processing.
+
+        Like process it consumes from the iterator the other events that processing the
+        event consumes. Returns the assets and the number of events consumed.
+        """
+
     @abstractmethod
     def serialize(self) -> dict[str, Any]:
         """Serializes the event"""
@@ -1,4 +1,5 @@
 import logging
+from collections.abc import Iterator
 from typing import TYPE_CHECKING, Any, Literal
 
 from rotkehlchen.accounting.cost_basis import CostBasisCalculator
@@ -14,7 +15,7 @@ from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.constants.assets import A_KFEE
 from rotkehlchen.constants.prices import ZERO_PRICE
-from rotkehlchen.db.reports import DBAccountingReports
+from rotkehlchen.db.reports import DBAccountingReports, PnlEventsWriter
 from rotkehlchen.db.settings import DBSettings
 from rotkehlchen.errors.misc import InputError, RemoteError
 from rotkehlchen.errors.price import NoPriceForGivenTimestamp, PriceQueryUnsupportedAsset
@@ -23,6 +24,7 @@ from rotkehlchen.fval import FVal
 from rotkehlchen.history.events.structures.types import EventDirection
 from rotkehlchen.history.price import PriceHistorian
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.serialization.deserialize import deserialize_fval
 from rotkehlchen.types import Location, Price, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.mixins.customizable_date import CustomizableDateMixin
@@ -47,11 +49,15 @@ class AccountingPot(CustomizableDateMixin):
             evm_accounting_aggregators: 'EVMAccountingAggregators',
             msg_aggregator: MessagesAggregator,
             is_dummy_pot: bool = False,
+            keep_processed_events: bool = True,
     ) -> None:
         """
         If is_dummy_pot is set to True then we won't save any events in the pot nor will we
         load any ignored assets. This option is used when fetching history events and checking
         if they have accounting rules set.
+
+        The processed events are always written to the PnL report in the DB. If
+        keep_processed_events is False then they are not also kept in processed_events.
         """
         super().__init__(database=database)
 
@@ -68,7 +74,10 @@ class AccountingPot(CustomizableDateMixin):
             msg_aggregator=msg_aggregator,
         )
         self.pnls = PnlTotals()
+        self.keep_processed_events = keep_processed_events
         self.processed_events: list[ProcessedAccountingEvent] = []
+        self.processed_events_num = 0
+        self.events_writer: PnlEventsWriter | None = None
         self.events_accountant = EventsAccountant(
             evm_accounting_aggregators=evm_accounting_aggregators,
             pot=self,
@@ -77,21 +86,44 @@ class AccountingPot(CustomizableDateMixin):
         self.report_id: int | None = None
 
     def _add_processed_event(self, event: ProcessedAccountingEvent) -> None:
-        dbpnl = DBAccountingReports(self.database)
-        self.processed_events.append(event)
+        self.processed_events_num += 1
+        if self.keep_processed_events:
+            self.processed_events.append(event)
+        if self.events_writer is None:  # not reset for a report
+            return
+
         try:
-            dbpnl.add_report_data(
-                report_id=self.report_id,  # type: ignore # report id is initialized by now
-                time=event.timestamp,
-                ts_converter=self.timestamp_to_date,
-                event=event,
-            )
+            self.events_writer.add(event)
         except (DeserializationError, InputError) as e:
             log.error(str(e))
             return
 
         log.debug(event.to_string(self.timestamp_to_date))
 
+    def flush_processed_events(self) -> None:
+        """Writes the processed events that are still buffered to the PnL report in the DB"""
+        if self.events_writer is None:
+            return
+
+        try:
+            self.events_writer.flush()
+        except InputError as e:
+            log.error(str(e))
+
+    def iterate_processed_events(self) -> Iterator[ProcessedAccountingEvent]:
+        """Iterates the processed events of the current report, lazily reading them from
+        the DB if they are not kept in memory
+
+        May raise:
+        - DeserializationError if an event read from the DB can't be deserialized
+        """
+        if self.keep_processed_events or self.report_id is None:
+            yield from self.processed_events
+            return
+
+        self.flush_processed_events()
+        yield from DBAccountingReports(self.database).iterate_report_events(self.report_id)
+
     def get_rate_in_profit_currency(self, asset: Asset, timestamp: Timestamp) -> Price:
         """Get the profit_currency price of asset in the given timestamp
 
@@ -130,6 +162,75 @@ class AccountingPot(CustomizableDateMixin):
         self.cost_basis.reset(settings)
         self.events_accountant.reset()
         self.processed_events = []
+        self.processed_events_num = 0
+        self.events_writer = PnlEventsWriter(
+            database=self.database,
+            report_id=report_id,
+            ts_converter=self.timestamp_to_date,
+        )
+
+    def serialize_state(
+            self,
+            first_processed_timestamp: Timestamp,
+            last_processed_timestamp: Timestamp,
+    ) -> dict[str, Any]:
+        """Serialize the state needed to continue processing events from this point on
+        so that it can be saved in an accounting snapshot"""
+        return {
+            'report_id': self.report_id,
+            'start_ts': self.query_start_ts,
+            'first_processed_timestamp': first_processed_timestamp,
+            'last_processed_timestamp': last_processed_timestamp,
+            'processed_events_num': self.processed_events_num,
+            'pnls': {
+                event_type.serialize(): pnl.serialize() for event_type, pnl in self.pnls.items()
+            },
+            'cost_basis': self.cost_basis.serialize_state(),
+            'accountants': self.events_accountant.evm_accounting_aggregators.serialize_state(),
+        }
+
+    def deserialize_state(
+            self,
+            data: dict[str, Any],
+            with_report_events: bool,
+    ) -> tuple[Timestamp, Timestamp]:
+        """Restore the state saved by serialize_state on top of a freshly reset pot.
+        Returns the first and last processed timestamps at the time of the snapshot.
+
+        If with_report_events is True then the snapshot is inside the range of the current
+        report and was taken for a report with the same start. The pnls and the processed
+        events of that report up to the snapshot are then copied to the current report.
+        Otherwise the snapshot is before the start of the report and only the cost basis
+        and accountants state is needed.
+
+        May raise:
+        - DeserializationError if the saved state is not as expected
+        - InputError if the events of the report of the snapshot can't be copied
+        """
+        try:
+            first_processed_timestamp = Timestamp(data['first_processed_timestamp'])
+            last_processed_timestamp = Timestamp(data['last_processed_timestamp'])
+            if with_report_events:
+                copied_events = DBAccountingReports(self.database).copy_report_data(
+                    from_report_id=data['report_id'],
+                    to_report_id=self.report_id,  # type: ignore[arg-type]  # report id is initialized by now
+                    events_num=data['processed_events_num'],
+                )
+                self.processed_events_num = len(copied_events)
+                if self.keep_processed_events:
+                    self.processed_events = copied_events
+                for event_type, pnl in data['pnls'].items():
+                    self.pnls[AccountingEventType.deserialize(event_type)] = PNL(
+                        free=deserialize_fval(pnl['free_pnl'], name='free_pnl', location='accounting snapshot'),  # noqa: E501
+                        taxable=deserialize_fval(pnl['taxable_pnl'], name='taxable_pnl', location='accounting snapshot'),  # noqa: E501
+                    )
+
+            self.cost_basis.deserialize_state(data['cost_basis'], keep_indices=with_report_events)
+            self.events_accountant.evm_accounting_aggregators.deserialize_state(data['accountants'])
+        except KeyError as e:
+            raise DeserializationError(f'Accounting snapshot is missing key {e!s}') from e
+
+        return first_processed_timestamp, last_processed_timestamp
 
     def add_in_event(
             self,  # pylint: disable=unused-argument
@@ -173,7 +274,7 @@ class AccountingPot(CustomizableDateMixin):
             amount=amount,
             price=price,
             ignored_asset_ids=self.ignored_asset_ids,
-            starting_index=len(self.processed_events),
+            starting_index=self.processed_events_num,
         )
         for prefork_event in prefork_events:
             self._add_processed_event(prefork_event)
@@ -195,7 +296,7 @@ class AccountingPot(CustomizableDateMixin):
             price=price,
             pnl=PNL(),  # filled out later
             cost_basis=None,
-            index=len(self.processed_events),
+            index=self.processed_events_num,
         )
         if extra_data:
             event.extra_data = extra_data
@@ -291,7 +392,7 @@ class AccountingPot(CustomizableDateMixin):
             price=price,
             pnl=PNL(),  # filled out later
             cost_basis=spend_cost,
-            index=len(self.processed_events),
+            index=self.processed_events_num,
         )
         if extra_data:
             spend_event.extra_data = extra_data
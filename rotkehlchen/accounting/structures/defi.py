@@ -104,6 +104,14 @@ class DefiEvent(AccountingEventMixin):
         """DefiEvent should be eventually deleted. Will not be called from accounting"""
         raise AssertionError('Should never be called')
 
+    def get_assets_to_price(
+            self,
+            accounting: 'AccountingPot',
+            events_iterator: Iterator['AccountingEventMixin'],  # pylint: disable=unused-argument
+    ) -> tuple[list[Asset], int]:
+        """DefiEvent should be eventually deleted. Will not be called from accounting"""
+        raise AssertionError('Should never be called')
+
     def should_ignore(self, ignored_ids_mapping: dict['ActionType', set[str]]) -> bool:
         """DefiEvent should be eventually deleted. Will not be called from accounting"""
         raise AssertionError('Should never be called')
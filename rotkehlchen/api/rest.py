@@ -110,7 +110,9 @@ from rotkehlchen.constants.resolver import ChainID
 from rotkehlchen.constants.timing import ENS_AVATARS_REFRESH
 from rotkehlchen.data_import.manager import DataImportSource
 from rotkehlchen.db.accounting_rules import DBAccountingRules, query_missing_accounting_rules
+from rotkehlchen.db.accounting_snapshots import invalidate_accounting_snapshots
 from rotkehlchen.db.addressbook import DBAddressbook
+from rotkehlchen.db.balance_snapshots import SnapshotResolution
 from rotkehlchen.db.cache import serialize_cache_for_api
 from rotkehlchen.db.constants import (
     HISTORY_MAPPING_KEY_STATE,
@@ -185,6 +187,7 @@ from rotkehlchen.globaldb.cache import (
     globaldb_set_general_cache_values,
 )
 from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.globaldb.manual_price_oracles import MANUAL_PRICE_MAX_SECONDS_DISTANCE
 from rotkehlchen.globaldb.updates import ASSETS_VERSION_KEY
 from rotkehlchen.history.events.structures.base import (
     HistoryBaseEntryType,
@@ -1463,16 +1466,27 @@ class RestAPI:
             return _wrap_in_ok_result(OK_RESULT)
         return wrap_in_fail_result(msg, status_code=HTTPStatus.CONFLICT)
 
-    def query_netvalue_data(self, include_nfts: bool) -> Response:
-        from_ts = Timestamp(0)
+    def query_netvalue_data(
+            self,
+            include_nfts: bool,
+            from_timestamp: Timestamp,
+            to_timestamp: Timestamp,
+            resolution: SnapshotResolution,
+    ) -> Response:
+        from_ts = from_timestamp
         premium = self.rotkehlchen.premium
 
         if premium is None or not premium.is_active():
             today = datetime.datetime.now(tz=datetime.timezone.utc)
             start_of_day_today = datetime.datetime(today.year, today.month, today.day, tzinfo=datetime.timezone.utc)  # noqa: E501
-            from_ts = Timestamp(int((start_of_day_today - datetime.timedelta(days=14)).timestamp()))  # noqa: E501
+            from_ts = max(from_ts, Timestamp(int((start_of_day_today - datetime.timedelta(days=14)).timestamp())))  # noqa: E501
 
-        data = self.rotkehlchen.data.db.get_netvalue_data(from_ts, include_nfts)
+        data = self.rotkehlchen.data.db.get_netvalue_data(
+            from_ts=from_ts,
+            include_nfts=include_nfts,
+            to_ts=to_timestamp,
+            resolution=resolution,
+        )
         result = process_result({'times': data[0], 'data': data[1]})
         return api_response(
             result=_wrap_in_ok_result(result),
@@ -1486,6 +1500,7 @@ class RestAPI:
             collection_id: int | None,
             from_timestamp: Timestamp,
             to_timestamp: Timestamp,
+            resolution: SnapshotResolution,
     ) -> Response:
 
         with self.rotkehlchen.data.db.conn.read_ctx() as cursor:
@@ -1497,6 +1512,7 @@ class RestAPI:
                     to_ts=to_timestamp,
                     asset=asset,
                     balance_type=BalanceType.ASSET,
+                    resolution=resolution,
                 )
             else:  # marshmallow check guarantees collection_id exists
                 data = self.rotkehlchen.data.db.query_collection_timed_balances(
@@ -1504,6 +1520,7 @@ class RestAPI:
                     collection_id=collection_id,  # type: ignore  # collection_id exists here
                     from_ts=from_timestamp,
                     to_ts=to_timestamp,
+                    resolution=resolution,
                 )
 
         result = process_result_list(data)
@@ -2266,6 +2283,11 @@ class RestAPI:
         result_dict = _wrap_in_ok_result(process_result_list(list(nodes)))
         return api_response(result_dict, status_code=HTTPStatus.OK)
 
+    def get_rpc_nodes_stats(self, blockchain: SUPPORTED_EVM_CHAINS) -> Response:
+        manager = self.rotkehlchen.chains_aggregator.get_chain_manager(blockchain)
+        result = manager.node_inquirer.get_node_stats()
+        return api_response(_wrap_in_ok_result(result), status_code=HTTPStatus.OK)
+
     def add_rpc_node(self, node: WeightedNode) -> Response:
         try:
             self.rotkehlchen.data.db.add_rpc_node(node)
@@ -3118,6 +3140,15 @@ class RestAPI:
             status_code=HTTPStatus.OK,
         )
 
+    def _invalidate_accounting_snapshots_for_manual_price(self, timestamp: Timestamp) -> None:
+        """A manual price is used for events up to an hour before it, so the snapshots
+        that include those events can't be used anymore"""
+        with self.rotkehlchen.data.db.user_write() as write_cursor:
+            invalidate_accounting_snapshots(
+                write_cursor=write_cursor,
+                from_ts=Timestamp(timestamp - MANUAL_PRICE_MAX_SECONDS_DISTANCE),
+            )
+
     def add_manual_price(
             self,
             from_asset: Asset,
@@ -3138,6 +3169,7 @@ class RestAPI:
         )
         added = GlobalDBHandler().add_single_historical_price(historical_price)
         if added:
+            self._invalidate_accounting_snapshots_for_manual_price(timestamp)
             return api_response(OK_RESULT, status_code=HTTPStatus.OK)
         return api_response(
             result={'result': False, 'message': 'Failed to store manual price'},
@@ -3160,6 +3192,7 @@ class RestAPI:
         )
         edited = GlobalDBHandler().edit_manual_price(historical_price)
         if edited:
+            self._invalidate_accounting_snapshots_for_manual_price(timestamp)
             return api_response(OK_RESULT, status_code=HTTPStatus.OK)
         return api_response(
             result={'result': False, 'message': 'Failed to edit manual price'},
@@ -3184,6 +3217,7 @@ class RestAPI:
     ) -> Response:
         deleted = GlobalDBHandler().delete_manual_price(from_asset, to_asset, timestamp)
         if deleted:
+            self._invalidate_accounting_snapshots_for_manual_price(timestamp)
             return api_response(OK_RESULT, status_code=HTTPStatus.OK)
         return api_response(
             result={'result': False, 'message': 'Failed to delete manual price'},
@@ -4680,6 +4714,7 @@ class RestAPI:
                 )
                 object.__setattr__(token, 'protocol', None)
                 AssetResolver.clean_memory_cache(identifier=token.identifier)
+                globaldb.clean_evm_tokens_cache(token.evm_address, token.chain_id)
 
         with self.rotkehlchen.data.db.user_write() as write_cursor:  # remove it from the ignored assets  # noqa: E501
             self.rotkehlchen.data.db.remove_from_ignored_assets(
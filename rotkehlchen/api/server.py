@@ -127,6 +127,7 @@ from rotkehlchen.api.v1.resources import (
     RefreshGeneralCacheResource,
     ReverseEnsResource,
     RpcNodesResource,
+    RpcNodesStatsResource,
     SettingsResource,
     StakingResource,
     StatisticsAssetBalanceResource,
@@ -269,6 +270,7 @@ URLS_V1: URLS = [
     ('/blockchains/evm/accounts', EvmAccountsResource),
     ('/blockchains/<string:blockchain>/accounts', BlockchainsAccountsResource),
     ('/blockchains/<string:blockchain>/nodes', RpcNodesResource),
+    ('/blockchains/<string:blockchain>/nodes/stats', RpcNodesStatsResource),
     ('/blockchains/<string:blockchain>/tokens/detect', DetectTokensResource),
     ('/blockchains/<string:blockchain>/xpub', BTCXpubResource),
     ('/blockchains/evm/transactions/add-hash', EvmTransactionsHashResource),
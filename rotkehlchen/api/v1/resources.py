@@ -132,6 +132,7 @@ from rotkehlchen.api.v1.schemas import (
     RpcNodeEditSchema,
     RpcNodeListDeleteSchema,
     RpcNodeSchema,
+    RpcNodesStatsSchema,
     SingleAssetIdentifierSchema,
     SingleAssetWithOraclesIdentifierSchema,
     SingleFileSchema,
@@ -179,6 +180,7 @@ from rotkehlchen.chain.ethereum.modules.nft.structures import NftLpHandling
 from rotkehlchen.chain.evm.types import NodeName, WeightedNode
 from rotkehlchen.constants.location_details import LOCATION_DETAILS
 from rotkehlchen.data_import.manager import DataImportSource
+from rotkehlchen.db.balance_snapshots import SnapshotResolution
 from rotkehlchen.db.constants import (
     LINKABLE_ACCOUNTING_PROPERTIES,
     LINKABLE_ACCOUNTING_SETTINGS_NAME,
@@ -654,6 +656,16 @@ class EthereumAirdropsResource(BaseMethodView):
         return self.rest_api.get_ethereum_airdrops(async_query=async_query)
 
 
+class RpcNodesStatsResource(BaseMethodView):
+
+    get_schema = RpcNodesStatsSchema()
+
+    @require_loggedin_user()
+    @use_kwargs(get_schema, location='view_args')
+    def get(self, blockchain: SUPPORTED_EVM_CHAINS) -> Response:
+        return self.rest_api.get_rpc_nodes_stats(blockchain=blockchain)
+
+
 class RpcNodesResource(BaseMethodView):
 
     get_schema = RpcNodeSchema()
@@ -1362,8 +1374,19 @@ class StatisticsNetvalueResource(BaseMethodView):
 
     @require_loggedin_user()
     @use_kwargs(get_schema, location='json_and_query')
-    def get(self, include_nfts: bool) -> Response:
-        return self.rest_api.query_netvalue_data(include_nfts=include_nfts)
+    def get(
+            self,
+            include_nfts: bool,
+            from_timestamp: Timestamp,
+            to_timestamp: Timestamp,
+            resolution: SnapshotResolution,
+    ) -> Response:
+        return self.rest_api.query_netvalue_data(
+            include_nfts=include_nfts,
+            from_timestamp=from_timestamp,
+            to_timestamp=to_timestamp,
+            resolution=resolution,
+        )
 
 
 class StatisticsAssetBalanceResource(BaseMethodView):
@@ -1378,12 +1401,14 @@ class StatisticsAssetBalanceResource(BaseMethodView):
             collection_id: int | None,
             from_timestamp: Timestamp,
             to_timestamp: Timestamp,
+            resolution: SnapshotResolution,
     ) -> Response:
         return self.rest_api.query_timed_balances_data(
             asset=asset,  # note that from marshmallow asset and collection_id are guaranteed to exist and be mutually exclusive  # noqa: E501
             collection_id=collection_id,
             from_timestamp=from_timestamp,
             to_timestamp=to_timestamp,
+            resolution=resolution,
         )
 
 
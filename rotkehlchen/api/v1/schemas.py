@@ -39,6 +39,7 @@ from rotkehlchen.constants.assets import A_ETH, A_ETH2
 from rotkehlchen.constants.misc import ONE, ZERO
 from rotkehlchen.constants.resolver import EVM_CHAIN_DIRECTIVE
 from rotkehlchen.data_import.manager import DataImportSource
+from rotkehlchen.db.balance_snapshots import SnapshotResolution
 from rotkehlchen.db.constants import (
     LINKABLE_ACCOUNTING_PROPERTIES,
     LINKABLE_ACCOUNTING_SETTINGS_NAME,
@@ -1261,6 +1262,7 @@ class ModifiableSettingsSchema(Schema):
         ),
         load_default=None,
     )
+    hedge_evm_queries = fields.Boolean(load_default=None)
 
     @validates_schema
     def validate_settings_schema(
@@ -1316,6 +1318,7 @@ class ModifiableSettingsSchema(Schema):
             query_retry_limit=data['query_retry_limit'],
             connect_timeout=data['connect_timeout'],
             read_timeout=data['read_timeout'],
+            hedge_evm_queries=data['hedge_evm_queries'],
         )
 
 
@@ -1447,7 +1450,14 @@ class BlockchainBalanceQuerySchema(AsyncQueryArgumentSchema):
     ignore_cache = fields.Boolean(load_default=False)
 
 
-class StatisticsAssetBalanceSchema(TimestampRangeSchema):
+class SnapshotResolutionSchema(Schema):
+    resolution = SerializableEnumField(
+        enum_class=SnapshotResolution,
+        load_default=SnapshotResolution.SNAPSHOT,
+    )
+
+
+class StatisticsAssetBalanceSchema(TimestampRangeSchema, SnapshotResolutionSchema):
     asset = AssetField(expected_type=Asset, load_default=None)
     collection_id = fields.Integer(load_default=None)
 
@@ -2454,7 +2464,7 @@ class Eth2DailyStatsSchema(
         }
 
 
-class StatisticsNetValueSchema(Schema):
+class StatisticsNetValueSchema(TimestampRangeSchema, SnapshotResolutionSchema):
     include_nfts = fields.Boolean(load_default=True)
 
 
@@ -2695,6 +2705,13 @@ class RpcNodeSchema(Schema):
     blockchain = BlockchainField(required=True, exclude_types=(SupportedBlockchain.ETHEREUM_BEACONCHAIN,))  # noqa: E501
 
 
+class RpcNodesStatsSchema(Schema):
+    blockchain = BlockchainField(
+        required=True,
+        exclude_types=tuple(x for x in SupportedBlockchain if x.is_evm() is False),
+    )
+
+
 class RpcAddNodeSchema(Schema):
     blockchain = BlockchainField(required=True, exclude_types=(SupportedBlockchain.ETHEREUM_BEACONCHAIN,))  # noqa: E501
     name = fields.String(
@@ -1,68 +1,199 @@
 import json
 import logging
+from collections import deque
 from collections.abc import Callable
-from contextlib import suppress
-from typing import TYPE_CHECKING, Any
+from dataclasses import dataclass
+from typing import Any
 
+import gevent
+from gevent.event import Event
 from gevent.lock import Semaphore
 from geventwebsocket import WebSocketApplication
 from geventwebsocket.exceptions import WebSocketError
 from geventwebsocket.websocket import WebSocket
 
+from rotkehlchen.api.websockets.typedefs import (
+    HistoryEventsStep,
+    TransactionStatusStep,
+    WSMessageType,
+)
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 
-if TYPE_CHECKING:
-    from rotkehlchen.api.websockets.typedefs import WSMessageType
-
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 
-def _ws_send_impl(
-        websocket: WebSocket,
-        lock: Semaphore,
-        to_send_msg: str,
-        success_callback: Callable | None = None,
-        success_callback_args: dict[str, Any] | None = None,
-        failure_callback: Callable | None = None,
-        failure_callback_args: dict[str, Any] | None = None,
-) -> None:
-    try:
-        with lock:
-            websocket.send(to_send_msg)
-    except WebSocketError as e:
-        log.error(f'Websocket send with message {to_send_msg} failed due to {e!s}')
-
-        if failure_callback:
-            failure_callback_args = {} if failure_callback_args is None else failure_callback_args
-            failure_callback(**failure_callback_args)
-        return
+# Time in seconds that a subscriber's sender waits after a message is queued so that the
+# messages broadcasted meanwhile are sent together in one go
+WS_SEND_WINDOW = 0.05
+# Messages queued for a subscriber after which the oldest ones are dropped
+MAX_QUEUED_MESSAGES = 2000
+# Intermediate progress steps of which only the latest per task needs to be sent
+PROGRESS_STEPS = {
+    str(TransactionStatusStep.QUERYING_TRANSACTIONS),
+    str(TransactionStatusStep.QUERYING_INTERNAL_TRANSACTIONS),
+    str(TransactionStatusStep.QUERYING_EVM_TOKENS_TRANSACTIONS),
+    str(HistoryEventsStep.QUERYING_EVENTS_STATUS_UPDATE),
+}
+
+
+def _progress_key(
+        message_type: WSMessageType,
+        data: dict[str, Any] | list[Any],
+) -> tuple | None:
+    """Returns the task that the message is an intermediate progress update of, or None
+    if the message is not one. A queued progress update is superseded by a later one of
+    the same task. The first and last message of each task are always sent."""
+    if not isinstance(data, dict):
+        return None
+
+    if message_type == WSMessageType.EVM_UNDECODED_TRANSACTIONS and 0 < data['processed'] < data['total']:  # noqa: E501
+        return message_type, data['evm_chain']
+    if message_type == WSMessageType.CSV_IMPORT_STATUS and 0 < data['processed'] < data['total']:
+        return message_type, data['source']
+    if message_type == WSMessageType.EVM_TRANSACTION_STATUS and data['status'] in PROGRESS_STEPS:
+        return message_type, data['evm_chain'], data['address']
+    if message_type == WSMessageType.HISTORY_EVENTS_STATUS and data['status'] in PROGRESS_STEPS:
+        return message_type, data['location'], data['name'], data['event_type']
+
+    return None
+
+
+@dataclass(init=True, repr=False, eq=False, order=False, unsafe_hash=False, frozen=False)
+class QueuedMessage:
+    message: str
+    progress_key: tuple | None
+    success_callback: Callable | None
+    success_callback_args: dict[str, Any] | None
+    failure_callback: Callable | None
+    failure_callback_args: dict[str, Any] | None
+    superseded: bool = False
+
+    def succeeded(self) -> None:
+        if self.success_callback is not None:
+            self.success_callback(**(self.success_callback_args or {}))
+
+    def failed(self) -> None:
+        if self.failure_callback is not None:
+            self.failure_callback(**(self.failure_callback_args or {}))
+
+
+class WebsocketSubscriber:
+    """The queue of the messages to send to a websocket and the greenlet that sends them
+
+    Broadcasting only queues the message, so that the greenlets emitting many messages
+    are not blocked by the websocket. The queue is bounded so that a slow client can't
+    make it grow indefinitely. When it's full the oldest message is dropped and its
+    failure callback is called."""
+
+    def __init__(self, websocket: WebSocket) -> None:
+        self.websocket = websocket
+        self.lock = Semaphore()
+        self.queue: deque[QueuedMessage] = deque()
+        self.progress: dict[tuple, QueuedMessage] = {}
+        self.queued_num = 0  # messages in the queue that are not superseded
+        self.max_queued_num = 0
+        self.coalesced_num = 0
+        self.dropped_num = 0
+        self.has_messages = Event()
+        self.greenlet = gevent.spawn(self._send_queued_messages)
+
+    def queue_message(self, queued_message: QueuedMessage) -> None:
+        if queued_message.progress_key is not None:
+            if (previous := self.progress.get(queued_message.progress_key)) is not None:
+                previous.superseded = True
+                self.queued_num -= 1
+                self.coalesced_num += 1
+            self.progress[queued_message.progress_key] = queued_message
+
+        if self.queued_num == MAX_QUEUED_MESSAGES:
+            self._drop_oldest_message()
 
-    if success_callback:  # send success
-        success_callback_args = {} if success_callback_args is None else success_callback_args
-        success_callback(**success_callback_args)
+        self.queue.append(queued_message)
+        self.queued_num += 1
+        self.max_queued_num = max(self.max_queued_num, self.queued_num)
+        self.has_messages.set()
+
+    def _drop_oldest_message(self) -> None:
+        while (dropped := self.queue.popleft()).superseded is True:
+            continue
+
+        if self.dropped_num == 0:
+            log.warning(
+                f'Websocket with hash id {hash(self.websocket)} does not keep up with the '
+                f'messages sent to it. Dropping the oldest queued messages',
+            )
+        self.dropped_num += 1
+        self.queued_num -= 1
+        if dropped.progress_key is not None:
+            self.progress.pop(dropped.progress_key, None)
+        dropped.failed()
+
+    def _send_queued_messages(self) -> None:
+        while True:
+            self.has_messages.wait()
+            gevent.sleep(WS_SEND_WINDOW)
+            self.has_messages.clear()
+            to_send, self.queue, self.progress, self.queued_num = self.queue, deque(), {}, 0
+            for queued_message in to_send:
+                if queued_message.superseded is False:
+                    self._send(queued_message)
+
+    def _send(self, queued_message: QueuedMessage) -> None:
+        try:
+            with self.lock:
+                self.websocket.send(queued_message.message)
+        except WebSocketError as e:
+            log.error(f'Websocket send with message {queued_message.message} failed due to {e!s}')
+            queued_message.failed()
+            return
+
+        queued_message.succeeded()
+
+    def close(self) -> None:
+        """Stops sending messages and fails the ones still queued"""
+        self.greenlet.kill()
+        for queued_message in self.queue:
+            if queued_message.superseded is False:
+                queued_message.failed()
+
+        self.queue.clear()
+        self.progress.clear()
+        self.queued_num = 0
+
+    def get_stats(self) -> dict[str, int]:
+        return {
+            'queued': self.queued_num,
+            'max_queued': self.max_queued_num,
+            'coalesced': self.coalesced_num,
+            'dropped': self.dropped_num,
+        }
 
 
 class RotkiNotifier:
 
     def __init__(self) -> None:
-        self.subscribers: list[WebSocket] = []
-        self.locks: dict[WebSocket, Semaphore] = {}
+        self.subscribers: dict[WebSocket, WebsocketSubscriber] = {}
 
     def subscribe(self, websocket: WebSocket) -> None:
         log.info(f'Websocket with hash id {hash(websocket)} subscribed to rotki notifier')
-        self.subscribers.append(websocket)
-        self.locks[websocket] = Semaphore()
+        self.subscribers[websocket] = WebsocketSubscriber(websocket)
 
     def unsubscribe(self, websocket: WebSocket) -> None:
-        self.locks.pop(websocket, None)
-        with suppress(ValueError):
-            self.subscribers.remove(websocket)
-            log.info(f'Websocket with hash id {hash(websocket)} unsubscribed from rotki notifier')
+        if (subscriber := self.subscribers.pop(websocket, None)) is not None:
+            subscriber.close()
+            log.info(
+                f'Websocket with hash id {hash(websocket)} unsubscribed from rotki notifier. '
+                f'Message queue stats: {subscriber.get_stats()}',
+            )
+
+    def get_stats(self) -> list[dict[str, int]]:
+        """Returns the stats of the message queue of each subscriber"""
+        return [x.get_stats() for x in self.subscribers.values()]
 
     def broadcast(
             self,
-            message_type: 'WSMessageType',
+            message_type: WSMessageType,
             to_send_data: dict[str, Any] | list[Any],
             success_callback: Callable | None = None,
             success_callback_args: dict[str, Any] | None = None,
@@ -71,8 +202,13 @@ class RotkiNotifier:
     ) -> None:
         """Broadcasts a websocket message
 
+        The message is queued for each subscriber and sent by its sender greenlet. An
+        intermediate progress update that is still queued when a later one of the same
+        task is broadcasted is not sent.
+
         A callback to run on message success and a callback to run on message
-        failure can be optionally provided.
+        failure can be optionally provided. They are called for each subscriber
+        when its message is sent or fails to be sent.
         """
         message_data = {'type': str(message_type), 'data': to_send_data}
         try:
@@ -85,29 +221,24 @@ class RotkiNotifier:
 
             return  # get out of the broadcast
 
-        to_remove_indices = set()
-        spawned_one_broadcast = False
-        for idx, websocket in enumerate(self.subscribers):
+        progress_key = _progress_key(message_type, to_send_data)
+        queued_one_broadcast = False
+        for websocket in list(self.subscribers):
             if websocket.closed is True:
-                to_remove_indices.add(idx)
+                self.unsubscribe(websocket)
                 continue
 
-            _ws_send_impl(
-                websocket=websocket,
-                lock=self.locks[websocket],
-                to_send_msg=message,
+            self.subscribers[websocket].queue_message(QueuedMessage(
+                message=message,
+                progress_key=progress_key,
                 success_callback=success_callback,
                 success_callback_args=success_callback_args,
                 failure_callback=failure_callback,
                 failure_callback_args=failure_callback_args,
-            )
-            spawned_one_broadcast = True
+            ))
+            queued_one_broadcast = True
 
-        if len(to_remove_indices) != 0:  # removed closed websockets from the list
-            self.subscribers = [
-                i for j, i in enumerate(self.subscribers) if j not in to_remove_indices
-            ]
-        if spawned_one_broadcast is False and failure_callback is not None:
+        if queued_one_broadcast is False and failure_callback is not None:
             failure_callback_args = {} if failure_callback_args is None else failure_callback_args
             failure_callback(**failure_callback_args)
 
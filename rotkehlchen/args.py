@@ -131,6 +131,14 @@ def app_args(prog: str, description: str) -> argparse.ArgumentParser:
         default=DEFAULT_SQL_VM_INSTRUCTIONS_CB,
         type=_positive_int_or_zero,
     )
+    p.add_argument(
+        '--premium-sync-deltas',
+        help=(
+            'If given then the premium DB sync uploads only the changes since the last '
+            'sync to servers that support it. Experimental.'
+        ),
+        action='store_true',
+    )
     p.add_argument(
         'version',
         help='Shows the rotki version',
@@ -0,0 +1,62 @@
+"""Concurrent querying of the balance sources
+
+A balance refresh queries every exchange and every chain for its balances. They are
+queried concurrently so that the refresh takes about as long as the slowest of them
+instead of the sum of all. Each source gets its own timeout and all of them share a
+deadline, so that a source that hangs makes only its own balances fail.
+"""
+import logging
+from collections.abc import Callable, Hashable
+from functools import partial
+from typing import TypeVar
+
+from rotkehlchen.errors.misc import EthSyncError, RemoteError
+from rotkehlchen.greenlets.utils import run_with_timeouts
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# Max number of balance sources queried at the same time
+BALANCES_QUERY_CONCURRENCY = 8
+# Seconds after which the balances query of a single source is abandoned
+BALANCE_SOURCE_QUERY_TIMEOUT = 180
+# Seconds after which the balances query of all the sources is abandoned
+BALANCES_QUERY_DEADLINE = 300
+
+K = TypeVar('K', bound=Hashable)
+
+
+def query_balance_sources(
+        sources: dict[K, Callable[[], None]],
+        concurrency: int = BALANCES_QUERY_CONCURRENCY,
+        source_timeout: float = BALANCE_SOURCE_QUERY_TIMEOUT,
+        deadline: float = BALANCES_QUERY_DEADLINE,
+) -> dict[K, RemoteError | EthSyncError]:
+    """Calls the query function of each source concurrently, up to `concurrency` of them
+    at a time. A query is abandoned after `source_timeout` seconds or once `deadline`
+    seconds have passed since the start, whichever comes first.
+
+    Returns the error of each source whose query failed or timed out. A timeout is
+    returned as a RemoteError. Unexpected errors are raised once all sources are done.
+    """
+    errors: dict[K, RemoteError | EthSyncError] = {}
+
+    def query_source(key: K, query: Callable[[], None]) -> None:
+        try:
+            query()
+        except (RemoteError, EthSyncError) as e:
+            errors[key] = e
+
+    def timeout_cb(key: K, timeout: float) -> None:
+        log.error(f'Balances query of {key} timed out after {timeout:.0f} seconds')
+        errors[key] = RemoteError(f'Balances query timed out after {timeout:.0f} seconds')
+
+    run_with_timeouts(
+        queries={key: partial(query_source, key, query) for key, query in sources.items()},
+        concurrency=concurrency,
+        timeout=source_timeout,
+        timeout_cb=timeout_cb,
+        deadline=deadline,
+    )
+    return errors
@@ -2,6 +2,7 @@ import logging
 import typing
 from collections import defaultdict
 from collections.abc import Callable, Iterator, Sequence
+from functools import partial
 from importlib import import_module
 from itertools import starmap
 from pathlib import Path
@@ -14,6 +15,12 @@ from web3.exceptions import BadFunctionCallOutput
 from rotkehlchen.accounting.structures.balance import Balance, BalanceSheet
 from rotkehlchen.api.websockets.typedefs import WSMessageType
 from rotkehlchen.assets.asset import CryptoAsset, EvmToken
+from rotkehlchen.balances.sources import (
+    BALANCE_SOURCE_QUERY_TIMEOUT,
+    BALANCES_QUERY_CONCURRENCY,
+    BALANCES_QUERY_DEADLINE,
+    query_balance_sources,
+)
 from rotkehlchen.chain.accounts import BlockchainAccountData, BlockchainAccounts
 from rotkehlchen.chain.avalanche.manager import AvalancheManager
 from rotkehlchen.chain.bitcoin import get_bitcoin_addresses_balances
@@ -478,7 +485,10 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
             blockchain: SupportedBlockchain | None = None,
             ignore_cache: bool = False,
     ) -> BlockchainBalancesUpdate:
-        """Queries either all, or specific blockchain balances
+        """Queries either all, or specific blockchain balances. All chains are
+        queried concurrently. If some of them fail or time out, they keep the balances
+        they had before the query and the error of the first of them is raised once
+        the rest are updated.
 
         If querying beaconchain and ignore_cache is true then each eth1 address is also
         checked for the validators it has deposited and the deposits are fetched.
@@ -489,22 +499,49 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         - EthSyncError if querying the token balances through a provided ethereum
         client and the chain is not synced
         """
-        xpub_manager = XpubManager(chains_aggregator=self)
         if blockchain is not None:
-            query_method = f'query_{blockchain.get_key()}_balances'
-            getattr(self, query_method)(ignore_cache=ignore_cache)
-            if ignore_cache is True and blockchain.is_bitcoin():
-                xpub_manager.check_for_new_xpub_addresses(blockchain=blockchain)  # type: ignore # is checked in the if
-        else:  # all chains
-            for chain in SupportedBlockchain:
-                query_method = f'query_{chain.get_key()}_balances'
-                getattr(self, query_method)(ignore_cache=ignore_cache)
-                if ignore_cache is True and chain.is_bitcoin():
-                    xpub_manager.check_for_new_xpub_addresses(blockchain=chain)  # type: ignore # is checked in the if
+            self._query_chain_balances(blockchain=blockchain, ignore_cache=ignore_cache)
+            self.totals = self.balances.recalculate_totals()
+        elif len(errors := self.query_all_chains_balances(ignore_cache=ignore_cache)) != 0:
+            raise next(iter(errors.values()))
 
-        self.totals = self.balances.recalculate_totals()
         return self.get_balances_update(blockchain)
 
+    def _query_chain_balances(self, blockchain: SupportedBlockchain, ignore_cache: bool) -> None:
+        query_method = f'query_{blockchain.get_key()}_balances'
+        getattr(self, query_method)(ignore_cache=ignore_cache)
+        if ignore_cache is True and blockchain.is_bitcoin():
+            XpubManager(chains_aggregator=self).check_for_new_xpub_addresses(blockchain=blockchain)  # type: ignore # is checked in the if
+
+    def query_all_chains_balances(
+            self,
+            ignore_cache: bool,
+            concurrency: int = BALANCES_QUERY_CONCURRENCY,
+            source_timeout: float = BALANCE_SOURCE_QUERY_TIMEOUT,
+            deadline: float = BALANCES_QUERY_DEADLINE,
+    ) -> dict[SupportedBlockchain, RemoteError | EthSyncError]:
+        """Queries the balances of all chains concurrently and recalculates the totals.
+
+        The chains whose query fails or times out keep the balances they had before
+        the query. Returns the error of each of them.
+        """
+        previous_balances = self.balances.copy()
+        errors = query_balance_sources(
+            sources={
+                chain: partial(self._query_chain_balances, blockchain=chain, ignore_cache=ignore_cache)  # noqa: E501
+                for chain in SupportedBlockchain
+            },
+            concurrency=concurrency,
+            source_timeout=source_timeout,
+            deadline=deadline,
+        )
+        for chain, error in errors.items():
+            log.error(f'Querying {chain} balances failed due to {error!s}')
+            setattr(self.balances, chain.get_key(), previous_balances.get(chain))
+
+        self.totals = self.balances.recalculate_totals()
+        return errors
+
     @protect_with_lock()
     @cache_response_timewise()
     def query_btc_balances(
@@ -1368,6 +1405,26 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
     def is_contract(self, address: ChecksumEvmAddress, chain: SUPPORTED_EVM_CHAINS) -> bool:
         return self.get_chain_manager(chain).node_inquirer.get_code(address) != '0x'
 
+    def get_contracts(
+            self,
+            addresses: Sequence[ChecksumEvmAddress],
+            chain: SUPPORTED_EVM_CHAINS,
+    ) -> set[ChecksumEvmAddress]:
+        """Returns which of the given addresses are contracts. Their code is queried in batch.
+
+        May raise:
+        - RemoteError if the code of an address could not be queried
+        """
+        node_inquirer = self.get_chain_manager(chain).node_inquirer
+        contracts = set()
+        for address, code in zip(addresses, node_inquirer.get_codes(addresses), strict=True):
+            if isinstance(code, RemoteError):
+                raise code
+            if code != '0x':
+                contracts.add(address)
+
+        return contracts
+
     def check_single_address_activity(
             self,
             address: ChecksumEvmAddress,
@@ -1502,10 +1559,11 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
         existed_accounts: list[tuple[SUPPORTED_EVM_CHAINS, ChecksumEvmAddress]] = []
         no_activity_accounts: list[tuple[SUPPORTED_EVM_CHAINS, ChecksumEvmAddress]] = []
 
+        # Distinguish between contracts and EOAs
+        contracts = self.get_contracts(accounts, SupportedBlockchain.ETHEREUM)
         for account in accounts:
             existed_accounts += [(chain, account) for chain in all_evm_chains if account in self.accounts.get(chain)]  # noqa: E501
-            # Distinguish between contracts and EOAs
-            if self.is_contract(account, SupportedBlockchain.ETHEREUM):
+            if account in contracts:
                 added_chains, _ = self.track_evm_address(account, [SupportedBlockchain.ETHEREUM])
                 if len(added_chains) == 1:  # Is always either 1 or 0 since is only for ethereum
                     added_accounts.append((SupportedBlockchain.ETHEREUM, account))
@@ -1550,11 +1608,12 @@ class ChainsAggregator(CacheableMixIn, LockableQueryMixIn):
 
         all_evm_chains = set(typing.get_args(SUPPORTED_EVM_CHAINS)) if chains is None else set(chains)  # noqa: E501
         added_accounts: list[tuple[SUPPORTED_EVM_CHAINS, ChecksumEvmAddress]] = []
+        contracts = self.get_contracts(list(current_accounts), SupportedBlockchain.ETHEREUM)
         for account, account_chains in current_accounts.items():
             if progress_handler is not None:
                 progress_handler.new_step(f'Checking {account} EVM chain activity')
 
-            if self.is_contract(account, SupportedBlockchain.ETHEREUM):
+            if account in contracts:
                 continue  # do not check ethereum mainnet contracts
 
             chains_to_check = list(all_evm_chains - set(account_chains))
@@ -3,6 +3,7 @@
 
 import hashlib
 import hmac
+from collections.abc import Iterable
 from dataclasses import dataclass
 from enum import auto
 from typing import NamedTuple, Optional, cast
@@ -404,20 +405,56 @@ class HDKey:
         )
         return self._child_from_xpub(index=index, child_xpub=child_xpub)
 
-    def address(self) -> BTCAddress:
+    def derive_addresses(self, indices: Iterable[int]) -> list[BTCAddress]:
+        """
+        Derives the addresses of the non-hardened children at the given indices.
+        Same as calling derive_child(idx).address() for each index, but only derives
+        the child public keys, without creating the child HDKeys and their xpubs.
+        Args:
+            indices (iterable(int)): the indices of the children
+        Returns:
+            (list(BTCAddress)): the address of each child in the order of the indices
+        """
+        if not self.chain_code:
+            raise XPUBError('Cannot derive XPUB child without chain_code')
+        if self.privkey:
+            raise NotImplementedError('Privkeys xpub derivation not implemented in rotki')
+
+        own_pubkey = self.pubkey.format(COMPRESSED_PUBKEY)
+        own_mac = hmac.new(self.chain_code, own_pubkey, digestmod=hashlib.sha512)
+        addresses = []
+        for idx in indices:
+            index = idx
+            while True:
+                if index >= BIP32_HARDEN:
+                    raise XPUBError('Need private key to derive XPUB hardened children')
+
+                mac = own_mac.copy()  # Data = serP(point(kpar)) || ser32(i)
+                mac.update(index.to_bytes(4, byteorder='big'))
+                try:
+                    child_pubkey = self.pubkey.add(mac.digest()[:32])
+                except ValueError:  # impossible key, derive at the next index as derive_child
+                    index += 1
+                    continue
+
+                break
+
+            addresses.append(self._pubkey_address(child_pubkey.format(COMPRESSED_PUBKEY)))
+
+        return addresses
+
+    def _pubkey_address(self, pubkey: bytes) -> BTCAddress:
+        """Returns the address of the given compressed pubkey for the type of this key"""
         if self.hint == 'xpub' and self.xpub_type == XpubType.P2TR:
-            return pubkey_to_bech32_address(
-                data=self.pubkey.format(COMPRESSED_PUBKEY),
-                witver=WitnessVersion.BECH32M,
-            )
+            return pubkey_to_bech32_address(data=pubkey, witver=WitnessVersion.BECH32M)
         if self.hint == 'xpub':
-            return pubkey_to_base58_address(self.pubkey.format(COMPRESSED_PUBKEY))
+            return pubkey_to_base58_address(pubkey)
         if self.hint == 'ypub':
-            return pubkey_to_p2sh_p2wpkh_address(self.pubkey.format(COMPRESSED_PUBKEY))
+            return pubkey_to_p2sh_p2wpkh_address(pubkey)
         if self.hint == 'zpub':
-            return pubkey_to_bech32_address(
-                data=self.pubkey.format(COMPRESSED_PUBKEY),
-                witver=WitnessVersion.BECH32,
-            )
+            return pubkey_to_bech32_address(data=pubkey, witver=WitnessVersion.BECH32)
         # else
         raise AssertionError(f'Unknown hint {self.hint} ended up in an HDKey')
+
+    def address(self) -> BTCAddress:
+        return self._pubkey_address(self.pubkey.format(COMPRESSED_PUBKEY))
@@ -1,6 +1,9 @@
 import logging
+from collections import deque
 from typing import TYPE_CHECKING, Any, Literal, NamedTuple
 
+import gevent
+from gevent import Greenlet
 from gevent.lock import Semaphore
 
 from rotkehlchen.accounting.structures.balance import Balance
@@ -24,6 +27,9 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Max number of gap windows of derived addresses whose activity is queried at the same time
+MAX_CONCURRENT_GAP_WINDOWS = 3
+
 
 class XpubData(NamedTuple):
     xpub: HDKey
@@ -72,56 +78,96 @@ class XpubDerivedAddressData(NamedTuple):
     balance: FVal
 
 
+def _query_addresses_activity(
+        addresses: list[BTCAddress],
+        blockchain: Literal[SupportedBlockchain.BITCOIN, SupportedBlockchain.BITCOIN_CASH],
+) -> dict[BTCAddress, tuple[bool, FVal]] | RemoteError:
+    """Queries which of the addresses have had transactions and their balances. Returns
+    the error instead of raising it, so that it can be called in its own greenlet"""
+    try:
+        if blockchain == SupportedBlockchain.BITCOIN:
+            return have_bitcoin_transactions(addresses)
+        return have_bch_transactions(addresses)
+    except RemoteError as e:
+        return e
+
+
 def _derive_addresses_loop(
         account_index: int,
         start_index: int,
         root: HDKey,
         gap_limit: int,
         blockchain: Literal[SupportedBlockchain.BITCOIN, SupportedBlockchain.BITCOIN_CASH],
+        derived_addresses: dict[int, BTCAddress],
 ) -> list[XpubDerivedAddressData]:
-    """May raise:
+    """Checks the addresses of root in windows of gap_limit addresses from start_index
+    until a window has no address with transactions.
+
+    The addresses are taken from derived_addresses, the mapping of derived index to
+    address, and the missing ones are derived and added to it.
+
+    The activity of the next windows is queried while a window is processed. The number
+    of windows queried at the same time starts at one and grows while the windows have
+    activity, so that checking an xpub without new activity costs a single query.
+
+    May raise:
     - RemoteError: if blockstream/blockchain.info can't be reached
     """
+    def query_window(window_start: int) -> tuple[list[tuple[int, BTCAddress]], Greenlet]:
+        indices = range(window_start, window_start + gap_limit)
+        if len(missing := [idx for idx in indices if idx not in derived_addresses]) != 0:
+            derived_addresses.update(zip(missing, root.derive_addresses(missing), strict=True))
+        batch_addresses = [(idx, derived_addresses[idx]) for idx in indices]
+        return batch_addresses, gevent.spawn(
+            _query_addresses_activity,
+            [x[1] for x in batch_addresses],
+            blockchain,
+        )
+
     step_index = start_index
     addresses: list[XpubDerivedAddressData] = []
+    pending_windows: deque[tuple[list[tuple[int, BTCAddress]], Greenlet]] = deque()
+    windows_num = 1
     should_continue = True
-    while should_continue:
-        batch_addresses: list[tuple[int, BTCAddress]] = []
-        for idx in range(step_index, step_index + gap_limit):
-            child = root.derive_child(idx)
-            batch_addresses.append((idx, child.address()))
-
-        if blockchain == SupportedBlockchain.BITCOIN:
-            have_tx_mapping = have_bitcoin_transactions([x[1] for x in batch_addresses])
-        else:
-            have_tx_mapping = have_bch_transactions([x[1] for x in batch_addresses])
-        should_continue = False
-        for idx, address in batch_addresses:
-            have_tx, balance = have_tx_mapping[address]
-            if have_tx:
-                addresses.append(XpubDerivedAddressData(
-                    account_index=account_index,
-                    derived_index=idx,
-                    address=address,
-                    balance=balance,
-                ))
-                should_continue = True
-
-        # do one more pass and add any addresses with no transactions before the max index
-        # this is so we can start new address generation from the max index later
-        if len(addresses) != 0:
-            max_index = max(x[0] for x in addresses)
-            for idx, address in batch_addresses[:max_index]:
+    try:
+        while should_continue:
+            while len(pending_windows) < windows_num:
+                pending_windows.append(query_window(step_index))
+                step_index += gap_limit
+
+            batch_addresses, greenlet = pending_windows.popleft()
+            if isinstance(have_tx_mapping := greenlet.get(), RemoteError):
+                raise have_tx_mapping
+
+            should_continue = False
+            for idx, address in batch_addresses:
                 have_tx, balance = have_tx_mapping[address]
-                if not have_tx:
+                if have_tx:
                     addresses.append(XpubDerivedAddressData(
                         account_index=account_index,
                         derived_index=idx,
                         address=address,
                         balance=balance,
                     ))
-
-        step_index += gap_limit
+                    should_continue = True
+
+            # do one more pass and add any addresses with no transactions before the max index
+            # this is so we can start new address generation from the max index later
+            if len(addresses) != 0:
+                max_index = max(x[0] for x in addresses)
+                for idx, address in batch_addresses[:max_index]:
+                    have_tx, balance = have_tx_mapping[address]
+                    if not have_tx:
+                        addresses.append(XpubDerivedAddressData(
+                            account_index=account_index,
+                            derived_index=idx,
+                            address=address,
+                            balance=balance,
+                        ))
+
+            windows_num = min(windows_num + 1, MAX_CONCURRENT_GAP_WINDOWS)
+    finally:  # the windows after the first one without activity are not needed
+        gevent.killall([greenlet for _, greenlet in pending_windows])
 
     return addresses
 
@@ -131,11 +177,15 @@ def _derive_addresses_from_xpub_data(
         start_receiving_index: int,
         start_change_index: int,
         gap_limit: int,
+        derived_addresses: tuple[dict[int, BTCAddress], dict[int, BTCAddress]],
 ) -> list[XpubDerivedAddressData]:
     """Derive all addresses from the xpub that have had transactions. Also includes
     any addresses until the biggest index derived addresses that have had no transactions.
     This is to make it easier to later derive and check more addresses
 
+    derived_addresses are the already derived receiving and change addresses. Any newly
+    derived addresses are added to them.
+
     May raise:
     - RemoteError: if blockstream/blockchain.info/haskoin and others can't be reached
     """
@@ -153,6 +203,7 @@ def _derive_addresses_from_xpub_data(
             root=receiving_xpub,
             gap_limit=gap_limit,
             blockchain=xpub_data.blockchain,
+            derived_addresses=derived_addresses[0],
         ),
     )
     change_xpub = account_xpub.derive_child(1)
@@ -163,6 +214,7 @@ def _derive_addresses_from_xpub_data(
             root=change_xpub,
             gap_limit=gap_limit,
             blockchain=xpub_data.blockchain,
+            derived_addresses=derived_addresses[1],
         ),
     )
     return addresses
@@ -190,14 +242,34 @@ class XpubManager:
         """
         with self.db.conn.read_ctx() as cursor:
             last_receiving_idx, last_change_idx = self.db.get_last_consecutive_xpub_derived_indices(cursor, xpub_data)  # noqa: E501
-            derived_addresses_data = _derive_addresses_from_xpub_data(
-                xpub_data=xpub_data,
-                start_receiving_index=last_receiving_idx,
-                start_change_index=last_change_idx,
-                gap_limit=self.chains_aggregator.btc_derivation_gap_limit,
+            derived_addresses = (
+                self.db.get_xpub_derived_addresses(cursor, xpub_data, account_index=0, start_index=last_receiving_idx),  # noqa: E501
+                self.db.get_xpub_derived_addresses(cursor, xpub_data, account_index=1, start_index=last_change_idx),  # noqa: E501
             )
             known_addresses = getattr(self.db.get_blockchain_accounts(cursor), xpub_data.blockchain.get_key())  # noqa: E501
 
+        saved_indices = [set(x) for x in derived_addresses]
+        derived_addresses_data = _derive_addresses_from_xpub_data(
+            xpub_data=xpub_data,
+            start_receiving_index=last_receiving_idx,
+            start_change_index=last_change_idx,
+            gap_limit=self.chains_aggregator.btc_derivation_gap_limit,
+            derived_addresses=derived_addresses,
+        )
+        newly_derived_addresses = [{
+            idx: address for idx, address in account_addresses.items()
+            if idx not in saved_indices[account_index]
+        } for account_index, account_addresses in enumerate(derived_addresses)]
+        if any(len(x) != 0 for x in newly_derived_addresses):
+            with self.db.user_write() as write_cursor:
+                for account_index, account_addresses in enumerate(newly_derived_addresses):
+                    self.db.add_xpub_derived_addresses(
+                        write_cursor=write_cursor,
+                        xpub_data=xpub_data,
+                        account_index=account_index,
+                        derived_addresses=account_addresses,
+                    )
+
         new_addresses = []
         existing_address_data = []
         for entry in derived_addresses_data:
@@ -13,6 +13,7 @@ from rotkehlchen.chain.evm.decoding.structures import (
     ActionItem,
     DecodingOutput,
     EnricherContext,
+    EventDecodingRule,
     TransferEnrichmentOutput,
 )
 from rotkehlchen.chain.evm.decoding.types import CounterpartyDetails
@@ -60,8 +61,11 @@ class EthereumTransactionDecoder(EVMTransactionDecoderWithDSProxy):
             transactions=transactions,
             value_asset=A_ETH.resolve_to_asset_with_oracles(),
             event_rules=[  # rules to try for all tx receipt logs decoding
-                self._maybe_decode_governance,
-                self._maybe_enrich_transfers,
+                EventDecodingRule(self._maybe_decode_governance, topics=(GOVERNORALPHA_PROPOSE,)),
+                EventDecodingRule(
+                    self._maybe_enrich_transfers,
+                    topics=(GTC_CLAIM, ONEINCH_CLAIM, GNOSIS_CHAIN_BRIDGE_RECEIVE),
+                ),
             ],
             misc_counterparties=[
                 GNOSIS_CPT_DETAILS,
@@ -1,8 +1,9 @@
 from collections import defaultdict
 from collections.abc import Iterator
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from rotkehlchen.accounting.mixins.event import AccountingEventType
+from rotkehlchen.assets.asset import Asset
 from rotkehlchen.chain.evm.accounting.interfaces import ModuleAccountantInterface
 from rotkehlchen.chain.evm.accounting.structures import EventsAccountantCallback
 from rotkehlchen.chain.evm.types import string_to_evm_address
@@ -10,12 +11,12 @@ from rotkehlchen.constants import ZERO
 from rotkehlchen.fval import FVal
 from rotkehlchen.history.events.structures.base import get_event_type_identifier
 from rotkehlchen.history.events.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.serialization.deserialize import deserialize_fval
 
 from ..constants import CPT_AAVE_V2
 
 if TYPE_CHECKING:
     from rotkehlchen.accounting.pot import AccountingPot
-    from rotkehlchen.assets.asset import Asset
     from rotkehlchen.history.events.structures.evm_event import EvmEvent
     from rotkehlchen.types import ChecksumEvmAddress
 
@@ -26,6 +27,18 @@ class Aavev2Accountant(ModuleAccountantInterface):
         self.assets_borrowed: dict[tuple[ChecksumEvmAddress, Asset], FVal] = defaultdict(FVal)
         self.assets_supplied: dict[tuple[ChecksumEvmAddress, Asset], FVal] = defaultdict(FVal)
 
+    def serialize_state(self) -> dict[str, Any]:
+        return {
+            'assets_borrowed': [[address, asset.identifier, str(value)] for (address, asset), value in self.assets_borrowed.items()],  # noqa: E501
+            'assets_supplied': [[address, asset.identifier, str(value)] for (address, asset), value in self.assets_supplied.items()],  # noqa: E501
+        }
+
+    def deserialize_state(self, data: dict[str, Any]) -> None:
+        for address, asset_identifier, value in data['assets_borrowed']:
+            self.assets_borrowed[(address, Asset(asset_identifier))] = deserialize_fval(value, name='borrowed amount', location='aave v2 accountant')  # noqa: E501
+        for address, asset_identifier, value in data['assets_supplied']:
+            self.assets_supplied[(address, Asset(asset_identifier))] = deserialize_fval(value, name='supplied amount', location='aave v2 accountant')  # noqa: E501
+
     def _process_borrow(
             self,
             pot: 'AccountingPot',  # pylint: disable=unused-argument
@@ -15,6 +15,7 @@ from rotkehlchen.chain.structures import TimestampOrBlockRange
 from rotkehlchen.constants import ONE
 from rotkehlchen.constants.assets import A_ETH
 from rotkehlchen.constants.timing import HOUR_IN_SECONDS
+from rotkehlchen.db.accounting_snapshots import invalidate_accounting_snapshots
 from rotkehlchen.db.eth2 import DBEth2
 from rotkehlchen.db.filtering import EvmEventFilterQuery
 from rotkehlchen.db.history_events import DBHistoryEvents
@@ -30,7 +31,7 @@ from rotkehlchen.premium.premium import Premium
 from rotkehlchen.types import ChecksumEvmAddress, Eth2PubKey, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.interfaces import EthereumModule
-from rotkehlchen.utils.misc import from_gwei, ts_now
+from rotkehlchen.utils.misc import from_gwei, ts_ms_to_sec, ts_now
 
 from .constants import (
     CPT_ETH2,
@@ -476,7 +477,8 @@ class Eth2(EthereumModule):
         transaction events if they can be found"""
         with self.database.conn.read_ctx() as cursor:
             cursor.execute(
-                'SELECT B_H.identifier, B_T.block_number, B_H.notes FROM evm_transactions B_T '
+                'SELECT B_H.identifier, B_T.block_number, B_H.notes, B_H.timestamp '
+                'FROM evm_transactions B_T '
                 'LEFT JOIN evm_events_info B_E '
                 'ON B_T.tx_hash=B_E.tx_hash LEFT JOIN history_events B_H '
                 'ON B_E.identifier=B_H.identifier WHERE '
@@ -498,7 +500,14 @@ class Eth2(EthereumModule):
             HistoryEventSubType.MEV_REWARD.serialize(),
             entry[0],
         ) for entry in result]
+        if len(changes) == 0:
+            return
+
         with self.database.user_write() as write_cursor:
+            invalidate_accounting_snapshots(
+                write_cursor=write_cursor,
+                from_ts=ts_ms_to_sec(min(entry[3] for entry in result)),
+            )
             for changes_entry in changes:
                 try:
                     write_cursor.execute(
@@ -571,7 +580,7 @@ class Eth2(EthereumModule):
         pubkey_to_data = {}
         with self.database.conn.read_ctx() as cursor:
             cursor.execute(
-                'SELECT H.identifier, H.amount, E.extra_data from history_events H LEFT JOIN eth_staking_events_info S '  # noqa: E501
+                'SELECT H.identifier, H.amount, E.extra_data, H.timestamp from history_events H LEFT JOIN eth_staking_events_info S '  # noqa: E501
                 'ON H.identifier=S.identifier LEFT JOIN evm_events_info E '
                 'ON E.identifier=H.identifier WHERE S.validator_index=?',
                 (UNKNOWN_VALIDATOR_INDEX,),
@@ -583,7 +592,7 @@ class Eth2(EthereumModule):
                     log.error(f'Non json or unexpected extra data {entry[2]} found for evm event with identifier {entry[0]}')  # noqa: E501
                     continue
 
-                pubkey_to_data[public_key] = (entry[0], entry[1])
+                pubkey_to_data[public_key] = (entry[0], entry[1], entry[3])
 
         if len(pubkey_to_data) == 0:
             return
@@ -598,9 +607,10 @@ class Eth2(EthereumModule):
         staking_changes = []
         history_changes = []
         validators = []
+        changed_timestamps = []
         for result in results:
             try:
-                identifier, amount = pubkey_to_data[result['pubkey']]
+                identifier, amount, timestamp = pubkey_to_data[result['pubkey']]
                 validator_index = result['validatorindex']
             except KeyError as e:
                 log.error(f'During refreshing activated validator deposits missing key {e!s} in result')  # noqa: E501
@@ -609,11 +619,16 @@ class Eth2(EthereumModule):
             staking_changes.append((validator_index, identifier))
             history_changes.append((f'Deposit {amount} ETH to validator {validator_index}', identifier))  # noqa: E501
             validators.append((validator_index, result['pubkey'], '1.0'))
+            changed_timestamps.append(timestamp)
 
         if len(staking_changes) == 0:
             return
 
         with self.database.user_write() as write_cursor:
+            invalidate_accounting_snapshots(
+                write_cursor=write_cursor,
+                from_ts=ts_ms_to_sec(min(changed_timestamps)),
+            )
             write_cursor.executemany(
                 'UPDATE eth_staking_events_info SET validator_index=? WHERE identifier=?',
                 staking_changes,
@@ -154,6 +154,16 @@ class ValidatorDailyStats(AccountingEventMixin):
     def should_ignore(self, ignored_ids_mapping: dict[ActionType, set[str]]) -> bool:
         return False
 
+    def get_assets_to_price(
+            self,
+            accounting: 'AccountingPot',
+            events_iterator: Iterator['AccountingEventMixin'],  # pylint: disable=unused-argument
+    ) -> tuple[list['Asset'], int]:
+        if self.pnl == ZERO or accounting.settings.eth_staking_taxable_after_withdrawal_enabled is True:  # noqa: E501
+            return [], 1
+
+        return [A_ETH2], 1
+
     def process(
             self,
             accounting: 'AccountingPot',
@@ -1,6 +1,6 @@
 from collections import defaultdict
 from collections.abc import Iterator
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Any, cast
 
 from rotkehlchen.accounting.mixins.event import AccountingEventType
 from rotkehlchen.chain.evm.accounting.interfaces import ModuleAccountantInterface
@@ -10,6 +10,7 @@ from rotkehlchen.constants.assets import A_DAI
 from rotkehlchen.fval import FVal
 from rotkehlchen.history.events.structures.base import get_event_type_identifier
 from rotkehlchen.history.events.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.serialization.deserialize import deserialize_fval
 from rotkehlchen.types import ChecksumEvmAddress
 
 from .constants import CPT_DSR, CPT_VAULT
@@ -25,6 +26,18 @@ class MakerdaoAccountant(ModuleAccountantInterface):
         self.vault_balances: dict[str, FVal] = defaultdict(FVal)
         self.dsr_balances: dict[ChecksumEvmAddress, FVal] = defaultdict(FVal)
 
+    def serialize_state(self) -> dict[str, Any]:
+        return {
+            'vault_balances': {key: str(value) for key, value in self.vault_balances.items()},
+            'dsr_balances': {key: str(value) for key, value in self.dsr_balances.items()},
+        }
+
+    def deserialize_state(self, data: dict[str, Any]) -> None:
+        for cdp_id, value in data['vault_balances'].items():
+            self.vault_balances[cdp_id] = deserialize_fval(value, name='vault balance', location='makerdao accountant')  # noqa: E501
+        for address, value in data['dsr_balances'].items():
+            self.dsr_balances[address] = deserialize_fval(value, name='dsr balance', location='makerdao accountant')  # noqa: E501
+
     def _process_vault_dai_generation(
             self,
             pot: 'AccountingPot',  # pylint: disable=unused-argument
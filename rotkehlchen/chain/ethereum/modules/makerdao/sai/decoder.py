@@ -15,6 +15,7 @@ from rotkehlchen.chain.evm.decoding.structures import (
     DecoderContext,
     DecodingOutput,
     EnricherContext,
+    EventDecodingRule,
     TransferEnrichmentOutput,
 )
 from rotkehlchen.chain.evm.decoding.types import CounterpartyDetails
@@ -483,9 +484,9 @@ class MakerdaosaiDecoder(DecoderInterface):
         )
         return DecodingOutput(event=event)
 
-    def decoding_rules(self) -> list[Callable]:
+    def decoding_rules(self) -> list[EventDecodingRule]:
         return [
-            self._decode_sai_cdp_migration,
+            EventDecodingRule(self._decode_sai_cdp_migration, topics=(SAI_CDP_MIGRATION_TOPIC,)),
         ]
 
     def addresses_to_decoders(self) -> dict[ChecksumEvmAddress, tuple[Any, ...]]:
@@ -1,4 +1,3 @@
-from collections.abc import Callable
 from typing import TYPE_CHECKING
 
 from rotkehlchen.assets.asset import EvmToken
@@ -14,6 +13,7 @@ from rotkehlchen.chain.evm.decoding.structures import (
     DEFAULT_DECODING_OUTPUT,
     ActionItem,
     DecodingOutput,
+    EventDecodingRule,
 )
 from rotkehlchen.chain.evm.decoding.types import CounterpartyDetails
 from rotkehlchen.chain.evm.structures import EvmTxReceiptLog
@@ -93,10 +93,13 @@ class SushiswapDecoder(DecoderInterface):
 
     # -- DecoderInterface methods
 
-    def decoding_rules(self) -> list[Callable]:
+    def decoding_rules(self) -> list[EventDecodingRule]:
         return [
-            self._maybe_decode_v2_swap,
-            self._maybe_decode_v2_liquidity_addition_and_removal,
+            EventDecodingRule(self._maybe_decode_v2_swap, topics=(SWAP_SIGNATURE,)),
+            EventDecodingRule(
+                self._maybe_decode_v2_liquidity_addition_and_removal,
+                topics=(MINT_SIGNATURE, BURN_SIGNATURE),
+            ),
         ]
 
     @staticmethod
@@ -1,6 +1,6 @@
 from collections import defaultdict
 from collections.abc import Iterator
-from typing import TYPE_CHECKING, cast
+from typing import TYPE_CHECKING, Any, cast
 
 from rotkehlchen.accounting.mixins.event import AccountingEventType
 from rotkehlchen.chain.ethereum.modules.thegraph.constants import CPT_THEGRAPH
@@ -10,6 +10,7 @@ from rotkehlchen.constants import ZERO
 from rotkehlchen.fval import FVal
 from rotkehlchen.history.events.structures.base import get_event_type_identifier
 from rotkehlchen.history.events.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.serialization.deserialize import deserialize_fval
 
 if TYPE_CHECKING:
     from rotkehlchen.accounting.pot import AccountingPot
@@ -21,6 +22,13 @@ class ThegraphAccountant(ModuleAccountantInterface):
     def reset(self) -> None:
         self.assets_supplied: dict[ChecksumEvmAddress, FVal] = defaultdict(FVal)
 
+    def serialize_state(self) -> dict[str, Any]:
+        return {'assets_supplied': {key: str(value) for key, value in self.assets_supplied.items()}}  # noqa: E501
+
+    def deserialize_state(self, data: dict[str, Any]) -> None:
+        for address, value in data['assets_supplied'].items():
+            self.assets_supplied[address] = deserialize_fval(value, name='supplied amount', location='thegraph accountant')  # noqa: E501
+
     def _process_deposit(
             self,
             pot: 'AccountingPot',  # pylint: disable=unused-argument
@@ -1,11 +1,10 @@
 import logging
-from collections.abc import Callable
 from typing import TYPE_CHECKING
 
 from rotkehlchen.assets.asset import EvmToken
 from rotkehlchen.chain.ethereum.modules.aave.v1.decoder import DEFAULT_DECODING_OUTPUT
 from rotkehlchen.chain.evm.decoding.interfaces import DecoderInterface
-from rotkehlchen.chain.evm.decoding.structures import ActionItem, DecodingOutput
+from rotkehlchen.chain.evm.decoding.structures import ActionItem, DecodingOutput, EventDecodingRule
 from rotkehlchen.chain.evm.decoding.types import CounterpartyDetails
 from rotkehlchen.chain.evm.decoding.utils import maybe_reshuffle_events
 from rotkehlchen.chain.evm.structures import EvmTxReceiptLog
@@ -84,9 +83,9 @@ class Uniswapv1Decoder(DecoderInterface):
 
     # -- DecoderInterface methods
 
-    def decoding_rules(self) -> list[Callable]:
+    def decoding_rules(self) -> list[EventDecodingRule]:
         return [
-            self._maybe_decode_swap,
+            EventDecodingRule(self._maybe_decode_swap, topics=(TOKEN_PURCHASE, ETH_PURCHASE)),
         ]
 
     @staticmethod
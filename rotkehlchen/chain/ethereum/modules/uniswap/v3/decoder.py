@@ -18,6 +18,7 @@ from rotkehlchen.chain.evm.decoding.structures import (
     DecoderContext,
     DecodingOutput,
     EnricherContext,
+    EventDecodingRule,
     TransferEnrichmentOutput,
 )
 from rotkehlchen.chain.evm.decoding.types import CounterpartyDetails
@@ -521,9 +522,9 @@ class Uniswapv3Decoder(DecoderInterface):
 
     # -- DecoderInterface methods
 
-    def decoding_rules(self) -> list[Callable]:
+    def decoding_rules(self) -> list[EventDecodingRule]:
         return [
-            self._maybe_decode_v3_swap,
+            EventDecodingRule(self._maybe_decode_v3_swap, topics=(SWAP_SIGNATURE,)),
         ]
 
     def addresses_to_decoders(self) -> dict[ChecksumEvmAddress, tuple[Any, ...]]:
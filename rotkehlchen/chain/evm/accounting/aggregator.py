@@ -4,7 +4,7 @@ import pkgutil
 from collections.abc import Sequence
 from contextlib import suppress
 from types import ModuleType
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from rotkehlchen.chain.evm.decoding.types import CounterpartyDetails
 from rotkehlchen.errors.misc import ModuleLoadingError
@@ -104,6 +104,25 @@ class EVMAccountingAggregator:
         for accountant in self.accountants.values():
             accountant.reset()
 
+    def serialize_state(self) -> dict[str, Any]:
+        """Serialize the state of all submodule accountants that keep one"""
+        result = {}
+        for name, accountant in self.accountants.items():
+            if len(state := accountant.serialize_state()) != 0:
+                result[name] = state
+
+        return result
+
+    def deserialize_state(self, data: dict[str, Any]) -> None:
+        """Restore the state of the submodule accountants saved by serialize_state
+
+        May raise:
+        - DeserializationError
+        - KeyError
+        """
+        for name, state in data.items():
+            self.accountants[name].deserialize_state(state)
+
 
 class EVMAccountingAggregators:
     """
@@ -130,3 +149,23 @@ class EVMAccountingAggregators:
         """Reset the state of all initialized submodule accountants"""
         for aggregator in self.aggregators:
             aggregator.reset()
+
+    def serialize_state(self) -> dict[str, Any]:
+        """Serialize the state of the submodule accountants of all chains"""
+        result = {}
+        for aggregator in self.aggregators:
+            if len(state := aggregator.serialize_state()) != 0:
+                result[aggregator.node_inquirer.chain_id.to_name()] = state
+
+        return result
+
+    def deserialize_state(self, data: dict[str, Any]) -> None:
+        """Restore the state saved by serialize_state
+
+        May raise:
+        - DeserializationError
+        - KeyError
+        """
+        for aggregator in self.aggregators:
+            if (state := data.get(aggregator.node_inquirer.chain_id.to_name())) is not None:
+                aggregator.deserialize_state(state)
@@ -1,7 +1,7 @@
 import logging
 from abc import ABCMeta, abstractmethod
 from collections.abc import Iterator
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from rotkehlchen.accounting.mixins.event import AccountingEventType
 from rotkehlchen.constants import ZERO
@@ -52,6 +52,21 @@ class ModuleAccountantInterface(metaclass=ABCMeta):
         """Subclasses may implement this to reset state between accounting runs"""
         return None
 
+    def serialize_state(self) -> dict[str, Any]:
+        """Subclasses that keep state between events should implement this to
+        serialize it so that it can be saved in an accounting snapshot"""
+        return {}
+
+    def deserialize_state(self, data: dict[str, Any]) -> None:  # pylint: disable=unused-argument
+        """Subclasses that keep state between events should implement this to restore
+        the state created by serialize_state. Called after reset().
+
+        May raise:
+        - DeserializationError
+        - KeyError
+        """
+        return None
+
 
 class DepositableAccountantInterface(ModuleAccountantInterface):
     """
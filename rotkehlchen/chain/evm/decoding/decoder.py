@@ -4,9 +4,9 @@ import pkgutil
 from abc import ABCMeta, abstractmethod
 from collections.abc import Callable
 from contextlib import suppress
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from types import ModuleType
-from typing import TYPE_CHECKING, Any, Optional, Protocol
+from typing import TYPE_CHECKING, Any, Optional
 
 from gevent.lock import Semaphore
 
@@ -41,7 +41,12 @@ from rotkehlchen.history.events.structures.evm_event import EvmProduct
 from rotkehlchen.history.events.structures.types import HistoryEventSubType, HistoryEventType
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import ChecksumEvmAddress, EvmTokenKind, EvmTransaction, EVMTxHash
-from rotkehlchen.utils.misc import from_wei, hex_or_bytes_to_address, hex_or_bytes_to_int
+from rotkehlchen.utils.misc import (
+    from_wei,
+    get_chunks,
+    hex_or_bytes_to_address,
+    hex_or_bytes_to_int,
+)
 from rotkehlchen.utils.mixins.customizable_date import CustomizableDateMixin
 
 from .base import BaseDecoderTools, BaseDecoderToolsWithDSProxy
@@ -52,6 +57,7 @@ from .structures import (
     DecoderContext,
     DecodingOutput,
     EnricherContext,
+    EventDecodingRule,
     TransferEnrichmentOutput,
 )
 from .utils import maybe_reshuffle_events
@@ -68,25 +74,25 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# How many decoded transactions to save in the DB with a single write transaction
+DEFAULT_DECODING_BATCH_SIZE = 100
 
-class EventDecoderFunction(Protocol):
 
-    def __call__(
-            self,
-            token: EvmToken | None,
-            tx_log: EvmTxReceiptLog,
-            transaction: EvmTransaction,
-            decoded_events: list['EvmEvent'],
-            action_items: list[ActionItem],
-            all_logs: list[EvmTxReceiptLog],
-    ) -> DecodingOutput:
-        ...
+@dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=False)
+class DecodingBatch:
+    """Decoded transactions pending to be saved in the DB in a single write transaction
+
+    If `ignore_cache` is True the previously decoded events of the transactions
+    are deleted in the same write transaction before saving the new ones.
+    """
+    ignore_cache: bool
+    decoded: list[tuple[EvmTransaction, list['EvmEvent']]] = field(default_factory=list)
 
 
 @dataclass(init=True, repr=True, eq=True, order=False, unsafe_hash=False, frozen=True)
 class DecodingRules:
     address_mappings: dict[ChecksumEvmAddress, tuple[Any, ...]]
-    event_rules: list[EventDecoderFunction]
+    event_rules: list[EventDecodingRule]
     input_data_rules: dict[bytes, dict[bytes, Callable]]
     token_enricher_rules: list[Callable]  # enrichers to run for token transfers
     # rules to run after the main decoding loop. post_decoding_rules is a mapping of
@@ -124,7 +130,7 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
             evm_inquirer: 'EvmNodeInquirer',
             transactions: 'EvmTransactions',
             value_asset: AssetWithOracles,
-            event_rules: list[EventDecoderFunction],
+            event_rules: list[EventDecodingRule],
             misc_counterparties: list[CounterpartyDetails],
             base_tools: BaseDecoderTools,
             dbevmtx_class: type[DBEvmTx] = DBEvmTx,
@@ -135,8 +141,8 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
         `value_asset` is the asset that is normally transferred at value transfers
         and the one that is spent for gas in this chain
 
-        `event_rules` is a list of callables to act as decoding rules for all tx
-        receipt logs decoding for the particular chain
+        `event_rules` is a list of rules to try for all tx receipt logs decoding
+        for the particular chain
 
         `misc_counterparties` is a list of counterparties not associated with any specific
         decoder that should be included for this decoder modules.
@@ -154,8 +160,8 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
         self.rules = DecodingRules(
             address_mappings={},
             event_rules=[
-                self._maybe_decode_erc20_approve,
-                self._maybe_decode_erc20_721_transfer,
+                EventDecodingRule(self._maybe_decode_erc20_approve, topics=(ERC20_APPROVE,)),
+                EventDecodingRule(self._maybe_decode_erc20_721_transfer, topics=(ERC20_OR_ERC721_TRANSFER,)),  # noqa: E501
             ],
             input_data_rules={},
             token_enricher_rules=[],
@@ -171,6 +177,7 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
         self._add_builtin_decoders(self.rules)
         # Recursively check all submodules to get all decoder address mappings and rules
         self.rules += self._recursively_initialize_decoders(self.chain_modules_root)
+        self.event_rules_by_topic, self.catch_all_event_rules = self._index_event_rules()
         self.undecoded_tx_query_lock = Semaphore()
 
     def _add_builtin_decoders(self, rules: DecodingRules) -> None:
@@ -276,6 +283,31 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
 
         return rules
 
+    def _index_event_rules(
+            self,
+    ) -> tuple[dict[bytes, list[EventDecodingRule]], list[EventDecodingRule]]:
+        """Index the event rules by the topics they decode so that for each log only the
+        rules that can decode it are tried instead of all the rules of all modules.
+
+        Returns the mapping of topic to rules and the rules to try for logs of any other
+        topic. Rules without topics are in all of them. The order of the rules in the
+        lists is the order in which they were registered, since the first rule that
+        decodes a log wins.
+        """
+        catch_all_rules = [rule for rule in self.rules.event_rules if len(rule.topics) == 0]
+        rules_by_topic: dict[bytes, list[EventDecodingRule]] = {}
+        for rule in self.rules.event_rules:
+            for topic in rule.topics:
+                rules_by_topic.setdefault(topic, [])
+
+        for topic, topic_rules in rules_by_topic.items():
+            topic_rules.extend(
+                rule for rule in self.rules.event_rules
+                if len(rule.topics) == 0 or topic in rule.topics
+            )
+
+        return rules_by_topic, catch_all_rules
+
     def get_decoders_products(self) -> dict[str, list[EvmProduct]]:
         """Get the list of possible products"""
         possible_products: dict[str, list[EvmProduct]] = {}
@@ -309,14 +341,17 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
         Execute event rules for the current tx log. Returns None when no
         new event or actions need to be propagated.
         """
-        for rule in self.rules.event_rules:
-            if len(tx_log.topics) == 0:
-                continue  # ignore anonymous events
+        if len(tx_log.topics) == 0:
+            return None  # ignore anonymous events
+
+        for rule in self.event_rules_by_topic.get(tx_log.topics[0], self.catch_all_event_rules):
+            if len(rule.addresses) != 0 and tx_log.address not in rule.addresses:
+                continue
 
             try:
-                decoding_output = rule(token=token, tx_log=tx_log, transaction=transaction, decoded_events=decoded_events, action_items=action_items, all_logs=all_logs)  # noqa: E501
+                decoding_output = rule.function(token=token, tx_log=tx_log, transaction=transaction, decoded_events=decoded_events, action_items=action_items, all_logs=all_logs)  # noqa: E501
             except (DeserializationError, IndexError) as e:
-                self.msg_aggregator.add_error(f'Decoding tx log with index {tx_log.log_index} of {transaction.tx_hash.hex()} through {rule} failed due to {e!s}. Skipping rule.')  # noqa: E501
+                self.msg_aggregator.add_error(f'Decoding tx log with index {tx_log.log_index} of {transaction.tx_hash.hex()} through {rule.function} failed due to {e!s}. Skipping rule.')  # noqa: E501
                 continue
 
             if decoding_output.event is not None or len(decoding_output.action_items) > 0:
@@ -392,9 +427,12 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
             self,
             transaction: EvmTransaction,
             tx_receipt: EvmTxReceipt,
+            batch: DecodingBatch | None = None,
     ) -> tuple[list['EvmEvent'], bool]:
         """
         Decodes an evm transaction and its receipt and saves result in the DB.
+        If a batch is given the result is added to it instead, to be saved with the
+        rest of the batch.
         Returns the list of decoded events and a flag which is True if balances refresh is needed.
         """
         self.base.reset_sequence_counter()
@@ -438,6 +476,9 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
                 events.append(decoding_output.event)
                 continue
 
+            if len(tx_log.topics) == 0 or (tx_log.topics[0] not in self.event_rules_by_topic and len(self.catch_all_event_rules) == 0):  # noqa: E501
+                continue  # no event rule can decode this log so don't query for its token
+
             token = GlobalDBHandler.get_evm_token(
                 address=tx_log.address,
                 chain_id=self.evm_inquirer.chain_id,
@@ -469,29 +510,77 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
         if len(events) == 0 and (eth_event := self._get_eth_transfer_event(transaction)) is not None:  # noqa: E501
             events = [eth_event]
 
+        if batch is None:
+            with self.database.user_write() as write_cursor:
+                self._save_decoded_transaction(write_cursor, transaction=transaction, events=events)  # noqa: E501
+        else:
+            batch.decoded.append((transaction, events))
+
+        events = sorted(events, key=lambda x: x.sequence_index, reverse=False)
+        return events, refresh_balances  # Propagate for post processing in the caller
+
+    def _save_decoded_transaction(
+            self,
+            write_cursor: 'DBCursor',
+            transaction: EvmTransaction,
+            events: list['EvmEvent'],
+    ) -> None:
+        """Saves the decoded events of a transaction and marks it as decoded"""
+        if len(events) > 0:
+            self.dbevents.add_history_events(
+                write_cursor=write_cursor,
+                history=events,
+            )
+        else:
+            # This is probably a phishing zero value token transfer tx.
+            # Details here: https://github.com/rotki/rotki/issues/5749
+            with suppress(InputError):  # We don't care if it's already in the DB
+                self.database.add_to_ignored_action_ids(
+                    write_cursor=write_cursor,
+                    action_type=ActionType.HISTORY_EVENT,
+                    identifiers=[transaction.identifier],
+                )
+        tx_id = transaction.get_or_query_db_id(write_cursor)
+        write_cursor.execute(
+            'INSERT OR IGNORE INTO evm_tx_mappings(tx_id, value) VALUES(?, ?)',
+            (tx_id, HISTORY_MAPPING_STATE_DECODED),
+        )
+
+    def _save_decoding_batch(self, batch: DecodingBatch) -> None:
+        """Saves all the decoded transactions of the batch in a single write transaction.
+        If anything fails only this batch is rolled back."""
+        if len(batch.decoded) == 0:
+            return
+
         with self.database.user_write() as write_cursor:
-            if len(events) > 0:
-                self.dbevents.add_history_events(
+            if batch.ignore_cache is True:  # delete all previously decoded events
+                self._delete_decoded_events(
                     write_cursor=write_cursor,
-                    history=events,
+                    transactions=[transaction for transaction, _ in batch.decoded],
                 )
-            else:
-                # This is probably a phishing zero value token transfer tx.
-                # Details here: https://github.com/rotki/rotki/issues/5749
-                with suppress(InputError):  # We don't care if it's already in the DB
-                    self.database.add_to_ignored_action_ids(
-                        write_cursor=write_cursor,
-                        action_type=ActionType.HISTORY_EVENT,
-                        identifiers=[transaction.identifier],
-                    )
-            tx_id = transaction.get_or_query_db_id(write_cursor)
-            write_cursor.execute(
-                'INSERT OR IGNORE INTO evm_tx_mappings(tx_id, value) VALUES(?, ?)',
-                (tx_id, HISTORY_MAPPING_STATE_DECODED),
-            )
+            for transaction, events in batch.decoded:
+                self._save_decoded_transaction(write_cursor, transaction=transaction, events=events)  # noqa: E501
 
-        events = sorted(events, key=lambda x: x.sequence_index, reverse=False)
-        return events, refresh_balances  # Propagate for post processing in the caller
+        batch.decoded = []
+
+    def _delete_decoded_events(
+            self,
+            write_cursor: 'DBCursor',
+            transactions: list[EvmTransaction],
+    ) -> None:
+        """Deletes the decoded events of the transactions and their decoded state"""
+        self.dbevents.delete_events_by_tx_hash(
+            write_cursor=write_cursor,
+            tx_hashes=[transaction.tx_hash for transaction in transactions],
+            chain_id=self.evm_inquirer.chain_id,
+        )
+        write_cursor.executemany(
+            'DELETE from evm_tx_mappings WHERE tx_id=? AND value=?',
+            [
+                (transaction.get_or_query_db_id(write_cursor), HISTORY_MAPPING_STATE_DECODED)
+                for transaction in transactions
+            ],
+        )
 
     def get_and_decode_undecoded_transactions(
             self,
@@ -523,11 +612,16 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
             ignore_cache: bool,
             tx_hashes: list[EVMTxHash] | None,
             send_ws_notifications: bool = False,
+            batch_size: int = DEFAULT_DECODING_BATCH_SIZE,
     ) -> list['EvmEvent']:
         """Make sure that receipts are pulled + events decoded for the given transaction hashes.
 
         The transaction hashes must exist in the DB at the time of the call
 
+        Transactions are decoded in memory and their events are saved in the DB every
+        `batch_size` transactions in a single write transaction. If something fails only
+        the decoding of the transactions of the pending batch is lost.
+
         May raise:
         - DeserializationError if there is a problem with contacting a remote to get receipts
         - RemoteError if there is a problem with contacting a remote to get receipts
@@ -546,36 +640,65 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
                 tx_hashes = [EVMTxHash(x[0]) for x in cursor]
 
         total_transactions = len(tx_hashes)
-        for tx_index, tx_hash in enumerate(tx_hashes):
-            if send_ws_notifications and tx_index % 10 == 0:
-                self.msg_aggregator.add_message(
-                    message_type=WSMessageType.EVM_UNDECODED_TRANSACTIONS,
-                    data={
-                        'evm_chain': self.evm_inquirer.chain_name,
-                        'total': total_transactions,
-                        'processed': tx_index,
-                    },
+        batch, write_transactions = DecodingBatch(ignore_cache=ignore_cache), 0
+        for chunk_start, tx_hashes_chunk in enumerate(get_chunks(tx_hashes, batch_size)):
+            # query the transactions missing from the DB in batches
+            self.transactions.ensure_txs_data_exist(tx_hashes=tx_hashes_chunk, relevant_address=None)  # noqa: E501
+            transactions = []
+            for tx_hash in tx_hashes_chunk:
+                # TODO: Change this if transaction filter query can accept multiple hashes
+                with self.database.conn.read_ctx() as cursor:
+                    try:
+                        transactions.append(self.transactions.get_or_create_transaction(
+                            cursor=cursor,
+                            tx_hash=tx_hash,
+                            relevant_address=None,
+                        ))
+                    except RemoteError as e:
+                        raise InputError(f'{self.evm_inquirer.chain_name} hash {tx_hash.hex()} does not correspond to a transaction. {e}') from e  # noqa: E501
+
+            # load all tokens the logs of the chunk may need with a single query
+            GlobalDBHandler.prefetch_evm_tokens(
+                addresses=(tx_log.address for _, receipt in transactions for tx_log in receipt.logs),  # noqa: E501
+                chain_id=self.evm_inquirer.chain_id,
+            )
+            for chunk_index, (tx, receipt) in enumerate(transactions):
+                tx_index = chunk_start * batch_size + chunk_index
+                if send_ws_notifications and tx_index % 10 == 0:
+                    self.msg_aggregator.add_message(
+                        message_type=WSMessageType.EVM_UNDECODED_TRANSACTIONS,
+                        data={
+                            'evm_chain': self.evm_inquirer.chain_name,
+                            'total': total_transactions,
+                            'processed': tx_index,
+                        },
+                    )
+
+                if any(tx.tx_hash == x.tx_hash for x, _ in batch.decoded):
+                    # a repeated hash has to see the events of its first decoding in the DB
+                    self._save_decoding_batch(batch)
+                    write_transactions += 1
+
+                new_events, new_refresh_balances = self._get_or_decode_transaction_events(
+                    transaction=tx,
+                    tx_receipt=receipt,
+                    ignore_cache=ignore_cache,
+                    batch=batch,
                 )
+                events.extend(new_events)
+                if new_refresh_balances is True:
+                    refresh_balances = True
 
-            # TODO: Change this if transaction filter query can accept multiple hashes
-            with self.database.conn.read_ctx() as cursor:
-                try:
-                    tx, receipt = self.transactions.get_or_create_transaction(
-                        cursor=cursor,
-                        tx_hash=tx_hash,
-                        relevant_address=None,
-                    )
-                except RemoteError as e:
-                    raise InputError(f'{self.evm_inquirer.chain_name} hash {tx_hash.hex()} does not correspond to a transaction. {e}') from e  # noqa: E501
+            if len(batch.decoded) != 0:
+                self._save_decoding_batch(batch)
+                write_transactions += 1
 
-            new_events, new_refresh_balances = self._get_or_decode_transaction_events(
-                transaction=tx,
-                tx_receipt=receipt,
-                ignore_cache=ignore_cache,
+        if total_transactions != 0:
+            log.debug(
+                f'Saved {total_transactions} decoded {self.evm_inquirer.chain_name} transactions '
+                f'with {write_transactions} DB write transactions. '
+                f'{write_transactions / total_transactions:.3f} commits per transaction',
             )
-            events.extend(new_events)
-            if new_refresh_balances is True:
-                refresh_balances = True
 
         if send_ws_notifications:
             self.msg_aggregator.add_message(
@@ -595,26 +718,21 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
             transaction: EvmTransaction,
             tx_receipt: EvmTxReceipt,
             ignore_cache: bool,
+            batch: DecodingBatch | None = None,
     ) -> tuple[list['EvmEvent'], bool]:
         """
         Get a transaction's events if existing in the DB or decode them.
+        If a batch is given, newly decoded events are saved with the rest of the batch
+        and for `ignore_cache` the old events are also deleted then.
         Returns the list of decoded events and a flag which is True if balances refresh is needed.
         """
-        with self.database.conn.read_ctx() as cursor:
-            tx_id = transaction.get_or_query_db_id(cursor)
-        if ignore_cache is True:  # delete all decoded events
-            with self.database.user_write() as write_cursor:
-                self.dbevents.delete_events_by_tx_hash(
-                    write_cursor=write_cursor,
-                    tx_hashes=[transaction.tx_hash],
-                    chain_id=self.evm_inquirer.chain_id,
-                )
-                write_cursor.execute(
-                    'DELETE from evm_tx_mappings WHERE tx_id=? AND value=?',
-                    (tx_id, HISTORY_MAPPING_STATE_DECODED),
-                )
+        if ignore_cache is True:
+            if batch is None:  # delete all decoded events
+                with self.database.user_write() as write_cursor:
+                    self._delete_decoded_events(write_cursor, transactions=[transaction])
         else:  # see if events are already decoded and return them
             with self.database.conn.read_ctx() as cursor:
+                tx_id = transaction.get_or_query_db_id(cursor)
                 cursor.execute(
                     'SELECT COUNT(*) from evm_tx_mappings WHERE tx_id=? AND value=?',
                     (tx_id, HISTORY_MAPPING_STATE_DECODED),
@@ -630,7 +748,7 @@ class EVMTransactionDecoder(metaclass=ABCMeta):
                     return events, False
 
         # else we should decode now
-        return self._decode_transaction(transaction=transaction, tx_receipt=tx_receipt)
+        return self._decode_transaction(transaction=transaction, tx_receipt=tx_receipt, batch=batch)  # noqa: E501
 
     def _maybe_decode_internal_transactions(
             self,
@@ -992,7 +1110,7 @@ class EVMTransactionDecoderWithDSProxy(EVMTransactionDecoder, metaclass=ABCMeta)
             evm_inquirer: 'EvmNodeInquirerWithDSProxy',
             transactions: 'EvmTransactions',
             value_asset: AssetWithOracles,
-            event_rules: list[EventDecoderFunction],
+            event_rules: list[EventDecodingRule],
             misc_counterparties: list[CounterpartyDetails],
             base_tools: BaseDecoderToolsWithDSProxy,
     ):
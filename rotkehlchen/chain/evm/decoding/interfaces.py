@@ -8,6 +8,7 @@ from rotkehlchen.chain.evm.decoding.structures import (
     DEFAULT_DECODING_OUTPUT,
     DecoderContext,
     DecodingOutput,
+    EventDecodingRule,
 )
 from rotkehlchen.constants.assets import A_ETH
 from rotkehlchen.history.events.structures.evm_event import EvmProduct
@@ -58,10 +59,11 @@ class DecoderInterface(metaclass=ABCMeta):
         Subclasses implement this to specify which counterparty values are introduced by the module
         """
 
-    def decoding_rules(self) -> list[Callable]:
+    def decoding_rules(self) -> list[EventDecodingRule]:
         """
         Subclasses may implement this to add new generic decoding rules to be attempted
-        by the decoding process
+        by the decoding process. Each rule should declare the log topics it decodes so
+        that it is only tried for matching logs.
         """
         return []
 
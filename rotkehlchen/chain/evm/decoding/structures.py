@@ -1,5 +1,5 @@
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING, Final, Literal, NamedTuple, Optional
+from typing import TYPE_CHECKING, Final, Literal, NamedTuple, Optional, Protocol
 
 from rotkehlchen.types import ChecksumEvmAddress
 
@@ -85,5 +85,31 @@ class TransferEnrichmentOutput(NamedTuple):
     refresh_balances: bool = False
 
 
+class EventDecoderFunction(Protocol):
+
+    def __call__(
+            self,
+            token: Optional['EvmToken'],
+            tx_log: 'EvmTxReceiptLog',
+            transaction: 'EvmTransaction',
+            decoded_events: list['EvmEvent'],
+            action_items: list[ActionItem],
+            all_logs: list['EvmTxReceiptLog'],
+    ) -> DecodingOutput:
+        ...
+
+
+class EventDecodingRule(NamedTuple):
+    """A generic decoding rule to try for the receipt logs of transactions
+
+    `topics` are the topic0 values of the logs the rule can decode and `addresses` the
+    addresses emitting them. The decoder only calls the rule for logs matching them.
+    A rule without topics is tried for all logs and without addresses for all emitters.
+    """
+    function: EventDecoderFunction
+    topics: tuple[bytes, ...] = ()
+    addresses: tuple[ChecksumEvmAddress, ...] = ()
+
+
 DEFAULT_DECODING_OUTPUT: Final = DecodingOutput()
 FAILED_ENRICHMENT_OUTPUT: Final = TransferEnrichmentOutput()
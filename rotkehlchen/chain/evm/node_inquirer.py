@@ -1,22 +1,28 @@
 import json
 import logging
 import random
+import time
 from abc import ABCMeta, abstractmethod
 from collections.abc import Callable, Sequence
 from contextlib import suppress
 from itertools import zip_longest
-from typing import TYPE_CHECKING, Any, Literal
+from typing import TYPE_CHECKING, Any, Literal, TypeVar
 from urllib.parse import urlparse
 
+import gevent
 import requests
 from ens import ENS
 from eth_abi.exceptions import InsufficientDataBytes
 from eth_typing import BlockNumber
+from gevent import GreenletExit
 from requests import RequestException
 from web3 import HTTPProvider, Web3
 from web3._utils.abi import get_abi_output_types
 from web3._utils.contracts import find_matching_event_abi
 from web3._utils.filters import construct_event_filter_params
+from web3._utils.method_formatters import PYTHONIC_RESULT_FORMATTERS
+from web3._utils.request import make_post_request
+from web3._utils.rpc_abi import RPC
 from web3.datastructures import MutableAttributeDict
 from web3.exceptions import (
     BadFunctionCallOutput,
@@ -25,7 +31,7 @@ from web3.exceptions import (
     TransactionNotFound,
 )
 from web3.middleware import geth_poa_middleware
-from web3.types import BlockIdentifier, FilterParams
+from web3.types import BlockIdentifier, FilterParams, RPCEndpoint
 
 from rotkehlchen.assets.asset import CryptoAsset
 from rotkehlchen.chain.constants import DEFAULT_EVM_RPC_TIMEOUT
@@ -39,9 +45,11 @@ from rotkehlchen.chain.evm.constants import (
     GENESIS_HASH,
 )
 from rotkehlchen.chain.evm.contracts import EvmContract, EvmContracts
+from rotkehlchen.chain.evm.node_stats import NodeStatsTracker
 from rotkehlchen.chain.evm.proxies_inquirer import EvmProxiesInquirer
 from rotkehlchen.chain.evm.types import NodeName, Web3Node, WeightedNode
 from rotkehlchen.constants import ONE
+from rotkehlchen.db.settings import CachedSettings
 from rotkehlchen.errors.misc import (
     BlockchainQueryError,
     EventNotInABI,
@@ -81,6 +89,16 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Number of calls sent in a JSON-RPC batch request to a node. It is halved for each
+# node that rejects a batch, as nodes have different limits.
+DEFAULT_RPC_BATCH_SIZE = 100
+# Number of consecutive batches a node has to accept before its batch size is doubled
+# again, up to the default, so that a node that rejected batches only for a while
+# does not stay with small batches
+RPC_BATCH_SIZE_GROWTH_BATCHES = 10
+
+T = TypeVar('T')
+
 
 def _connect_task_prefix(chain_name: str) -> str:
     """Helper function to create the connection task greenlet name"""
@@ -195,6 +213,13 @@ class EvmNodeInquirer(metaclass=ABCMeta):
         '_get_transaction_by_hash',
         '_get_logs',
     )
+    # idempotent reads that are also sent to the next node if the first one is slow
+    methods_to_hedge = (
+        '_call_contract',
+        '_get_code',
+        '_get_transaction_receipt',
+        '_get_transaction_by_hash',
+    )
 
     def __init__(
             self,
@@ -219,6 +244,9 @@ class EvmNodeInquirer(metaclass=ABCMeta):
         self.contracts = contracts
         self.web3_mapping: dict[NodeName, Web3Node] = {}
         self.rpc_timeout = rpc_timeout
+        self.node_stats = NodeStatsTracker()
+        self.rpc_batch_sizes: dict[NodeName, int] = {}
+        self.rpc_batches_accepted: dict[NodeName, int] = {}  # since the last size change
         self.chain_id: SUPPORTED_CHAIN_IDS = blockchain.to_chain_id()  # type: ignore[assignment]
         self.chain_name = self.chain_id.to_name()
         self.native_token = native_token
@@ -271,7 +299,8 @@ class EvmNodeInquirer(metaclass=ABCMeta):
         """Default call order for evm nodes
 
         Own node always has preference. Then all other node types are randomly queried
-        in sequence depending on a weighted probability.
+        in sequence depending on a weighted probability. The weight of each node is
+        adjusted by its recently observed latency and error rate.
 
 
         Some benchmarks on weighted probability based random selection when compared
@@ -293,7 +322,8 @@ class EvmNodeInquirer(metaclass=ABCMeta):
 
         ordered_list = []
         while len(selection) != 0:
-            weights = [float(entry.weight) for entry in selection]
+            factors = self.node_stats.performance_factors([x.node_info for x in selection])
+            weights = [float(entry.weight) * factor for entry, factor in zip(selection, factors, strict=True)]  # noqa: E501
             node = random.choices(selection, weights, k=1)
             ordered_list.append(node[0])
             selection.remove(node[0])
@@ -510,12 +540,16 @@ class EvmNodeInquirer(metaclass=ABCMeta):
         """Queries evm related data by performing a query of the provided method to all given nodes
 
         The first node in the call order that gets a successful response returns.
-        If none get a result then RemoteError is raised
+        If none get a result then RemoteError is raised.
+
+        If hedging is enabled in the settings, the method is an idempotent read and the
+        node queried takes longer than its 95th percentile latency, the next node in the
+        call order is queried too and the first successful response is returned.
         """
+        nodes = []
         for weighted_node in call_order:
-            node_info = weighted_node.node_info
-            web3node = self.web3_mapping.get(node_info, None)
-            if web3node is None and node_info.name != self.etherscan_node_name:
+            web3node = self.web3_mapping.get(weighted_node.node_info, None)
+            if web3node is None and weighted_node.node_info.name != self.etherscan_node_name:
                 continue
 
             if (
@@ -525,26 +559,26 @@ class EvmNodeInquirer(metaclass=ABCMeta):
             ):
                 continue
 
-            try:
-                web3 = web3node.web3_instance if web3node is not None else None
-                result = method(web3, **kwargs)
-            except (
-                RemoteError,
-                requests.exceptions.RequestException,
-                BlockchainQueryError,
-                BlockNotFound,
-                BadResponseFormat,
-                ValueError,  # Yabir saw this happen with mew node for unavailable method at node. Since it's generic we should replace if web3 implements https://github.com/ethereum/web3.py/issues/2448  # noqa: E501
-            ) as e:
-                log.warning(f'Failed to query {node_info} for {method!s} due to {e!s}')
-                # Catch all possible errors here and just try next node call
-                continue
-            except TransactionNotFound:
-                if kwargs.get('must_exist', False) is True:
-                    continue  # try other nodes, as transaction has to exist
-                return None
+            nodes.append((weighted_node.node_info, web3node))
+
+        hedge = (
+            method.__name__ in self.methods_to_hedge and
+            CachedSettings().get_entry('hedge_evm_queries') is True
+        )
+        idx = 0
+        while idx < len(nodes):
+            if (
+                hedge and idx + 1 < len(nodes) and
+                (delay := self.node_stats.hedge_delay(nodes[idx][0])) is not None
+            ):
+                success, result = self._hedged_query_nodes(method, nodes[idx], nodes[idx + 1], delay, **kwargs)  # noqa: E501
+                idx += 2
+            else:
+                success, result = self._query_node(method, *nodes[idx], **kwargs)
+                idx += 1
 
-            return result
+            if success:
+                return result
 
         # no node in the call order list was succesfully queried
         log.error(
@@ -555,6 +589,77 @@ class EvmNodeInquirer(metaclass=ABCMeta):
             f'Please check your network and confirm sufficient nodes are connected for {self.blockchain!s}.',  # noqa: E501
         )
 
+    def _query_node(
+            self,
+            method: Callable,
+            node_info: NodeName,
+            web3node: Web3Node | None,
+            **kwargs: Any,
+    ) -> tuple[bool, Any]:
+        """Queries the method at the given node and records its latency and outcome in
+        the node stats. Returns whether the query succeeded and its result."""
+        start = time.monotonic()
+        success: bool | None = False
+        try:
+            web3 = web3node.web3_instance if web3node is not None else None
+            result = method(web3, **kwargs)
+            success = True
+        except (
+            RemoteError,
+            requests.exceptions.RequestException,
+            BlockchainQueryError,
+            BlockNotFound,
+            BadResponseFormat,
+            ValueError,  # Yabir saw this happen with mew node for unavailable method at node. Since it's generic we should replace if web3 implements https://github.com/ethereum/web3.py/issues/2448  # noqa: E501
+        ) as e:
+            log.warning(f'Failed to query {node_info} for {method!s} due to {e!s}')
+            # Catch all possible errors here and just try next node call
+            return False, None
+        except TransactionNotFound:
+            if kwargs.get('must_exist', False) is True:
+                return False, None  # try other nodes, as transaction has to exist
+            success = True
+            return True, None
+        except GreenletExit:
+            success = None  # abandoned since a hedged query to another node answered first
+            raise
+        finally:
+            self.node_stats.get(node_info).record(latency=time.monotonic() - start, success=success)  # noqa: E501
+
+        return True, result
+
+    def _hedged_query_nodes(
+            self,
+            method: Callable,
+            first_node: tuple[NodeName, Web3Node | None],
+            second_node: tuple[NodeName, Web3Node | None],
+            delay: float,
+            **kwargs: Any,
+    ) -> tuple[bool, Any]:
+        """Queries the method at the first node and, if it has not answered after delay
+        seconds, at the second node too. Returns the first successful result and abandons
+        the other query."""
+        first = gevent.spawn(self._query_node, method, *first_node, **kwargs)
+        first.join(timeout=delay)
+        if first.ready():  # answered in time. If it failed try the second node as usual
+            return first.get() if first.get()[0] else self._query_node(method, *second_node, **kwargs)  # noqa: E501
+
+        log.debug(f'Hedging {method!s} query to {first_node[0]} with {second_node[0]}')
+        self.node_stats.get(first_node[0]).hedged_num += 1
+        second = gevent.spawn(self._query_node, method, *second_node, **kwargs)
+        try:
+            for greenlet in gevent.iwait((first, second)):
+                if (outcome := greenlet.get())[0]:
+                    return outcome
+        finally:
+            gevent.killall((first, second))
+
+        return False, None
+
+    def get_node_stats(self) -> list[dict[str, Any]]:
+        """Returns the latency and error stats of the nodes of the chain"""
+        return self.node_stats.serialize()
+
     def _get_latest_block_number(self, web3: Web3 | None) -> int:
         if web3 is not None:
             return web3.eth.block_number
@@ -871,6 +976,275 @@ class EvmNodeInquirer(metaclass=ABCMeta):
 
         return result
 
+    def _send_rpc_batch(
+            self,
+            web3: Web3,
+            rpc_method: RPCEndpoint,
+            calls: list[tuple[int, list[Any]]],
+    ) -> dict[int, dict[str, Any]]:
+        """Sends the given (id, params) calls of the JSON-RPC method to the node in a
+        single batch request. Returns the response of each call by its id.
+
+        May raise:
+        - RemoteError if the node rejected the batch or did not return a batch response
+        - RequestException if the node could not be reached
+        """
+        provider: HTTPProvider = web3.provider  # type: ignore[assignment]  # all nodes are http
+        data = json.dumps([
+            {'jsonrpc': '2.0', 'method': rpc_method, 'params': params, 'id': call_id}
+            for call_id, params in calls
+        ]).encode()
+        try:
+            raw_response = make_post_request(
+                provider.endpoint_uri,  # type: ignore[arg-type]  # always given for the nodes
+                data,
+                **provider.get_request_kwargs(),
+            )
+        except requests.exceptions.HTTPError as e:
+            raise RemoteError(f'Batch request got {e!s}') from e
+
+        try:
+            response = json.loads(raw_response)
+        except json.JSONDecodeError as e:
+            raise RemoteError(f'Batch request returned invalid JSON: {e!s}') from e
+
+        if not isinstance(response, list):  # an error for the whole batch
+            raise RemoteError(f'Batch request was rejected with {response}')
+
+        return {x['id']: x for x in response if isinstance(x, dict) and 'id' in x}
+
+    def _batch_query(
+            self,
+            rpc_method: RPCEndpoint,
+            params_list: Sequence[list[Any]],
+            call_order: Sequence[WeightedNode],
+            query_past_data: bool,
+    ) -> dict[int, Any]:
+        """Makes a call of the JSON-RPC method for each of the given params in batch
+        requests to the connected nodes, in call order. Calls that fail or return nothing
+        at a node are sent to the next one. Etherscan is skipped since it can't batch.
+        Each batch request counts as one query in the node stats, unless it was rejected
+        for its size.
+
+        Returns the formatted result of each call that succeeded by its index in params_list.
+        """
+        results: dict[int, Any] = {}
+        formatter = PYTHONIC_RESULT_FORMATTERS.get(rpc_method)
+        pending = list(range(len(params_list)))
+        for weighted_node in call_order:
+            node = weighted_node.node_info
+            web3node = self.web3_mapping.get(node, None)
+            if len(pending) == 0:
+                break
+            if web3node is None or (query_past_data and web3node.is_pruned is True):
+                continue
+
+            failed: list[int] = []
+            while len(pending) != 0:
+                batch_size = self.rpc_batch_sizes.get(node, DEFAULT_RPC_BATCH_SIZE)
+                batch, pending = pending[:batch_size], pending[batch_size:]
+                try:
+                    responses = self._send_rpc_batch(
+                        web3=web3node.web3_instance,
+                        rpc_method=rpc_method,
+                        calls=[(idx, params_list[idx]) for idx in batch],
+                    )
+                except RemoteError as e:
+                    if batch_size != 1:  # probably over the node's limit. Retry in smaller batches
+                        log.debug(f'{node} rejected a batch of {batch_size} {rpc_method} calls due to {e!s}')  # noqa: E501
+                        self.rpc_batch_sizes[node] = batch_size // 2
+                        self.rpc_batches_accepted[node] = 0
+                        pending = batch + pending
+                        continue
+
+                    log.warning(f'Failed to query {node} for {rpc_method} in batch due to {e!s}')
+                    self.node_stats.get(node).record(latency=None, success=False)
+                    failed, pending = failed + batch + pending, []
+                    break
+                except requests.exceptions.RequestException as e:
+                    log.warning(f'Failed to query {node} for {rpc_method} in batch due to {e!s}')
+                    self.node_stats.get(node).record(latency=None, success=False)
+                    failed, pending = failed + batch + pending, []
+                    break
+
+                self.node_stats.get(node).record(latency=None, success=True)
+                self._grow_rpc_batch_size(node, batch_size)
+                for idx in batch:
+                    if (result := responses.get(idx, {}).get('result')) is None:
+                        failed.append(idx)  # errored or not found at this node
+                        continue
+
+                    try:
+                        results[idx] = formatter(result) if formatter is not None else result
+                    except (ValueError, TypeError, KeyError) as e:
+                        log.warning(f'Got unexpected {rpc_method} result {result} from {node}: {e!s}')  # noqa: E501
+                        failed.append(idx)
+
+            pending = failed
+
+        return results
+
+    def _grow_rpc_batch_size(self, node: NodeName, batch_size: int) -> None:
+        """Doubles the batch size of the node, up to the default, once it has accepted
+        RPC_BATCH_SIZE_GROWTH_BATCHES batches in a row"""
+        if batch_size >= DEFAULT_RPC_BATCH_SIZE:
+            return
+
+        accepted = self.rpc_batches_accepted.get(node, 0) + 1
+        if accepted >= RPC_BATCH_SIZE_GROWTH_BATCHES:
+            self.rpc_batch_sizes[node] = min(batch_size * 2, DEFAULT_RPC_BATCH_SIZE)
+            accepted = 0
+        self.rpc_batches_accepted[node] = accepted
+
+    @staticmethod
+    def _query_or_error(method: Callable[..., T], **kwargs: Any) -> T | RemoteError:
+        """Makes a single query for an item of a batch that failed to be queried in batch"""
+        try:
+            return method(**kwargs)
+        except RemoteError as e:
+            return e
+
+    def get_transaction_receipts(
+            self,
+            tx_hashes: Sequence[EVMTxHash],
+            call_order: Sequence[WeightedNode] | None = None,
+    ) -> list[dict[str, Any] | RemoteError]:
+        """Retrieves the receipts of the given transactions, which are assumed to exist,
+        in JSON-RPC batch requests. The receipts that could not be retrieved in a batch
+        are queried one by one.
+
+        Returns the receipt of each transaction or the error of querying it.
+        """
+        call_order = call_order if call_order is not None else self.default_call_order()
+        results = self._batch_query(
+            rpc_method=RPC.eth_getTransactionReceipt,
+            params_list=[[tx_hash.hex()] for tx_hash in tx_hashes],
+            call_order=call_order,
+            query_past_data=True,
+        )
+        return [
+            process_result(results[idx]) if idx in results else self._query_or_error(
+                self.get_transaction_receipt,
+                tx_hash=tx_hash,
+                call_order=call_order,
+            ) for idx, tx_hash in enumerate(tx_hashes)
+        ]
+
+    def get_transactions_by_hash(
+            self,
+            tx_hashes: Sequence[EVMTxHash],
+            call_order: Sequence[WeightedNode] | None = None,
+    ) -> list[tuple[EvmTransaction, dict[str, Any]] | RemoteError]:
+        """Retrieves the given transactions, which are assumed to exist, and their raw
+        receipt data in JSON-RPC batch requests. The transactions that could not be
+        retrieved in a batch are queried one by one.
+
+        Returns the transaction and receipt of each hash or the error of querying it.
+        """
+        call_order = call_order if call_order is not None else self.default_call_order()
+        tx_results = self._batch_query(
+            rpc_method=RPC.eth_getTransactionByHash,
+            params_list=[[tx_hash.hex()] for tx_hash in tx_hashes],
+            call_order=call_order,
+            query_past_data=True,
+        )
+        found = sorted(tx_results)
+        receipts = dict(zip(found, self.get_transaction_receipts(
+            tx_hashes=[tx_hashes[idx] for idx in found],
+            call_order=call_order,
+        ), strict=True))
+        block_numbers = sorted({tx_results[idx]['blockNumber'] for idx in found})
+        blocks = dict(zip(block_numbers, self.get_blocks_by_number(
+            nums=block_numbers,
+            call_order=call_order,
+        ), strict=True))
+
+        transactions: list[tuple[EvmTransaction, dict[str, Any]] | RemoteError] = []
+        for idx, tx_hash in enumerate(tx_hashes):
+            if (
+                idx not in tx_results or
+                isinstance(receipt := receipts[idx], RemoteError) or
+                isinstance(block := blocks[tx_results[idx]['blockNumber']], RemoteError)
+            ):
+                transactions.append(self._query_or_error(
+                    self.get_transaction_by_hash,
+                    tx_hash=tx_hash,
+                    call_order=call_order,
+                ))
+                continue
+
+            try:
+                transaction, receipt_data = deserialize_evm_transaction(
+                    data={**tx_results[idx], 'timeStamp': block['timestamp']},
+                    internal=False,
+                    chain_id=self.chain_id,
+                    evm_inquirer=self,
+                    raw_receipt_data=receipt,
+                )
+            except (DeserializationError, ValueError) as e:
+                transactions.append(RemoteError(
+                    f'Couldnt deserialize evm transaction data from {tx_results[idx]}. Error: {e!s}',  # noqa: E501
+                ))
+                continue
+
+            transactions.append((transaction, receipt_data))
+
+        return transactions
+
+    def get_codes(
+            self,
+            accounts: Sequence[ChecksumEvmAddress],
+            call_order: Sequence[WeightedNode] | None = None,
+    ) -> list[str | RemoteError]:
+        """Gets the deployment bytecode at each of the given addresses in JSON-RPC batch
+        requests. The addresses that could not be queried in a batch are queried one by one.
+
+        Returns the bytecode at each address or the error of querying it.
+        """
+        call_order = call_order if call_order is not None else self.default_call_order()
+        results = self._batch_query(
+            rpc_method=RPC.eth_getCode,
+            params_list=[[account, 'latest'] for account in accounts],
+            call_order=call_order,
+            query_past_data=False,
+        )
+        return [
+            hex_or_bytes_to_str(results[idx]) if idx in results else self._query_or_error(
+                self.get_code,
+                account=account,
+                call_order=call_order,
+            ) for idx, account in enumerate(accounts)
+        ]
+
+    def get_blocks_by_number(
+            self,
+            nums: Sequence[int],
+            call_order: Sequence[WeightedNode] | None = None,
+    ) -> list[dict[str, Any] | RemoteError]:
+        """Returns the block objects of the given block numbers, queried in JSON-RPC batch
+        requests. The blocks that could not be queried in a batch are queried one by one.
+
+        Returns the block of each number or the error of querying it.
+        """
+        call_order = call_order if call_order is not None else self.default_call_order()
+        results = self._batch_query(
+            rpc_method=RPC.eth_getBlockByNumber,
+            params_list=[[hex(num), False] for num in nums],
+            call_order=call_order,
+            query_past_data=False,
+        )
+        blocks: list[dict[str, Any] | RemoteError] = []
+        for idx, num in enumerate(nums):
+            if idx not in results:
+                blocks.append(self._query_or_error(self.get_block_by_number, num=num, call_order=call_order))  # noqa: E501
+                continue
+
+            block_data = dict(results[idx])
+            block_data['hash'] = hex_or_bytes_to_str(block_data['hash'])
+            blocks.append(block_data)
+
+        return blocks
+
     def get_logs(
             self,
             contract_address: ChecksumEvmAddress,
@@ -0,0 +1,128 @@
+"""Tracking of the performance of the evm nodes
+
+Each query to a node records whether it succeeded and, unless it failed, how long it
+took, over a rolling window of the latest queries. The call order of the queries
+favours the nodes that have been fast and reliable lately. If enabled in the settings,
+idempotent reads are also hedged: if the node queried first takes longer than its 95th
+percentile latency, the next node is queried too and the first answer is used.
+"""
+import statistics
+from collections import deque
+from typing import Any
+
+from rotkehlchen.chain.evm.types import NodeName
+
+# Number of latest queries of a node that its stats are calculated over
+NODE_STATS_WINDOW = 100
+# Number of queries of a node below which its stats are not used
+MIN_NODE_STATS_SAMPLES = 5
+# Seconds that a query is given at least before it is hedged
+MIN_HEDGE_DELAY = 0.2
+# Limits of the factor that the weight of a node is multiplied with due to its stats
+MIN_PERFORMANCE_FACTOR = 0.05
+MAX_PERFORMANCE_FACTOR = 20.0
+
+
+class NodeStats:
+    """Rolling latency and error rate of the queries to a node"""
+
+    def __init__(self) -> None:
+        self.latencies: deque[float] = deque(maxlen=NODE_STATS_WINDOW)
+        self.failures: deque[bool] = deque(maxlen=NODE_STATS_WINDOW)
+        self.queries_num = 0
+        self.failures_num = 0
+        self.hedged_num = 0  # queries of the node that another node was also queried for
+
+    def record(self, latency: float | None, success: bool | None) -> None:
+        """Records a query. success is None if the query was abandoned because another
+        node answered first, in which case the query took at least `latency` seconds.
+
+        The latency of failed queries is not recorded since a node that fails fast
+        would otherwise look fast. latency is None for the JSON-RPC batch requests,
+        which take longer than single queries and so only count toward the error rate."""
+        self.queries_num += 1
+        if success is not False and latency is not None:
+            self.latencies.append(latency)
+        if success is not None:
+            self.failures.append(not success)
+            self.failures_num += not success
+
+    def latency_percentile(self, percentile: int) -> float | None:
+        """The latency of the given percentile or None if there are not enough samples"""
+        if len(self.latencies) < MIN_NODE_STATS_SAMPLES:
+            return None
+
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, len(ordered) * percentile // 100)]
+
+    def error_rate(self) -> float:
+        if len(self.failures) == 0:
+            return 0.0
+
+        return sum(self.failures) / len(self.failures)
+
+    def serialize(self) -> dict[str, Any]:
+        return {
+            'queries': self.queries_num,
+            'failures': self.failures_num,
+            'hedged': self.hedged_num,
+            'error_rate': self.error_rate(),
+            'latency_p50': self.latency_percentile(50),
+            'latency_p95': self.latency_percentile(95),
+        }
+
+
+class NodeStatsTracker:
+    """The stats of the nodes of a chain and the call order preferences derived from them"""
+
+    def __init__(self) -> None:
+        self.stats: dict[NodeName, NodeStats] = {}
+
+    def get(self, node: NodeName) -> NodeStats:
+        if (node_stats := self.stats.get(node)) is None:
+            node_stats = self.stats[node] = NodeStats()
+        return node_stats
+
+    def hedge_delay(self, node: NodeName) -> float | None:
+        """Seconds after which a query to the node should be hedged or None if the node
+        does not have enough samples to tell"""
+        if (node_stats := self.stats.get(node)) is None:
+            return None
+
+        if (p95 := node_stats.latency_percentile(95)) is None:
+            return None
+
+        return max(p95, MIN_HEDGE_DELAY)
+
+    def performance_factors(self, nodes: list[NodeName]) -> list[float]:
+        """Returns the factor to multiply the weight of each node with in the call order.
+
+        It is the median latency of the given nodes over the latency of the node, reduced
+        by its error rate. So a node twice as fast as the median is twice as likely to be
+        queried first. Nodes without enough samples keep their weight, so that they are
+        still queried and get stats."""
+        latencies = [
+            node_stats.latency_percentile(50) if (node_stats := self.stats.get(node)) is not None else None  # noqa: E501
+            for node in nodes
+        ]
+        known_latencies = [x for x in latencies if x is not None]
+        if len(known_latencies) == 0:
+            return [1.0] * len(nodes)
+
+        reference = statistics.median(known_latencies)
+        factors = []
+        for node, latency in zip(nodes, latencies, strict=True):
+            if latency is None:
+                factors.append(1.0)
+                continue
+
+            factor = reference / max(latency, 0.001) * (1 - self.stats[node].error_rate()) ** 2
+            factors.append(min(max(factor, MIN_PERFORMANCE_FACTOR), MAX_PERFORMANCE_FACTOR))
+
+        return factors
+
+    def serialize(self) -> list[dict[str, Any]]:
+        return [
+            {'name': node.name, 'endpoint': node.endpoint, **node_stats.serialize()}
+            for node, node_stats in self.stats.items()
+        ]
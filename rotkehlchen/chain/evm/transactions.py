@@ -22,9 +22,16 @@ from rotkehlchen.errors.misc import AlreadyExists, InputError, RemoteError
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.serialization.deserialize import deserialize_evm_address
-from rotkehlchen.types import SPAM_PROTOCOL, ChecksumEvmAddress, EvmTokenKind, EVMTxHash, Timestamp
+from rotkehlchen.types import (
+    SPAM_PROTOCOL,
+    ChecksumEvmAddress,
+    EvmTokenKind,
+    EVMTxHash,
+    Timestamp,
+    deserialize_evm_tx_hash,
+)
 from rotkehlchen.utils.hexbytes import hexstring_to_bytes
-from rotkehlchen.utils.misc import ts_now
+from rotkehlchen.utils.misc import get_chunks, ts_now
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.evm.node_inquirer import EvmNodeInquirer
@@ -37,6 +44,9 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Number of missing receipts that are queried and then saved in a single DB transaction
+RECEIPTS_CHUNK_SIZE = 500
+
 
 class EvmTransactions(metaclass=ABCMeta):  # noqa: B024
 
@@ -265,6 +275,10 @@ class EvmTransactions(metaclass=ABCMeta):  # noqa: B024
             if len(new_internal_txs) == 0:
                 continue
 
+            self.ensure_txs_data_exist(
+                tx_hashes=[x.parent_tx_hash for x in new_internal_txs if x.value != 0],
+                relevant_address=address,
+            )
             for internal_tx in new_internal_txs:
                 if internal_tx.value == 0:
                     continue  # Only reason we need internal is for ether transfer. Ignore 0
@@ -384,6 +398,7 @@ class EvmTransactions(metaclass=ABCMeta):  # noqa: B024
                     from_ts=query_start_ts,
                     to_ts=query_end_ts,
                 ):
+                    self.ensure_txs_data_exist(tx_hashes=erc20_tx_hashes, relevant_address=address)
                     for tx_hash in erc20_tx_hashes:
                         with self.database.conn.read_ctx() as cursor:
                             tx, _ = self.get_or_create_transaction(
@@ -546,6 +561,51 @@ class EvmTransactions(metaclass=ABCMeta):  # noqa: B024
         tx_receipt = self.dbevmtx.get_receipt(cursor, tx_hash, self.evm_inquirer.chain_id)
         return tx_data, tx_receipt  # type: ignore  # tx_data can't be None here
 
+    def ensure_txs_data_exist(
+            self,
+            tx_hashes: Sequence[EVMTxHash],
+            relevant_address: ChecksumEvmAddress | None,
+    ) -> None:
+        """Makes sure that the transactions of the given hashes and their receipts are in
+        the database. The ones missing their receipt are queried in JSON-RPC batches and
+        each chunk of them is saved in a single DB transaction.
+
+        Transactions that fail to be queried are skipped, so that ensure_tx_data_exists
+        can query them on their own and raise for them.
+        """
+        for chunk in get_chunks([x for x in tx_hashes if x != GENESIS_HASH], n=RECEIPTS_CHUNK_SIZE):  # noqa: E501
+            with self.database.conn.read_ctx() as cursor:
+                cursor.execute(
+                    f'SELECT tx_hash FROM evm_transactions WHERE chain_id=? AND tx_hash IN '
+                    f'({",".join(["?"] * len(chunk))}) AND identifier IN '
+                    f'(SELECT tx_id FROM evmtx_receipts)',
+                    (self.evm_inquirer.chain_id.serialize_for_db(), *chunk),
+                )
+                existing = {deserialize_evm_tx_hash(x[0]) for x in cursor}
+
+            if len(missing := list(dict.fromkeys(x for x in chunk if x not in existing))) == 0:
+                continue
+
+            results = []
+            for tx_hash, result in zip(missing, self.evm_inquirer.get_transactions_by_hash(tx_hashes=missing), strict=True):  # noqa: E501
+                if isinstance(result, RemoteError):
+                    log.debug(f'Failed to query {self.evm_inquirer.chain_name} transaction {tx_hash.hex()} in batch due to {result!s}')  # noqa: E501
+                else:
+                    results.append(result)
+
+            with self.database.user_write() as write_cursor:
+                self.dbevmtx.add_evm_transactions(
+                    write_cursor=write_cursor,
+                    evm_transactions=[transaction for transaction, _ in results],
+                    relevant_address=relevant_address,
+                )
+                for _, raw_receipt_data in results:
+                    self.dbevmtx.add_or_ignore_receipt_data(
+                        write_cursor=write_cursor,
+                        chain_id=self.evm_inquirer.chain_id,
+                        data=raw_receipt_data,
+                    )
+
     def get_or_create_transaction(
             self,
             cursor: 'DBCursor',
@@ -660,7 +720,8 @@ class EvmTransactions(metaclass=ABCMeta):  # noqa: B024
     ) -> None:
         """
         Searches the database for up to `limit` transactions that have no corresponding receipt
-        and for each one of them queries the receipt and saves it in the DB.
+        and for each one of them queries the receipt and saves it in the DB. The receipts
+        are queried in batches and each chunk of them is saved in a single DB transaction.
 
         It's protected by a lock to not enter the same code twice
         (i.e. from periodic tasks and from pnl report history events gathering)
@@ -687,19 +748,21 @@ class EvmTransactions(metaclass=ABCMeta):  # noqa: B024
             if len(hash_results) == 0:
                 return  # nothing to do
 
-            for entry in hash_results:
-                try:
-                    tx_receipt_data = self.evm_inquirer.get_transaction_receipt(tx_hash=entry)
-                except RemoteError as e:
-                    self.msg_aggregator.add_warning(f'Failed to query information for {self.evm_inquirer.chain_name} transaction {entry.hex()} due to {e!s}. Skipping...')  # noqa: E501
-                    continue
+            for chunk in get_chunks(hash_results, n=RECEIPTS_CHUNK_SIZE):
+                receipts = []
+                for tx_hash, result in zip(chunk, self.evm_inquirer.get_transaction_receipts(tx_hashes=chunk), strict=True):  # noqa: E501
+                    if isinstance(result, RemoteError):
+                        self.msg_aggregator.add_warning(f'Failed to query information for {self.evm_inquirer.chain_name} transaction {tx_hash.hex()} due to {result!s}. Skipping...')  # noqa: E501
+                    else:
+                        receipts.append(result)
 
                 with self.database.user_write() as write_cursor:
-                    self.dbevmtx.add_or_ignore_receipt_data(
-                        write_cursor=write_cursor,
-                        chain_id=self.evm_inquirer.chain_id,
-                        data=tx_receipt_data,
-                    )
+                    for tx_receipt_data in receipts:
+                        self.dbevmtx.add_or_ignore_receipt_data(
+                            write_cursor=write_cursor,
+                            chain_id=self.evm_inquirer.chain_id,
+                            data=tx_receipt_data,
+                        )
 
     def add_transaction_by_hash(
             self,
@@ -4,7 +4,8 @@ from typing import TYPE_CHECKING
 
 from rotkehlchen.assets.asset import AssetWithOracles
 from rotkehlchen.chain.evm.decoding.base import BaseDecoderTools
-from rotkehlchen.chain.evm.decoding.decoder import EventDecoderFunction, EVMTransactionDecoder
+from rotkehlchen.chain.evm.decoding.decoder import EVMTransactionDecoder
+from rotkehlchen.chain.evm.decoding.structures import EventDecodingRule
 from rotkehlchen.chain.evm.decoding.types import CounterpartyDetails
 from rotkehlchen.chain.optimism.types import OptimismTransaction
 from rotkehlchen.db.optimismtx import DBOptimismTx
@@ -34,7 +35,7 @@ class OptimismSuperchainTransactionDecoder(EVMTransactionDecoder, metaclass=ABCM
             node_inquirer: 'OptimismSuperchainInquirer',
             transactions: 'OptimismSuperchainTransactions',
             value_asset: AssetWithOracles,
-            event_rules: list[EventDecoderFunction],
+            event_rules: list[EventDecodingRule],
             misc_counterparties: list[CounterpartyDetails],
             base_tools: BaseDecoderTools,
             dbevmtx_class: type[DBOptimismTx] = DBOptimismTx,
@@ -1,7 +1,7 @@
 import os
 
 from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers import Cipher, CipherContext, algorithms, modes
 
 from rotkehlchen.errors.misc import UnableToDecryptRemoteData
 
@@ -14,20 +14,85 @@ AES_BLOCK_SIZE = 16
 # cryptography library seem to suggest it's the safest options. Problem is the
 # already encrypted and saved database files and how to handle the previous encryption
 # We need to keep a versioning of encryption used for each file.
-def encrypt(key: bytes, source: bytes) -> bytes:
+def _aes_cipher(key: bytes, iv: bytes) -> Cipher:
     assert isinstance(key, bytes), 'key should be given in bytes'
-    assert isinstance(source, bytes), 'source should be given in bytes'
     digest = hashes.Hash(hashes.SHA256())
     digest.update(key)
     key = digest.finalize()  # use SHA-256 over our key to get a proper-sized AES key
-    iv = os.urandom(AES_BLOCK_SIZE)
-    cipher = Cipher(algorithms.AES(key), modes.CBC(iv))
-    encryptor = cipher.encryptor()
-    padding = AES_BLOCK_SIZE - len(source) % AES_BLOCK_SIZE  # calculate needed padding
-    source += bytes([padding]) * padding  # Python 2.x: source += chr(padding) * padding
-    # store the iv at the beginning and encrypt
-    data = iv + (encryptor.update(source) + encryptor.finalize())
-    return data
+    return Cipher(algorithms.AES(key), modes.CBC(iv))
+
+
+class StreamEncryptor:
+    """Encrypts data given in chunks of any size. The concatenated output of update()
+    and finalize() is the iv followed by the padded ciphertext, same as encrypt()."""
+
+    def __init__(self, key: bytes) -> None:
+        iv = os.urandom(AES_BLOCK_SIZE)
+        self._encryptor = _aes_cipher(key, iv).encryptor()
+        self._prefix = iv  # store the iv at the beginning
+        self._length = 0
+
+    def update(self, data: bytes) -> bytes:
+        self._length += len(data)
+        result = self._prefix + self._encryptor.update(data)
+        self._prefix = b''
+        return result
+
+    def finalize(self) -> bytes:
+        padding = AES_BLOCK_SIZE - self._length % AES_BLOCK_SIZE  # calculate needed padding
+        return self.update(bytes([padding]) * padding) + self._encryptor.finalize()
+
+
+class StreamDecryptor:
+    """Decrypts data produced by encrypt() or StreamEncryptor given in chunks of any size.
+
+    The last block is held back until finalize() so that the padding can be checked and
+    removed. If data can't be decrypted then finalize() raises UnableToDecryptRemoteData
+    """
+
+    def __init__(self, key: bytes) -> None:
+        self._key = key
+        self._iv = b''
+        self._decryptor: CipherContext | None = None
+        self._last_block = b''
+
+    def update(self, data: bytes) -> bytes:
+        if self._decryptor is None:  # extract the iv from the beginning
+            missing = AES_BLOCK_SIZE - len(self._iv)
+            self._iv += data[:missing]
+            data = data[missing:]
+            if len(self._iv) != AES_BLOCK_SIZE:
+                return b''
+            self._decryptor = _aes_cipher(self._key, self._iv).decryptor()
+
+        decrypted = self._last_block + self._decryptor.update(data)
+        self._last_block = decrypted[-AES_BLOCK_SIZE:]
+        return decrypted[:-AES_BLOCK_SIZE]
+
+    def finalize(self) -> bytes:
+        try:
+            if self._decryptor is None:
+                raise ValueError('Missing iv')
+            data = self._last_block + self._decryptor.finalize()
+        except ValueError as e:  # not a whole number of blocks
+            raise UnableToDecryptRemoteData(
+                f'Could not decrypt the DB data we received from the server due to {e!s}',
+            ) from e
+
+        padding = data[-1] if len(data) != 0 else 0  # pick the padding value from the end
+        if padding == 0 or data[-padding:] != bytes([padding]) * padding:
+            raise UnableToDecryptRemoteData(
+                'Invalid padding when decrypting the DB data we received from the server. '
+                'Are you using a new user and if yes have you used the same password as before? '
+                'If you have then please open a bug report.',
+            )
+        return data[:-padding]  # remove the padding
+
+
+def encrypt(key: bytes, source: bytes) -> bytes:
+    assert isinstance(source, bytes), 'source should be given in bytes'
+    encryptor = StreamEncryptor(key)
+    return encryptor.update(source) + encryptor.finalize()
 
 
 def decrypt(key: bytes, source: bytes) -> bytes:
@@ -37,25 +102,9 @@ def decrypt(key: bytes, source: bytes) -> bytes:
     Returns the decrypted data.
     If data can't be decrypted then raises UnableToDecryptRemoteData
     """
-    assert isinstance(key, bytes), 'key should be given in bytes'
     assert isinstance(source, bytes), 'source should be given in bytes'
-    digest = hashes.Hash(hashes.SHA256())
-    digest.update(key)
-    key = digest.finalize()  # use SHA-256 over our key to get a proper-sized AES key
-    iv = source[:AES_BLOCK_SIZE]  # extract the iv from the beginning
-    cipher = Cipher(algorithms.AES(key), modes.CBC(iv))
-    decryptor = cipher.decryptor()
-
-    data = source[AES_BLOCK_SIZE:]  # decrypt
-    data = decryptor.update(data)
-    padding = data[-1]  # pick the padding value from the end; Python 2.x: ord(data[-1])
-    if data[-padding:] != bytes([padding]) * padding:  # Python 2.x: chr(padding) * padding
-        raise UnableToDecryptRemoteData(
-            'Invalid padding when decrypting the DB data we received from the server. '
-            'Are you using a new user and if yes have you used the same password as before? '
-            'If you have then please open a bug report.',
-        )
-    return data[:-padding]  # remove the padding
+    decryptor = StreamDecryptor(key)
+    return decryptor.update(source) + decryptor.finalize()
 
 
 def sha3(data: bytes) -> bytes:
@@ -2,17 +2,22 @@ import base64
 import hashlib
 import logging
 import shutil
+import sqlite3
 import tempfile
 import zlib
+from collections.abc import Iterator, Sequence
+from contextlib import contextmanager
 from pathlib import Path
+from typing import BinaryIO
 
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants.misc import USERDB_NAME, USERSDIR_NAME
-from rotkehlchen.crypto import decrypt, encrypt
+from rotkehlchen.crypto import StreamDecryptor, StreamEncryptor, decrypt
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.settings import ModifiableDBSettings
+from rotkehlchen.db.sync_changes import DBSyncChanges, apply_delta, get_delta_hash
 from rotkehlchen.errors.api import AuthenticationError
-from rotkehlchen.errors.misc import SystemPermissionError
+from rotkehlchen.errors.misc import SystemPermissionError, UnableToDecryptRemoteData
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import timestamp_to_date, ts_now
@@ -21,6 +26,16 @@ logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 BUFFERSIZE = 64 * 1024
+# zlib level of the DB backups. The max level of 9 only shaves a bit off the size of a
+# DB while compressing several times slower than this
+BACKUP_COMPRESSION_LEVEL = 6
+
+
+def _decompress_to_file(decompressor: 'zlib._Decompress', data: bytes, target: BinaryIO) -> None:
+    """Decompress data to the target file at most BUFFERSIZE bytes at a time"""
+    while len(data) != 0:
+        target.write(decompressor.decompress(data, BUFFERSIZE))
+        data = decompressor.unconsumed_tail
 
 
 class DataHandler:
@@ -184,43 +199,84 @@ class DataHandler:
 
         return users
 
-    def compress_and_encrypt_db(self) -> tuple[bytes, str]:
+    @contextmanager
+    def compress_and_encrypt_db(
+            self,
+            compression_level: int = BACKUP_COMPRESSION_LEVEL,
+    ) -> Iterator[tuple[Path, str]]:
         """Decrypt the DB, dump in temporary plaintextdb, compress it,
-        and then re-encrypt it
-
-        Returns a b64 encoded binary blob"""
-        compressor = zlib.compressobj(level=9)
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.db') as tempdbfile:
-            tempdbpath = Path(tempdbfile.name)
-            log.info(f'Compress and encrypt DB at temporary path: {tempdbpath}')
-            tempdbfile.close()  # close the file to allow re-opening by export_unencrypted in windows https://github.com/rotki/rotki/issues/5051  # noqa: E501
+        and then re-encrypt it in a temporary file
+
+        The data goes through hashing, compression and encryption in chunks so memory
+        use does not depend on the size of the DB.
+
+        Yields the path of the encrypted file and the b64 encoded hash of the plaintext
+        DB. The file is deleted when the context exits."""
+        compressor = zlib.compressobj(level=compression_level)
+        encryptor = StreamEncryptor(self.db.password.encode())
+        data_hash = hashlib.sha256()
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmpdirname:  # needed on windows, see https://tinyurl.com/tmp-win-err  # noqa: E501
+            tempdbpath = Path(tmpdirname) / 'plaintext.db'
+            encrypted_path = Path(tmpdirname) / 'encrypted.bin'
+            log.info(f'Compress and encrypt DB at temporary path: {encrypted_path}')
             self.db.export_unencrypted(tempdbpath)
-            source_data = bytearray()
-            compressed_data = bytearray()
-            with open(tempdbpath, 'rb') as src_f:
-                block = src_f.read(BUFFERSIZE)
-                while block:
-                    source_data += block
-                    compressed_data += compressor.compress(block)
-                    block = src_f.read(BUFFERSIZE)
-
-                compressed_data += compressor.flush()
-
-        original_data_hash = base64.b64encode(
-            hashlib.sha256(source_data).digest(),
-        ).decode()
-        encrypted_data = encrypt(self.db.password.encode(), bytes(compressed_data))
-        # cleanup temp file to avoid windows problem (https://github.com/rotki/rotki/issues/5051)
-        tempdbpath.unlink()
-        return encrypted_data, original_data_hash
-
-    def decompress_and_decrypt_db(self, encrypted_data: bytes) -> None:
-        """Decrypt and decompress the encrypted data we receive from the server
-
-        If successful then replace our local Database
+            with open(tempdbpath, 'rb') as src_f, open(encrypted_path, 'wb') as dst_f:
+                while block := src_f.read(BUFFERSIZE):
+                    data_hash.update(block)
+                    dst_f.write(encryptor.update(compressor.compress(block)))
+
+                dst_f.write(encryptor.update(compressor.flush()) + encryptor.finalize())
+
+            # cleanup the plaintext early to avoid windows problem (https://github.com/rotki/rotki/issues/5051)  # noqa: E501
+            tempdbpath.unlink()
+            yield encrypted_path, base64.b64encode(data_hash.digest()).decode()
+
+    @contextmanager
+    def compress_and_encrypt_changes(
+            self,
+            parent_hash: str,
+    ) -> Iterator[tuple[Path, str, int] | None]:
+        """Compress and encrypt the changes of the DB since the last premium sync in a
+        temporary file. Their size depends on the changed tables and not on the whole DB.
+
+        Yields the path of the encrypted file, the hash of the data in the server after
+        they are added on top of the data with parent_hash and the id of the last change
+        they contain. Yields None if nothing changed. The file is deleted when the
+        context exits."""
+        with self.db.conn.read_ctx() as cursor:
+            result = DBSyncChanges(self.db).export_delta(cursor)
+
+        if result is None:
+            yield None
+            return
+
+        delta, last_change_id = result
+        encryptor = StreamEncryptor(self.db.password.encode())
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmpdirname:  # needed on windows, see https://tinyurl.com/tmp-win-err  # noqa: E501
+            encrypted_path = Path(tmpdirname) / 'delta.bin'
+            encrypted_path.write_bytes(
+                encryptor.update(zlib.compress(delta, BACKUP_COMPRESSION_LEVEL)) +
+                encryptor.finalize(),
+            )
+            yield encrypted_path, get_delta_hash(parent_hash, delta), last_change_id
+
+    def decompress_and_decrypt_db(
+            self,
+            encrypted_path: Path,
+            delta_paths: Sequence[Path] = (),
+    ) -> str:
+        """Decrypt and decompress the encrypted file we receive from the server and
+        apply on it the encrypted deltas at delta_paths in order
+
+        If successful then replace our local Database. The data goes through
+        decryption and decompression in chunks to a temporary file so memory use
+        does not depend on the size of the DB.
+
+        Returns the b64 encoded hash of the received data, chained with the deltas.
 
         May Raise:
-        - UnableToDecryptRemoteData due to decrypt()
+        - UnableToDecryptRemoteData if the data can't be decrypted or decompressed
+        - DeserializationError if a delta can't be applied on the data
         - DBUpgradeError if the rotki DB version is newer than the software or
         there is a DB upgrade and there is an error or if the version is older
         than the one supported.
@@ -235,6 +291,65 @@ class DataHandler:
             users_dir / self.username / f'rotkehlchen_db_{date}.backup',
         )
 
-        decrypted_data = decrypt(self.db.password.encode(), encrypted_data)
-        decompressed_data = zlib.decompress(decrypted_data)
-        self.db.import_unencrypted(decompressed_data)
+        decryptor = StreamDecryptor(self.db.password.encode())
+        decompressor = zlib.decompressobj()
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmpdirname:  # needed on windows, see https://tinyurl.com/tmp-win-err  # noqa: E501
+            tempdbpath = Path(tmpdirname) / 'temp.db'
+            with open(encrypted_path, 'rb') as src_f, open(tempdbpath, 'wb') as dst_f:
+                try:
+                    while block := src_f.read(BUFFERSIZE):
+                        _decompress_to_file(decompressor, decryptor.update(block), dst_f)
+
+                    _decompress_to_file(decompressor, decryptor.finalize(), dst_f)
+                    dst_f.write(decompressor.flush())
+                except zlib.error as e:  # also what a wrong password ends up as
+                    raise UnableToDecryptRemoteData(
+                        f'Could not decompress the DB data we received from the server due to {e!s}',  # noqa: E501
+                    ) from e
+
+            data_hash = hashlib.sha256()
+            with open(tempdbpath, 'rb') as f:
+                while block := f.read(BUFFERSIZE):
+                    data_hash.update(block)
+
+            head = base64.b64encode(data_hash.digest()).decode()
+            if len(delta_paths) != 0:
+                head = self._apply_deltas(tempdbpath, head, delta_paths)
+
+            self.db.import_unencrypted(tempdbpath)
+
+        return head
+
+    def _apply_deltas(
+            self,
+            plaintext_db_path: Path,
+            parent_hash: str,
+            delta_paths: Sequence[Path],
+    ) -> str:
+        """Apply the encrypted deltas at delta_paths in order on the plaintext DB whose
+        data has parent_hash. If any of them fails then none is applied.
+
+        Returns the hash of the data after the last delta.
+
+        May Raise:
+        - UnableToDecryptRemoteData if a delta can't be decrypted or decompressed
+        - DeserializationError if a delta can't be applied on the data
+        """
+        conn = sqlite3.connect(plaintext_db_path)  # plaintext, so no need for sqlcipher
+        try:
+            with conn:  # a single transaction that rolls back on error
+                cursor = conn.cursor()
+                for delta_path in delta_paths:
+                    try:
+                        delta = zlib.decompress(decrypt(self.db.password.encode(), delta_path.read_bytes()))  # noqa: E501
+                    except zlib.error as e:
+                        raise UnableToDecryptRemoteData(
+                            f'Could not decompress a DB delta we received from the server due to {e!s}',  # noqa: E501
+                        ) from e
+
+                    apply_delta(cursor, delta)
+                    parent_hash = get_delta_hash(parent_hash, delta)
+        finally:
+            conn.close()
+
+        return parent_hash
@@ -2,14 +2,19 @@ import abc
 import csv
 import logging
 from collections import Counter, defaultdict
-from pathlib import Path
-from typing import TYPE_CHECKING, Any, Final
+from collections.abc import Iterator
+from typing import TYPE_CHECKING, Any, Final, TextIO
 
 from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.assets.converters import asset_from_binance
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_USD
-from rotkehlchen.data_import.utils import BaseExchangeImporter, hash_csv_row
+from rotkehlchen.data_import.utils import (
+    BaseExchangeImporter,
+    CountedLines,
+    StreamingCSVImporter,
+    hash_csv_row,
+)
 from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.errors.asset import UnknownAsset, UnsupportedAsset
 from rotkehlchen.errors.misc import InputError
@@ -38,13 +43,18 @@ from rotkehlchen.utils.misc import ts_sec_to_ms
 
 if TYPE_CHECKING:
     from rotkehlchen.assets.asset import AssetWithOracles
+    from rotkehlchen.db.dbhandler import DBHandler
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
 BinanceCsvRow = dict[str, Any]
+BinanceRowsGroup = tuple[Timestamp, list[BinanceCsvRow]]
 BINANCE_TRADE_OPERATIONS = {'Buy', 'Sell', 'Fee'}
 EVENT_IDENTIFIER_PREFIX = 'BNC_'
+# Number of the latest distinct timestamps whose groups of rows are kept open while
+# reading the CSV, since the rows of a timestamp are not always contiguous
+BINANCE_GROUPING_WINDOW = 100
 
 
 class BinanceEntry(metaclass=abc.ABCMeta):  # noqa: B024
@@ -656,34 +666,101 @@ MULTIPLE_BINANCE_ENTRIES: list[BinanceMultipleEntry] = [
 ]
 
 
-def _group_binance_rows(
-        rows: list[BinanceCsvRow],
-        timestamp_format: str = '%Y-%m-%d %H:%M:%S',
-) -> tuple[int, dict[Timestamp, list[BinanceCsvRow]]]:
-    """Groups Binance rows by timestamp and deletes unused columns"""
-    multirows: dict[Timestamp, list[BinanceCsvRow]] = defaultdict(list)
-    skipped_count = 0
-    for csv_row in rows:
-        try:
-            timestamp = deserialize_timestamp_from_date(
-                date=csv_row['UTC_Time'],
-                formatstr=timestamp_format,
-                location='binance',
-            )
-            csv_row['Coin'] = asset_from_binance(csv_row['Coin'])
-            csv_row['Change'] = deserialize_asset_amount(csv_row['Change'])
-            multirows[timestamp].append(csv_row)
-        except (DeserializationError, UnknownAsset, UnsupportedAsset) as e:
-            log.warning(f'Skipped binance csv row {csv_row} because of {e!s}')
-            skipped_count += 1
-        except KeyError as e:
-            log.error(f'Malformed binance csv columns! Broke on row {csv_row}. {e!s}')
-            return len(rows), {}
+class BinanceImporter(StreamingCSVImporter[BinanceRowsGroup]):
+    """Imports the Binance CSV rows grouped by timestamp, since the rows of an entry
+    that is represented with multiple rows, such as a trade, have the same timestamp"""
+    source = 'binance'
+
+    def __init__(self, db: 'DBHandler') -> None:
+        super().__init__(db=db)
+        self.bad_format_count = 0
+        self.skipped_count = 0
+        self.stats: dict[BinanceEntry, int] = defaultdict(int)
 
-    return skipped_count, multirows
+    @staticmethod
+    def _has_returning_timestamps(csvfile: TextIO, timestamp_format: str) -> bool:
+        """Whether the rows of a timestamp could come back after the grouping window has
+        closed its group. Only the range of the closed timestamps is kept, so a new
+        timestamp within it counts as returning. That is never the case for files
+        sorted by time, as the exports of Binance are."""
+        open_timestamps: dict[Timestamp, None] = {}
+        closed_range: tuple[Timestamp, Timestamp] | None = None
+        for csv_row in csv.DictReader(csvfile):
+            try:
+                timestamp = deserialize_timestamp_from_date(
+                    date=csv_row['UTC_Time'],
+                    formatstr=timestamp_format,
+                    location='binance',
+                )
+            except (DeserializationError, KeyError):
+                continue  # reported when the rows are grouped
 
+            if timestamp in open_timestamps:
+                continue
+            if closed_range is not None and closed_range[0] <= timestamp <= closed_range[1]:
+                return True
+
+            open_timestamps[timestamp] = None
+            if len(open_timestamps) > BINANCE_GROUPING_WINDOW:
+                closed = next(iter(open_timestamps))
+                del open_timestamps[closed]
+                closed_range = (closed, closed) if closed_range is None else (
+                    min(closed_range[0], closed), max(closed_range[1], closed),
+                )
 
-class BinanceImporter(BaseExchangeImporter):
+        return False
+
+    def _iterate_entries(
+            self,
+            lines: CountedLines,
+            timestamp_format: str = '%Y-%m-%d %H:%M:%S',
+            **kwargs: Any,
+    ) -> Iterator[BinanceRowsGroup]:
+        """Groups Binance rows by timestamp and deletes unused columns.
+
+        The rows of a timestamp are mostly contiguous but not always, so the groups of the
+        latest BINANCE_GROUPING_WINDOW timestamps are kept open and a group is yielded
+        once its timestamp falls out of the window. If the rows of a timestamp could
+        come back after that, the file is read once more and all the groups are kept
+        open until its end, so that no group is split."""
+        window: int | None = BINANCE_GROUPING_WINDOW
+        if self._has_returning_timestamps(lines.csvfile, timestamp_format):
+            log.debug('Binance CSV rows are not sorted by time. Grouping the whole file')
+            window = None
+        lines.csvfile.seek(0)
+
+        open_groups: dict[Timestamp, list[BinanceCsvRow]] = {}
+        rows_num = 0
+        reader = csv.DictReader(lines)
+        for csv_row in reader:
+            rows_num += 1
+            try:
+                timestamp = deserialize_timestamp_from_date(
+                    date=csv_row['UTC_Time'],
+                    formatstr=timestamp_format,
+                    location='binance',
+                )
+                csv_row['Coin'] = asset_from_binance(csv_row['Coin'])
+                csv_row['Change'] = deserialize_asset_amount(csv_row['Change'])
+            except (DeserializationError, UnknownAsset, UnsupportedAsset) as e:
+                log.warning(f'Skipped binance csv row {csv_row} because of {e!s}')
+                self.bad_format_count += 1
+                continue
+            except KeyError as e:
+                log.error(f'Malformed binance csv columns! Broke on row {csv_row}. {e!s}')
+                self.bad_format_count = rows_num + sum(1 for _ in reader)
+                return
+
+            if (group := open_groups.get(timestamp)) is not None:
+                group.append(csv_row)
+                continue
+
+            open_groups[timestamp] = [csv_row]
+            if window is not None and len(open_groups) > window:
+                oldest_timestamp = next(iter(open_groups))
+                yield oldest_timestamp, open_groups.pop(oldest_timestamp)
+
+        yield from open_groups.items()
 
     def _process_single_binance_entries(
             self,
@@ -744,69 +821,52 @@ class BinanceImporter(BaseExchangeImporter):
                 return multiple_entry_class, processed_count
         return None, 0
 
-    def _process_binance_rows(
+    def _import_entry(
             self,
             write_cursor: DBCursor,
-            multi: dict[Timestamp, list[BinanceCsvRow]],
+            entry: BinanceRowsGroup,
+            **kwargs: Any,
     ) -> None:
-        stats: dict[BinanceEntry, int] = defaultdict(int)
-        skipped_rows: list[Any] = []
-        for timestamp, rows in multi.items():
-            single_processed, rows_without_single = self._process_single_binance_entries(
-                write_cursor=write_cursor,
-                timestamp=timestamp,
-                rows=rows,
-            )
-            for entry_type, amount in single_processed.items():
-                stats[entry_type] += amount
+        """May raise:
+        - InputError
+        """
+        timestamp, rows = entry
+        single_processed, rows_without_single = self._process_single_binance_entries(
+            write_cursor=write_cursor,
+            timestamp=timestamp,
+            rows=rows,
+        )
+        for entry_type, amount in single_processed.items():
+            self.stats[entry_type] += amount
 
-            multiple_type, multiple_count = self._process_multiple_binance_entries(
-                write_cursor=write_cursor,
-                timestamp=timestamp,
-                rows=rows_without_single,
-            )
-            if multiple_type is not None and multiple_count > 0:
-                stats[multiple_type] += multiple_count
-                rows_without_multiple = []
-            else:
-                rows_without_multiple = rows_without_single
+        multiple_type, multiple_count = self._process_multiple_binance_entries(
+            write_cursor=write_cursor,
+            timestamp=timestamp,
+            rows=rows_without_single,
+        )
+        if multiple_type is not None and multiple_count > 0:
+            self.stats[multiple_type] += multiple_count
+            return
 
-            if len(rows_without_multiple) > 0:
-                skipped_rows.append([timestamp, rows_without_multiple])
+        if len(rows_without_single) == 0:
+            return
 
-        skipped_nontrade_rows = []
-        skipped_trade_rows = []
-        for skipped_rows_group in skipped_rows:
-            cur_operations = {el['Operation'] for el in skipped_rows_group[1]}
-            if cur_operations.issubset(BINANCE_TRADE_OPERATIONS):
-                skipped_trade_rows.append(skipped_rows_group)
-            else:
-                skipped_nontrade_rows.append(skipped_rows_group)
-        total_found = sum(stats.values())
-        skipped_count = 0
-        for _, rows in skipped_rows:
-            skipped_count += len(rows)
-        log.debug(f'Skipped Binance trade rows: {skipped_trade_rows}')
-        log.debug(f'Skipped Binance non-trade rows {skipped_nontrade_rows}')
-        log.debug(f'Total found Binance entries: {total_found}')
-        log.debug(f'Total skipped Binance csv rows: {skipped_count}')
-        log.debug(f'Binance import stats: {[{type(entry_class).__name__: amount} for entry_class, amount in stats.items()]}')  # noqa: E501
-        if skipped_count > 0:
+        self.skipped_count += len(rows_without_single)
+        if {el['Operation'] for el in rows_without_single}.issubset(BINANCE_TRADE_OPERATIONS):
+            log.debug(f'Skipped Binance trade rows: {[timestamp, rows_without_single]}')
+        else:
+            log.debug(f'Skipped Binance non-trade rows {[timestamp, rows_without_single]}')
+
+    def _finish_import(self) -> None:
+        log.debug(f'Total found Binance entries: {sum(self.stats.values())}')
+        log.debug(f'Total skipped Binance csv rows: {self.skipped_count}')
+        log.debug(f'Binance import stats: {[{type(entry_class).__name__: amount} for entry_class, amount in self.stats.items()]}')  # noqa: E501
+        if self.bad_format_count > 0:
             self.db.msg_aggregator.add_warning(
-                f'Skipped {skipped_count} rows during processing binance csv file. '
+                f'{self.bad_format_count} Binance rows have bad format. Check logs for details.',
+            )
+        if self.skipped_count > 0:
+            self.db.msg_aggregator.add_warning(
+                f'Skipped {self.skipped_count} rows during processing binance csv file. '
                 f'Check logs for details',
             )
-
-    def _import_csv(self, write_cursor: DBCursor, filepath: Path, **kwargs: Any) -> None:
-        """
-        Group and process binance CSV entries. May raise:
-        - InputError
-        """
-        with open(filepath, encoding='utf-8-sig') as csvfile:
-            input_rows = list(csv.DictReader(csvfile))
-            skipped_count, multirows = _group_binance_rows(rows=input_rows, **kwargs)
-            if skipped_count > 0:
-                self.db.msg_aggregator.add_warning(
-                    f'{skipped_count} Binance rows have bad format. Check logs for details.',
-                )
-            self._process_binance_rows(write_cursor=write_cursor, multi=multirows)
@@ -1,7 +1,7 @@
 import csv
 import logging
+from collections.abc import Iterator
 from itertools import count
-from pathlib import Path
 from typing import TYPE_CHECKING, Any
 from uuid import uuid4
 
@@ -11,7 +11,7 @@ from rotkehlchen.assets.utils import symbol_to_asset_or_token
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_USD
 from rotkehlchen.data_import.importers.constants import COINTRACKING_EVENT_PREFIX
-from rotkehlchen.data_import.utils import BaseExchangeImporter, UnsupportedCSVEntry
+from rotkehlchen.data_import.utils import CountedLines, StreamingCSVImporter, UnsupportedCSVEntry
 from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.misc import InputError
@@ -86,11 +86,13 @@ def exchange_row_to_location(entry: str) -> Location:
     return Location.EXTERNAL
 
 
-class CointrackingImporter(BaseExchangeImporter):
+class CointrackingImporter(StreamingCSVImporter[list[str]]):
+    source = 'cointracking'
 
     def __init__(self, db: 'DBHandler') -> None:
         super().__init__(db=db)
         self.usd = A_USD.resolve_to_asset_with_oracles()
+        self.header: list[str] = []
 
     def _consume_cointracking_entry(
             self,
@@ -219,41 +221,41 @@ class CointrackingImporter(BaseExchangeImporter):
                 f'data import. Ignoring entry',
             )
 
-    def _import_csv(
+    def _iterate_entries(self, lines: CountedLines, **kwargs: Any) -> Iterator[list[str]]:
+        data = csv.reader(lines, delimiter=',', quotechar='"')
+        if (header := next(data, None)) is None:
+            return
+
+        self.header = remap_header(header)
+        yield from data
+
+    def _import_entry(
             self,
             write_cursor: DBCursor,
-            filepath: Path,
+            entry: list[str],
             **kwargs: Any,
     ) -> None:
         """May raise:
         - InputError if one of the rows is malformed
         """
-        with open(filepath, encoding='utf-8-sig') as csvfile:
-            data = csv.reader(csvfile, delimiter=',', quotechar='"')
-            header = remap_header(next(data))
-            for row in data:
-                try:
-                    self._consume_cointracking_entry(write_cursor, dict(zip(header, row, strict=True)), **kwargs)  # noqa: E501
-                except UnknownAsset as e:
-                    self.db.msg_aggregator.add_warning(
-                        f'During cointracking CSV import found action with unknown '
-                        f'asset {e.identifier}. Ignoring entry',
-                    )
-                    continue
-                except (IndexError, ValueError):
-                    self.db.msg_aggregator.add_warning(
-                        'During cointracking CSV import found entry with '
-                        'unexpected number of columns',
-                    )
-                    continue
-                except DeserializationError as e:
-                    self.db.msg_aggregator.add_warning(
-                        f'Error during cointracking CSV import deserialization. '
-                        f'Error was {e!s}. Ignoring entry',
-                    )
-                    continue
-                except UnsupportedCSVEntry as e:
-                    self.db.msg_aggregator.add_warning(str(e))
-                    continue
-                except KeyError as e:
-                    raise InputError(f'Could not find key {e!s} in csv row {row!s}') from e
+        try:
+            self._consume_cointracking_entry(write_cursor, dict(zip(self.header, entry, strict=True)), **kwargs)  # noqa: E501
+        except UnknownAsset as e:
+            self.db.msg_aggregator.add_warning(
+                f'During cointracking CSV import found action with unknown '
+                f'asset {e.identifier}. Ignoring entry',
+            )
+        except (IndexError, ValueError):
+            self.db.msg_aggregator.add_warning(
+                'During cointracking CSV import found entry with '
+                'unexpected number of columns',
+            )
+        except DeserializationError as e:
+            self.db.msg_aggregator.add_warning(
+                f'Error during cointracking CSV import deserialization. '
+                f'Error was {e!s}. Ignoring entry',
+            )
+        except UnsupportedCSVEntry as e:
+            self.db.msg_aggregator.add_warning(str(e))
+        except KeyError as e:
+            raise InputError(f'Could not find key {e!s} in csv row {entry!s}') from e
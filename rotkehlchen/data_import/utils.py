@@ -1,21 +1,34 @@
 import hashlib
+import logging
 from abc import ABCMeta, abstractmethod
-from collections.abc import Mapping
+from collections.abc import Iterator, Mapping
+from itertools import islice
 from pathlib import Path
-from typing import Any
+from typing import Any, ClassVar, Generic, TextIO, TypeVar
 
+from rotkehlchen.api.websockets.typedefs import WSMessageType
 from rotkehlchen.assets.asset import Asset, AssetWithOracles
 from rotkehlchen.assets.converters import LOCATION_TO_ASSET_MAPPING, asset_from_common_identifier
+from rotkehlchen.db.cache import DBCacheDynamic
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.errors.misc import InputError
 from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade
 from rotkehlchen.history.events.structures.base import HistoryBaseEntry
+from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.serialization.deserialize import deserialize_asset_amount, deserialize_timestamp
 from rotkehlchen.types import Fee, Location, TimestampMS
 
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
 ITEMS_PER_DB_WRITE = 400
+# Number of CSV lines that the streaming importers import in each DB transaction
+LINES_PER_IMPORT_TRANSACTION = 10000
+HASH_READ_SIZE = 1024 * 1024
+
+E = TypeVar('E')
 
 
 class BaseExchangeImporter(metaclass=ABCMeta):
@@ -75,6 +88,137 @@ class BaseExchangeImporter(metaclass=ABCMeta):
         self._history_events = []
 
 
+class CountedLines:
+    """Iterates the lines of a text file counting how many have been read"""
+
+    def __init__(self, csvfile: TextIO) -> None:
+        self.csvfile = csvfile
+        self.count = 0
+
+    def __iter__(self) -> Iterator[str]:
+        for line in self.csvfile:
+            self.count += 1
+            yield line
+
+
+def hash_and_count_lines(filepath: Path) -> tuple[str, int]:
+    """Returns the sha256 of the file contents and the number of lines of the file"""
+    file_hash, lines_num, last_chunk = hashlib.sha256(), 0, b''
+    with open(filepath, 'rb') as f:
+        while len(chunk := f.read(HASH_READ_SIZE)) != 0:
+            file_hash.update(chunk)
+            lines_num += chunk.count(b'\n')
+            last_chunk = chunk
+
+    if len(last_chunk) != 0 and last_chunk.endswith(b'\n') is False:
+        lines_num += 1  # last line without newline
+
+    return file_hash.hexdigest(), lines_num
+
+
+class StreamingCSVImporter(BaseExchangeImporter, Generic[E], metaclass=ABCMeta):
+    """Importer of CSV files that can be too large to read in memory or to import in a
+    single DB transaction, like the exports of exchanges with millions of rows.
+
+    Subclasses lazily read the file into entries, each being one or more rows that are
+    imported together, and import each entry. The entries are imported in transactions
+    of about LINES_PER_IMPORT_TRANSACTION lines, so that the DB is not locked for the
+    whole import. The number of entries imported from the file is saved along with each
+    transaction, so that if an import fails, importing the same file again skips them.
+    """
+    # The name of the import source as given to the API, for the progress messages
+    source: ClassVar[str]
+
+    @abstractmethod
+    def _iterate_entries(self, lines: CountedLines, **kwargs: Any) -> Iterator[E]:
+        """Lazily reads the entries from the lines of the CSV file
+        May raise:
+        - InputError if the file is malformed
+        """
+
+    @abstractmethod
+    def _import_entry(self, write_cursor: DBCursor, entry: E, **kwargs: Any) -> None:
+        """Imports the entry, adding what it contains via the add_* methods
+        May raise:
+        - InputError if the entry is malformed
+        """
+
+    def _finish_import(self) -> None:
+        """Called once all the entries are imported. Can be used to report stats"""
+        return None
+
+    def _import_csv(self, write_cursor: DBCursor, filepath: Path, **kwargs: Any) -> None:
+        """Imports the entire file within the given transaction"""
+        with open(filepath, encoding='utf-8-sig') as csvfile:
+            for entry in self._iterate_entries(CountedLines(csvfile), **kwargs):
+                self._import_entry(write_cursor, entry, **kwargs)
+        self._finish_import()
+
+    def _send_progress(self, processed: int, total: int) -> None:
+        self.db.msg_aggregator.add_message(
+            message_type=WSMessageType.CSV_IMPORT_STATUS,
+            data={'source': self.source, 'total': total, 'processed': min(processed, total)},
+        )
+
+    def import_csv(self, filepath: Path, **kwargs: Any) -> tuple[bool, str]:
+        file_hash, lines_num = hash_and_count_lines(filepath)
+        total = max(lines_num - 1, 0)  # without the header
+        cache_args = {'source': self.source, 'file_hash': file_hash}
+        with self.db.conn.read_ctx() as cursor:
+            imported = self.db.get_dynamic_cache(
+                cursor=cursor,
+                name=DBCacheDynamic.CSV_IMPORT_PROGRESS,
+                **cache_args,
+            ) or 0
+
+        try:
+            with open(filepath, encoding='utf-8-sig') as csvfile:
+                lines = CountedLines(csvfile)
+                entries = self._iterate_entries(lines, **kwargs)
+                if imported != 0:
+                    log.debug(f'Skipping {imported} {self.source} CSV entries imported before')
+                    for _ in islice(entries, imported):
+                        pass
+
+                self._send_progress(processed=max(lines.count - 1, 0), total=total)
+                finished = False
+                while finished is False:
+                    chunk_end = lines.count + LINES_PER_IMPORT_TRANSACTION
+                    with self.db.user_write() as write_cursor:
+                        for entry in entries:
+                            self._import_entry(write_cursor, entry, **kwargs)
+                            imported += 1
+                            if lines.count >= chunk_end:
+                                break
+                        else:
+                            finished = True
+
+                        self.flush_all(write_cursor)
+                        if finished:
+                            self.db.delete_dynamic_cache(
+                                write_cursor=write_cursor,
+                                name=DBCacheDynamic.CSV_IMPORT_PROGRESS,
+                                **cache_args,
+                            )
+                        else:
+                            self.db.set_dynamic_cache(
+                                write_cursor=write_cursor,
+                                name=DBCacheDynamic.CSV_IMPORT_PROGRESS,
+                                value=imported,
+                                **cache_args,
+                            )
+
+                    self._send_progress(
+                        processed=total if finished else lines.count - 1,
+                        total=total,
+                    )
+        except InputError as e:
+            return False, str(e)
+
+        self._finish_import()
+        return True, ''
+
+
 class UnsupportedCSVEntry(Exception):
     """Thrown for external exchange exported entries we can't import"""
 
@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import Timestamp
+
+if TYPE_CHECKING:
+    from rotkehlchen.accounting.structures.types import ActionType
+    from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.db.drivers.gevent import DBCursor
+    from rotkehlchen.db.settings import DBSettings
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# How many snapshots to keep for the current accounting settings
+MAX_ACCOUNTING_SNAPSHOTS = 5
+
+
+class AccountingSnapshot(NamedTuple):
+    """The accounting state right before processing the first event at `timestamp`
+
+    All the events before `timestamp` have been processed and none after it.
+    """
+    timestamp: Timestamp
+    processed_actions: int
+    state: dict[str, Any]
+
+
+def invalidate_accounting_snapshots(
+        write_cursor: 'DBCursor',
+        from_ts: Timestamp | None = None,
+) -> None:
+    """Delete all accounting snapshots affected by a change of history at `from_ts`.
+    That is all snapshots that contain the effect of events at or after `from_ts`.
+    If no timestamp is given then all snapshots are deleted.
+
+    Should be called whenever an event is added, edited or removed from the DB and
+    whenever any other accounting input changes, like eth2 daily stats or manual prices.
+    """
+    if from_ts is None:
+        write_cursor.execute('DELETE FROM accounting_snapshots')
+    else:
+        write_cursor.execute('DELETE FROM accounting_snapshots WHERE timestamp > ?', (from_ts,))
+
+
+class DBAccountingSnapshots:
+
+    def __init__(self, database: 'DBHandler') -> None:
+        self.db = database
+
+    def get_settings_hash(
+            self,
+            cursor: 'DBCursor',
+            settings: 'DBSettings',
+            ignored_ids_mapping: dict['ActionType', set[str]],
+    ) -> str:
+        """Hash of everything apart from the events that affects the accounting state.
+
+        That is the accounting settings, the ignored assets and actions and the
+        accounting rules. If any of them changes, previous snapshots can't be used.
+        """
+        accounting_rules = cursor.execute(
+            'SELECT type, subtype, counterparty, taxable, count_entire_amount_spend, '
+            'count_cost_basis_pnl, accounting_treatment FROM accounting_rules '
+            'ORDER BY type, subtype, counterparty',
+        ).fetchall()
+        linked_properties = cursor.execute(
+            'SELECT accounting_rule, property_name, setting_name FROM linked_rules_properties '
+            'ORDER BY accounting_rule, property_name',
+        ).fetchall()
+        data = {
+            'settings': [
+                settings.main_currency.identifier,
+                settings.taxfree_after_period,
+                settings.include_crypto2crypto,
+                settings.calculate_past_cost_basis,
+                settings.include_gas_costs,
+                settings.account_for_assets_movements,
+                settings.cost_basis_method.serialize(),
+                settings.eth_staking_taxable_after_withdrawal_enabled,
+                settings.include_fees_in_cost_basis,
+            ],
+            'ignored_assets': sorted(self.db.get_ignored_asset_ids(cursor)),
+            'ignored_actions': sorted(
+                (action_type.serialize(), sorted(identifiers))
+                for action_type, identifiers in ignored_ids_mapping.items()
+            ),
+            'accounting_rules': accounting_rules,
+            'linked_properties': linked_properties,
+        }
+        return hashlib.sha256(json.dumps(data).encode()).hexdigest()
+
+    def add_snapshot(
+            self,
+            settings_hash: str,
+            snapshot: AccountingSnapshot,
+    ) -> None:
+        """Save a snapshot of the accounting state for the given settings.
+
+        Snapshots made with other settings can't be used anymore so they are deleted.
+        Only the latest MAX_ACCOUNTING_SNAPSHOTS snapshots are kept.
+        """
+        with self.db.conn.write_ctx() as write_cursor:
+            write_cursor.execute(
+                'DELETE FROM accounting_snapshots WHERE settings_hash != ?', (settings_hash,),
+            )
+            write_cursor.execute(
+                'INSERT OR REPLACE INTO accounting_snapshots('
+                'timestamp, settings_hash, processed_actions, state) VALUES(?, ?, ?, ?)',
+                (
+                    snapshot.timestamp,
+                    settings_hash,
+                    snapshot.processed_actions,
+                    json.dumps(snapshot.state, separators=(',', ':')),
+                ),
+            )
+            write_cursor.execute(
+                'DELETE FROM accounting_snapshots WHERE timestamp NOT IN ('
+                'SELECT timestamp FROM accounting_snapshots ORDER BY timestamp DESC LIMIT ?)',
+                (MAX_ACCOUNTING_SNAPSHOTS,),
+            )
+
+        log.debug(f'Saved accounting snapshot at {snapshot.timestamp}')
+
+    def get_snapshots(
+            self,
+            cursor: 'DBCursor',
+            settings_hash: str,
+            to_ts: Timestamp,
+    ) -> list[AccountingSnapshot]:
+        """Get all snapshots for the given settings up to and including `to_ts`.
+        Latest snapshot comes first. Snapshots that can't be read are skipped."""
+        snapshots = []
+        cursor.execute(
+            'SELECT timestamp, processed_actions, state FROM accounting_snapshots '
+            'WHERE settings_hash=? AND timestamp <= ? ORDER BY timestamp DESC',
+            (settings_hash, to_ts),
+        )
+        for timestamp, processed_actions, state in cursor:
+            try:
+                snapshot_state = json.loads(state)
+            except json.JSONDecodeError as e:
+                log.error(f'Could not read accounting snapshot at {timestamp} due to {e!s}')
+                continue
+
+            snapshots.append(AccountingSnapshot(
+                timestamp=Timestamp(timestamp),
+                processed_actions=processed_actions,
+                state=snapshot_state,
+            ))
+
+        return snapshots
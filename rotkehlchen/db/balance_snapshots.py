@@ -0,0 +1,79 @@
+"""Timeline of the balance snapshots that the balance graphs are queried on
+
+The graphs of the net value and of each asset have a point per balance snapshot. To
+avoid scanning the timed balances of all assets for the timestamps of the snapshots,
+they are kept in the balance_snapshots table along with the coarsest resolution of the
+graphs that each snapshot is a point of.
+
+The day and week graphs are downsampled by keeping the last snapshot of each period and
+not by aggregating the snapshots of the period. A snapshot is the state of the balances
+at a point in time, so the last one is the balance at the end of the period, while an
+average would show amounts that were never held and would not add up to the net value
+of the same point.
+"""
+from collections.abc import Collection
+from typing import TYPE_CHECKING
+
+from rotkehlchen.constants.timing import DAY_IN_SECONDS, WEEK_IN_SECONDS
+from rotkehlchen.utils.mixins.enums import SerializableEnumNameMixin
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.drivers.gevent import DBCursor
+    from rotkehlchen.types import Timestamp
+
+
+class SnapshotResolution(SerializableEnumNameMixin):
+    """The resolution of the balance graphs. Each resolution includes the coarser ones."""
+    SNAPSHOT = 0  # every snapshot
+    DAY = 1  # the last snapshot of each day
+    WEEK = 2  # the last snapshot of each week, starting on monday
+
+    def period_seconds(self) -> int:
+        return RESOLUTION_PERIOD_SECONDS[self]
+
+
+RESOLUTION_PERIOD_SECONDS = {
+    SnapshotResolution.SNAPSHOT: 0,
+    SnapshotResolution.DAY: DAY_IN_SECONDS,
+    SnapshotResolution.WEEK: WEEK_IN_SECONDS,
+}
+
+
+def _week_start(timestamp: 'Timestamp') -> int:
+    """The epoch was a thursday so days are shifted by 3 for the weeks to start on monday"""
+    return ((timestamp // DAY_IN_SECONDS + 3) // 7 * 7 - 3) * DAY_IN_SECONDS
+
+
+def update_balance_snapshots(
+        write_cursor: 'DBCursor',
+        timestamps: Collection['Timestamp'],
+) -> None:
+    """Updates the balance snapshots at the given timestamps after timed balances or timed
+    location data were added at or removed from them. Needs to be called by every write
+    of those tables that adds or removes a snapshot.
+
+    Only the resolutions of the snapshots in the weeks of the timestamps are updated."""
+    for timestamp in timestamps:
+        if write_cursor.execute(
+                'SELECT EXISTS(SELECT 1 FROM timed_balances WHERE timestamp=?) OR '
+                'EXISTS(SELECT 1 FROM timed_location_data WHERE timestamp=?)',
+                (timestamp, timestamp),
+        ).fetchone()[0] == 1:
+            write_cursor.execute(
+                'INSERT OR IGNORE INTO balance_snapshots(timestamp) VALUES(?)', (timestamp,),
+            )
+        else:
+            write_cursor.execute('DELETE FROM balance_snapshots WHERE timestamp=?', (timestamp,))
+
+    for week_start in {_week_start(x) for x in timestamps}:
+        week_end = week_start + WEEK_IN_SECONDS - 1
+        write_cursor.execute(
+            'UPDATE balance_snapshots SET resolution = CASE '
+            'WHEN timestamp = (SELECT MAX(timestamp) FROM balance_snapshots '
+            f'WHERE timestamp BETWEEN ? AND ?) THEN {SnapshotResolution.WEEK.value} '
+            'WHEN timestamp IN (SELECT MAX(timestamp) FROM balance_snapshots '
+            f'WHERE timestamp BETWEEN ? AND ? GROUP BY timestamp / {DAY_IN_SECONDS}) '
+            f'THEN {SnapshotResolution.DAY.value} ELSE {SnapshotResolution.SNAPSHOT.value} END '
+            'WHERE timestamp BETWEEN ? AND ?',
+            (week_start, week_end) * 3,
+        )
@@ -22,6 +22,16 @@ class DBCache(Enum):
             raise DeserializationError(f'Failed to deserialize {cls.__name__} value {value}') from e  # noqa: E501
 
 
+class DBCacheDynamic(Enum):
+    """Values of the `key_value_cache` table of the DB whose name depends on arguments.
+    The value of each member is the format string of the name."""
+    BINANCE_PAIR_LAST_ID = '{location}_{location_name}_{queried_pair}'  # last trade id of a pair
+    CSV_IMPORT_PROGRESS = 'csv_import_{source}_{file_hash}'  # entries of a CSV already imported
+
+    def get_name(self, **kwargs: str) -> str:
+        return self.value.format(**kwargs)
+
+
 def serialize_cache_for_api(cache: dict[DBCache, Timestamp]) -> dict[str, Timestamp]:
     """Serialize the cache for /settings API consumption."""
     return {
@@ -3,7 +3,6 @@ import logging
 import os
 import re
 import shutil
-import tempfile
 from collections import defaultdict
 from collections.abc import Iterator, Sequence
 from contextlib import contextmanager, suppress
@@ -44,7 +43,9 @@ from rotkehlchen.constants.limits import (
 )
 from rotkehlchen.constants.misc import NFT_DIRECTIVE, USERDB_NAME
 from rotkehlchen.constants.timing import HOUR_IN_SECONDS
-from rotkehlchen.db.cache import DBCache
+from rotkehlchen.db.accounting_snapshots import invalidate_accounting_snapshots
+from rotkehlchen.db.balance_snapshots import SnapshotResolution, update_balance_snapshots
+from rotkehlchen.db.cache import DBCache, DBCacheDynamic
 from rotkehlchen.db.constants import (
     BINANCE_MARKETS_KEY,
     EVM_ACCOUNTS_DETAILS_LAST_QUERIED_TS,
@@ -74,6 +75,7 @@ from rotkehlchen.db.settings import (
     db_settings_from_dict,
     serialize_db_setting,
 )
+from rotkehlchen.db.sync_changes import DBSyncChanges
 from rotkehlchen.db.upgrade_manager import DBUpgradeManager
 from rotkehlchen.db.utils import (
     DBAssetBalance,
@@ -334,6 +336,8 @@ class DBHandler:
         # run checks on the database
         self.conn.schema_sanity_check()
         self._check_settings()
+        # log the changes for the premium sync from now on if it syncs with deltas
+        DBSyncChanges(self).maybe_track_changes()
 
         # This logic executes only for the transient db
         self._connect(conn_attribute='conn_transient')
@@ -545,8 +549,8 @@ class DBHandler:
                 'DETACH DATABASE plaintext;',
             )
 
-    def import_unencrypted(self, unencrypted_db_data: bytes) -> None:
-        """Imports an unencrypted DB from raw data
+    def import_unencrypted(self, unencrypted_db_path: Path) -> None:
+        """Imports an unencrypted DB from the plaintext DB at the given path
 
         May raise:
         - DBUpgradeError if the rotki DB version is newer than the software or
@@ -564,25 +568,19 @@ class DBHandler:
         )
         rdbpath.unlink()
 
-        # dump the unencrypted data into a temporary file
-        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmpdirname:  # needed on windows, see https://tinyurl.com/tmp-win-err  # noqa: E501
-            tempdbpath = os.path.join(tmpdirname, 'temp.db')
-            with open(tempdbpath, 'wb') as f:
-                f.write(unencrypted_db_data)
-
-            # Now attach to the unencrypted DB and copy it to our DB and encrypt it
-            self.conn = DBConnection(
-                path=tempdbpath,
-                connection_type=DBConnectionType.USER,
-                sql_vm_instructions_cb=self.sql_vm_instructions_cb,
-            )
-            password_for_sqlcipher = protect_password_sqlcipher(self.password)
-            script = f'ATTACH DATABASE "{rdbpath}" AS encrypted KEY "{password_for_sqlcipher}";'
-            if self.sqlcipher_version == 3:
-                script += f'PRAGMA encrypted.kdf_iter={KDF_ITER};'
-            script += 'SELECT sqlcipher_export("encrypted");DETACH DATABASE encrypted;'
-            self.conn.executescript(script)
-            self.disconnect()
+        # Now attach to the unencrypted DB and copy it to our DB and encrypt it
+        self.conn = DBConnection(
+            path=str(unencrypted_db_path),
+            connection_type=DBConnectionType.USER,
+            sql_vm_instructions_cb=self.sql_vm_instructions_cb,
+        )
+        password_for_sqlcipher = protect_password_sqlcipher(self.password)
+        script = f'ATTACH DATABASE "{rdbpath}" AS encrypted KEY "{password_for_sqlcipher}";'
+        if self.sqlcipher_version == 3:
+            script += f'PRAGMA encrypted.kdf_iter={KDF_ITER};'
+        script += 'SELECT sqlcipher_export("encrypted");DETACH DATABASE encrypted;'
+        self.conn.executescript(script)
+        self.disconnect()
 
         try:
             self._connect()
@@ -647,7 +645,10 @@ class DBHandler:
         - If `name` is not passed, it returns all the values in the table
         - If `name` is passed, it returns the value of the given name, defaults to Timestamp(0)"""
         if name is None:
-            cursor.execute('SELECT name, value FROM key_value_cache;')
+            cursor.execute(  # skip the dynamic names which are not DBCache values
+                f'SELECT name, value FROM key_value_cache WHERE name IN ({",".join(["?"] * len(DBCache))});',  # noqa: E501
+                [x.value for x in DBCache],
+            )
             return {
                 DBCache.deserialize(q[0]): Timestamp(int(q[1]))
                 for q in cursor
@@ -662,6 +663,62 @@ class DBHandler:
             [(name.value, value) for name, value in cache.items()],
         )
 
+    def get_dynamic_cache(
+            self,
+            cursor: 'DBCursor',
+            name: DBCacheDynamic,
+            **kwargs: str,
+    ) -> int | None:
+        """Returns the value of the dynamic cache entry with the given name arguments
+        from the `key_value_cache` table of the DB or None if it is not there"""
+        value = cursor.execute(
+            'SELECT value FROM key_value_cache WHERE name=?;', (name.get_name(**kwargs),),
+        ).fetchone()
+        return None if value is None else int(value[0])
+
+    def set_dynamic_cache(
+            self,
+            write_cursor: 'DBCursor',
+            name: DBCacheDynamic,
+            value: int,
+            **kwargs: str,
+    ) -> None:
+        """Save the value of the dynamic cache entry with the given name arguments"""
+        write_cursor.execute(
+            'INSERT OR REPLACE INTO key_value_cache(name, value) VALUES(?, ?)',
+            (name.get_name(**kwargs), value),
+        )
+
+    def delete_dynamic_cache(
+            self,
+            write_cursor: 'DBCursor',
+            name: DBCacheDynamic,
+            **kwargs: str,
+    ) -> None:
+        """Delete the dynamic cache entry with the given name arguments"""
+        write_cursor.execute(
+            'DELETE FROM key_value_cache WHERE name=?', (name.get_name(**kwargs),),
+        )
+
+    def _get_binance_pair_last_id_names(
+            self,
+            cursor: 'DBCursor',
+            location: Location,
+            exchange_name: str | None,
+    ) -> list[str]:
+        """Returns the names of the last trade id cache entries of the pairs of the given
+        binance location, optionally only of the exchange with the given name"""
+        prefix = f'{location!s}_' if exchange_name is None else f'{location!s}_{exchange_name}_'
+        cursor.execute(
+            'SELECT name FROM key_value_cache WHERE name LIKE ? ESCAPE ?;',
+            (prefix.replace('_', '\\_') + '%', '\\'),
+        )
+        # pairs have no underscores, so this skips exchanges whose name starts with the given one
+        return [
+            x[0] for x in cursor
+            if exchange_name is None or '_' not in x[0].removeprefix(prefix)
+        ]
+
     @need_writable_cursor('user_write')
     def add_external_service_credentials(
             self,
@@ -837,6 +894,8 @@ class DBHandler:
                 'or an entry for the given timestamp already exists',
             ) from e
 
+        update_balance_snapshots(write_cursor, {balance.time for balance in balances})
+
     def delete_balancer_events_data(self, write_cursor: 'DBCursor') -> None:
         """Delete all historical Balancer events data"""
         write_cursor.execute('DELETE FROM balancer_events;')
@@ -848,6 +907,7 @@ class DBHandler:
     def delete_eth2_daily_stats(self, write_cursor: 'DBCursor') -> None:
         """Delete all historical ETH2 eth2_daily_staking_details data"""
         write_cursor.execute('DELETE FROM eth2_daily_staking_details;')
+        invalidate_accounting_snapshots(write_cursor)
 
     def purge_module_data(self, module_name: ModuleName | None) -> None:
         with self.user_write() as cursor:
@@ -917,7 +977,8 @@ class DBHandler:
             location: Location,
             exchange_name: str | None = None,
     ) -> None:
-        """Delete the query ranges for the given exchange name"""
+        """Delete the query ranges for the given exchange name. For binance also delete
+        the last queried trade ids of its pairs so that all the trades are queried again"""
         names_to_delete = f'{location!s}\\_%'
         if exchange_name is not None:
             names_to_delete += f'\\_{exchange_name}'
@@ -925,10 +986,16 @@ class DBHandler:
             'DELETE FROM used_query_ranges WHERE name LIKE ? ESCAPE ?;',
             (names_to_delete, '\\'),
         )
+        if location in (Location.BINANCE, Location.BINANCEUS):
+            write_cursor.executemany(
+                'DELETE FROM key_value_cache WHERE name=?;',
+                [(x,) for x in self._get_binance_pair_last_id_names(write_cursor, location, exchange_name)],  # noqa: E501
+            )
 
     def purge_exchange_data(self, write_cursor: 'DBCursor', location: Location) -> None:
         self.delete_used_query_range_for_exchange(write_cursor=write_cursor, location=location)
         serialized_location = location.serialize_for_db()
+        invalidate_accounting_snapshots(write_cursor)
         for table in ('trades', 'asset_movements', 'history_events'):
             write_cursor.execute(
                 f'DELETE FROM {table} WHERE location = ?;', (serialized_location,),
@@ -970,6 +1037,8 @@ class DBHandler:
                     f' already existing timestamp {entry.time}.',
                 ) from e
 
+        update_balance_snapshots(write_cursor, {entry.time for entry in location_data})
+
     def add_blockchain_accounts(
             self,
             write_cursor: 'DBCursor',
@@ -1502,6 +1571,19 @@ class DBHandler:
                 ],
             )
 
+            if location_is_binance:
+                write_cursor.executemany(
+                    'UPDATE key_value_cache SET name=? WHERE name=?;',
+                    [
+                        (DBCacheDynamic.BINANCE_PAIR_LAST_ID.get_name(
+                            location=str(location),
+                            location_name=new_name,
+                            queried_pair=x.removeprefix(f'{location!s}_{name}_'),
+                        ), x)
+                        for x in self._get_binance_pair_last_id_names(write_cursor, location, name)
+                    ],
+                )
+
             # also update the name of the events related to this exchange
             write_cursor.execute(
                 'UPDATE history_events SET location_label=? WHERE location=? AND location_label=?',
@@ -1731,6 +1813,8 @@ class DBHandler:
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         self.write_tuples(write_cursor=write_cursor, tuple_type='margin_position', query=query, tuples=margin_tuples)  # noqa: E501
+        if len(margin_positions) != 0:
+            invalidate_accounting_snapshots(write_cursor, from_ts=min(x.close_time for x in margin_positions))  # noqa: E501
 
     def get_margin_positions(
             self,
@@ -1800,6 +1884,8 @@ class DBHandler:
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         self.write_tuples(write_cursor=write_cursor, tuple_type='asset_movement', query=query, tuples=movement_tuples)  # noqa: E501
+        if len(asset_movements) != 0:
+            invalidate_accounting_snapshots(write_cursor, from_ts=min(x.timestamp for x in asset_movements))  # noqa: E501
 
     def get_asset_movements_and_limit_info(
             self,
@@ -1827,6 +1913,19 @@ class DBHandler:
 
         Returned list is ordered according to the passed filter query
         """
+        return list(self.iterate_asset_movements(
+            cursor=cursor,
+            filter_query=filter_query,
+            has_premium=has_premium,
+        ))
+
+    def iterate_asset_movements(
+            self,
+            cursor: 'DBCursor',
+            filter_query: AssetMovementsFilterQuery,
+            has_premium: bool,
+    ) -> Iterator[AssetMovement]:
+        """Same as get_asset_movements but lazily yields the movements as they are read"""
         query, bindings = filter_query.prepare()
         if has_premium:
             query = 'SELECT * from asset_movements ' + query
@@ -1835,7 +1934,6 @@ class DBHandler:
             query = 'SELECT * FROM (SELECT * from asset_movements ORDER BY timestamp DESC LIMIT ?) ' + query  # noqa: E501
             results = cursor.execute(query, [FREE_ASSET_MOVEMENTS_LIMIT] + bindings)
 
-        asset_movements = []
         for result in results:
             try:
                 movement = AssetMovement.deserialize_from_db(result)
@@ -1851,9 +1949,7 @@ class DBHandler:
                     f'Unknown asset {e.identifier} found',
                 )
                 continue
-            asset_movements.append(movement)
-
-        return asset_movements
+            yield movement
 
     def get_entries_count(
             self,
@@ -1919,6 +2015,7 @@ class DBHandler:
 
         dbtx = DBEvmTx(self)
         dbtx.delete_transactions(write_cursor=write_cursor, address=address, chain=blockchain)
+        invalidate_accounting_snapshots(write_cursor)
 
     def add_trades(self, write_cursor: 'DBCursor', trades: list[Trade]) -> None:
         trade_tuples = [(
@@ -1952,6 +2049,8 @@ class DBHandler:
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """
         self.write_tuples(write_cursor=write_cursor, tuple_type='trade', query=query, tuples=trade_tuples)  # noqa: E501
+        if len(trades) != 0:
+            invalidate_accounting_snapshots(write_cursor, from_ts=min(x.timestamp for x in trades))
 
     def edit_trade(
             self,
@@ -1959,6 +2058,10 @@ class DBHandler:
             old_trade_id: str,
             trade: Trade,
     ) -> tuple[bool, str]:
+        write_cursor.execute('SELECT timestamp FROM trades WHERE id=?', (old_trade_id,))
+        if (result := write_cursor.fetchone()) is not None:  # invalidate from old timestamp
+            invalidate_accounting_snapshots(write_cursor, from_ts=Timestamp(result[0]))
+        invalidate_accounting_snapshots(write_cursor, from_ts=trade.timestamp)
         write_cursor.execute(
             'UPDATE trades SET '
             '  id=?, '
@@ -2015,6 +2118,19 @@ class DBHandler:
         """Returns a list of trades optionally filtered by various filters.
 
         The returned list is ordered according to the passed filter query"""
+        return list(self.iterate_trades(
+            cursor=cursor,
+            filter_query=filter_query,
+            has_premium=has_premium,
+        ))
+
+    def iterate_trades(
+            self,
+            cursor: 'DBCursor',
+            filter_query: TradesFilterQuery,
+            has_premium: bool,
+    ) -> Iterator[Trade]:
+        """Same as get_trades but lazily yields the trades as they are read from the cursor"""
         query, bindings = filter_query.prepare()
         if has_premium:
             query = 'SELECT * from trades ' + query
@@ -2023,7 +2139,6 @@ class DBHandler:
             query = 'SELECT * FROM (SELECT * from trades ORDER BY timestamp DESC LIMIT ?) ' + query
             results = cursor.execute(query, [FREE_TRADES_LIMIT] + bindings)
 
-        trades = []
         for result in results:
             try:
                 trade = Trade.deserialize_from_db(result)
@@ -2038,15 +2153,19 @@ class DBHandler:
                     f'Unknown asset {e.identifier} found',
                 )
                 continue
-            trades.append(trade)
-
-        return trades
+            yield trade
 
     def delete_trades(self, write_cursor: 'DBCursor', trades_ids: list[str]) -> None:
         """Removes trades from the database using their `trade_id`.
         May raise:
         - InputError if any of the `trade_id` are non-existent.
         """
+        write_cursor.execute(
+            f'SELECT MIN(timestamp) FROM trades WHERE id IN ({", ".join(["?"] * len(trades_ids))})',  # noqa: E501
+            trades_ids,
+        )
+        if (min_timestamp := write_cursor.fetchone()[0]) is not None:
+            invalidate_accounting_snapshots(write_cursor, from_ts=Timestamp(min_timestamp))
         write_cursor.executemany(
             'DELETE FROM trades WHERE id=?',
             [(trade_id,) for trade_id in trades_ids],
@@ -2079,6 +2198,7 @@ class DBHandler:
             except sqlcipher.OperationalError as e:  # pylint: disable=no-member
                 log.error(f'Could not delete rotki premium credentials: {e!s}')
                 return False
+            DBSyncChanges(self).stop_tracking(cursor)  # no more syncs to track changes for
         return True
 
     def get_rotkehlchen_premium(self, cursor: 'DBCursor') -> PremiumCredentials | None:
@@ -2106,24 +2226,30 @@ class DBHandler:
             self,
             from_ts: Timestamp,
             include_nfts: bool = True,
+            to_ts: Timestamp | None = None,
+            resolution: SnapshotResolution = SnapshotResolution.SNAPSHOT,
     ) -> tuple[list[str], list[str]]:
-        """Get all entries of net value data from the DB"""
+        """Get the entries of net value data from the DB in the given range and resolution"""
+        if to_ts is None:
+            to_ts = ts_now()
+        bindings = (from_ts, to_ts, resolution.value)
         with self.conn.read_ctx() as cursor:
+            if not include_nfts:
+                nft_values = dict(cursor.execute(
+                    'SELECT S.timestamp, SUM(B.usd_value) FROM balance_snapshots S '
+                    'INNER JOIN timed_balances B ON B.timestamp=S.timestamp AND B.currency LIKE ? '
+                    'WHERE S.timestamp BETWEEN ? AND ? AND S.resolution >= ? GROUP BY S.timestamp',
+                    (f'{NFT_DIRECTIVE}%', *bindings),
+                ))
+
             # Get the total location ("H") entries in ascending time
             cursor.execute(
-                'SELECT timestamp, usd_value FROM timed_location_data '
-                'WHERE location="H" AND timestamp >= ? ORDER BY timestamp ASC;',
-                (from_ts,),
+                'SELECT S.timestamp, L.usd_value FROM balance_snapshots S '
+                'INNER JOIN timed_location_data L ON L.timestamp=S.timestamp AND L.location=? '
+                'WHERE S.timestamp BETWEEN ? AND ? AND S.resolution >= ? '
+                'ORDER BY S.timestamp ASC;',
+                (Location.TOTAL.serialize_for_db(), *bindings),  # pylint: disable=no-member
             )
-            if not include_nfts:
-                with self.conn.read_ctx() as nft_cursor:
-                    nft_cursor.execute(
-                        'SELECT timestamp, SUM(usd_value) FROM timed_balances WHERE '
-                        'timestamp >= ? AND currency LIKE ? GROUP BY timestamp',
-                        (from_ts, f'{NFT_DIRECTIVE}%'),
-                    )
-                    nft_values = dict(nft_cursor)
-
             data = []
             times_int = []
             for entry in cursor:
@@ -2137,20 +2263,19 @@ class DBHandler:
 
     @staticmethod
     def _infer_zero_timed_balances(
-            cursor: 'DBCursor',
-            balances: list[SingleDBAssetBalance],
-            from_ts: Timestamp | None = None,
-            to_ts: Timestamp | None = None,
+            snapshots_have_balance: dict[Timestamp, bool],
+            balance_type: BalanceType,
     ) -> list[SingleDBAssetBalance]:
         """
-        Given a list of asset specific timed balances, infers the missing zero timed balances
-        for the asset. We add 0 balances on the start and end of a period of 0 balances.
+        Given whether an asset has a balance at each of the balance snapshots, infers the
+        missing zero timed balances for the asset. We add 0 balances on the start and end
+        of a period of 0 balances.
         It addresses this issue: https://github.com/rotki/rotki/issues/2822
 
         Example
         We have the following timed balances for ETH (value, time):
         (1, 1), (1, 2), (2, 3), (5, 7), (5, 12)
-        The timestamps of all timed balances in the DB are:
+        The timestamps of all balance snapshots in the DB are:
         (1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12)
         So we need to infer the following zero timed balances:
         (0, 4), (0, 6), (0, 8), (0, 11)
@@ -2158,75 +2283,42 @@ class DBHandler:
         Keep in mind that in a case like this (1, 1), (1, 2), (5, 4) we will infer (0, 3)
         despite the fact that it is not strictly needed by the front end.
         """
-        if len(balances) == 0:
-            return []
-
-        if from_ts is None:
-            from_ts = Timestamp(0)
-        if to_ts is None:
-            to_ts = ts_now()
-
-        cursor.execute(
-            'SELECT COUNT(DISTINCT timestamp) FROM timed_balances WHERE timestamp BETWEEN ? AND ?',
-            (from_ts, to_ts),
-        )
-        num_distinct_timestamps = cursor.fetchone()[0]
-
-        asset_timestamps = [b.time for b in balances if b.amount != ZERO]  # ignore timestamps from 0 balances added by the ssf_graph_multiplier setting  # noqa: E501
-        if len(asset_timestamps) == num_distinct_timestamps:
+        if all(snapshots_have_balance.values()):
             return []
 
-        cursor.execute(
-            'SELECT timestamp, category FROM timed_balances WHERE timestamp BETWEEN ? AND ? '
-            'ORDER BY timestamp ASC',
-            (from_ts, to_ts),
-        )
-        all_timestamps, all_categories = zip(*cursor, strict=True)
-        # dicts maintain insertion order in python 3.7+
-        timestamps_have_asset_balance = dict.fromkeys(all_timestamps, False)
-        timestamps_with_asset_balance = dict.fromkeys(asset_timestamps, True)
-        timestamps_have_asset_balance.update(timestamps_with_asset_balance)
-        prev_has_asset_balance = timestamps_have_asset_balance[all_timestamps[0]]  # the value of the first timestamp  # noqa: E501
-        prev_timestamp = all_timestamps[0]
         inferred_balances: list[SingleDBAssetBalance] = []
+        timestamps = list(snapshots_have_balance)
+        prev_has_asset_balance = snapshots_have_balance[timestamps[0]]
+        prev_timestamp = timestamps[0]
         is_zero_period_open = False
-        last_asset_category = all_categories[-1]  # just a placeholder value, no need to calculate the actual value here  # noqa: E501
-        for idx, (timestamp, has_asset_balance) in enumerate(timestamps_have_asset_balance.items()):  # noqa: E501
-            if idx == len(timestamps_have_asset_balance) - 1 and has_asset_balance is False:
+        for idx, timestamp in enumerate(timestamps):
+            has_asset_balance = snapshots_have_balance[timestamp]
+            if idx == len(timestamps) - 1 and has_asset_balance is False:
                 # If there is no balance for the last timestamp add a zero balance.
-                inferred_balances.append(
-                    SingleDBAssetBalance(
-                        time=timestamp,
-                        amount=ZERO,
-                        usd_value=ZERO,
-                        category=last_asset_category,
-                    ),
-                )
+                inferred_balances.append(SingleDBAssetBalance(
+                    time=timestamp,
+                    amount=ZERO,
+                    usd_value=ZERO,
+                    category=balance_type,
+                ))
             elif has_asset_balance is False and prev_has_asset_balance is True:
                 # add the start of a zero balance period
-                inferred_balances.append(
-                    SingleDBAssetBalance(
-                        time=timestamp,
-                        amount=ZERO,
-                        usd_value=ZERO,
-                        category=BalanceType.deserialize_from_db(all_categories[idx - 1]),  # the category of the previous timed_balance of the asset  # noqa: E501
-                    ),
-                )
+                inferred_balances.append(SingleDBAssetBalance(
+                    time=timestamp,
+                    amount=ZERO,
+                    usd_value=ZERO,
+                    category=balance_type,
+                ))
                 is_zero_period_open = True
             elif has_asset_balance is True and prev_has_asset_balance is False and is_zero_period_open is True:  # noqa: E501
                 # add the end of a zero balance period
-                inferred_balances.append(
-                    SingleDBAssetBalance(
-                        time=prev_timestamp,
-                        amount=ZERO,
-                        usd_value=ZERO,
-                        category=inferred_balances[-1].category,  # the category of the asset at the start of the zero balance period  # noqa: E501
-                    ),
-                )
+                inferred_balances.append(SingleDBAssetBalance(
+                    time=prev_timestamp,
+                    amount=ZERO,
+                    usd_value=ZERO,
+                    category=balance_type,
+                ))
                 is_zero_period_open = False
-                last_asset_category = inferred_balances[-1].category
-            elif has_asset_balance is True:
-                last_asset_category = BalanceType.deserialize_from_db(all_categories[idx])
             prev_has_asset_balance, prev_timestamp = has_asset_balance, timestamp
         return inferred_balances
 
@@ -2237,8 +2329,11 @@ class DBHandler:
             balance_type: BalanceType,
             from_ts: Timestamp | None = None,
             to_ts: Timestamp | None = None,
+            resolution: SnapshotResolution = SnapshotResolution.SNAPSHOT,
     ) -> list[SingleDBAssetBalance]:
         """Query all balance entries for an asset and balance type within a range of timestamps
+        in the given resolution. The balances are looked up at the balance snapshots of
+        the resolution so the cost does not depend on the number of assets.
         """
         if from_ts is None:
             from_ts = Timestamp(0)
@@ -2246,42 +2341,49 @@ class DBHandler:
             to_ts = ts_now()
 
         settings = self.get_settings(cursor)
-        querystr = (
-            'SELECT timestamp, amount, usd_value, category FROM timed_balances '
-            'WHERE timestamp BETWEEN ? AND ? AND currency=?'
-        )
-        bindings = [from_ts, to_ts, asset.identifier]
-
+        currencies = [asset.identifier]
         if settings.treat_eth2_as_eth and asset == A_ETH:
-            querystr = querystr.replace('currency=?', 'currency IN (?,?)')
-            bindings.append('ETH2')
+            currencies.append('ETH2')
 
-        querystr += ' AND category=?'
-        bindings.append(balance_type.serialize_for_db())
-        querystr += ' ORDER BY timestamp ASC;'
+        cursor.execute(
+            'SELECT S.timestamp, B.amount, B.usd_value FROM balance_snapshots S '
+            'LEFT JOIN timed_balances B ON B.timestamp=S.timestamp AND '
+            f'B.currency IN ({",".join(["?"] * len(currencies))}) AND B.category=? '
+            'WHERE S.timestamp BETWEEN ? AND ? AND S.resolution >= ? '
+            'ORDER BY S.timestamp ASC;',
+            (*currencies, balance_type.serialize_for_db(), from_ts, to_ts, resolution.value),
+        )
+        results = []
+        # whether the asset has a balance at each snapshot. Ignores the 0 balances
+        # added by the ssf_graph_multiplier setting.
+        snapshots_have_balance: dict[Timestamp, bool] = {}
+        for timestamp, amount, usd_value in cursor:
+            if amount is not None:
+                results.append((timestamp, FVal(amount), FVal(usd_value)))
+            snapshots_have_balance[timestamp] = (
+                snapshots_have_balance.get(timestamp, False) or
+                (amount is not None and FVal(amount) != ZERO)
+            )
 
-        cursor.execute(querystr, bindings)
-        results = cursor.fetchall()
         balances = []
         results_length = len(results)
-        for idx, result in enumerate(results):
-            entry_time = result[0]
-            category = BalanceType.deserialize_from_db(result[3])
+        save_period = max(settings.balance_save_frequency * HOUR_IN_SECONDS, resolution.period_seconds())  # noqa: E501
+        for idx, (timestamp, amount, usd_value) in enumerate(results):
             balances.append(
                 SingleDBAssetBalance(
-                    time=entry_time,
-                    amount=FVal(result[1]),
-                    usd_value=FVal(result[2]),
-                    category=category,
+                    time=timestamp,
+                    amount=amount,
+                    usd_value=usd_value,
+                    category=balance_type,
                 ),
             )
             if settings.ssf_graph_multiplier == 0 or idx == results_length - 1:
                 continue
 
-            next_result_time = results[idx + 1][0]
-            max_diff = settings.balance_save_frequency * HOUR_IN_SECONDS * settings.ssf_graph_multiplier  # noqa: E501
+            entry_time, next_result_time = timestamp, results[idx + 1][0]
+            max_diff = save_period * settings.ssf_graph_multiplier
             while next_result_time - entry_time > max_diff:
-                entry_time = entry_time + settings.balance_save_frequency * HOUR_IN_SECONDS
+                entry_time = entry_time + save_period
                 if entry_time >= next_result_time:
                     break
 
@@ -2290,12 +2392,12 @@ class DBHandler:
                         time=entry_time,
                         amount=ZERO,
                         usd_value=ZERO,
-                        category=category,
+                        category=balance_type,
                     ),
                 )
 
-        if settings.infer_zero_timed_balances is True:
-            inferred_balances = self._infer_zero_timed_balances(cursor, balances, from_ts, to_ts)
+        if settings.infer_zero_timed_balances is True and len(balances) != 0:
+            inferred_balances = self._infer_zero_timed_balances(snapshots_have_balance, balance_type)  # noqa: E501
             if len(inferred_balances) != 0:
                 balances.extend(inferred_balances)
                 balances.sort(key=lambda x: x.time)
@@ -2311,8 +2413,10 @@ class DBHandler:
             collection_id: int,
             from_ts: Timestamp | None = None,
             to_ts: Timestamp | None = None,
+            resolution: SnapshotResolution = SnapshotResolution.SNAPSHOT,
     ) -> list[SingleDBAssetBalance]:
         """Query all balance entries for all assets of a collection within a range of timestamps
+        in the given resolution
         """
         with GlobalDBHandler().conn.read_ctx() as global_cursor:
             global_cursor.execute(
@@ -2327,6 +2431,7 @@ class DBHandler:
                     balance_type=BalanceType.ASSET,
                     from_ts=from_ts,
                     to_ts=to_ts,
+                    resolution=resolution,
                 ))
 
         asset_balances.sort(key=lambda x: x.time)
@@ -2911,6 +3016,49 @@ class DBHandler:
 
         return tuple(returned_indices)  # type: ignore
 
+    def get_xpub_derived_addresses(
+            self,
+            cursor: 'DBCursor',
+            xpub_data: XpubData,
+            account_index: int,
+            start_index: int,
+    ) -> dict[int, BTCAddress]:
+        """Get the already derived addresses of the given account index of the xpub,
+        from start_index onwards, as a mapping of derived index to address"""
+        cursor.execute(
+            'SELECT derived_index, address FROM xpub_derived_addresses WHERE xpub=? AND '
+            'derivation_path=? AND blockchain=? AND account_index=? AND derived_index>=?',
+            (
+                xpub_data.xpub.xpub,
+                xpub_data.serialize_derivation_path_for_db(),
+                xpub_data.blockchain.value,
+                account_index,
+                start_index,
+            ),
+        )
+        return dict(cursor)
+
+    def add_xpub_derived_addresses(
+            self,
+            write_cursor: 'DBCursor',
+            xpub_data: XpubData,
+            account_index: int,
+            derived_addresses: dict[int, BTCAddress],
+    ) -> None:
+        """Save the given derived index to address mapping of the account index of the xpub"""
+        write_cursor.executemany(
+            'INSERT OR IGNORE INTO xpub_derived_addresses(xpub, derivation_path, blockchain, '
+            'account_index, derived_index, address) VALUES (?, ?, ?, ?, ?, ?)',
+            [(
+                xpub_data.xpub.xpub,
+                xpub_data.serialize_derivation_path_for_db(),
+                xpub_data.blockchain.value,
+                account_index,
+                derived_index,
+                address,
+            ) for derived_index, address in derived_addresses.items()],
+        )
+
     def get_addresses_to_xpub_mapping(
             self,
             cursor: 'DBCursor',
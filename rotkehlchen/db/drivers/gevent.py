@@ -3,6 +3,7 @@
 but heavily modified"""
 
 import random
+import re
 import sqlite3
 from collections.abc import Generator, Sequence
 from contextlib import contextmanager
@@ -28,6 +29,13 @@ UnderlyingCursor: TypeAlias = sqlite3.Cursor | sqlcipher.Cursor  # pylint: disab
 UnderlyingConnection: TypeAlias = sqlite3.Connection | sqlcipher.Connection  # pylint: disable=no-member
 
 CONTEXT_SWITCH_WAIT = 1  # seconds to wait for a status change in a DB context switch
+# The table written by an INSERT, REPLACE, UPDATE or DELETE statement
+WRITE_TARGET_RE = re.compile(
+    r'\s*(?:INSERT|REPLACE|UPDATE|DELETE)(?:\s+OR\s+\w+)?(?:\s+INTO|\s+FROM)?\s+["`\[]?(\w+)',
+    re.IGNORECASE,
+)
+# Logged instead of a table name for changes of statements whose table is not known
+UNKNOWN_SYNC_CHANGE = ''
 import logging
 
 logger: 'RotkehlchenLogger' = logging.getLogger(__name__)  # type: ignore
@@ -81,6 +89,8 @@ class DBCursor:
     def execute(self, statement: str, *bindings: Sequence) -> 'DBCursor':
         if __debug__:
             logger.trace(f'EXECUTE {statement}')
+        if (tracking := self.connection.track_sync_changes):
+            total_changes = self.connection.total_changes
         try:
             self._cursor.execute(statement, *bindings)
         except (sqlcipher.InterfaceError, sqlite3.InterfaceError):  # pylint: disable=no-member
@@ -88,6 +98,8 @@ class DBCursor:
             logger.debug(f'{statement} with {bindings} failed due to https://github.com/rotki/rotki/issues/5432. Retrying')  # noqa: E501
             self._cursor.execute(statement, *bindings)
 
+        if tracking:
+            self.connection.log_sync_change(statement, total_changes)
         if __debug__:
             logger.trace(f'FINISH EXECUTE {statement}')
         return self
@@ -95,7 +107,11 @@ class DBCursor:
     def executemany(self, statement: str, *bindings: Sequence[Sequence]) -> 'DBCursor':
         if __debug__:
             logger.trace(f'EXECUTEMANY {statement}')
+        if (tracking := self.connection.track_sync_changes):
+            total_changes = self.connection.total_changes
         self._cursor.executemany(statement, *bindings)
+        if tracking:
+            self.connection.log_sync_change(statement, total_changes)
         if __debug__:
             logger.trace(f'FINISH EXECUTEMANY {statement}')
         return self
@@ -106,7 +122,11 @@ class DBCursor:
         """
         if __debug__:
             logger.trace(f'EXECUTESCRIPT {script}')
+        if (tracking := self.connection.track_sync_changes):
+            total_changes = self.connection.total_changes
         self._cursor.executescript(script)
+        if tracking:  # a script may write many tables
+            self.connection.log_sync_change(None, total_changes)
         if __debug__:
             logger.trace(f'FINISH EXECUTESCRIPT {script}')
         return self
@@ -253,6 +273,10 @@ class DBConnection:
         # https://www.gevent.org/api/gevent.greenlet.html#gevent.Greenlet.minimal_ident
         self.savepoint_greenlet_id: str | None = None
         self.write_greenlet_id: str | None = None
+        # Whether the tables written are logged in premium_sync_changes and the tables logged
+        # since the last rollback. See db/sync_changes.py
+        self.track_sync_changes = False
+        self.sync_logged_tables: set[str] = set()
         if connection_type == DBConnectionType.GLOBAL:
             self._conn = sqlite3.connect(
                 database=path,
@@ -299,6 +323,29 @@ class DBConnection:
             logger.trace(f'DB CONNECTION EXECUTESCRIPT {script}')
         return DBCursor(connection=self, cursor=underlying_cursor)
 
+    def log_sync_change(self, statement: str | None, total_changes: int) -> None:
+        """Logs the table written by the statement for the premium sync if the statement
+        changed any rows since the connection had total_changes. If the statement is None
+        or its table is not known then UNKNOWN_SYNC_CHANGE is logged instead.
+
+        This is in the write path of every statement while changes are tracked, so the
+        table is only logged the first time it is written after a rollback."""
+        if self._conn.total_changes == total_changes:
+            return
+
+        if statement is None or (match := WRITE_TARGET_RE.match(statement)) is None:
+            table_name = UNKNOWN_SYNC_CHANGE
+        else:
+            table_name = match.group(1)
+
+        if table_name not in self.sync_logged_tables:
+            # executed in the statement's transaction, so it's rolled back along with it
+            self._conn.execute(
+                'INSERT OR REPLACE INTO premium_sync_changes(table_name) VALUES(?)',
+                (table_name,),
+            )
+            self.sync_logged_tables.add(table_name)
+
     def commit(self) -> None:
         with self.in_callback:
             if __debug__:
@@ -315,6 +362,7 @@ class DBConnection:
                 logger.trace('START DB CONNECTION ROLLBACK')
             try:
                 self._conn.rollback()
+                self.sync_logged_tables.clear()  # rolled back, so need to be logged again
             finally:
                 if __debug__:
                     logger.trace('FINISH DB CONNECTION ROLLBACK')
@@ -363,6 +411,7 @@ class DBConnection:
                 yield cursor
             except Exception:
                 self._conn.rollback()
+                self.sync_logged_tables.clear()  # rolled back, so need to be logged again
                 raise
             else:
                 if commit_ts is True:
@@ -467,6 +516,7 @@ class DBConnection:
         - ContextError if savepoints stack is empty or given savepoint name is not in the stack
         """
         self._modify_savepoint(rollback_or_release='ROLLBACK TO', savepoint_name=savepoint_name)
+        self.sync_logged_tables.clear()  # rolled back, so need to be logged again
 
     def release_savepoint(self, savepoint_name: str | None = None) -> None:
         """
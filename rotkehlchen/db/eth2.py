@@ -7,6 +7,7 @@ from rotkehlchen.chain.ethereum.modules.eth2.structures import Eth2Validator, Va
 from rotkehlchen.chain.ethereum.modules.eth2.utils import form_withdrawal_notes, timestamp_to_epoch
 from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.constants.timing import DAY_IN_SECONDS
+from rotkehlchen.db.accounting_snapshots import invalidate_accounting_snapshots
 from rotkehlchen.db.filtering import ETH_STAKING_EVENT_JOIN, EthStakingEventFilterQuery
 from rotkehlchen.errors.misc import InputError
 from rotkehlchen.fval import FVal
@@ -84,6 +85,7 @@ class DBEth2:
                         'VALUES(?,?,?)',
                         entry.to_db_tuple(),
                     )
+                    invalidate_accounting_snapshots(write_cursor, from_ts=entry.timestamp)
             except sqlcipher.IntegrityError as e:  # pylint: disable=no-member
                 log.debug(
                     f'Cant insert Eth2 staking detail entry {entry!s} to the DB '
@@ -185,6 +187,7 @@ class DBEth2:
             return  # no event found so nothing to do
 
         if timestamp_to_epoch(ts_ms_to_sec(latest_result[1])) > exit_epoch:
+            invalidate_accounting_snapshots(write_cursor, from_ts=ts_ms_to_sec(latest_result[1]))
             write_cursor.execute(
                 'UPDATE eth_staking_events_info SET is_exit_or_blocknumber=? WHERE identifier=?',
                 (1, latest_result[0]),
@@ -216,6 +219,8 @@ class DBEth2:
                     f'Tried to edit validator with index {validator_index} '
                     f'that is not in the database',
                 )
+            # the ownership proportion scales all the daily stats of the validator
+            invalidate_accounting_snapshots(cursor)
 
     def delete_validators(self, validator_indices: list[int]) -> None:
         """Deletes the given validators from the DB. Due to marshmallow here at least one
@@ -249,6 +254,7 @@ class DBEth2:
                 f'({",".join(question_marks)})) AND entry_type != ?',
                 (*validator_indices, HistoryBaseEntryType.ETH_DEPOSIT_EVENT.serialize_for_db()),
             )
+            invalidate_accounting_snapshots(cursor)
 
     @staticmethod
     def _validator_stats_process_queries(
@@ -12,6 +12,7 @@ from rotkehlchen.chain.evm.types import EvmAccount
 from rotkehlchen.chain.gnosis.constants import GNOSIS_GENESIS
 from rotkehlchen.chain.optimism.constants import OPTIMISM_GENESIS
 from rotkehlchen.chain.polygon_pos.constants import POLYGON_POS_GENESIS
+from rotkehlchen.db.accounting_snapshots import invalidate_accounting_snapshots
 from rotkehlchen.db.constants import HISTORY_MAPPING_STATE_DECODED
 from rotkehlchen.db.filtering import EvmTransactionsFilterQuery, TransactionsNotDecodedFilterQuery
 from rotkehlchen.db.history_events import DBHistoryEvents
@@ -483,6 +484,8 @@ class DBEvmTx:
             'ON H.identifier=E.identifier WHERE E.tx_hash=? AND H.location_label=?)',
             (GENESIS_HASH, address),
         )
+        if write_cursor.rowcount != 0:  # genesis events are at the start of history
+            invalidate_accounting_snapshots(write_cursor)
         genesis_events_count = write_cursor.execute(
             'SELECT COUNT (*) FROM history_events H INNER JOIN evm_events_info E'
             ' WHERE H.identifier=E.identifier and E.tx_hash=?',
@@ -1,6 +1,6 @@
 import copy
 import logging
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 from typing import TYPE_CHECKING, Any, Literal, Optional, overload
 
 from pysqlcipher3 import dbapi2 as sqlcipher
@@ -8,6 +8,7 @@ from pysqlcipher3 import dbapi2 as sqlcipher
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.limits import FREE_HISTORY_EVENTS_LIMIT
+from rotkehlchen.db.accounting_snapshots import invalidate_accounting_snapshots
 from rotkehlchen.db.constants import HISTORY_MAPPING_KEY_STATE, HISTORY_MAPPING_STATE_CUSTOMIZED
 from rotkehlchen.db.filtering import (
     ALL_EVENTS_DATA_JOIN,
@@ -97,6 +98,7 @@ class DBHistoryEvents:
             else:
                 write_cursor.execute(f'INSERT OR IGNORE INTO {insertquery}', (identifier, *bindings))  # noqa: E501
 
+        invalidate_accounting_snapshots(write_cursor, from_ts=event.get_timestamp_in_sec())
         if mapping_values is not None:
             write_cursor.executemany(
                 'INSERT OR IGNORE INTO history_events_mappings(parent_identifier, name, value) '
@@ -127,6 +129,12 @@ class DBHistoryEvents:
         NOTE: It edits all the fields except the extra_data one.
         """
         with self.db.user_write() as write_cursor:
+            write_cursor.execute(
+                'SELECT timestamp FROM history_events WHERE identifier=?', (event.identifier,),
+            )
+            if (result := write_cursor.fetchone()) is not None:  # invalidate from old timestamp
+                invalidate_accounting_snapshots(write_cursor, from_ts=ts_ms_to_sec(result[0]))
+            invalidate_accounting_snapshots(write_cursor, from_ts=event.get_timestamp_in_sec())
             for idx, (_, updatestr, bindings) in enumerate(event.serialize_for_db()):
                 if idx == 0:  # base history event data
                     try:
@@ -186,6 +194,11 @@ class DBHistoryEvents:
                         )
 
             with self.db.user_write() as write_cursor:
+                write_cursor.execute(
+                    'SELECT timestamp FROM history_events WHERE identifier=?', (identifier,),
+                )
+                if (result := write_cursor.fetchone()) is not None:
+                    invalidate_accounting_snapshots(write_cursor, from_ts=ts_ms_to_sec(result[0]))
                 write_cursor.execute(
                     'DELETE FROM history_events WHERE identifier=?', (identifier,),
                 )
@@ -218,6 +231,13 @@ class DBHistoryEvents:
             bindings = [*tx_hashes, *customized_event_ids]
         else:
             bindings = tx_hashes  # type: ignore  # different type of elements in the list
+        write_cursor.execute(
+            'SELECT MIN(H.timestamp) FROM history_events H INNER JOIN evm_events_info E ON '
+            f'H.identifier=E.identifier AND E.tx_hash IN ({", ".join(["?"] * len(tx_hashes))})',
+            tx_hashes,
+        )
+        if (min_timestamp := write_cursor.fetchone()[0]) is not None:
+            invalidate_accounting_snapshots(write_cursor, from_ts=ts_ms_to_sec(min_timestamp))
         write_cursor.execute(querystr, bindings)
 
     def get_customized_event_identifiers(
@@ -354,6 +374,26 @@ class DBHistoryEvents:
         TODO: To not query all columns with all joins for all cases, we perhaps can
         peek on the entry type of the filter and adjust the SELECT fields accordingly?
         """
+        return list(self.iterate_history_events(  # type: ignore  # the overloads define the type
+            cursor=cursor,
+            filter_query=filter_query,
+            has_premium=has_premium,
+            group_by_event_ids=group_by_event_ids,
+        ))
+
+    def iterate_history_events(
+            self,
+            cursor: 'DBCursor',
+            filter_query: HistoryEventFilterQuery | EvmEventFilterQuery | EthDepositEventFilterQuery | EthWithdrawalFilterQuery,  # noqa: E501
+            has_premium: bool,
+            group_by_event_ids: bool = False,
+    ) -> Iterator[HistoryBaseEntry | tuple[int, HistoryBaseEntry]]:
+        """Same as get_history_events but lazily deserializes the events while
+        iterating over the given cursor instead of creating a list of all of them.
+
+        The cursor is used for the entire iteration so it should be kept open
+        until the iterator is exhausted.
+        """
         free_query_group_by = ''
         free_query_count = ''
         base_prefix = 'SELECT '
@@ -386,7 +426,6 @@ class DBHistoryEvents:
             bindings.insert(0, FREE_HISTORY_EVENTS_LIMIT)
 
         cursor.execute(base_query + prepared_query, bindings)
-        output: list[HistoryBaseEntry] | list[tuple[int, HistoryBaseEntry]] = []
         data_start_idx = type_idx + 1
         for entry in cursor:
             entry_type = HistoryBaseEntryType(entry[type_idx])
@@ -433,11 +472,9 @@ class DBHistoryEvents:
                 continue
 
             if group_by_event_ids is True:
-                output.append((entry[0], deserialized_event))  # type: ignore
+                yield entry[0], deserialized_event
             else:
-                output.append(deserialized_event)  # type: ignore
-
-        return output
+                yield deserialized_event
 
     @overload
     def get_history_events_and_limit_info(
@@ -52,4 +52,8 @@ MINIMIZED_USER_DB_SCHEMA = {
     "linked_rules_properties": "identifierintegerprimarykeynotnull,accounting_ruleintegerreferencesaccounting_rules(identifier),property_nametextnotnull,setting_nametextnotnullreferencessettings(name)",
     "unresolved_remote_conflicts": "identifierintegerprimarykeynotnull,local_idintegernotnull,remote_datatextnotnull,typeintegernotnull",
     "key_value_cache": "nametextnotnullprimarykey,valuetext",
+    "accounting_snapshots": "timestampintegernotnull,settings_hashtextnotnull,processed_actionsintegernotnull,statetextnotnull,primarykey(timestamp,settings_hash)",
+    "premium_sync_changes": "change_idintegernotnullprimarykey,table_nametextnotnullunique",
+    "balance_snapshots": "timestampintegernotnullprimarykey,resolutionintegernotnulldefault0",
+    "xpub_derived_addresses": "xpubtextnotnull,derivation_pathtextnotnull,blockchaintextnotnull,account_indexintegernotnull,derived_indexintegernotnull,addresstextnotnull,foreignkey(xpub,derivation_path,blockchain)referencesxpubs(xpub,derivation_path,blockchain)ondeletecascadeprimarykey(xpub,derivation_path,blockchain,account_index,derived_index)",
 }
@@ -1,6 +1,8 @@
 import logging
-from collections.abc import Callable
+import time
+from collections.abc import Callable, Iterator
 from copy import deepcopy
+from itertools import starmap
 from typing import TYPE_CHECKING, Any, Literal, overload
 
 from pysqlcipher3 import dbapi2 as sqlcipher
@@ -22,6 +24,11 @@ if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
     from rotkehlchen.db.filtering import ReportDataFilterQuery
 
+# Number of processed events of a PnL report that are written to the DB together
+PNL_EVENTS_WRITE_BATCH = 1000
+# Seconds after which the buffered processed events are written even if they are fewer
+PNL_EVENTS_WRITE_INTERVAL = 5
+
 
 @overload
 def _get_reports_or_events_maybe_limit(
@@ -108,6 +115,7 @@ class DBAccountingReports:
     def add_report_overview(
             self,
             report_id: int,
+            first_processed_timestamp: Timestamp,
             last_processed_timestamp: Timestamp,
             processed_actions: int,
             total_actions: int,
@@ -120,9 +128,9 @@ class DBAccountingReports:
         """
         with self.db.transient_write() as cursor:
             cursor.execute(
-                'UPDATE pnl_reports SET last_processed_timestamp=?,'
+                'UPDATE pnl_reports SET first_processed_timestamp=?, last_processed_timestamp=?,'
                 ' processed_actions=?, total_actions=? WHERE identifier=?',
-                (last_processed_timestamp, processed_actions, total_actions, report_id),
+                (first_processed_timestamp, last_processed_timestamp, processed_actions, total_actions, report_id),  # noqa: E501
             )
             if cursor.rowcount != 1:
                 raise InputError(
@@ -214,32 +222,52 @@ class DBAccountingReports:
                     f'Could not delete PnL report {report_id} from the DB. Report was not found',
                 )
 
-    def add_report_data(
+    def copy_report_data(
             self,
-            report_id: int,
-            time: Timestamp,
-            ts_converter: Callable[[Timestamp], str],
-            event: ProcessedAccountingEvent,
-    ) -> None:
-        """Adds a new entry to a transient report for the PnL history in a given time range
+            from_report_id: int,
+            to_report_id: int,
+            events_num: int,
+    ) -> list[ProcessedAccountingEvent]:
+        """Copies the first `events_num` events of a report to another report.
+        Returns the copied events.
+
         May raise:
-        - DeserializationError if there is a conflict at serialization of the event
-        - InputError if the event can not be written to the DB. Probably report id does not exist.
+        - InputError if the report to copy from does not have that many events.
+        Probably it was deleted.
+        - DeserializationError if any of the copied events can't be deserialized
         """
-        data = event.serialize_for_db(ts_converter)
-        query = """
-        INSERT INTO pnl_events(
-            report_id, timestamp, data
-        )
-        VALUES(?, ?, ?);"""
         with self.db.transient_write() as cursor:
-            try:
-                cursor.execute(query, (report_id, time, data))
-            except sqlcipher.IntegrityError as e:  # pylint: disable=no-member
+            cursor.execute(
+                'INSERT INTO pnl_events(report_id, timestamp, data) '
+                'SELECT ?, timestamp, data FROM pnl_events WHERE report_id=? '
+                'ORDER BY identifier LIMIT ?',
+                (to_report_id, from_report_id, events_num),
+            )
+            if cursor.rowcount != events_num:
                 raise InputError(
-                    f'Could not write {event} data to the DB due to {e!s}. '
-                    f'Probably report {report_id} does not exist?',
-                ) from e
+                    f'Could not copy {events_num} events from PnL report {from_report_id}. '
+                    f'Only {cursor.rowcount} were found',
+                )
+
+            cursor.execute(
+                'SELECT timestamp, data FROM pnl_events WHERE report_id=? ORDER BY identifier',
+                (to_report_id,),
+            )
+            return list(starmap(ProcessedAccountingEvent.deserialize_from_db, cursor))
+
+    def iterate_report_events(self, report_id: int) -> Iterator[ProcessedAccountingEvent]:
+        """Lazily reads all the processed events of a report in the order they were
+        processed, so that they don't all need to be in memory at once
+
+        May raise:
+        - DeserializationError if any of the events can't be deserialized
+        """
+        with self.db.conn_transient.read_ctx() as cursor:
+            cursor.execute(
+                'SELECT timestamp, data FROM pnl_events WHERE report_id=? ORDER BY identifier',
+                (report_id,),
+            )
+            yield from starmap(ProcessedAccountingEvent.deserialize_from_db, cursor)
 
     def get_report_data(
             self,
@@ -295,3 +323,61 @@ class DBAccountingReports:
             entries=records,
             with_limit=with_limit,
         )
+
+
+class PnlEventsWriter:
+    """Writes the processed events of a PnL report to the transient DB. The events are
+    buffered and written in a single transaction per batch, once PNL_EVENTS_WRITE_BATCH
+    of them are buffered or PNL_EVENTS_WRITE_INTERVAL seconds have passed since the
+    last write. The owner has to flush at the end of the report."""
+
+    def __init__(
+            self,
+            database: 'DBHandler',
+            report_id: int,
+            ts_converter: Callable[[Timestamp], str],
+            batch_size: int = PNL_EVENTS_WRITE_BATCH,
+            write_interval: float = PNL_EVENTS_WRITE_INTERVAL,
+    ) -> None:
+        self.db = database
+        self.report_id = report_id
+        self.ts_converter = ts_converter
+        self.batch_size = batch_size
+        self.write_interval = write_interval
+        self.buffer: list[tuple[int, Timestamp, str]] = []
+        self.last_write = time.monotonic()
+
+    def add(self, event: ProcessedAccountingEvent) -> None:
+        """Buffers the event and writes the buffered events if it's time to
+
+        May raise:
+        - DeserializationError if there is a conflict at serialization of the event
+        - InputError if the buffered events can not be written to the DB
+        """
+        self.buffer.append((self.report_id, event.timestamp, event.serialize_for_db(self.ts_converter)))  # noqa: E501
+        if len(self.buffer) >= self.batch_size or time.monotonic() - self.last_write >= self.write_interval:  # noqa: E501
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered events to the DB
+
+        May raise:
+        - InputError if the events can not be written to the DB. Probably the report
+        does not exist. The buffered events are dropped.
+        """
+        self.last_write = time.monotonic()
+        if len(self.buffer) == 0:
+            return
+
+        rows, self.buffer = self.buffer, []
+        with self.db.transient_write() as cursor:
+            try:
+                cursor.executemany(
+                    'INSERT INTO pnl_events(report_id, timestamp, data) VALUES(?, ?, ?)',
+                    rows,
+                )
+            except sqlcipher.IntegrityError as e:  # pylint: disable=no-member
+                raise InputError(
+                    f'Could not write {len(rows)} processed events to the DB due to {e!s}. '
+                    f'Probably report {self.report_id} does not exist?',
+                ) from e
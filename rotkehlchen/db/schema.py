@@ -285,6 +285,25 @@ CREATE TABLE IF NOT EXISTS xpub_mappings (
 );
 """
 
+# Addresses derived from the xpubs, so that they are not derived again at each check of the
+# xpubs for new addresses. They include the derived addresses that have had no activity yet
+DB_CREATE_XPUB_DERIVED_ADDRESSES = """
+CREATE TABLE IF NOT EXISTS xpub_derived_addresses (
+    xpub TEXT NOT NULL,
+    derivation_path TEXT NOT NULL,
+    blockchain TEXT NOT NULL,
+    account_index INTEGER NOT NULL,
+    derived_index INTEGER NOT NULL,
+    address TEXT NOT NULL,
+    FOREIGN KEY(xpub, derivation_path, blockchain) REFERENCES xpubs(
+        xpub,
+        derivation_path,
+        blockchain
+    ) ON DELETE CASCADE
+    PRIMARY KEY (xpub, derivation_path, blockchain, account_index, derived_index)
+);
+"""
+
 
 # Store information about the tokens queried for each combination of account and blockchain.
 # The table is designed to have a key-value structure where we use the key `token` to
@@ -703,6 +722,51 @@ DB_CREATE_KEY_VALUE_CACHE = """CREATE TABLE IF NOT EXISTS key_value_cache (
     value TEXT
 );"""
 
+# Snapshots of the accounting state taken during PnL report processing. The state
+# contains the effect of all events before timestamp and is only valid for the
+# accounting settings that hash to settings_hash.
+DB_CREATE_ACCOUNTING_SNAPSHOTS = """
+CREATE TABLE IF NOT EXISTS accounting_snapshots (
+    timestamp INTEGER NOT NULL,
+    settings_hash TEXT NOT NULL,
+    processed_actions INTEGER NOT NULL,
+    state TEXT NOT NULL,
+    PRIMARY KEY (timestamp, settings_hash)
+);
+"""
+
+# Secondary indexes for the columns that the history events filters of db/filtering.py
+# filter and sort by. Picked by checking the query plans of the statements the filters
+# generate, so that the history queries don't scan the entire tables.
+DB_CREATE_HISTORY_EVENTS_INDEXES = """
+CREATE INDEX IF NOT EXISTS idx_history_events_timestamp ON history_events(timestamp, sequence_index);
+CREATE INDEX IF NOT EXISTS idx_history_events_location ON history_events(location);
+CREATE INDEX IF NOT EXISTS idx_history_events_location_label ON history_events(location_label);
+CREATE INDEX IF NOT EXISTS idx_history_events_asset ON history_events(asset);
+CREATE INDEX IF NOT EXISTS idx_history_events_type ON history_events(type, subtype);
+CREATE INDEX IF NOT EXISTS idx_evm_events_info_tx_hash ON evm_events_info(tx_hash);
+CREATE INDEX IF NOT EXISTS idx_evm_events_info_counterparty ON evm_events_info(counterparty);
+"""  # noqa: E501
+
+# User tables changed since the last premium sync. Only filled while a premium sync with
+# deltas is active. See db/sync_changes.py
+DB_CREATE_PREMIUM_SYNC_CHANGES = """
+CREATE TABLE IF NOT EXISTS premium_sync_changes (
+    change_id INTEGER NOT NULL PRIMARY KEY,
+    table_name TEXT NOT NULL UNIQUE
+);
+"""
+
+# Timestamps of the balance snapshots with the coarsest resolution of the balance graphs
+# that each one is a point of. Kept up to date from the timed balances and location
+# data. See db/balance_snapshots.py
+DB_CREATE_BALANCE_SNAPSHOTS = """
+CREATE TABLE IF NOT EXISTS balance_snapshots (
+    timestamp INTEGER NOT NULL PRIMARY KEY,
+    resolution INTEGER NOT NULL DEFAULT 0
+);
+"""
+
 
 DB_SCRIPT_CREATE_TABLES = f"""
 PRAGMA foreign_keys=off;
@@ -758,6 +822,11 @@ BEGIN TRANSACTION;
 {DB_CREATE_MAPPED_ACCOUNTING_RULES}
 {DB_CREATE_UNRESOLVED_REMOTE_CONFLICTS}
 {DB_CREATE_KEY_VALUE_CACHE}
+{DB_CREATE_ACCOUNTING_SNAPSHOTS}
+{DB_CREATE_HISTORY_EVENTS_INDEXES}
+{DB_CREATE_PREMIUM_SYNC_CHANGES}
+{DB_CREATE_BALANCE_SNAPSHOTS}
+{DB_CREATE_XPUB_DERIVED_ADDRESSES}
 COMMIT;
 PRAGMA foreign_keys=on;
 """
@@ -55,6 +55,7 @@ DEFAULT_INFER_ZERO_TIMED_BALANCES = False  # If True the asset amount and value
 DEFAULT_QUERY_RETRY_LIMIT = 5
 DEFAULT_CONNECT_TIMEOUT = 30
 DEFAULT_READ_TIMEOUT = 30
+DEFAULT_HEDGE_EVM_QUERIES = False
 
 JSON_KEYS = (
     'current_price_oracles',
@@ -77,6 +78,7 @@ BOOLEAN_KEYS = (
     'eth_staking_taxable_after_withdrawal_enabled',
     'include_fees_in_cost_basis',
     'infer_zero_timed_balances',
+    'hedge_evm_queries',
 )
 INTEGER_KEYS = (
     'version',
@@ -135,6 +137,7 @@ CachedDBSettingsFieldNames = Literal[
     'query_retry_limit',
     'connect_timeout',
     'read_timeout',
+    'hedge_evm_queries',
 ]
 
 DBSettingsFieldTypes = (
@@ -190,6 +193,7 @@ class DBSettings:
     query_retry_limit: int = DEFAULT_QUERY_RETRY_LIMIT
     connect_timeout: int = DEFAULT_CONNECT_TIMEOUT
     read_timeout: int = DEFAULT_READ_TIMEOUT
+    hedge_evm_queries: bool = DEFAULT_HEDGE_EVM_QUERIES
 
     def serialize(self) -> dict[str, Any]:
         settings_dict = {}
@@ -243,6 +247,7 @@ class ModifiableDBSettings(NamedTuple):
     query_retry_limit: int | None = None
     connect_timeout: int | None = None
     read_timeout: int | None = None
+    hedge_evm_queries: bool | None = None
 
     def serialize(self) -> dict[str, Any]:
         settings_dict = {}
@@ -7,6 +7,7 @@ from zipfile import ZIP_DEFLATED, ZipFile
 from rotkehlchen.accounting.export.csv import CSVWriteError, dict_to_csv_file
 from rotkehlchen.assets.asset import AssetWithOracles
 from rotkehlchen.constants.misc import NFT_DIRECTIVE
+from rotkehlchen.db.balance_snapshots import update_balance_snapshots
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.utils import DBAssetBalance, LocationData
 from rotkehlchen.errors.asset import UnknownAsset
@@ -268,6 +269,7 @@ class DBSnapshot:
         write_cursor.execute('DELETE FROM timed_location_data WHERE timestamp=?', (timestamp,))
         if write_cursor.rowcount == 0:
             raise InputError('No snapshot found for the specified timestamp')
+        update_balance_snapshots(write_cursor, [timestamp])
 
     def add_nft_asset_ids(self, write_cursor: 'DBCursor', entries: list[str]) -> None:
         """Add NFT identifiers to the DB to prevent unknown asset error."""
@@ -0,0 +1,232 @@
+"""Tracking of the tables changed since the last premium sync
+
+To sync the DB with the premium server without uploading all of it every time, the tables
+written after a sync are logged in the premium_sync_changes table by the DB driver as
+part of the same write. A delta with the current rows of those tables brings a copy of
+the DB as it was at the sync up to date. The deltas are uploaded on top of the DB data in
+the server, which is identified by a hash that each delta extends.
+
+Changes are logged per table and not per row. So a delta is as big as the tables that
+changed, and when they have too many rows the whole DB is uploaded instead. Changes are
+only logged while the DB is known to match the data in the server, which is recorded as
+the sync head.
+"""
+import base64
+import hashlib
+import json
+import logging
+import sqlite3
+from typing import TYPE_CHECKING, Any
+
+from rotkehlchen.db.drivers.gevent import UNKNOWN_SYNC_CHANGE
+from rotkehlchen.db.settings import ROTKEHLCHEN_DB_VERSION
+from rotkehlchen.errors.serialization import DeserializationError
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.db.drivers.gevent import DBCursor
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# Name of the key_value_cache entry of the sync head
+PREMIUM_SYNC_HEAD_KEY = 'premium_sync_head'
+DELTA_FORMAT_VERSION = 1
+UNTRACKED_TABLES = {'premium_sync_changes', 'sqlite_sequence'}
+# Above this many rows in the changed tables the whole DB is uploaded instead of a delta
+MAX_DELTA_ROWS = 50000
+# Foreign key actions that change the rows of a table when the rows it references change
+CASCADING_FK_ACTIONS = {'CASCADE', 'SET NULL', 'SET DEFAULT'}
+
+
+def _get_table_columns(cursor: 'DBCursor | sqlite3.Cursor', table_name: str) -> list[str]:
+    return [x[1] for x in cursor.execute(f'PRAGMA table_info("{table_name}")').fetchall()]
+
+
+def _add_cascading_tables(cursor: 'DBCursor', table_names: set[str]) -> set[str]:
+    """Adds to the changed tables the tables whose rows foreign key actions may have
+    changed, since those changes are not written by any statement of ours"""
+    referencing_tables: dict[str, set[str]] = {}
+    for (table_name,) in cursor.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall():  # noqa: E501
+        for foreign_key in cursor.execute(f'PRAGMA foreign_key_list("{table_name}")').fetchall():
+            if foreign_key[5] in CASCADING_FK_ACTIONS or foreign_key[6] in CASCADING_FK_ACTIONS:
+                referencing_tables.setdefault(foreign_key[2], set()).add(table_name)
+
+    result, to_check = set(table_names), list(table_names)
+    while len(to_check) != 0:
+        for table_name in referencing_tables.get(to_check.pop(), set()) - result:
+            result.add(table_name)
+            to_check.append(table_name)
+
+    return result
+
+
+def _serialize_value(value: Any) -> Any:
+    return {'hex': value.hex()} if isinstance(value, bytes) else value
+
+
+def _deserialize_value(value: Any) -> Any:
+    return bytes.fromhex(value['hex']) if isinstance(value, dict) else value
+
+
+def get_delta_hash(parent_hash: str, delta: bytes) -> str:
+    """The hash of the data in the premium server after adding the delta on top of the
+    data with parent_hash"""
+    return base64.b64encode(hashlib.sha256(parent_hash.encode() + delta).digest()).decode()
+
+
+def apply_delta(cursor: sqlite3.Cursor, delta: bytes) -> None:
+    """Applies a delta produced by DBSyncChanges.export_delta on a copy of the DB as it
+    was at the sync the delta's changes were tracked from. Foreign keys should be off
+    so that replacing the rows of a table does not cascade.
+
+    May raise:
+    - DeserializationError if the delta can't be read or does not fit the DB
+    """
+    try:
+        data = json.loads(delta)
+        version, tables = data['version'], data['tables']
+    except (json.JSONDecodeError, KeyError, TypeError) as e:
+        raise DeserializationError(f'Could not read the premium sync delta due to {e!s}') from e
+
+    if version != DELTA_FORMAT_VERSION:
+        raise DeserializationError(f'Unknown premium sync delta version {version}')
+
+    try:
+        for table_name, entry in tables.items():
+            if _get_table_columns(cursor, table_name) != entry['columns']:
+                raise DeserializationError(
+                    f'Premium sync delta does not match the columns of table {table_name}',
+                )
+
+            cursor.execute(f'DELETE FROM "{table_name}"')
+            columns_sql = ', '.join(f'"{x}"' for x in entry['columns'])
+            cursor.executemany(
+                f'INSERT INTO "{table_name}"({columns_sql}) '
+                f'VALUES({",".join(["?"] * len(entry["columns"]))})',
+                [[_deserialize_value(x) for x in row] for row in entry['rows']],
+            )
+    except (sqlite3.Error, KeyError, TypeError, ValueError) as e:
+        raise DeserializationError(f'Could not apply the premium sync delta due to {e!s}') from e
+
+
+class DBSyncChanges:
+
+    def __init__(self, database: 'DBHandler') -> None:
+        self.db = database
+
+    def get_head(self, cursor: 'DBCursor') -> str | None:
+        """Returns the hash of the data in the premium server that the DB matched at the
+        last sync, if the changes since then are tracked"""
+        result = cursor.execute(
+            'SELECT value FROM key_value_cache WHERE name=?', (PREMIUM_SYNC_HEAD_KEY,),
+        ).fetchone()
+        if result is None:
+            return None
+
+        head = json.loads(result[0])
+        if head['db_version'] != ROTKEHLCHEN_DB_VERSION:
+            return None  # the changes of DB upgrades are not tracked
+
+        return head['hash']
+
+    def get_last_change_id(self, cursor: 'DBCursor') -> int:
+        return cursor.execute('SELECT MAX(change_id) FROM premium_sync_changes').fetchone()[0] or 0
+
+    def get_changed_tables(self, cursor: 'DBCursor') -> set[str]:
+        return {x[0] for x in cursor.execute('SELECT table_name FROM premium_sync_changes')}
+
+    def start_tracking(
+            self,
+            write_cursor: 'DBCursor',
+            head: str,
+            last_change_id: int | None,
+    ) -> None:
+        """Records that the DB matches the data with the given hash in the premium server,
+        apart from the changes after last_change_id, and tracks the changes from now on.
+        If last_change_id is None then all the logged changes are forgotten."""
+        self.db.conn.track_sync_changes = False  # the head itself is not synced
+        write_cursor.execute(
+            'INSERT OR REPLACE INTO key_value_cache(name, value) VALUES(?, ?)',
+            (PREMIUM_SYNC_HEAD_KEY, json.dumps({'hash': head, 'db_version': ROTKEHLCHEN_DB_VERSION})),  # noqa: E501
+        )
+        if last_change_id is None:
+            write_cursor.execute('DELETE FROM premium_sync_changes')
+        else:
+            write_cursor.execute(
+                'DELETE FROM premium_sync_changes WHERE change_id <= ?', (last_change_id,),
+            )
+        self.db.conn.sync_logged_tables.clear()
+        self.db.conn.track_sync_changes = True
+
+    def stop_tracking(self, write_cursor: 'DBCursor') -> None:
+        """Stops tracking the changes and forgets the sync head and the logged changes"""
+        self.db.conn.track_sync_changes = False
+        write_cursor.execute(
+            'DELETE FROM key_value_cache WHERE name=?', (PREMIUM_SYNC_HEAD_KEY,),
+        )
+        write_cursor.execute('DELETE FROM premium_sync_changes')
+
+    def maybe_track_changes(self) -> None:
+        """Makes the DB connection log the changed tables if the DB has a sync head. Needs
+        to be called after each connection to the DB, before anything is written.
+
+        A head from before a DB upgrade or one left while premium sync is off is removed
+        since the changes from then on were not or will not be tracked."""
+        with self.db.conn.read_ctx() as cursor:
+            has_head = cursor.execute(
+                'SELECT COUNT(*) FROM key_value_cache WHERE name=?', (PREMIUM_SYNC_HEAD_KEY,),
+            ).fetchone()[0] != 0
+            if has_head is False:
+                return
+
+            keep_tracking = (
+                self.get_head(cursor) is not None and
+                self.db.get_setting(cursor, 'premium_should_sync') is True
+            )
+
+        if keep_tracking:
+            self.db.conn.track_sync_changes = True
+        else:
+            log.debug('Removing stale premium sync head')
+            with self.db.conn.write_ctx() as write_cursor:
+                self.stop_tracking(write_cursor)
+
+    def export_delta(self, cursor: 'DBCursor') -> tuple[bytes, int] | None:
+        """Serializes the current rows of the tables changed since the last sync.
+        Returns them along with the id of the last change they contain or None if
+        nothing changed or if the whole DB should be synced instead. That is when
+        a change could not be attributed to a table or the changed tables have more
+        than MAX_DELTA_ROWS rows."""
+        # so that writes from now on are logged again after the last change id
+        self.db.conn.sync_logged_tables.clear()
+
+        last_change_id = self.get_last_change_id(cursor)
+        if len(changed_tables := self.get_changed_tables(cursor)) == 0:
+            return None
+
+        existing_tables = {x[0] for x in cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table'",
+        )} - UNTRACKED_TABLES
+        if UNKNOWN_SYNC_CHANGE in changed_tables or not changed_tables <= existing_tables:
+            log.debug(f'Can not sync the premium DB changes of tables {changed_tables} as a delta')
+            return None
+
+        tables: dict[str, dict[str, Any]] = {}
+        rows_num = 0
+        for table_name in sorted(_add_cascading_tables(cursor, changed_tables)):
+            rows_num += cursor.execute(f'SELECT COUNT(*) FROM "{table_name}"').fetchone()[0]
+            if rows_num > MAX_DELTA_ROWS:
+                return None
+
+            tables[table_name] = {
+                'columns': _get_table_columns(cursor, table_name),
+                'rows': [
+                    [_serialize_value(x) for x in row]
+                    for row in cursor.execute(f'SELECT * FROM "{table_name}"')
+                ],
+            }
+
+        delta = {'version': DELTA_FORMAT_VERSION, 'tables': tables}
+        return json.dumps(delta, separators=(',', ':')).encode(), last_change_id
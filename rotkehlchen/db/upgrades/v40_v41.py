@@ -58,19 +58,111 @@ def _add_new_supported_locations(write_cursor: 'DBCursor') -> None:
     log.debug('Exit _add_new_supported_locations')
 
 
+def _add_accounting_snapshots_table(write_cursor: 'DBCursor') -> None:
+    """Add the table where the accounting state is snapshotted during PnL reports"""
+    log.debug('Enter _add_accounting_snapshots_table')
+    write_cursor.execute("""CREATE TABLE IF NOT EXISTS accounting_snapshots (
+        timestamp INTEGER NOT NULL,
+        settings_hash TEXT NOT NULL,
+        processed_actions INTEGER NOT NULL,
+        state TEXT NOT NULL,
+        PRIMARY KEY (timestamp, settings_hash)
+    );""")
+    log.debug('Exit _add_accounting_snapshots_table')
+
+
+def _add_history_events_indexes(write_cursor: 'DBCursor') -> None:
+    """Add the indexes of the columns that the history events are filtered and sorted by"""
+    log.debug('Enter _add_history_events_indexes')
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_events_timestamp ON history_events(timestamp, sequence_index);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_events_location ON history_events(location);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_events_location_label ON history_events(location_label);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_events_asset ON history_events(asset);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_history_events_type ON history_events(type, subtype);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_evm_events_info_tx_hash ON evm_events_info(tx_hash);')  # noqa: E501
+    write_cursor.execute('CREATE INDEX IF NOT EXISTS idx_evm_events_info_counterparty ON evm_events_info(counterparty);')  # noqa: E501
+    log.debug('Exit _add_history_events_indexes')
+
+
+def _add_premium_sync_changes_table(write_cursor: 'DBCursor') -> None:
+    """Add the table where the tables changed since the last premium sync are tracked"""
+    log.debug('Enter _add_premium_sync_changes_table')
+    write_cursor.execute("""CREATE TABLE IF NOT EXISTS premium_sync_changes (
+        change_id INTEGER NOT NULL PRIMARY KEY,
+        table_name TEXT NOT NULL UNIQUE
+    );""")
+    log.debug('Exit _add_premium_sync_changes_table')
+
+
+def _add_balance_snapshots_table(write_cursor: 'DBCursor') -> None:
+    """Add the table with the timestamps of the balance snapshots and fill it with the
+    existing snapshots, marking the last one of each day (1) and of each week (2)"""
+    log.debug('Enter _add_balance_snapshots_table')
+    write_cursor.execute("""CREATE TABLE IF NOT EXISTS balance_snapshots (
+        timestamp INTEGER NOT NULL PRIMARY KEY,
+        resolution INTEGER NOT NULL DEFAULT 0
+    );""")
+    write_cursor.execute(
+        'INSERT OR IGNORE INTO balance_snapshots(timestamp) '
+        'SELECT timestamp FROM timed_balances UNION SELECT timestamp FROM timed_location_data',
+    )
+    write_cursor.execute(
+        'UPDATE balance_snapshots SET resolution = CASE '
+        'WHEN timestamp IN (SELECT MAX(timestamp) FROM balance_snapshots GROUP BY (timestamp / 86400 + 3) / 7) THEN 2 '  # noqa: E501
+        'WHEN timestamp IN (SELECT MAX(timestamp) FROM balance_snapshots GROUP BY timestamp / 86400) THEN 1 '  # noqa: E501
+        'ELSE 0 END',
+    )
+    log.debug('Exit _add_balance_snapshots_table')
+
+
+def _add_xpub_derived_addresses_table(write_cursor: 'DBCursor') -> None:
+    """Add the table where the addresses derived from the xpubs are kept"""
+    log.debug('Enter _add_xpub_derived_addresses_table')
+    write_cursor.execute("""CREATE TABLE IF NOT EXISTS xpub_derived_addresses (
+        xpub TEXT NOT NULL,
+        derivation_path TEXT NOT NULL,
+        blockchain TEXT NOT NULL,
+        account_index INTEGER NOT NULL,
+        derived_index INTEGER NOT NULL,
+        address TEXT NOT NULL,
+        FOREIGN KEY(xpub, derivation_path, blockchain) REFERENCES xpubs(
+            xpub,
+            derivation_path,
+            blockchain
+        ) ON DELETE CASCADE
+        PRIMARY KEY (xpub, derivation_path, blockchain, account_index, derived_index)
+    );""")
+    log.debug('Exit _add_xpub_derived_addresses_table')
+
+
 def upgrade_v40_to_v41(db: 'DBHandler', progress_handler: 'DBUpgradeProgressHandler') -> None:
     """Upgrades the DB from v40 to v41. This was in v1.32 release.
 
         - Create a new table for key-value cache
+        - Create a new table for accounting snapshots
+        - Add indexes to the history events tables
+        - Create a new table for the changes since the last premium sync
+        - Create a new table for the timestamps of the balance snapshots
+        - Create a new table for the addresses derived from the xpubs
     """
     log.debug('Enter userdb v40->v41 upgrade')
-    progress_handler.set_total_steps(3)
+    progress_handler.set_total_steps(8)
     with db.user_write() as write_cursor:
         _add_cache_table(write_cursor)
         progress_handler.new_step()
         _move_non_settings_mappings_to_cache(write_cursor)
         progress_handler.new_step()
         _add_new_supported_locations(write_cursor)
+        progress_handler.new_step()
+        _add_accounting_snapshots_table(write_cursor)
+        progress_handler.new_step()
+        _add_history_events_indexes(write_cursor)
+        progress_handler.new_step()
+        _add_premium_sync_changes_table(write_cursor)
+        progress_handler.new_step()
+        _add_balance_snapshots_table(write_cursor)
+        progress_handler.new_step()
+        _add_xpub_derived_addresses_table(write_cursor)
     progress_handler.new_step()
 
     log.debug('Finish userdb v40->v41 upgrade')
@@ -2,7 +2,9 @@ import hashlib
 import hmac
 import json
 import logging
+import time
 from collections import defaultdict
+from collections.abc import Mapping
 from contextlib import suppress
 from json.decoder import JSONDecodeError
 from typing import TYPE_CHECKING, Any, Literal
@@ -11,12 +13,14 @@ from uuid import uuid4
 
 import gevent
 import requests
+from gevent.pool import Pool
 
 from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.assets.asset import AssetWithOracles
 from rotkehlchen.assets.converters import asset_from_binance
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_USD
+from rotkehlchen.db.cache import DBCacheDynamic
 from rotkehlchen.db.constants import BINANCE_MARKETS_KEY
 from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.db.ranges import DBQueryRanges
@@ -109,6 +113,16 @@ BINANCE_API_TYPE = Literal['api', 'sapi', 'dapi', 'fapi']
 BINANCE_BASE_URL = 'binance.com/'
 BINANCEUS_BASE_URL = 'binance.us/'
 
+# Request weight that the api endpoints allow per minute. The limit of binance.us is lower.
+# https://binance-docs.github.io/apidocs/spot/en/#limits
+API_WEIGHT_LIMITS = {BINANCE_BASE_URL: 6000, BINANCEUS_BASE_URL: 1200}
+# Fraction of the weight limit we use, leaving the rest to other clients of the same IP
+API_WEIGHT_LIMIT_USAGE = 0.8
+# Request weight of the /api methods we call. Anything else weighs 1.
+API_METHOD_WEIGHTS = {'account': 20, 'exchangeInfo': 20, 'myTrades': 20, 'openOrders': 80}
+# Max number of pairs whose trades are queried at the same time
+TRADES_QUERY_CONCURRENCY = 8
+
 
 class BinancePermissionError(RemoteError):
     """Exception raised when a binance permission problem is detected
@@ -116,6 +130,46 @@ class BinancePermissionError(RemoteError):
     Example is when there is no margin account to query or insufficient api key permissions."""
 
 
+class RequestWeightLimiter:
+    """Keeps the request weight used in each minute under binance's limit so that
+    concurrent queries wait for the next minute instead of getting a 429 response.
+
+    Binance counts the weight of an IP per minute and returns the count in the
+    X-MBX-USED-WEIGHT-1M header of each response, which also accounts for the
+    requests of other clients of the same IP."""
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.minute = 0
+        self.used_weight = 0
+
+    def _current_minute(self) -> int:
+        if (minute := int(time.time() // 60)) != self.minute:
+            self.minute = minute
+            self.used_weight = 0
+        return minute
+
+    def acquire(self, weight: int) -> None:
+        """Block the greenlet until the request of the given weight fits in the limit"""
+        while True:
+            minute = self._current_minute()
+            if self.used_weight + weight <= self.limit:
+                self.used_weight += weight
+                return
+
+            log.debug(f'Binance request weight limit of {self.limit} reached. Waiting')
+            gevent.sleep((minute + 1) * 60 - time.time())
+
+    def update(self, response_headers: Mapping[str, str]) -> None:
+        """Sync the used weight with the one that binance reports"""
+        if (used_weight := response_headers.get('x-mbx-used-weight-1m')) is None:
+            return
+
+        with suppress(ValueError):
+            self._current_minute()
+            self.used_weight = max(self.used_weight, int(used_weight))
+
+
 def trade_from_binance(
         binance_trade: dict,
         binance_symbols_to_pair: dict[str, BinancePair],
@@ -227,6 +281,9 @@ class Binance(ExchangeInterface, ExchangeWithExtras):
         self.msg_aggregator = msg_aggregator
         self.offset_ms = 0
         self.selected_pairs = binance_selected_trade_pairs
+        self.weight_limiter = RequestWeightLimiter(
+            int(API_WEIGHT_LIMITS.get(uri, API_WEIGHT_LIMITS[BINANCEUS_BASE_URL]) * API_WEIGHT_LIMIT_USAGE),  # noqa: E501
+        )
 
     def first_connection(self) -> None:
         if self.first_connection_made:
@@ -309,6 +366,9 @@ class Binance(ExchangeInterface, ExchangeWithExtras):
             if 'signature' in call_options:
                 del call_options['signature']
 
+            if api_type == 'api':  # wait before signing since the signature has a timestamp
+                self.weight_limiter.acquire(API_METHOD_WEIGHTS.get(method, 1))
+
             is_v3_api_method = api_type == 'api' and method in V3_METHODS
             is_new_futures_api = api_type in {'fapi', 'dapi'}
             api_version = 3  # public methos are v3
@@ -348,6 +408,9 @@ class Binance(ExchangeInterface, ExchangeWithExtras):
                     f'{self.name} API request failed due to {e!s}',
                 ) from e
 
+            if api_type == 'api':
+                self.weight_limiter.update(response.headers)
+
             if response.status_code not in {200, 418, 429}:
                 code = 'no code found'
                 msg = 'no message found'
@@ -970,12 +1033,104 @@ class Binance(ExchangeInterface, ExchangeWithExtras):
         )
         return dict(returned_balances), ''
 
+    def _query_pair_trades(self, symbol: str, from_id: int) -> list[dict[str, Any]]:
+        """Query the trades of a pair starting from the given trade id
+
+        May raise due to api query and unexpected id:
+        - RemoteError
+        - BinancePermissionError
+        """
+        raw_data = []
+        # Limit of results to return. 1000 is max limit according to docs
+        limit = 1000
+        len_result = limit
+        while len_result == limit:
+            # We know that myTrades returns a list from the api docs
+            result = self.api_query_list(
+                'api',
+                'myTrades',
+                options={
+                    'symbol': symbol,
+                    'fromId': from_id,
+                    'limit': limit,
+                    # Not specifying them since binance does not seem to
+                    # respect them and always return all trades
+                })
+            if result:
+                try:
+                    from_id = int(result[-1]['id']) + 1
+                except (ValueError, KeyError, IndexError) as e:
+                    raise RemoteError(
+                        f'Could not parse id from Binance myTrades api query result: {result}',
+                    ) from e
+
+            len_result = len(result)
+            log.debug(f'{self.name} myTrades query result', results_num=len_result)
+            for r in result:
+                r['symbol'] = symbol
+            raw_data.extend(result)
+
+        return raw_data
+
+    def _deserialize_trade(self, raw_trade: dict[str, Any]) -> Trade | None:
+        """Turn a binance trade to a Trade. Returns None and lets the user know if it fails"""
+        try:
+            return trade_from_binance(
+                binance_trade=raw_trade,
+                binance_symbols_to_pair=self.symbols_to_pair,
+                location=self.location,
+            )
+        except UnknownAsset as e:
+            self.msg_aggregator.add_warning(
+                f'Found {self.name} trade with unknown asset '
+                f'{e.identifier}. Ignoring it.',
+            )
+        except UnsupportedAsset as e:
+            self.msg_aggregator.add_warning(
+                f'Found {self.name} trade with unsupported asset '
+                f'{e.identifier}. Ignoring it.',
+            )
+        except (DeserializationError, KeyError) as e:
+            msg = str(e)
+            if isinstance(e, KeyError):
+                msg = f'Missing key entry for {msg}.'
+            self.msg_aggregator.add_error(
+                f'Error processing a {self.name} trade. Check logs '
+                f'for details. Ignoring it.',
+            )
+            log.error(
+                f'Error processing a {self.name} trade',
+                trade=raw_trade,
+                error=msg,
+            )
+
+        return None
+
     def query_online_trade_history(
             self,
             start_ts: Timestamp,
             end_ts: Timestamp,
     ) -> tuple[list[Trade], tuple[Timestamp, Timestamp]]:
+        """May raise due to api query and unexpected id:
+        - RemoteError
+        - BinancePermissionError
         """
+        trades, queried_range, _ = self.query_online_trade_history_with_last_ids(
+            start_ts=start_ts,
+            end_ts=end_ts,
+        )
+        return trades, queried_range
+
+    def query_online_trade_history_with_last_ids(
+            self,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+    ) -> tuple[list[Trade], tuple[Timestamp, Timestamp], dict[str, int]]:
+        """Query the trades of the pairs after the last trade id saved for each pair and
+        all the trades of the pairs without one. Binance does not respect a time range
+        when querying trades so the trades before start_ts are also returned, since the
+        last ids move past them and they would not be queried again. Returns the trades
+        along with the new last trade ids, which should be saved together with the trades.
 
         May raise due to api query and unexpected id:
         - RemoteError
@@ -987,90 +1142,67 @@ class Binance(ExchangeInterface, ExchangeWithExtras):
         else:
             iter_markets = list(self._symbols_to_pair.keys())
 
-        raw_data = []
-        # Limit of results to return. 1000 is max limit according to docs
-        limit = 1000
-        for symbol in iter_markets:
-            last_trade_id = 0
-            len_result = limit
-            while len_result == limit:
-                # We know that myTrades returns a list from the api docs
-                result = self.api_query_list(
-                    'api',
-                    'myTrades',
-                    options={
-                        'symbol': symbol,
-                        'fromId': last_trade_id,
-                        'limit': limit,
-                        # Not specifying them since binance does not seem to
-                        # respect them and always return all trades
-                    })
-                if result:
-                    try:
-                        last_trade_id = int(result[-1]['id']) + 1
-                    except (ValueError, KeyError, IndexError) as e:
-                        raise RemoteError(
-                            f'Could not parse id from Binance myTrades api query result: {result}',
-                        ) from e
-
-                len_result = len(result)
-                log.debug(f'{self.name} myTrades query result', results_num=len_result)
-                for r in result:
-                    r['symbol'] = symbol
-                raw_data.extend(result)
-
-            raw_data.sort(key=lambda x: x['time'])
-
-        trades = []
-        for raw_trade in raw_data:
-            try:
-                trade = trade_from_binance(
-                    binance_trade=raw_trade,
-                    binance_symbols_to_pair=self.symbols_to_pair,
-                    location=self.location,
-                )
-            except UnknownAsset as e:
-                self.msg_aggregator.add_warning(
-                    f'Found {self.name} trade with unknown asset '
-                    f'{e.identifier}. Ignoring it.',
-                )
-                continue
-            except UnsupportedAsset as e:
-                self.msg_aggregator.add_warning(
-                    f'Found {self.name} trade with unsupported asset '
-                    f'{e.identifier}. Ignoring it.',
-                )
-                continue
-            except (DeserializationError, KeyError) as e:
-                msg = str(e)
-                if isinstance(e, KeyError):
-                    msg = f'Missing key entry for {msg}.'
-                self.msg_aggregator.add_error(
-                    f'Error processing a {self.name} trade. Check logs '
-                    f'for details. Ignoring it.',
-                )
-                log.error(
-                    f'Error processing a {self.name} trade',
-                    trade=raw_trade,
-                    error=msg,
-                )
-                continue
+        with self.db.conn.read_ctx() as cursor:
+            last_ids = {
+                symbol: self.db.get_dynamic_cache(
+                    cursor=cursor,
+                    name=DBCacheDynamic.BINANCE_PAIR_LAST_ID,
+                    location=str(self.location),
+                    location_name=self.name,
+                    queried_pair=symbol,
+                ) for symbol in iter_markets
+            }
 
-            # Since binance does not respect the given timestamp range, limit the range here
-            if trade.timestamp < start_ts:
-                continue
+        # the pairs are queried concurrently and the weight limiter of api_query
+        # makes them wait if they would go over the request weight limit
+        pool = Pool(TRADES_QUERY_CONCURRENCY)
+        greenlets = {
+            symbol: pool.spawn(
+                self._query_pair_trades,
+                symbol=symbol,
+                from_id=0 if (last_id := last_ids[symbol]) is None else last_id + 1,
+            ) for symbol in iter_markets
+        }
+        try:
+            pool.join(raise_error=True)
+        finally:
+            pool.kill()
+
+        trades, new_last_ids = [], {}
+        for symbol, greenlet in greenlets.items():
+            # The last id only moves past consecutive trades that are returned. Trades
+            # after end_ts and trades that could not be processed are queried again.
+            last_id_moves = True
+            for raw_trade in greenlet.value:
+                if (trade := self._deserialize_trade(raw_trade)) is None:
+                    last_id_moves = False
+                    continue
 
-            if trade.timestamp > end_ts:
-                break
+                if trade.timestamp > end_ts:
+                    break
 
-            trades.append(trade)
+                trades.append(trade)
+                if last_id_moves:
+                    new_last_ids[symbol] = int(raw_trade['id'])
 
-        fiat_payments = self._query_online_fiat_payments(start_ts=start_ts, end_ts=end_ts)
-        if fiat_payments:
-            trades += fiat_payments
-            trades.sort(key=lambda x: x.timestamp)
+        trades += self._query_online_fiat_payments(start_ts=start_ts, end_ts=end_ts)
+        trades.sort(key=lambda x: x.timestamp)
+        return trades, (start_ts, end_ts), new_last_ids
 
-        return trades, (start_ts, end_ts)
+    def save_trades_last_ids(
+            self,
+            write_cursor: 'DBCursor',
+            last_ids: dict[str, int],
+    ) -> None:
+        for symbol, last_id in last_ids.items():
+            self.db.set_dynamic_cache(
+                write_cursor=write_cursor,
+                name=DBCacheDynamic.BINANCE_PAIR_LAST_ID,
+                value=last_id,
+                location=str(self.location),
+                location_name=self.name,
+                queried_pair=symbol,
+            )
 
     def _query_online_fiat_payments(self, start_ts: Timestamp, end_ts: Timestamp) -> list[Trade]:
         if self.location == Location.BINANCEUS:
@@ -177,6 +177,16 @@ class AssetMovement(AccountingEventMixin):
     def should_ignore(self, ignored_ids_mapping: dict[ActionType, set[str]]) -> bool:
         return self.identifier in ignored_ids_mapping.get(ActionType.ASSET_MOVEMENT, set())
 
+    def get_assets_to_price(
+            self,
+            accounting: 'AccountingPot',
+            events_iterator: Iterator['AccountingEventMixin'],  # pylint: disable=unused-argument
+    ) -> tuple[list[Asset], int]:
+        if self.asset.identifier == 'KFEE' or not accounting.settings.account_for_assets_movements or self.fee == ZERO:  # noqa: E501
+            return [], 1
+
+        return [self.fee_asset], 1
+
     def process(
             self,
             accounting: 'AccountingPot',
@@ -347,6 +357,20 @@ class Trade(AccountingEventMixin):
     def should_ignore(self, ignored_ids_mapping: dict[ActionType, set[str]]) -> bool:
         return self.identifier in ignored_ids_mapping.get(ActionType.TRADE, set())
 
+    def get_assets_to_price(
+            self,
+            accounting: 'AccountingPot',
+            events_iterator: Iterator['AccountingEventMixin'],  # pylint: disable=unused-argument
+    ) -> tuple[list[Asset], int]:
+        if self.rate == ZERO or self.amount == ZERO or self.trade_type not in (TradeType.BUY, TradeType.SELL):  # noqa: E501
+            return [], 1
+
+        assets = [self.base_asset, self.quote_asset]
+        # the fee price is looked up unless it's one of the prices of the trade
+        if self.fee is not None and self.fee_currency is not None and self.fee != ZERO and self.fee_currency not in assets:  # noqa: E501
+            assets.append(self.fee_currency)
+        return assets, 1
+
     def process(
             self,
             accounting: 'AccountingPot',
@@ -583,6 +607,16 @@ class MarginPosition(AccountingEventMixin):
     def should_ignore(self, ignored_ids_mapping: dict[ActionType, set[str]]) -> bool:
         return False
 
+    def get_assets_to_price(
+            self,
+            accounting: 'AccountingPot',
+            events_iterator: Iterator['AccountingEventMixin'],  # pylint: disable=unused-argument
+    ) -> tuple[list[Asset], int]:
+        assets = [self.pl_currency] if self.profit_loss != ZERO else []
+        if self.fee != ZERO:
+            assets.append(self.fee_currency)
+        return assets, 1
+
     def process(
             self,
             accounting: 'AccountingPot',
@@ -678,6 +712,13 @@ class Loan(AccountingEventMixin):
     def get_assets(self) -> list[Asset]:
         return [self.currency]
 
+    def get_assets_to_price(
+            self,
+            accounting: 'AccountingPot',
+            events_iterator: Iterator['AccountingEventMixin'],  # pylint: disable=unused-argument
+    ) -> tuple[list[Asset], int]:
+        return [self.currency] if self.earned != self.fee else [], 1
+
     def process(
             self,
             accounting: 'AccountingPot',
@@ -3,8 +3,6 @@ from abc import abstractmethod
 from collections.abc import Callable
 from typing import TYPE_CHECKING, Any
 
-import requests
-
 from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.assets.asset import AssetWithOracles
 from rotkehlchen.db.filtering import (
@@ -27,12 +25,13 @@ from rotkehlchen.types import (
     T_ApiSecret,
     Timestamp,
 )
-from rotkehlchen.utils.misc import set_user_agent
 from rotkehlchen.utils.mixins.cacheable import CacheableMixIn
 from rotkehlchen.utils.mixins.lockable import LockableQueryMixIn, protect_with_lock
+from rotkehlchen.utils.network import create_session
 
 if TYPE_CHECKING:
     from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.db.drivers.gevent import DBCursor
     from rotkehlchen.history.events.structures.base import HistoryEvent
 
 logger = logging.getLogger(__name__)
@@ -89,8 +88,7 @@ class ExchangeInterface(CacheableMixIn, LockableQueryMixIn):
         self.api_key = api_key
         self.secret = secret
         self.first_connection_made = False
-        self.session = requests.session()
-        set_user_agent(self.session)
+        self.session = create_session()
         log.info(f'Initialized {location!s} exchange {name}')
 
     def reset_to_db_credentials(self) -> None:
@@ -188,6 +186,31 @@ class ExchangeInterface(CacheableMixIn, LockableQueryMixIn):
             'query_online_trade_history() should only be implemented by subclasses',
         )
 
+    def query_online_trade_history_with_last_ids(
+            self,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+    ) -> tuple[list[Trade], tuple[Timestamp, Timestamp], dict[str, int]]:
+        """Same as query_online_trade_history but also returns the id of the last trade
+        queried of each market, for exchanges that only query the trades after it.
+        The ids should be saved with save_trades_last_ids() along with the trades.
+        """
+        trades, queried_range = self.query_online_trade_history(
+            start_ts=start_ts,
+            end_ts=end_ts,
+        )
+        return trades, queried_range, {}
+
+    def save_trades_last_ids(
+            self,
+            write_cursor: 'DBCursor',
+            last_ids: dict[str, int],
+    ) -> None:
+        """Saves the ids returned by query_online_trade_history_with_last_ids()
+
+        Should be implemented by subclasses that query the trades after the last id
+        """
+
     def query_online_margin_history(
             self,
             start_ts: Timestamp,
@@ -271,15 +294,16 @@ class ExchangeInterface(CacheableMixIn, LockableQueryMixIn):
                     f'Querying online trade history for {self.name} between '
                     f'{query_start_ts} and {query_end_ts}',
                 )
-                new_trades, queried_range = self.query_online_trade_history(
+                new_trades, queried_range, last_ids = self.query_online_trade_history_with_last_ids(  # noqa: E501
                     start_ts=query_start_ts,
                     end_ts=query_end_ts,
                 )
 
-                # make sure to add them to the DB
+                # make sure to add them to the DB along with the ids to continue from
                 with self.db.user_write() as write_cursor:
                     if len(new_trades) != 0:
                         self.db.add_trades(write_cursor=write_cursor, trades=new_trades)
+                    self.save_trades_last_ids(write_cursor=write_cursor, last_ids=last_ids)
 
                     # and also set the used queried timestamp range for the exchange
                     ranges.update_used_query_range(
@@ -22,7 +22,8 @@ from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.serialization.deserialize import deserialize_fval
 from rotkehlchen.types import ChecksumEvmAddress, ExternalService, Timestamp
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.misc import from_wei, iso8601ts_to_timestamp, set_user_agent, ts_sec_to_ms
+from rotkehlchen.utils.misc import from_wei, iso8601ts_to_timestamp, ts_sec_to_ms
+from rotkehlchen.utils.network import create_session
 from rotkehlchen.utils.serialization import jsonloads_dict
 
 if TYPE_CHECKING:
@@ -39,8 +40,7 @@ class Blockscout(ExternalServiceWithApiKey):
         super().__init__(database=database, service_name=ExternalService.BLOCKSCOUT)
         self.db: DBHandler  # specifying DB is not optional
         self.msg_aggregator = msg_aggregator
-        self.session = requests.session()
-        set_user_agent(self.session)
+        self.session = create_session()
         self.url = 'https://eth.blockscout.com/api/v2/'
 
     def _query(
@@ -20,7 +20,8 @@ from rotkehlchen.types import (
     Timestamp,
 )
 from rotkehlchen.user_messages import MessagesAggregator
-from rotkehlchen.utils.misc import create_timestamp, set_user_agent, ts_now
+from rotkehlchen.utils.misc import create_timestamp, ts_now
+from rotkehlchen.utils.network import create_session
 
 COVALENT_QUERY_LIMIT = 1000
 CONST_RETRY = 1
@@ -87,8 +88,7 @@ class Covalent(ExternalServiceWithApiKey):
             chain_id: int,
     ) -> None:
         super().__init__(database=database, service_name=ExternalService.COVALENT)
-        self.session = requests.session()
-        set_user_agent(self.session)
+        self.session = create_session()
         self.msg_aggregator = msg_aggregator
         self.chain_id = chain_id
 
@@ -7,6 +7,7 @@ from typing import TYPE_CHECKING, Any, Literal, Optional
 
 import gevent
 import requests
+from gevent.pool import Pool
 
 from rotkehlchen.assets.asset import Asset, AssetWithOracles
 from rotkehlchen.constants import ZERO
@@ -52,8 +53,9 @@ from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.interfaces import HistoricalPriceOracleInterface
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import ExternalService, Price, Timestamp
-from rotkehlchen.utils.misc import pairwise, set_user_agent, ts_now
+from rotkehlchen.utils.misc import pairwise, ts_now
 from rotkehlchen.utils.mixins.penalizable_oracle import PenalizablePriceOracleMixin
+from rotkehlchen.utils.network import create_session
 from rotkehlchen.utils.serialization import jsonloads_dict, rlk_jsondumps
 
 if TYPE_CHECKING:
@@ -66,6 +68,8 @@ log = RotkehlchenLogsAdapter(logger)
 RATE_LIMIT_MSG = 'You are over your rate limit please upgrade your account!'
 CRYPTOCOMPARE_QUERY_RETRY_TIMES = 3
 CRYPTOCOMPARE_RATE_LIMIT_WAIT_TIME = 60
+# Number of asset pairs whose histohour data are queried at the same time
+CRYPTOCOMPARE_PAIRS_QUERY_CONCURRENCY = 4
 CRYPTOCOMPARE_SPECIAL_CASES_MAPPING = {
     'ADADOWN': A_USDT,
     'ADAUP': A_USDT,
@@ -200,8 +204,7 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface, P
         )
         PenalizablePriceOracleMixin.__init__(self)
         self.data_directory = data_directory
-        self.session = requests.session()
-        set_user_agent(self.session)
+        self.session = create_session()
         self.last_histohour_query_ts = 0
         self.last_rate_limit = 0
 
@@ -725,20 +728,14 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface, P
 
         # Let's always check for data sanity for the hourly prices.
         _check_hourly_data_sanity(calculated_history, from_asset, to_asset)
-        # Turn them into the format we will enter in the DB
+        # Turn them into the series we will enter in the DB
         prices = []
         for entry in calculated_history:
             try:
                 price = Price((deserialize_price(entry['high']) + deserialize_price(entry['low'])) / 2)  # noqa: E501
                 if price == ZERO_PRICE:
                     continue  # don't write zero prices
-                prices.append(HistoricalPrice(
-                    from_asset=from_asset,
-                    to_asset=to_asset,
-                    source=HistoricalPriceOracle.CRYPTOCOMPARE,
-                    timestamp=Timestamp(entry['time']),
-                    price=price,
-                ))
+                prices.append((Timestamp(entry['time']), price))
             except (DeserializationError, KeyError) as e:
                 msg = str(e)
                 if isinstance(e, KeyError):
@@ -749,9 +746,54 @@ class Cryptocompare(ExternalServiceWithApiKey, HistoricalPriceOracleInterface, P
                 )
                 continue
 
-        GlobalDBHandler().add_historical_prices(prices)
+        GlobalDBHandler().add_historical_price_series(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            source=HistoricalPriceOracle.CRYPTOCOMPARE,
+            prices=prices,
+        )
         self.last_histohour_query_ts = ts_now()  # also save when last query finished
 
+    def query_and_store_historical_data_of_pairs(
+            self,
+            pairs: list[tuple[AssetWithOracles, AssetWithOracles]],
+            timestamp: Timestamp,
+    ) -> list[tuple[AssetWithOracles, AssetWithOracles]]:
+        """Get historical hour price data from cryptocompare for the given asset pairs,
+        CRYPTOCOMPARE_PAIRS_QUERY_CONCURRENCY pairs at a time, and populate the global DB.
+
+        A pair whose query fails is skipped. Pairs are not queried once cryptocompare has
+        rate limited us and are returned so that they can be queried later.
+        """
+        not_queried = []
+
+        def query_pair(from_asset: AssetWithOracles, to_asset: AssetWithOracles) -> None:
+            if self.rate_limited_in_last():
+                not_queried.append((from_asset, to_asset))
+                return
+
+            try:
+                self.query_and_store_historical_data(
+                    from_asset=from_asset,
+                    to_asset=to_asset,
+                    timestamp=timestamp,
+                )
+            except (RemoteError, PriceQueryUnsupportedAsset) as e:
+                log.warning(
+                    f'Failed to query cryptocompare historical prices of {from_asset} / '
+                    f'{to_asset} due to {e!s}. Skipping',
+                )
+
+        pool = Pool(CRYPTOCOMPARE_PAIRS_QUERY_CONCURRENCY)
+        for from_asset, to_asset in pairs:
+            pool.spawn(query_pair, from_asset, to_asset)
+        try:
+            pool.join(raise_error=True)
+        finally:
+            pool.kill()
+
+        return not_queried
+
     def query_historical_price(
             self,
             from_asset: Asset,
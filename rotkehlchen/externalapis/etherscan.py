@@ -38,7 +38,8 @@ from rotkehlchen.types import (
     deserialize_evm_tx_hash,
 )
 from rotkehlchen.utils.data_structures import LRUCacheWithRemove
-from rotkehlchen.utils.misc import hex_or_bytes_to_int, set_user_agent
+from rotkehlchen.utils.misc import hex_or_bytes_to_int
+from rotkehlchen.utils.network import create_session
 from rotkehlchen.utils.serialization import jsonloads_dict
 
 if TYPE_CHECKING:
@@ -102,9 +103,8 @@ class Etherscan(ExternalServiceWithApiKey, metaclass=ABCMeta):
             SupportedBlockchain.GNOSIS,
         ) else 'api-'
         self.base_url = base_url
-        self.session = requests.session()
+        self.session = create_session()
         self.warning_given = False
-        set_user_agent(self.session)
         self.timestamp_to_block_cache: LRUCacheWithRemove[Timestamp, int] = LRUCacheWithRemove(maxsize=32)  # noqa: E501
         # set per-chain earliest timestamps that can be turned to blocks. Never returns block 0
         if service == ExternalService.ETHERSCAN:
@@ -1,4 +1,5 @@
 from decimal import Decimal, InvalidOperation
+from functools import cache
 from typing import Any, Union
 
 from rotkehlchen.errors.serialization import ConversionError
@@ -7,6 +8,11 @@ from rotkehlchen.errors.serialization import ConversionError
 AcceptableFValInitInput = Union[float, bytes, Decimal, int, str, 'FVal']
 AcceptableFValOtherInput = Union[int, 'FVal']
 
+# Results of operations are created without going through the constructor since they
+# are always Decimals. Together with the inlined FVal check of the other operand this
+# avoids most of the wrapper overhead on top of the Decimal arithmetic.
+_new_fval = object.__new__
+
 
 class FVal:
     """A value to represent numbers for financial applications. At the moment
@@ -23,7 +29,9 @@ class FVal:
     def __init__(self, data: AcceptableFValInitInput = 0):
 
         try:
-            if isinstance(data, float):
+            if isinstance(data, str | Decimal):
+                self.num = Decimal(data)
+            elif isinstance(data, float):
                 self.num = Decimal(str(data))
             elif isinstance(data, bytes):
                 # assume it's an ascii string and try to decode the bytes to one
@@ -32,7 +40,7 @@ class FVal:
                 # This elif has to come before the isinstance(int) check due to
                 # https://stackoverflow.com/questions/37888620/comparing-boolean-and-int-using-isinstance
                 raise ValueError('Invalid type bool for data given to FVal constructor')
-            elif isinstance(data, Decimal | int | str):
+            elif isinstance(data, int):
                 self.num = Decimal(data)
             elif isinstance(data, FVal):
                 self.num = data.num
@@ -54,21 +62,23 @@ class FVal:
     def __hash__(self) -> int:
         return hash(self.num)
 
+    # The operators check the other operand with `type(other) is FVal` instead of a helper or
+    # isinstance since it's the cheapest check, and FVal is never subclassed. Other operands
+    # go through _evaluate_input.
+    # pylint: disable=unidiomatic-typecheck
+
+    # Ordering comparisons of Decimals signal InvalidOperation for NaN, same as compare_signal
     def __gt__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = _evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) == Decimal('1')
+        return self.num > (other.num if type(other) is FVal else _evaluate_input(other))
 
     def __lt__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = _evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) == Decimal('-1')
+        return self.num < (other.num if type(other) is FVal else _evaluate_input(other))
 
     def __le__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = _evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) in (Decimal('-1'), Decimal('0'))
+        return self.num <= (other.num if type(other) is FVal else _evaluate_input(other))
 
     def __ge__(self, other: AcceptableFValOtherInput) -> bool:
-        evaluated_other = _evaluate_input(other)
-        return self.num.compare_signal(evaluated_other) in (Decimal('1'), Decimal('0'))
+        return self.num >= (other.num if type(other) is FVal else _evaluate_input(other))
 
     def __eq__(self, other: object) -> bool:
         evaluated_other: Decimal | int
@@ -79,59 +89,79 @@ class FVal:
         else:
             evaluated_other = other
 
-        return self.num.compare_signal(evaluated_other) == Decimal('0')
+        if self.num == evaluated_other:
+            return True
+        # keep the signaling behavior of compare_signal for NaN
+        if self.num.is_nan() or (isinstance(evaluated_other, Decimal) and evaluated_other.is_nan()):  # noqa: E501
+            raise InvalidOperation(f'Tried to compare {self.num} with {evaluated_other}')
+        return False
 
     def __add__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__add__(evaluated_other))
+        result = _new_fval(FVal)
+        result.num = self.num + (other.num if type(other) is FVal else _evaluate_input(other))
+        return result
 
     def __sub__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__sub__(evaluated_other))
+        result = _new_fval(FVal)
+        result.num = self.num - (other.num if type(other) is FVal else _evaluate_input(other))
+        return result
 
     def __mul__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__mul__(evaluated_other))
+        result = _new_fval(FVal)
+        result.num = self.num * (other.num if type(other) is FVal else _evaluate_input(other))
+        return result
 
     def __truediv__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__truediv__(evaluated_other))
+        result = _new_fval(FVal)
+        result.num = self.num / (other.num if type(other) is FVal else _evaluate_input(other))
+        return result
 
     def __floordiv__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__floordiv__(evaluated_other))
+        result = _new_fval(FVal)
+        result.num = self.num // (other.num if type(other) is FVal else _evaluate_input(other))
+        return result
 
     def __pow__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__pow__(evaluated_other))
+        result = _new_fval(FVal)
+        result.num = self.num ** (other.num if type(other) is FVal else _evaluate_input(other))
+        return result
 
     def __radd__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__radd__(evaluated_other))
+        result = _new_fval(FVal)
+        result.num = (other.num if type(other) is FVal else _evaluate_input(other)) + self.num
+        return result
 
     def __rsub__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__rsub__(evaluated_other))
+        result = _new_fval(FVal)
+        result.num = (other.num if type(other) is FVal else _evaluate_input(other)) - self.num
+        return result
 
     def __rmul__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__rmul__(evaluated_other))
+        result = _new_fval(FVal)
+        result.num = (other.num if type(other) is FVal else _evaluate_input(other)) * self.num
+        return result
 
     def __rtruediv__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__rtruediv__(evaluated_other))
+        result = _new_fval(FVal)
+        result.num = (other.num if type(other) is FVal else _evaluate_input(other)) / self.num
+        return result
 
     def __rfloordiv__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__rfloordiv__(evaluated_other))
+        result = _new_fval(FVal)
+        result.num = (other.num if type(other) is FVal else _evaluate_input(other)) // self.num
+        return result
 
     def __mod__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__mod__(evaluated_other))
+        result = _new_fval(FVal)
+        result.num = self.num % (other.num if type(other) is FVal else _evaluate_input(other))
+        return result
 
     def __rmod__(self, other: AcceptableFValOtherInput) -> 'FVal':
-        evaluated_other = _evaluate_input(other)
-        return FVal(self.num.__rmod__(evaluated_other))
+        result = _new_fval(FVal)
+        result.num = (other.num if type(other) is FVal else _evaluate_input(other)) % self.num
+        return result
+
+    # pylint: enable=unidiomatic-typecheck
 
     def __float__(self) -> float:
         return float(self.num)
@@ -139,10 +169,14 @@ class FVal:
     # --- Unary operands
 
     def __neg__(self) -> 'FVal':
-        return FVal(self.num.__neg__())
+        result = _new_fval(FVal)
+        result.num = -self.num
+        return result
 
     def __abs__(self) -> 'FVal':
-        return FVal(self.num.copy_abs())
+        result = _new_fval(FVal)
+        result.num = self.num.copy_abs()
+        return result
 
     # --- Other operations
 
@@ -151,9 +185,9 @@ class FVal:
         Fused multiply-add. Return self*other+third with no rounding of the
         intermediate product self*other
         """
-        evaluated_other = _evaluate_input(other)
-        evaluated_third = _evaluate_input(third)
-        return FVal(self.num.fma(evaluated_other, evaluated_third))
+        result = _new_fval(FVal)
+        result.num = self.num.fma(_evaluate_input(other), _evaluate_input(third))
+        return result
 
     def to_percentage(self, precision: int = 4, with_perc_sign: bool = True) -> str:
         return f'{self.num * 100:.{precision}f}{"%" if with_perc_sign else ""}'
@@ -171,13 +205,16 @@ class FVal:
         return int(self.num)
 
     def is_close(self, other: AcceptableFValInitInput, max_diff: str = '1e-6') -> bool:
-        evaluated_max_diff = FVal(max_diff)
-
         if not isinstance(other, FVal):
             other = FVal(other)
 
-        diff_num = abs(self.num - other.num)
-        return diff_num <= evaluated_max_diff.num
+        return abs(self.num - other.num) <= _decimal_from_str(max_diff)
+
+
+@cache
+def _decimal_from_str(value: str) -> Decimal:
+    """Decimals are immutable so the ones of often used string constants can be reused"""
+    return FVal(value).num
 
 
 def _evaluate_input(other: Any) -> Decimal | int:
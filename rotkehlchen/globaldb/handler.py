@@ -3,6 +3,7 @@ import os
 import shutil
 import sqlite3
 from collections import defaultdict
+from collections.abc import Iterable
 from pathlib import Path
 from typing import TYPE_CHECKING, Any, Literal, Optional, cast, overload
 
@@ -42,13 +43,16 @@ from rotkehlchen.types import (
     Price,
     Timestamp,
 )
-from rotkehlchen.utils.misc import timestamp_to_date, ts_now
+from rotkehlchen.utils.data_structures import LRUCacheWithRemove, SizedLRUCache
+from rotkehlchen.utils.misc import get_chunks, timestamp_to_date, ts_now
 from rotkehlchen.utils.serialization import (
     deserialize_asset_with_oracles_from_db,
     deserialize_generic_asset_from_db,
 )
 
 from .migrations.manager import LAST_DATA_MIGRATION, maybe_apply_globaldb_migrations
+from .price_blocks import PRICE_BLOCK_SIZE, decode_price_block, make_price_blocks
+from .price_series import PriceHistoryRow, PriceSeries
 from .schema import DB_SCRIPT_CREATE_TABLES
 from .upgrades.manager import maybe_upgrade_globaldb
 from .utils import GLOBAL_DB_VERSION, globaldb_get_setting_value
@@ -60,6 +64,22 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Max number of (address, chain) entries kept in the evm tokens memory cache
+EVM_TOKENS_CACHE_SIZE = 4096
+# Max number of addresses to bind in a single query when prefetching evm tokens
+EVM_TOKENS_PREFETCH_CHUNK_SIZE = 500
+# Max number of prices, of all pairs, kept in memory in the price series cache. A price
+# takes around 100 bytes in memory, so the cache stays around 100MB.
+PRICE_SERIES_CACHE_MAX_PRICES = 1_000_000
+# Max number of asset pairs to load in a single query
+PRICE_SERIES_LOAD_CHUNK_SIZE = 200
+_EVM_TOKEN_DETAILS_QUERY = (
+    'SELECT A.identifier, B.address, B.chain, B.token_kind, B.decimals, C.name, '
+    'A.symbol, A.started, A.swapped_for, A.coingecko, A.cryptocompare, B.protocol '
+    'FROM evm_tokens AS B JOIN '
+    'common_asset_details AS A ON B.identifier = A.identifier '
+    'JOIN assets AS C on C.identifier=A.identifier '
+)
 
 _ALL_ASSETS_TABLES_JOINS = """
 FROM {dbprefix}assets LEFT JOIN {dbprefix}common_asset_details on {dbprefix}assets.identifier={dbprefix}common_asset_details.identifier
@@ -204,6 +224,11 @@ class GlobalDBHandler:
     conn: DBConnection
     used_backup: bool  # specifies if the global DB was restored from a backup
     packaged_db_lock: Semaphore
+    # Maps (address, chain) to the evm token or to None if the address is not a known token
+    evm_tokens_cache: LRUCacheWithRemove[tuple[ChecksumEvmAddress, ChainID], EvmToken | None]
+    # Maps lowercase (from_asset, to_asset) identifiers to all their prices in price_history.
+    # Bounded by the total number of prices, not pairs, since a pair can have years of prices
+    price_series_cache: SizedLRUCache[tuple[str, str], PriceSeries]
 
     def __new__(
             cls,
@@ -226,6 +251,11 @@ class GlobalDBHandler:
         GlobalDBHandler.__instance._data_directory = data_dir
         GlobalDBHandler.__instance.conn, GlobalDBHandler.__instance.used_backup = _initialize_global_db_directory(data_dir, sql_vm_instructions_cb)  # noqa: E501
         GlobalDBHandler.__instance.packaged_db_lock = Semaphore()
+        GlobalDBHandler.__instance.evm_tokens_cache = LRUCacheWithRemove(maxsize=EVM_TOKENS_CACHE_SIZE)  # noqa: E501
+        GlobalDBHandler.__instance.price_series_cache = SizedLRUCache(
+            get_size=len,
+            maxsize=PRICE_SERIES_CACHE_MAX_PRICES,
+        )
         return GlobalDBHandler.__instance
 
     def filepath(self) -> Path:
@@ -712,6 +742,7 @@ class GlobalDBHandler:
         May raise InputError
         """
         for underlying_token in underlying_tokens:
+            GlobalDBHandler().clean_evm_tokens_cache(underlying_token.address, chain_id)
             # make sure underlying token address is tracked if not already there
             asset_id = GlobalDBHandler.get_evm_token_identifier(
                 cursor=write_cursor,
@@ -801,39 +832,99 @@ class GlobalDBHandler:
 
         return [x[0] for x in result]
 
+    @staticmethod
+    def _deserialize_evm_token(
+            token_data: tuple,
+            underlying_tokens: list[UnderlyingToken] | None,
+    ) -> EvmToken | None:
+        """Deserialize an evm token from the DB. Returns None if it references an unknown asset"""
+        try:
+            return EvmToken.deserialize_from_db(
+                entry=token_data,
+                underlying_tokens=underlying_tokens,
+            )
+        except UnknownAsset as e:
+            log.error(
+                f'Found unknown swapped_for asset {e!s} in '
+                f'the DB when deserializing an EvmToken',
+            )
+            return None
+
     @staticmethod
     def get_evm_token(address: ChecksumEvmAddress, chain_id: ChainID) -> EvmToken | None:
         """Gets all details for an evm token by its address
 
         If no token for the given address can be found None is returned.
+        Results, including addresses that are not tokens, are kept in a memory cache.
         """
+        cache = GlobalDBHandler().evm_tokens_cache
+        if (address, chain_id) in cache:
+            return cache.get((address, chain_id))
+
         with GlobalDBHandler().conn.read_ctx() as cursor:
             cursor.execute(
-                'SELECT A.identifier, B.address, B.chain, B.token_kind, B.decimals, C.name, '
-                'A.symbol, A.started, A.swapped_for, A.coingecko, A.cryptocompare, B.protocol '
-                'FROM evm_tokens AS B JOIN '
-                'common_asset_details AS A ON B.identifier = A.identifier '
-                'JOIN assets AS C on C.identifier=A.identifier WHERE B.address=? AND B.chain=?;',
+                _EVM_TOKEN_DETAILS_QUERY + 'WHERE B.address=? AND B.chain=?;',
                 (address, chain_id.serialize_for_db()),
             )
             results = cursor.fetchall()
             if len(results) == 0:
+                cache.add((address, chain_id), None)
                 return None
 
             token_data = results[0]
             underlying_tokens = GlobalDBHandler().fetch_underlying_tokens(cursor, token_data[0])
 
-        try:
-            return EvmToken.deserialize_from_db(
-                entry=token_data,
-                underlying_tokens=underlying_tokens,
-            )
-        except UnknownAsset as e:
-            log.error(
-                f'Found unknown swapped_for asset {e!s} in '
-                f'the DB when deserializing an EvmToken',
-            )
-            return None
+        token = GlobalDBHandler()._deserialize_evm_token(token_data, underlying_tokens)
+        cache.add((address, chain_id), token)
+        return token
+
+    @staticmethod
+    def prefetch_evm_tokens(addresses: Iterable[ChecksumEvmAddress], chain_id: ChainID) -> None:
+        """Loads in the memory cache all evm tokens of the given addresses that are not
+        cached yet, with one query per chunk of addresses. The addresses that are not
+        tokens are cached as such, so get_evm_token won't query the DB for any of them."""
+        cache = GlobalDBHandler().evm_tokens_cache
+        missing = list({x for x in addresses if (x, chain_id) not in cache})
+        for chunk in get_chunks(missing, EVM_TOKENS_PREFETCH_CHUNK_SIZE):
+            placeholders = ','.join('?' * len(chunk))
+            underlying_tokens: defaultdict[str, list[UnderlyingToken]] = defaultdict(list)
+            with GlobalDBHandler().conn.read_ctx() as cursor:
+                tokens_data = cursor.execute(
+                    _EVM_TOKEN_DETAILS_QUERY + f'WHERE B.address IN ({placeholders}) AND B.chain=?;',  # noqa: E501
+                    (*chunk, chain_id.serialize_for_db()),
+                ).fetchall()
+                if len(tokens_data) != 0:
+                    cursor.execute(
+                        'SELECT A.parent_token_entry, B.address, B.token_kind, A.weight FROM '
+                        'underlying_tokens_list AS A JOIN evm_tokens AS B ON A.identifier=B.identifier '  # noqa: E501
+                        f'WHERE A.parent_token_entry IN ({",".join("?" * len(tokens_data))});',
+                        [x[0] for x in tokens_data],
+                    )
+                    for entry in cursor:
+                        underlying_tokens[entry[0]].append(UnderlyingToken.deserialize_from_db(entry[1:]))
+
+            for address in chunk:  # everything not found below is not a token
+                cache.add((address, chain_id), None)
+            for token_data in tokens_data:
+                cache.add(
+                    (token_data[1], chain_id),
+                    GlobalDBHandler()._deserialize_evm_token(
+                        token_data=token_data,
+                        underlying_tokens=underlying_tokens.get(token_data[0]),
+                    ),
+                )
+
+    @staticmethod
+    def clean_evm_tokens_cache(
+            address: ChecksumEvmAddress | None = None,
+            chain_id: ChainID | None = None,
+    ) -> None:
+        """Remove a single evm token, or all of them if no address is given, from the memory
+        cache. Needs to be called whenever evm tokens are modified in the DB."""
+        if address is not None and chain_id is not None:
+            GlobalDBHandler().evm_tokens_cache.remove((address, chain_id))
+        else:
+            GlobalDBHandler().evm_tokens_cache.clear()
 
     @staticmethod
     def get_evm_tokens(
@@ -937,6 +1028,7 @@ class GlobalDBHandler:
                 msg = f'Ethereum token with identifier {entry.identifier} already exists in the DB'
             raise InputError(msg) from e
 
+        GlobalDBHandler().clean_evm_tokens_cache(entry.evm_address, entry.chain_id)
         if entry.underlying_tokens is not None:
             GlobalDBHandler()._add_underlying_tokens(
                 write_cursor=write_cursor,
@@ -955,6 +1047,13 @@ class GlobalDBHandler:
         """
         try:
             with GlobalDBHandler().conn.write_ctx() as write_cursor:
+                # the address or chain may change so also forget the token at the old ones
+                for address, chain in write_cursor.execute(
+                    'SELECT address, chain FROM evm_tokens WHERE identifier=?',
+                    (entry.identifier,),
+                ).fetchall():
+                    GlobalDBHandler().clean_evm_tokens_cache(address, ChainID.deserialize_from_db(chain))  # noqa: E501
+                GlobalDBHandler().clean_evm_tokens_cache(entry.evm_address, entry.chain_id)
                 write_cursor.execute(
                     'UPDATE common_asset_details SET symbol=?, coingecko=?, '
                     'cryptocompare=?, forked=?, started=?, swapped_for=? WHERE identifier=?;',
@@ -1130,6 +1229,8 @@ class GlobalDBHandler:
         """Delete an asset by identifier EVEN if it's in the owned assets table
          May raise:
          - InputError if no asset with the provided identifier was found"""
+        GlobalDBHandler().clean_evm_tokens_cache()  # the asset may be a token or underlying one
+        GlobalDBHandler().clean_price_series_cache()  # its prices are deleted in cascade
         with GlobalDBHandler().conn.write_ctx() as write_cursor:
             write_cursor.execute('DELETE FROM assets WHERE identifier=?;', (identifier,))
             if write_cursor.rowcount != 1:
@@ -1201,6 +1302,104 @@ class GlobalDBHandler:
 
         return assets
 
+    @staticmethod
+    def load_price_series(pairs: Iterable[tuple['Asset', 'Asset']]) -> None:
+        """Loads in the memory cache the price series of all given asset pairs that
+        are not cached yet, with one query per chunk of pairs"""
+        cache = GlobalDBHandler().price_series_cache
+        missing = list({
+            key for from_asset, to_asset in pairs
+            if (key := (from_asset.identifier.lower(), to_asset.identifier.lower())) not in cache
+        })
+        for chunk in get_chunks(missing, PRICE_SERIES_LOAD_CHUNK_SIZE):
+            rows: defaultdict[tuple[str, str], list[PriceHistoryRow]] = defaultdict(list)
+            pairs_with_blocks: set[tuple[str, str]] = set()
+            with GlobalDBHandler().conn.read_ctx() as cursor:
+                cursor.execute(
+                    'SELECT from_asset, to_asset, source_type, timestamp, price '
+                    'FROM price_history WHERE '
+                    f'{" OR ".join(["(from_asset=? AND to_asset=?)"] * len(chunk))} '
+                    'ORDER BY from_asset, to_asset, source_type, timestamp',
+                    [identifier for pair in chunk for identifier in pair],
+                )
+                for row in cursor:
+                    rows[(row[0].lower(), row[1].lower())].append(row)
+
+                cursor.execute(
+                    'SELECT from_asset, to_asset, source_type, data FROM price_history_blocks '
+                    f'WHERE {" OR ".join(["(from_asset=? AND to_asset=?)"] * len(chunk))} '
+                    'ORDER BY from_asset, to_asset, source_type, start_ts',
+                    [identifier for pair in chunk for identifier in pair],
+                )
+                for from_asset, to_asset, source_type, data in cursor:
+                    key = (from_asset.lower(), to_asset.lower())
+                    timestamps, prices = decode_price_block(data)
+                    rows[key].extend(
+                        (from_asset, to_asset, source_type, timestamp, price)
+                        for timestamp, price in zip(timestamps, prices, strict=True)
+                    )
+                    pairs_with_blocks.add(key)
+
+            for key in chunk:
+                pair_rows = rows.get(key, [])
+                if key in pairs_with_blocks:  # merge the prices of both tables per source
+                    pair_rows.sort(key=lambda row: (row[2], row[3]))
+                cache.add(key, PriceSeries(pair_rows))
+
+    @staticmethod
+    def clean_price_series_cache(pairs: Iterable[tuple['Asset', 'Asset']] | None = None) -> None:
+        """Remove the price series of the given asset pairs, or all of them if no pairs are
+        given, from the memory cache. Needs to be called whenever price_history or
+        price_history_blocks is modified."""
+        cache = GlobalDBHandler().price_series_cache
+        if pairs is None:
+            cache.clear()
+            return
+
+        for from_asset, to_asset in pairs:
+            cache.remove((from_asset.identifier.lower(), to_asset.identifier.lower()))
+
+    @staticmethod
+    def _update_price_series_cache(
+            rows: Iterable[PriceHistoryRow],
+            replace: bool,
+    ) -> None:
+        """Insert the prices of the given rows in the cached price series of their pairs
+        instead of discarding the series. Pairs that are not cached are skipped."""
+        pair_rows: defaultdict[tuple[str, str], list[PriceHistoryRow]] = defaultdict(list)
+        for row in rows:
+            pair_rows[(row[0].lower(), row[1].lower())].append(row)
+
+        cache = GlobalDBHandler().price_series_cache
+        for key, rows_of_pair in pair_rows.items():
+            if (series := cache.get(key)) is not None:
+                series.update(rows=rows_of_pair, replace=replace)
+                cache.add(key, series)  # to account for its new size
+
+    @staticmethod
+    def _remove_from_price_series_cache(
+            from_asset: 'Asset',
+            to_asset: 'Asset',
+            source: HistoricalPriceOracle,
+            timestamp: Timestamp | None = None,
+    ) -> None:
+        """Remove the price at the timestamp, or all the prices if no timestamp is given, of
+        the source from the cached price series of the pair if it's cached"""
+        cache = GlobalDBHandler().price_series_cache
+        key = (from_asset.identifier.lower(), to_asset.identifier.lower())
+        if (series := cache.get(key)) is not None:
+            series.remove(source_type=source.serialize_for_db(), timestamp=timestamp)
+            cache.add(key, series)  # to account for its new size
+
+    @staticmethod
+    def _get_price_series(from_asset: 'Asset', to_asset: 'Asset') -> PriceSeries:
+        key = (from_asset.identifier.lower(), to_asset.identifier.lower())
+        if (series := GlobalDBHandler().price_series_cache.get(key)) is None:
+            GlobalDBHandler().load_price_series([(from_asset, to_asset)])
+            series = GlobalDBHandler().price_series_cache.get(key)
+
+        return series  # type: ignore[return-value]  # was just loaded
+
     @staticmethod
     def get_historical_price(
             from_asset: 'Asset',
@@ -1211,25 +1410,17 @@ class GlobalDBHandler:
     ) -> Optional['HistoricalPrice']:
         """Gets the price around a particular timestamp
 
+        The price series of the pair is loaded in memory the first time it's needed.
         If no price can be found returns None
         """
-        querystr = (
-            'SELECT from_asset, to_asset, source_type, timestamp, '
-            'price, MIN(ABS(timestamp - ?)) FROM price_history '
-            'WHERE from_asset=? AND to_asset=? '
-            'AND timestamp between ? AND ?'
+        result = GlobalDBHandler()._get_price_series(from_asset, to_asset).nearest(
+            timestamp=timestamp,
+            max_seconds_distance=max_seconds_distance,
+            source_type=source.serialize_for_db() if source is not None else None,
         )
-        querylist = [timestamp, from_asset.identifier, to_asset.identifier, timestamp - max_seconds_distance, timestamp + max_seconds_distance]  # noqa: E501
-        if source is not None:
-            querystr += ' AND source_type=? '
-            querylist.append(source.serialize_for_db())
-
-        with GlobalDBHandler().conn.read_ctx() as cursor:
-            result = cursor.execute(querystr, tuple(querylist)).fetchone()
-            if result[0] is None:
-                return None
+        if result is None:
+            return None
 
-        # The result tuple last entry MIN(ABS()) is disregarded in deserialize_from_db
         return HistoricalPrice.deserialize_from_db(result)
 
     @staticmethod
@@ -1240,29 +1431,29 @@ class GlobalDBHandler:
     ) -> list[Optional['HistoricalPrice']]:
         """Given a list of from/to/timestamp data to query returns all values
         that could be found in the DB and None for those that could not be found.
-        """
-        querystr = (
-            'SELECT from_asset, to_asset, source_type, timestamp, price, MIN(ABS(timestamp - ?)) '
-            'FROM price_history WHERE from_asset=? AND to_asset=? AND timestamp BETWEEN ? AND ?'
-        )
-        querylist: list[tuple] = []
-        if source is not None:
-            querystr += ' AND source_type=? '
-            serialized_source = source.serialize_for_db()
-            for from_asset, to_asset, timestamp in query_data:
-                querylist.append((timestamp, from_asset.identifier, to_asset.identifier, timestamp - max_seconds_distance, timestamp + max_seconds_distance, serialized_source))  # noqa: E501
-
-        else:
-            for from_asset, to_asset, timestamp in query_data:
-                querylist.append((timestamp, from_asset.identifier, to_asset.identifier, timestamp - max_seconds_distance, timestamp + max_seconds_distance))  # noqa: E501
 
-        prices_results = []
-        with GlobalDBHandler().conn.read_ctx() as cursor:
-            for entry in querylist:
-                result = cursor.execute(querystr, entry).fetchone()  # below last index of the result tuple is ignored in deserialize  # noqa: E501
-                prices_results.append(None if result[0] is None else HistoricalPrice.deserialize_from_db(result))  # noqa: E501
+        The price series of the pairs are loaded a chunk of pairs at a time and the
+        lookups of each chunk are done before the next one is loaded, since the price
+        series cache may not fit all of them.
+        """
+        pair_queries: defaultdict[tuple[Asset, Asset], list[tuple[int, Timestamp]]] = defaultdict(list)  # noqa: E501
+        for idx, (from_asset, to_asset, timestamp) in enumerate(query_data):
+            pair_queries[(from_asset, to_asset)].append((idx, timestamp))
+
+        results: list[HistoricalPrice | None] = [None] * len(query_data)
+        for chunk in get_chunks(list(pair_queries), PRICE_SERIES_LOAD_CHUNK_SIZE):
+            GlobalDBHandler().load_price_series(chunk)
+            for from_asset, to_asset in chunk:
+                for idx, timestamp in pair_queries[(from_asset, to_asset)]:
+                    results[idx] = GlobalDBHandler().get_historical_price(
+                        from_asset=from_asset,
+                        to_asset=to_asset,
+                        timestamp=timestamp,
+                        max_seconds_distance=max_seconds_distance,
+                        source=source,
+                    )
 
-        return prices_results
+        return results
 
     @staticmethod
     def add_historical_prices(entries: list['HistoricalPrice']) -> None:
@@ -1270,13 +1461,14 @@ class GlobalDBHandler:
 
         If any addition causes a DB error it's skipped and an error is logged
         """
+        added_rows = [x.serialize_for_db() for x in entries]
         try:
             with GlobalDBHandler().conn.write_ctx() as write_cursor:
                 write_cursor.executemany(
                     """INSERT OR IGNORE INTO price_history(
                     from_asset, to_asset, source_type, timestamp, price
                     ) VALUES (?, ?, ?, ?, ?)
-                    """, [x.serialize_for_db() for x in entries],
+                    """, added_rows,
                 )
         except sqlite3.IntegrityError as e:
             # roll back any of the executemany that may have gone in
@@ -1285,19 +1477,118 @@ class GlobalDBHandler:
                 f'Will attempt to input them one by one',
             )
 
+            added_rows = []
             with GlobalDBHandler().conn.write_ctx() as write_cursor:
                 for entry in entries:
+                    serialized = entry.serialize_for_db()
                     try:
                         write_cursor.execute(
                             """INSERT OR IGNORE INTO price_history(
                             from_asset, to_asset, source_type, timestamp, price
                             ) VALUES (?, ?, ?, ?, ?)
-                            """, entry.serialize_for_db(),
+                            """, serialized,
                         )
                     except sqlite3.IntegrityError as entry_error:
                         log.error(
                             f'Failed to add {entry!s} due to {entry_error!s}. Skipping entry addition',  # noqa: E501
                         )
+                    else:
+                        added_rows.append(serialized)
+
+        # prices that already exist are ignored by the insertion, so they are not replaced
+        GlobalDBHandler()._update_price_series_cache(rows=added_rows, replace=False)
+
+    @staticmethod
+    def add_historical_price_series(
+            from_asset: 'Asset',
+            to_asset: 'Asset',
+            source: HistoricalPriceOracle,
+            prices: list[tuple[Timestamp, Price]],
+    ) -> None:
+        """Adds a series of prices of an asset pair in the price_history_blocks table.
+
+        The blocks that the new prices overlap with, and the neighbouring blocks if they are
+        not full, are merged with the new prices and written again. Prices at timestamps
+        that are already stored are skipped.
+        """
+        if len(prices) == 0:
+            return
+
+        pair_bindings = (from_asset.identifier, to_asset.identifier, source.serialize_for_db())
+        merged_prices: dict[int, str] = {timestamp: str(price) for timestamp, price in prices}
+        from_ts, to_ts = min(merged_prices), max(merged_prices)
+        try:
+            with GlobalDBHandler().conn.write_ctx() as write_cursor:
+                blocks = write_cursor.execute(
+                    'SELECT start_ts, data FROM price_history_blocks WHERE from_asset=? AND '
+                    'to_asset=? AND source_type=? AND start_ts<=? AND end_ts>=?',
+                    (*pair_bindings, to_ts, from_ts),
+                ).fetchall()
+                for neighbour_query, timestamp in (
+                    ('end_ts<? ORDER BY start_ts DESC', from_ts),
+                    ('start_ts>? ORDER BY start_ts', to_ts),
+                ):
+                    write_cursor.execute(
+                        'SELECT start_ts, data, prices_num FROM price_history_blocks WHERE '
+                        f'from_asset=? AND to_asset=? AND source_type=? AND {neighbour_query} '
+                        'LIMIT 1',
+                        (*pair_bindings, timestamp),
+                    )
+                    if (neighbour := write_cursor.fetchone()) is not None and neighbour[2] < PRICE_BLOCK_SIZE:  # noqa: E501
+                        blocks.append(neighbour[:2])
+
+                stored_prices: dict[int, str] = {}
+                for _, data in blocks:  # the stored prices are kept
+                    stored_prices.update(zip(*decode_price_block(data), strict=True))
+                merged_prices.update(stored_prices)
+
+                write_cursor.executemany(
+                    'DELETE FROM price_history_blocks WHERE from_asset=? AND to_asset=? AND '
+                    'source_type=? AND start_ts=?',
+                    [(*pair_bindings, start_ts) for start_ts, _ in blocks],
+                )
+                timestamps = sorted(merged_prices)
+                write_cursor.executemany(
+                    'INSERT INTO price_history_blocks(from_asset, to_asset, source_type, '
+                    'start_ts, end_ts, prices_num, data) VALUES(?, ?, ?, ?, ?, ?, ?)',
+                    [
+                        (*pair_bindings, *block) for block in make_price_blocks(
+                            timestamps=timestamps,
+                            prices=[merged_prices[x] for x in timestamps],
+                        )
+                    ],
+                )
+        except sqlite3.IntegrityError as e:
+            log.error(
+                f'Failed to add the historical price series from {from_asset} to {to_asset} '
+                f'and source {source!s} due to {e!s}',
+            )
+            return
+
+        GlobalDBHandler()._update_price_series_cache(
+            rows=[
+                (*pair_bindings, timestamp, price) for timestamp, price in merged_prices.items()
+                if timestamp not in stored_prices
+            ],
+            replace=False,
+        )
+
+    @staticmethod
+    def get_historical_price_series(
+            from_asset: 'Asset',
+            to_asset: 'Asset',
+            source: HistoricalPriceOracle,
+            from_timestamp: Timestamp,
+            to_timestamp: Timestamp,
+    ) -> tuple[list[Timestamp], list[Price]]:
+        """Gets the prices of an asset pair and source from from_timestamp until
+        to_timestamp, inclusive, as the sorted list of their timestamps and their prices"""
+        timestamps, prices = GlobalDBHandler()._get_price_series(from_asset, to_asset).range(
+            source_type=source.serialize_for_db(),
+            from_timestamp=from_timestamp,
+            to_timestamp=to_timestamp,
+        )
+        return timestamps, [deserialize_price(x) for x in prices]  # type: ignore[return-value]  # ints are timestamps
 
     @staticmethod
     def add_single_historical_price(entry: HistoricalPrice) -> bool:
@@ -1323,6 +1614,7 @@ class GlobalDBHandler:
             )
             return False
 
+        GlobalDBHandler()._update_price_series_cache(rows=[serialized], replace=True)
         return True
 
     @staticmethod
@@ -1382,11 +1674,14 @@ class GlobalDBHandler:
                 raise InputError(f'Failed to add manual current price due to: {e!s}') from e
 
             write_cursor.execute(
-                'SELECT from_asset, to_asset FROM price_history WHERE from_asset=? OR to_asset=?',
-                (from_asset.identifier, from_asset.identifier),
+                'SELECT from_asset, to_asset FROM price_history WHERE from_asset=? OR to_asset=? '
+                'UNION SELECT from_asset, to_asset FROM price_history_blocks '
+                'WHERE from_asset=? OR to_asset=?',
+                (from_asset.identifier,) * 4,
             )
             pairs_to_invalidate = [(Asset(entry[0]), Asset(entry[1])) for entry in write_cursor]
 
+        GlobalDBHandler().clean_price_series_cache(pairs_to_invalidate)
         return pairs_to_invalidate
 
     @staticmethod
@@ -1448,7 +1743,8 @@ class GlobalDBHandler:
                     f'Not found manual current price to delete for asset {asset!s}',
                 )
 
-            return pairs_to_invalidate
+        GlobalDBHandler().clean_price_series_cache(pairs_to_invalidate)
+        return pairs_to_invalidate
 
     @staticmethod
     def get_manual_prices(
@@ -1508,6 +1804,7 @@ class GlobalDBHandler:
             )
             return False
 
+        GlobalDBHandler()._update_price_series_cache(rows=[entry_serialized], replace=True)
         return True
 
     @staticmethod
@@ -1539,6 +1836,12 @@ class GlobalDBHandler:
                 )
                 return False
 
+        GlobalDBHandler()._remove_from_price_series_cache(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            source=HistoricalPriceOracle.MANUAL,
+            timestamp=timestamp,
+        )
         return True
 
     @staticmethod
@@ -1547,7 +1850,7 @@ class GlobalDBHandler:
             to_asset: 'Asset',
             source: HistoricalPriceOracle | None = None,
     ) -> None:
-        querystr = 'DELETE FROM price_history WHERE from_asset=? AND to_asset=?'
+        querystr = 'WHERE from_asset=? AND to_asset=?'
         query_list = [from_asset.identifier, to_asset.identifier]
         if source is not None:
             querystr += ' AND source_type=?'
@@ -1555,12 +1858,26 @@ class GlobalDBHandler:
 
         try:
             with GlobalDBHandler().conn.write_ctx() as write_cursor:
-                write_cursor.execute(querystr, tuple(query_list))
+                for table in ('price_history', 'price_history_blocks'):
+                    write_cursor.execute(f'DELETE FROM {table} {querystr}', tuple(query_list))
         except sqlite3.IntegrityError as e:
             log.error(
                 f'Failed to delete historical prices from {from_asset} to {to_asset} '
                 f'and source: {source!s} due to {e!s}',
             )
+            return
+
+        if source is not None:
+            GlobalDBHandler()._remove_from_price_series_cache(
+                from_asset=from_asset,
+                to_asset=to_asset,
+                source=source,
+            )
+        else:  # the pair has no prices left, which needs no query to know
+            GlobalDBHandler().price_series_cache.add(
+                (from_asset.identifier.lower(), to_asset.identifier.lower()),
+                PriceSeries([]),
+            )
 
     @staticmethod
     def get_historical_price_range(
@@ -1568,14 +1885,19 @@ class GlobalDBHandler:
             to_asset: 'Asset',
             source: HistoricalPriceOracle | None = None,
     ) -> tuple[Timestamp, Timestamp] | None:
-        querystr = 'SELECT MIN(timestamp), MAX(timestamp) FROM price_history WHERE from_asset=? AND to_asset=?'  # noqa: E501
+        querystr = 'WHERE from_asset=? AND to_asset=?'
         query_list = [from_asset.identifier, to_asset.identifier]
         if source is not None:
             querystr += ' AND source_type=?'
             query_list.append(source.serialize_for_db())
 
         with GlobalDBHandler().conn.read_ctx() as cursor:
-            query = cursor.execute(querystr, tuple(query_list))
+            query = cursor.execute(
+                'SELECT MIN(start_ts), MAX(end_ts) FROM ('
+                f'SELECT timestamp AS start_ts, timestamp AS end_ts FROM price_history {querystr} '
+                f'UNION ALL SELECT start_ts, end_ts FROM price_history_blocks {querystr})',
+                tuple(query_list) * 2,
+            )
             result = query.fetchone()
             if result is None or None in (result[0], result[1]):
                 return None
@@ -1588,9 +1910,12 @@ class GlobalDBHandler:
         Only used by the API so just returning it as List of dicts from here"""
         with GlobalDBHandler().conn.read_ctx() as cursor:
             query = cursor.execute(
-                'SELECT from_asset, to_asset, MIN(timestamp), MAX(timestamp) FROM '
-                'price_history WHERE source_type=? GROUP BY from_asset, to_asset',
-                (source.serialize_for_db(),),
+                'SELECT from_asset, to_asset, MIN(start_ts), MAX(end_ts) FROM ('
+                'SELECT from_asset, to_asset, timestamp AS start_ts, timestamp AS end_ts FROM '
+                'price_history WHERE source_type=? UNION ALL SELECT from_asset, to_asset, '
+                'start_ts, end_ts FROM price_history_blocks WHERE source_type=?) '
+                'GROUP BY from_asset, to_asset',
+                (source.serialize_for_db(),) * 2,
             )
             return [
                 {'from_asset': entry[0],
@@ -1610,6 +1935,8 @@ class GlobalDBHandler:
         """
         root_dir = Path(__file__).resolve().parent.parent
         builtin_database = root_dir / 'data' / GLOBALDB_NAME
+        self.clean_evm_tokens_cache()
+        self.clean_price_series_cache()
         # Update owned assets
         with user_db.conn.read_ctx() as cursor:
             user_db.update_owned_assets_in_globaldb(cursor)
@@ -1686,6 +2013,8 @@ class GlobalDBHandler:
         """
         root_dir = Path(__file__).resolve().parent.parent
         builtin_database = root_dir / 'data' / GLOBALDB_NAME
+        self.clean_evm_tokens_cache()
+        self.clean_price_series_cache()
 
         with self.packaged_db_lock:
             try:
@@ -18,6 +18,9 @@ if TYPE_CHECKING:
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# How far from a timestamp a manual historical price can be to be used for it
+MANUAL_PRICE_MAX_SECONDS_DISTANCE = 3600
+
 
 class ManualPriceOracle:
 
@@ -41,7 +44,7 @@ class ManualPriceOracle:
             from_asset=from_asset,
             to_asset=to_asset,
             timestamp=timestamp,
-            max_seconds_distance=3600,
+            max_seconds_distance=MANUAL_PRICE_MAX_SECONDS_DISTANCE,
             source=HistoricalPriceOracle.MANUAL,
         )
         if price_entry is not None:
@@ -0,0 +1,65 @@
+import logging
+from typing import TYPE_CHECKING
+
+from rotkehlchen.globaldb.price_blocks import make_price_blocks
+from rotkehlchen.globaldb.schema import DB_CREATE_PRICE_HISTORY_BLOCKS
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.drivers.gevent import DBConnection, DBCursor
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+CRYPTOCOMPARE_SOURCE_TYPE = 'C'
+
+
+def _move_cryptocompare_prices_to_blocks(write_cursor: 'DBCursor') -> int:
+    """Moves the cryptocompare prices from price_history to price_history_blocks, one
+    pair at a time. Returns the number of moved prices"""
+    pairs = write_cursor.execute(
+        'SELECT DISTINCT from_asset, to_asset FROM price_history WHERE source_type=?',
+        (CRYPTOCOMPARE_SOURCE_TYPE,),
+    ).fetchall()
+    moved_num = 0
+    for from_asset, to_asset in pairs:
+        timestamps, prices = [], []
+        for timestamp, price in write_cursor.execute(
+            'SELECT timestamp, price FROM price_history WHERE from_asset=? AND to_asset=? '
+            'AND source_type=? ORDER BY timestamp',
+            (from_asset, to_asset, CRYPTOCOMPARE_SOURCE_TYPE),
+        ):
+            timestamps.append(timestamp)
+            prices.append(price)
+
+        write_cursor.executemany(
+            'INSERT INTO price_history_blocks(from_asset, to_asset, source_type, start_ts, '
+            'end_ts, prices_num, data) VALUES(?, ?, ?, ?, ?, ?, ?)',
+            [
+                (from_asset, to_asset, CRYPTOCOMPARE_SOURCE_TYPE, *block)
+                for block in make_price_blocks(timestamps, prices)
+            ],
+        )
+        write_cursor.execute(
+            'DELETE FROM price_history WHERE from_asset=? AND to_asset=? AND source_type=?',
+            (from_asset, to_asset, CRYPTOCOMPARE_SOURCE_TYPE),
+        )
+        moved_num += len(timestamps)
+
+    return moved_num
+
+
+def globaldb_data_migration_2(conn: 'DBConnection') -> None:
+    """Introduced at 1.32.0
+    - Creates the `price_history_blocks` table. It only holds prices queried by this rotki
+    instance, so it is added without a schema upgrade to keep the global DB version that
+    the assets updates expect.
+    - Moves the cryptocompare prices from `price_history` to `price_history_blocks`
+    """
+    with conn.write_ctx() as write_cursor:
+        write_cursor.execute(DB_CREATE_PRICE_HISTORY_BLOCKS)
+        moved_num = _move_cryptocompare_prices_to_blocks(write_cursor)
+
+    log.debug(f'Moved {moved_num} cryptocompare prices to price_history_blocks')
+    if moved_num != 0:  # give the space of the moved rows back
+        conn.execute('VACUUM;')
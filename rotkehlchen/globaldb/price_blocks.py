@@ -0,0 +1,121 @@
+"""Compact storage of long price series of an asset pair
+
+The hourly prices of a pair that cryptocompare returns cover years, so they are kept in
+the price_history_blocks table instead of as a price_history row each. Each block has up
+to PRICE_BLOCK_SIZE consecutive prices of a pair and source, stored as columns:
+
+- the timestamps, delta encoded. The first one is stored as is and each next one as its
+  difference from the previous, which is almost always 3600 for hourly prices.
+- the prices as fixed point integers with the number of decimals of the block, also
+  delta encoded. The decimals of the block are those of its most precise price, so every
+  price is stored exactly and comes back as the same number.
+
+All the numbers are zigzag varints and the block is zlib compressed, so a price takes a
+couple of bytes instead of a row with a text price and its primary key index entry.
+"""
+import zlib
+from collections.abc import Iterator, Sequence
+from decimal import Decimal
+
+# Max number of prices in a block
+PRICE_BLOCK_SIZE = 1024
+
+
+def _append_varint(buffer: bytearray, value: int) -> None:
+    value = value * 2 if value >= 0 else -value * 2 - 1  # zigzag, to keep small negatives small
+    while value >= 0x80:
+        buffer.append((value & 0x7f) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _iterate_varints(data: bytes) -> Iterator[int]:
+    value, shift = 0, 0
+    for byte in data:
+        value |= (byte & 0x7f) << shift
+        if byte & 0x80:
+            shift += 7
+            continue
+
+        yield value >> 1 if value & 1 == 0 else -(value >> 1) - 1
+        value, shift = 0, 0
+
+
+def _price_decimals(price: Decimal) -> int:
+    exponent = price.as_tuple().exponent
+    assert isinstance(exponent, int), f'Non finite price {price} can not be stored'
+    return max(-exponent, 0)
+
+
+def _to_fixed_point(price: Decimal, decimals: int) -> int:
+    """Returns the price as an integer of the given decimals, which need to be at least
+    the decimals of the price"""
+    sign, digits, exponent = price.as_tuple()
+    shift = exponent + decimals  # type: ignore[operator]  # finite, checked in _price_decimals
+    mantissa = int(''.join(map(str, digits))) * 10 ** shift
+    return -mantissa if sign else mantissa
+
+
+def _from_fixed_point(value: int, decimals: int) -> str:
+    """Returns the string of the price of the given fixed point integer"""
+    digits = str(abs(value)).rjust(decimals + 1, '0')
+    result = digits[:len(digits) - decimals]
+    if decimals != 0 and (fraction := digits[-decimals:].rstrip('0')) != '':
+        result += f'.{fraction}'
+    return f'-{result}' if value < 0 else result
+
+
+def encode_price_block(timestamps: Sequence[int], prices: Sequence[str]) -> bytes:
+    """Encodes the given prices, whose timestamps need to be sorted, into a block"""
+    values = [Decimal(x) for x in prices]
+    decimals = max(_price_decimals(x) for x in values)
+    buffer = bytearray()
+    _append_varint(buffer, decimals)
+    _append_varint(buffer, len(timestamps))
+    previous = 0
+    for timestamp in timestamps:
+        _append_varint(buffer, timestamp - previous)
+        previous = timestamp
+    previous = 0
+    for value in values:
+        fixed_point = _to_fixed_point(value, decimals)
+        _append_varint(buffer, fixed_point - previous)
+        previous = fixed_point
+
+    return zlib.compress(buffer)
+
+
+def decode_price_block(data: bytes) -> tuple[list[int], list[str]]:
+    """Decodes a block into its timestamps and the strings of its prices"""
+    varints = _iterate_varints(zlib.decompress(data))
+    decimals, count = next(varints), next(varints)
+    timestamps, prices = [], []
+    value = 0
+    for _ in range(count):
+        value += next(varints)
+        timestamps.append(value)
+    value = 0
+    for _ in range(count):
+        value += next(varints)
+        prices.append(_from_fixed_point(value, decimals))
+
+    return timestamps, prices
+
+
+def make_price_blocks(
+        timestamps: Sequence[int],
+        prices: Sequence[str],
+) -> list[tuple[int, int, int, bytes]]:
+    """Splits the given prices, whose timestamps need to be sorted and unique, in blocks.
+    Returns the start timestamp, end timestamp, number of prices and data of each block"""
+    blocks = []
+    for start in range(0, len(timestamps), PRICE_BLOCK_SIZE):
+        block_timestamps = timestamps[start:start + PRICE_BLOCK_SIZE]
+        blocks.append((
+            block_timestamps[0],
+            block_timestamps[-1],
+            len(block_timestamps),
+            encode_price_block(block_timestamps, prices[start:start + PRICE_BLOCK_SIZE]),
+        ))
+
+    return blocks
@@ -0,0 +1,128 @@
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from collections.abc import Iterable
+
+# A price_history row: from_asset, to_asset, source_type, timestamp, price
+PriceHistoryRow = tuple[str, str, str, int, str]
+# Above this number of new prices of a source they are merged with a sort instead of
+# being inserted one by one, since each insertion moves the later prices of the list
+PRICE_SERIES_MAX_INSERTS = 64
+
+
+class PriceSeries:
+    """All the prices of an asset pair in the price_history and price_history_blocks
+    tables, per source and sorted by timestamp, so that the price closest to a timestamp
+    is found by binary search.
+
+    The lookup returns the same row as the price_history query it replaces:
+    'SELECT ... MIN(ABS(timestamp - ?)) ... WHERE timestamp BETWEEN ? AND ?'. SQLite scans
+    the rows of a pair in primary key order (source_type, timestamp) and keeps the first
+    row with the minimum distance, so ties go to the smallest source type and then to the
+    earliest timestamp.
+
+    Writes to the pair update the series in place. They keep a single price per source
+    and timestamp, like the primary key of the price_history table.
+    """
+    __slots__ = ('sources',)
+
+    def __init__(self, rows: Iterable[PriceHistoryRow]) -> None:
+        """The rows need to be of a single pair and ordered by source type and timestamp"""
+        # source type -> (from_asset, to_asset, timestamps, prices)
+        self.sources: dict[str, tuple[str, str, list[int], list[str]]] = {}
+        for from_asset, to_asset, source_type, timestamp, price in rows:
+            if (source_data := self.sources.get(source_type)) is None:
+                source_data = self.sources[source_type] = (from_asset, to_asset, [], [])
+            source_data[2].append(timestamp)
+            source_data[3].append(price)
+
+    def update(self, rows: Iterable[PriceHistoryRow], replace: bool) -> None:
+        """Insert the prices of the rows in their place in the series. If there already is a
+        price at the timestamp of a row it's replaced only if replace is True."""
+        source_prices: defaultdict[str, dict[int, str]] = defaultdict(dict)
+        for from_asset, to_asset, source_type, timestamp, price in rows:
+            if source_type not in self.sources:
+                self.sources[source_type] = (from_asset, to_asset, [], [])
+            source_prices[source_type][timestamp] = price
+
+        for source_type, new_prices in source_prices.items():
+            timestamps, prices = self.sources[source_type][2:]
+            if len(new_prices) > PRICE_SERIES_MAX_INSERTS:  # merge them all at once
+                merged_prices = dict(zip(timestamps, prices, strict=True))
+                for timestamp, price in new_prices.items():
+                    if replace or timestamp not in merged_prices:
+                        merged_prices[timestamp] = price
+                timestamps[:] = sorted(merged_prices)
+                prices[:] = [merged_prices[x] for x in timestamps]
+                continue
+
+            for timestamp, price in new_prices.items():
+                idx = bisect_left(timestamps, timestamp)
+                if idx != len(timestamps) and timestamps[idx] == timestamp:
+                    if replace:
+                        prices[idx] = price
+                    continue
+
+                timestamps.insert(idx, timestamp)
+                prices.insert(idx, price)
+
+    def remove(self, source_type: str, timestamp: int | None = None) -> None:
+        """Remove the price of the source type at the timestamp if there is one, or all the
+        prices of the source type if no timestamp is given"""
+        if (source_data := self.sources.get(source_type)) is None:
+            return
+
+        timestamps, prices = source_data[2], source_data[3]
+        if timestamp is not None:
+            idx = bisect_left(timestamps, timestamp)
+            if idx != len(timestamps) and timestamps[idx] == timestamp:
+                del timestamps[idx], prices[idx]
+
+        if timestamp is None or len(timestamps) == 0:
+            del self.sources[source_type]
+
+    def __len__(self) -> int:
+        return sum(len(x[2]) for x in self.sources.values())
+
+    def nearest(
+            self,
+            timestamp: int,
+            max_seconds_distance: int,
+            source_type: str | None,
+    ) -> PriceHistoryRow | None:
+        """Find the price closest to the timestamp that is at most max_seconds_distance
+        away from it, optionally only from the given source type"""
+        if source_type is not None:
+            sources = [source_type] if source_type in self.sources else []
+        else:
+            sources = sorted(self.sources)
+
+        result, result_distance = None, max_seconds_distance
+        for source in sources:
+            from_asset, to_asset, timestamps, prices = self.sources[source]
+            idx = bisect_left(timestamps, timestamp)
+            # check the earlier candidate first so that it wins the ties
+            for candidate in (idx - 1, idx):
+                if candidate < 0 or candidate == len(timestamps):
+                    continue
+                distance = abs(timestamps[candidate] - timestamp)
+                if distance < result_distance or (result is None and distance == result_distance):
+                    result = (from_asset, to_asset, source, timestamps[candidate], prices[candidate])  # noqa: E501
+                    result_distance = distance
+
+        return result
+
+    def range(
+            self,
+            source_type: str,
+            from_timestamp: int,
+            to_timestamp: int,
+    ) -> tuple[list[int], list[str]]:
+        """The timestamps and prices of the source type from from_timestamp until
+        to_timestamp, inclusive, as two lists"""
+        if (source_data := self.sources.get(source_type)) is None:
+            return [], []
+
+        timestamps, prices = source_data[2], source_data[3]
+        start = bisect_left(timestamps, from_timestamp)
+        end = bisect_right(timestamps, to_timestamp)
+        return timestamps[start:end], prices[start:end]
@@ -226,6 +226,23 @@ CREATE TABLE IF NOT EXISTS price_history (
 );
 """
 
+# Blocks of consecutive prices of an asset pair, used for long series such as the hourly
+# prices of cryptocompare instead of a price_history row per price. See price_blocks.py
+DB_CREATE_PRICE_HISTORY_BLOCKS = """
+CREATE TABLE IF NOT EXISTS price_history_blocks (
+    from_asset TEXT NOT NULL COLLATE NOCASE,
+    to_asset TEXT NOT NULL COLLATE NOCASE,
+    source_type CHAR(1) NOT NULL REFERENCES price_history_source_types(type),
+    start_ts INTEGER NOT NULL,
+    end_ts INTEGER NOT NULL,
+    prices_num INTEGER NOT NULL,
+    data BLOB NOT NULL,
+    FOREIGN KEY(from_asset) REFERENCES assets(identifier) ON UPDATE CASCADE ON DELETE CASCADE,
+    FOREIGN KEY(to_asset) REFERENCES assets(identifier) ON UPDATE CASCADE ON DELETE CASCADE,
+    PRIMARY KEY(from_asset, to_asset, source_type, start_ts)
+);
+"""
+
 DB_CREATE_BINANCE_PAIRS = """
 CREATE TABLE IF NOT EXISTS binance_pairs (
     pair TEXT NOT NULL,
@@ -317,6 +334,7 @@ BEGIN TRANSACTION;
 {DB_CREATE_USER_OWNED_ASSETS}
 {DB_CREATE_PRICE_HISTORY_SOURCE_TYPES}
 {DB_CREATE_PRICE_HISTORY}
+{DB_CREATE_PRICE_HISTORY_BLOCKS}
 {DB_CREATE_BINANCE_PAIRS}
 {DB_CREATE_ADDRESS_BOOK}
 {DB_CREATE_CUSTOM_ASSET}
@@ -628,6 +628,8 @@ class AssetsUpdater:
                 # now move the data to the actual global DB
                 log.info('Finishing assets update. Replacing users globaldb with the updated information')  # noqa: E501
                 _replace_assets_from_db(GlobalDBHandler().conn, tmpdir / temp_db_name)
+                GlobalDBHandler().clean_evm_tokens_cache()
+                GlobalDBHandler().clean_price_series_cache()
 
         return None
 
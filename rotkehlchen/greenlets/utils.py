@@ -1,7 +1,11 @@
-from typing import TYPE_CHECKING, Union
+import time
+from collections.abc import Callable, Hashable
+from typing import TypeVar, Union
 
-if TYPE_CHECKING:
-    import gevent
+import gevent
+from gevent.pool import Pool
+
+K = TypeVar('K', bound=Hashable)
 
 
 def get_greenlet_name(greenlet: Union['gevent.Greenlet', 'gevent.greenlet']) -> str:
@@ -13,3 +17,37 @@ def get_greenlet_name(greenlet: Union['gevent.Greenlet', 'gevent.greenlet']) ->
         except AttributeError:  # means it's a raw greenlet
             greenlet_name = f'Greenlet with id {id(greenlet)}'
     return greenlet_name
+
+
+def run_with_timeouts(
+        queries: dict[K, Callable[[], None]],
+        concurrency: int,
+        timeout: float,
+        timeout_cb: Callable[[K, float], None],
+        deadline: float | None = None,
+) -> None:
+    """Calls each of the queries concurrently, up to `concurrency` of them at a time.
+    A query is abandoned after `timeout` seconds or once `deadline` seconds have passed
+    since the start, whichever comes first. For each abandoned query `timeout_cb` is
+    called with its key and the seconds it was given.
+
+    Exceptions of the queries are raised once all of them are done.
+    """
+    deadline_ts = None if deadline is None else time.monotonic() + deadline
+
+    def run_query(key: K, query: Callable[[], None]) -> None:
+        query_timeout = timeout
+        if deadline_ts is not None:
+            query_timeout = max(min(timeout, deadline_ts - time.monotonic()), 0)
+        try:
+            with gevent.Timeout(query_timeout):
+                query()
+        except gevent.Timeout:
+            timeout_cb(key, query_timeout)
+
+    pool = Pool(concurrency)
+    greenlets = [pool.spawn(run_query, key, query) for key, query in queries.items()]
+    pool.join()
+    for greenlet in greenlets:
+        if greenlet.exception is not None:
+            raise greenlet.exception
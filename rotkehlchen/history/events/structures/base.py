@@ -10,6 +10,7 @@ from rotkehlchen.accounting.structures.types import ActionType
 from rotkehlchen.accounting.types import EventAccountingRuleStatus
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.chain.ethereum.constants import SHAPPELA_TIMESTAMP
+from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_ETH2
 from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.history.events.structures.types import (
@@ -441,25 +442,45 @@ class HistoryEvent(HistoryBaseEntry):
     def get_accounting_event_type() -> AccountingEventType:
         return AccountingEventType.HISTORY_EVENT
 
+    def _is_processed_kraken_event(self, accounting: 'AccountingPot') -> bool:
+        """Whether processing the kraken event adds it to the accounting pot"""
+        if (  # LEF: Why the heck do we have this here? Perhaps to ignore all the ledger events that comprise the trades  # noqa: E501
+            self.event_type != HistoryEventType.STAKING or
+            self.event_subtype != HistoryEventSubType.REWARD
+        ):
+            return False
+
+        # This omits every acquisition event of `ETH2` if `eth_staking_taxable_after_withdrawal_enabled`  # noqa: E501
+        # setting is set to `True` until ETH2 withdrawals were enabled
+        return not (self.asset == A_ETH2 and accounting.settings.eth_staking_taxable_after_withdrawal_enabled is True and self.get_timestamp_in_sec() < SHAPPELA_TIMESTAMP)  # noqa: E501
+
+    def get_assets_to_price(
+            self,
+            accounting: 'AccountingPot',
+            events_iterator: "peekable['AccountingEventMixin']",
+    ) -> tuple[list[Asset], int]:
+        if self.location == Location.KRAKEN:
+            if self.balance.amount == ZERO or not self._is_processed_kraken_event(accounting):
+                return [], 1
+
+            return [self.asset], 1
+
+        return accounting.events_accountant.get_assets_to_price(
+            event=self,
+            events_iterator=events_iterator,
+        )
+
     def process(
             self,
             accounting: 'AccountingPot',
             events_iterator: "peekable['AccountingEventMixin']",  # pylint: disable=unused-argument
     ) -> int:
         if self.location == Location.KRAKEN:
-            if (  # LEF: Why the heck do we have this here? Perhaps to ignore all the ledger events that comprise the trades  # noqa: E501
-                self.event_type != HistoryEventType.STAKING or
-                self.event_subtype != HistoryEventSubType.REWARD
-            ):
-                return 1
-
-            timestamp = self.get_timestamp_in_sec()
-            # This omits every acquisition event of `ETH2` if `eth_staking_taxable_after_withdrawal_enabled`  # noqa: E501
-            # setting is set to `True` until ETH2 withdrawals were enabled
-            if self.asset == A_ETH2 and accounting.settings.eth_staking_taxable_after_withdrawal_enabled is True and timestamp < SHAPPELA_TIMESTAMP:  # noqa: E501
+            if not self._is_processed_kraken_event(accounting):
                 return 1
 
             # otherwise it's kraken staking
+            timestamp = self.get_timestamp_in_sec()
             accounting.add_in_event(
                 event_type=AccountingEventType.STAKING,
                 notes=f'Kraken {self.asset.resolve_to_asset_with_symbol().symbol} staking',
@@ -22,7 +22,9 @@ from .evm_event import EvmProduct
 
 if TYPE_CHECKING:
     from rotkehlchen.accounting.pot import AccountingPot
+    from rotkehlchen.assets.asset import Asset
 
+from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_ETH
 
 from .base import HISTORY_EVENT_DB_TUPLE_WRITE, HistoryBaseEntry, HistoryBaseEntryType
@@ -203,6 +205,13 @@ class EthWithdrawalEvent(EthStakingEvent):
     def get_accounting_event_type() -> AccountingEventType:
         return AccountingEventType.HISTORY_EVENT
 
+    def get_assets_to_price(
+            self,
+            accounting: 'AccountingPot',
+            events_iterator: Iterator['AccountingEventMixin'],  # pylint: disable=unused-argument
+    ) -> tuple[list['Asset'], int]:
+        return [self.asset] if self.balance.amount != 32 else [], 1
+
     def process(
             self,
             accounting: 'AccountingPot',
@@ -337,6 +346,19 @@ class EthBlockEvent(EthStakingEvent):
     def get_accounting_event_type() -> AccountingEventType:
         return AccountingEventType.HISTORY_EVENT
 
+    def get_assets_to_price(
+            self,
+            accounting: 'AccountingPot',
+            events_iterator: Iterator['AccountingEventMixin'],  # pylint: disable=unused-argument
+    ) -> tuple[list['Asset'], int]:
+        with accounting.database.conn.read_ctx() as cursor:
+            accounts = accounting.database.get_blockchain_accounts(cursor)
+
+        if self.location_label not in accounts.eth or self.balance.amount == ZERO:
+            return [], 1
+
+        return [self.asset], 1
+
     def process(
             self,
             accounting: 'AccountingPot',
@@ -483,6 +505,13 @@ class EthDepositEvent(EvmEvent, EthStakingEvent):  # noqa: PLW1641  # hash in su
     def get_accounting_event_type() -> AccountingEventType:
         return AccountingEventType.HISTORY_EVENT
 
+    def get_assets_to_price(
+            self,
+            accounting: 'AccountingPot',
+            events_iterator: Iterator['AccountingEventMixin'],  # pylint: disable=unused-argument
+    ) -> tuple[list['Asset'], int]:
+        return [], 1
+
     def process(
             self,
             accounting: 'AccountingPot',
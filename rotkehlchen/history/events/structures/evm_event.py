@@ -282,6 +282,13 @@ class EvmEvent(HistoryBaseEntry):  # noqa: PLW1641  # hash in superclass
     def get_accounting_event_type() -> AccountingEventType:
         return AccountingEventType.TRANSACTION_EVENT
 
+    def get_assets_to_price(
+            self,
+            accounting: 'AccountingPot',
+            events_iterator: "peekable['AccountingEventMixin']",
+    ) -> tuple[list[Asset], int]:
+        return accounting.events_accountant.get_assets_to_price(self, events_iterator)
+
     def process(
             self,
             accounting: 'AccountingPot',
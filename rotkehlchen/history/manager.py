@@ -1,5 +1,9 @@
+import heapq
 import logging
 from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from functools import partial
+from itertools import groupby
 from pathlib import Path
 from typing import TYPE_CHECKING, Literal
 
@@ -12,14 +16,21 @@ from rotkehlchen.db.filtering import (
 )
 from rotkehlchen.db.history_events import DBHistoryEvents
 from rotkehlchen.errors.misc import RemoteError
-from rotkehlchen.exchanges.data_structures import AssetMovement, Trade
+from rotkehlchen.exchanges.data_structures import AssetMovement, MarginPosition, Trade
 from rotkehlchen.exchanges.manager import SUPPORTED_EXCHANGES, ExchangeManager
 from rotkehlchen.fval import FVal
+from rotkehlchen.greenlets.utils import run_with_timeouts
 from rotkehlchen.history.events.structures.base import HistoryBaseEntry, HistoryEvent
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.tasks.manager import TaskManager
 from rotkehlchen.tasks.utils import query_missing_prices_of_base_entries
-from rotkehlchen.types import EVM_CHAINS_WITH_TRANSACTIONS, Location, Timestamp
+from rotkehlchen.types import (
+    EVM_CHAINS_WITH_TRANSACTIONS,
+    EVM_CHAINS_WITH_TRANSACTIONS_TYPE,
+    Location,
+    SupportedBlockchain,
+    Timestamp,
+)
 from rotkehlchen.user_messages import MessagesAggregator
 from rotkehlchen.utils.misc import timestamp_to_date
 
@@ -28,6 +39,7 @@ if TYPE_CHECKING:
     from rotkehlchen.chain.aggregator import ChainsAggregator
     from rotkehlchen.db.dbhandler import DBHandler
     from rotkehlchen.db.drivers.gevent import DBCursor
+    from rotkehlchen.exchanges.exchange import ExchangeInterface
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -38,13 +50,142 @@ log = RotkehlchenLogsAdapter(logger)
 #    chain.receipts
 #    chain.tx decoding
 #
-# reading from the db trades, asset movements, margin positions
 # eth2
-# base history entries
+#
+# Trades, asset movements, margin positions and base history entries are not
+# read here but lazily from the DB by the HistoryEventsStream during processing.
 #
 # Please, update this number each time a history query step is either added or removed
-NUM_HISTORY_QUERY_STEPS_EXCL_EXCHANGES = 3 + 3 * len(EVM_CHAINS_WITH_TRANSACTIONS)
+STEPS_PER_EVM_CHAIN = 3
+NUM_HISTORY_QUERY_STEPS_EXCL_EXCHANGES = 1 + STEPS_PER_EVM_CHAIN * len(EVM_CHAINS_WITH_TRANSACTIONS)  # noqa: E501
 STEPS_PER_CEX = 5
+# Max number of exchanges and chains whose history is queried at the same time
+HISTORY_QUERY_CONCURRENCY = 4
+# Seconds after which the history query of a single exchange or chain is abandoned
+HISTORY_SOURCE_QUERY_TIMEOUT = 1800
+
+
+def history_sort_key(event: 'AccountingEventMixin') -> tuple[Timestamp, int]:
+    """The order in which accounting processes events. First by timestamp and if
+    it's a history base entry by sequence index"""
+    return (
+        event.get_timestamp(),
+        event.sequence_index if isinstance(event, HistoryBaseEntry) else 1,
+    )
+
+
+def _sort_within_each_second(
+        events: Iterable['AccountingEventMixin'],
+) -> Iterator['AccountingEventMixin']:
+    """History events are ordered in the DB by their millisecond timestamp and then by
+    sequence index, but accounting orders them by second and then by sequence index.
+    Reorder the events of each second so that the iterator follows history_sort_key.
+    Only the events of a single second are ever kept in memory."""
+    for _, same_second_events in groupby(events, key=lambda x: x.get_timestamp()):
+        yield from sorted(same_second_events, key=history_sort_key)
+
+
+class HistoryEventsStream:
+    """All the events taken into account by accounting up to end_ts, sorted by
+    history_sort_key.
+
+    Instead of materializing and sorting the entire history in memory, trades, asset
+    movements and history events are each read lazily from their own DB cursor, already
+    sorted, and all the sources are combined with a k-way merge. So memory stays bounded
+    no matter how long the history is. Each iteration over the stream re-reads the DB.
+    """
+
+    def __init__(
+            self,
+            db: 'DBHandler',
+            end_ts: Timestamp,
+            eth2_events: list['AccountingEventMixin'],
+    ) -> None:
+        self.db = db
+        self.end_ts = end_ts
+        self.eth2_events = sorted(eth2_events, key=history_sort_key)
+        self.events_num: int | None = None
+        # We need to have history since before the range, unless accounting continues
+        # from a snapshot of the already processed history.
+        self.from_ts = Timestamp(0)
+
+    def start_from(self, timestamp: Timestamp) -> None:
+        """Skip all events before the given timestamp"""
+        self.from_ts = timestamp
+        self.events_num = None
+
+    def _trades_filter(self) -> TradesFilterQuery:
+        return TradesFilterQuery.make(from_ts=self.from_ts, to_ts=self.end_ts)
+
+    def _asset_movements_filter(self) -> AssetMovementsFilterQuery:
+        return AssetMovementsFilterQuery.make(from_ts=self.from_ts, to_ts=self.end_ts)
+
+    def _history_events_filter(self) -> HistoryEventFilterQuery:
+        return HistoryEventFilterQuery.make(from_ts=self.from_ts, to_ts=self.end_ts)
+
+    def _iterate_trades(self) -> Iterator[Trade]:
+        with self.db.conn.read_ctx() as cursor:
+            yield from self.db.iterate_trades(
+                cursor=cursor,
+                filter_query=self._trades_filter(),
+                has_premium=True,  # we need all trades for accounting -- limit happens later
+            )
+
+    def _iterate_asset_movements(self) -> Iterator[AssetMovement]:
+        with self.db.conn.read_ctx() as cursor:
+            yield from self.db.iterate_asset_movements(
+                cursor=cursor,
+                filter_query=self._asset_movements_filter(),
+                has_premium=True,  # we need all movements for accounting -- limit happens later
+            )
+
+    def _iterate_history_events(self) -> Iterator['AccountingEventMixin']:
+        with self.db.conn.read_ctx() as cursor:
+            history_events = DBHistoryEvents(self.db).iterate_history_events(
+                cursor=cursor,
+                filter_query=self._history_events_filter(),
+                has_premium=True,  # ignore limits here. Limit applied at processing
+            )
+            yield from _sort_within_each_second(history_events)  # type: ignore[arg-type]  # not grouped so only events are yielded
+
+    def _get_margin_positions(self) -> list[MarginPosition]:
+        with self.db.conn.read_ctx() as cursor:
+            return self.db.get_margin_positions(cursor, from_ts=self.from_ts, to_ts=self.end_ts)
+
+    def __iter__(self) -> Iterator['AccountingEventMixin']:
+        """The order of the sources matters. Events with the same sort key are
+        yielded in the order of the sources given to the merge."""
+        yield from heapq.merge(
+            self._iterate_trades(),
+            self._iterate_asset_movements(),
+            sorted(self._get_margin_positions(), key=history_sort_key),
+            (x for x in self.eth2_events if x.get_timestamp() >= self.from_ts),
+            self._iterate_history_events(),
+            key=history_sort_key,
+        )
+
+    def __len__(self) -> int:
+        """Number of events in the stream. Counted in the DB without deserializing
+        so entries that fail deserialization, and are skipped when iterating, are counted"""
+        if self.events_num is not None:
+            return self.events_num
+
+        with self.db.conn.read_ctx() as cursor:
+            query, bindings = self._trades_filter().prepare(with_pagination=False, with_order=False)  # noqa: E501
+            trades_num = cursor.execute(f'SELECT COUNT(*) FROM trades {query}', bindings).fetchone()[0]  # noqa: E501
+            query, bindings = self._asset_movements_filter().prepare(with_pagination=False, with_order=False)  # noqa: E501
+            movements_num = cursor.execute(f'SELECT COUNT(*) FROM asset_movements {query}', bindings).fetchone()[0]  # noqa: E501
+            history_events_num, _ = DBHistoryEvents(self.db).get_history_events_count(
+                cursor=cursor,
+                query_filter=self._history_events_filter(),
+            )
+
+        self.events_num = (
+            trades_num + movements_num + history_events_num +
+            len(self._get_margin_positions()) +
+            sum(1 for x in self.eth2_events if x.get_timestamp() >= self.from_ts)
+        )
+        return self.events_num
 
 
 class HistoryQueryingManager:
@@ -296,6 +437,32 @@ class HistoryQueryingManager:
         """
         Creates all events history from start_ts to end_ts. Returns it
         sorted by ascending timestamp.
+
+        This materializes the entire history in memory. For processing prefer
+        get_history_stream which reads the events lazily from the DB.
+        """
+        empty_or_error, events_stream = self.get_history_stream(
+            start_ts=start_ts,
+            end_ts=end_ts,
+            has_premium=has_premium,
+        )
+        return empty_or_error, list(events_stream)
+
+    def get_history_stream(
+            self,
+            start_ts: Timestamp,
+            end_ts: Timestamp,
+            has_premium: bool,
+            concurrency: int = HISTORY_QUERY_CONCURRENCY,
+            source_timeout: int = HISTORY_SOURCE_QUERY_TIMEOUT,
+    ) -> tuple[str, HistoryEventsStream]:
+        """
+        Queries all services for new history up to end_ts and returns a stream
+        that yields all the events of the history sorted by ascending timestamp.
+
+        The exchanges and the evm chains are queried concurrently, up to `concurrency`
+        of them at a time. The query of each one is abandoned after `source_timeout`
+        seconds and its failure is reported without affecting the rest.
         """
         self._reset_variables()
         step = 0
@@ -308,8 +475,7 @@ class HistoryQueryingManager:
             start_ts=start_ts,
             end_ts=end_ts,
         )
-        # start creating the all trades history list
-        history: list[AccountingEventMixin] = []
+        eth2_events: list[AccountingEventMixin] = []
         empty_or_error = ''
 
         def fail_history_cb(error_msg: str) -> None:
@@ -317,52 +483,37 @@ class HistoryQueryingManager:
             nonlocal empty_or_error
             empty_or_error += '\n' + error_msg
 
-        def new_step_cb(state_name: str) -> None:
-            """This callback will run for each new step in exchange history query"""
+        def increase_progress(step_by: int = 1) -> None:
+            """Progress of all the concurrent queries is counted in the same steps"""
             nonlocal step
-            step = self._increase_progress(step, total_steps)
-            self.processing_state_name = state_name
+            step = self._increase_progress(step, total_steps, step_by=step_by)
 
-        for exchange in self.exchange_manager.iterate_exchanges():
-            self.processing_state_name = f'Querying {exchange.name} exchange history'
-            exchange.query_history_with_callbacks(
-                # We need to have history of exchanges since before the range
-                start_ts=Timestamp(0),
-                end_ts=end_ts,
-                fail_callback=fail_history_cb,
-                new_step_data=(new_step_cb, exchange.name),
-            )
-            # each exchange instance executes STEPS_PER_CEX steps out of the total_steps
-            step = self._increase_progress(step, total_steps, step_by=STEPS_PER_CEX)
+        def query_exchange(exchange: 'ExchangeInterface') -> None:
+            exchange_steps = 0
 
-        # Query all trades, asset movements and margin positions from the DB for all
-        # possible locations.
-        self.processing_state_name = 'Reading trades, asset movements and margin positions from the DB'  # noqa: E501
-        with self.db.conn.read_ctx() as cursor:
-            # Include all trades
-            trades = self.db.get_trades(
-                cursor,
-                filter_query=TradesFilterQuery.make(to_ts=end_ts),
-                has_premium=True,  # we need all trades for accounting -- limit happens later
-            )
-            history.extend(trades)
+            def new_step_cb(state_name: str) -> None:
+                """This callback will run for each new step in exchange history query"""
+                nonlocal exchange_steps
+                if exchange_steps < STEPS_PER_CEX:
+                    exchange_steps += 1
+                    increase_progress()
+                self.processing_state_name = state_name
 
-            # Include all asset movements
-            asset_movements = self.db.get_asset_movements(
-                cursor,
-                filter_query=AssetMovementsFilterQuery.make(to_ts=end_ts),
-                has_premium=True,  # we need all trades for accounting -- limit happens later
-            )
-            history.extend(asset_movements)
-
-            # Include all margin positions
-            margin_positions = self.db.get_margin_positions(cursor, to_ts=end_ts)
-            history.extend(margin_positions)
-
-        step = self._increase_progress(step, total_steps)
+            self.processing_state_name = f'Querying {exchange.name} exchange history'
+            try:
+                exchange.query_history_with_callbacks(
+                    # We need to have history of exchanges since before the range
+                    start_ts=Timestamp(0),
+                    end_ts=end_ts,
+                    fail_callback=fail_history_cb,
+                    new_step_data=(new_step_cb, exchange.name),
+                )
+            finally:  # each exchange instance executes STEPS_PER_CEX steps out of the total_steps
+                increase_progress(step_by=STEPS_PER_CEX - exchange_steps)
 
-        for blockchain in EVM_CHAINS_WITH_TRANSACTIONS:
+        def query_evm_chain(blockchain: EVM_CHAINS_WITH_TRANSACTIONS_TYPE) -> None:
             str_blockchain = str(blockchain)
+            chain_steps = 0
             self.processing_state_name = f'Querying {str_blockchain} transactions history'
             evm_manager = self.chains_aggregator.get_chain_manager(blockchain)
             tx_filter_query = EvmTransactionsFilterQuery.make(
@@ -374,34 +525,66 @@ class HistoryQueryingManager:
                 chain_id=blockchain.to_chain_id(),  # type: ignore[arg-type]
             )
             try:
-                evm_manager.transactions.query_chain(filter_query=tx_filter_query)
-            except RemoteError as e:
-                msg = str(e)
+                try:
+                    evm_manager.transactions.query_chain(filter_query=tx_filter_query)
+                except RemoteError as e:
+                    msg = str(e)
+                    self.msg_aggregator.add_error(
+                        f'There was an error when querying {str_blockchain} etherscan for transactions: {msg}'  # noqa: E501
+                        f'The final history result will not include {str_blockchain} transactions',
+                    )
+                    fail_history_cb(msg)
+
+                chain_steps += 1
+                increase_progress()
+                self.processing_state_name = f'Querying {str_blockchain} transaction receipts'
+                evm_manager.transactions.get_receipts_for_transactions_missing_them()
+                chain_steps += 1
+                increase_progress()
+
+                self.processing_state_name = f'Decoding {str_blockchain} raw transactions'
+                evm_manager.transactions_decoder.get_and_decode_undecoded_transactions(limit=None)
+            finally:
+                increase_progress(step_by=STEPS_PER_EVM_CHAIN - chain_steps)
+
+        def timeout_cb(
+                source: 'ExchangeInterface | EVM_CHAINS_WITH_TRANSACTIONS_TYPE',
+                timeout: float,
+        ) -> None:
+            if isinstance(source, SupportedBlockchain):
+                msg = f'{source!s} history query timed out after {timeout:.0f} seconds'
                 self.msg_aggregator.add_error(
-                    f'There was an error when querying {str_blockchain} etherscan for transactions: {msg}'  # noqa: E501
-                    f'The final history result will not include {str_blockchain} transactions',
+                    f'{msg}. The final history result may not include all {source!s} transactions',
                 )
-                empty_or_error += '\n' + msg
-
-            step = self._increase_progress(step, total_steps)
-            self.processing_state_name = f'Querying {str_blockchain} transaction receipts'
-            evm_manager.transactions.get_receipts_for_transactions_missing_them()
-            step = self._increase_progress(step, total_steps)
-
-            self.processing_state_name = f'Decoding {str_blockchain} raw transactions'
-            evm_manager.transactions_decoder.get_and_decode_undecoded_transactions(limit=None)
-            step = self._increase_progress(step, total_steps)
+            else:
+                msg = f'{source.name} history query timed out after {timeout:.0f} seconds'
+            fail_history_cb(msg)
+
+        queries: dict['ExchangeInterface | EVM_CHAINS_WITH_TRANSACTIONS_TYPE', Callable[[], None]] = {  # noqa: E501
+            exchange: partial(query_exchange, exchange)
+            for exchange in self.exchange_manager.iterate_exchanges()
+        }
+        queries.update({
+            blockchain: partial(query_evm_chain, blockchain)
+            for blockchain in EVM_CHAINS_WITH_TRANSACTIONS
+        })
+        # errors that were not reported in the failure callback are raised
+        run_with_timeouts(
+            queries=queries,
+            concurrency=concurrency,
+            timeout=source_timeout,
+            timeout_cb=timeout_cb,
+        )
 
         # include eth2 staking events
         eth2 = self.chains_aggregator.get_module('eth2')
         if eth2 is not None and has_premium:
             self.processing_state_name = 'Querying ETH2 staking history'
             try:
-                eth2_events = self.chains_aggregator.get_eth2_history_events(
+                eth2_events.extend(self.chains_aggregator.get_eth2_history_events(
                     from_timestamp=Timestamp(0),
                     to_timestamp=end_ts,
-                )
-                history.extend(eth2_events)
+                ))
             except RemoteError as e:
                 self.msg_aggregator.add_error(
                     f'Eth2 events are not included in the PnL report due to {e!s}',
@@ -409,28 +592,11 @@ class HistoryQueryingManager:
             # make sure that eth2 events and history events are combined
             eth2.combine_block_with_tx_events()
 
-        step = self._increase_progress(step, total_steps)
-        self.processing_state_name = 'Querying base history events'
-        # Include all base history entries
-        history_events_db = DBHistoryEvents(self.db)
-        with self.db.conn.read_ctx() as cursor:
-            base_entries = history_events_db.get_history_events(
-                cursor=cursor,
-                filter_query=HistoryEventFilterQuery.make(
-                    # We need to have history since before the range
-                    from_ts=Timestamp(0),
-                    to_ts=end_ts,
-                ),
-                has_premium=True,  # ignore limits here. Limit applied at processing
-                group_by_event_ids=False,
-            )
-        history.extend(base_entries)
-        self._increase_progress(step, total_steps)
-
-        history.sort(  # sort events first by timestamp and if history base by sequence index
-            key=lambda x: (
-                x.get_timestamp(),
-                x.sequence_index if isinstance(x, HistoryBaseEntry) else 1,
-            ),
+        increase_progress()
+        # Trades, asset movements, margin positions and all base history entries are
+        # read from the DB by the stream as the events get processed
+        return empty_or_error, HistoryEventsStream(
+            db=self.db,
+            end_ts=end_ts,
+            eth2_events=eth2_events,
         )
-        return empty_or_error, history
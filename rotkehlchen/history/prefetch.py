@@ -0,0 +1,210 @@
+"""Prefetching of the historical prices that a PnL report needs
+
+Accounting asks for the price of the assets of each event in the profit currency one
+event at a time. So a report over a history whose prices are missing from the DB stalls
+on one oracle round trip after the other. Before processing, the events are scanned for
+the prices they need and the lookups of a pair in the same bucket of time are merged.
+Prices that are already in the DB are found with a bulk lookup and the rest are queried
+concurrently, spacing out the queries to each oracle to respect its rate limit. The
+oracles store what they return in the DB, so that processing finds it there when it looks
+up the price of each event at its exact timestamp.
+"""
+import logging
+import time
+from collections import Counter
+from collections.abc import Iterable
+from dataclasses import dataclass
+from typing import TYPE_CHECKING
+
+import gevent
+from gevent.pool import Pool
+from more_itertools import peekable
+
+from rotkehlchen.constants.prices import ZERO_PRICE
+from rotkehlchen.constants.timing import HOUR_IN_SECONDS
+from rotkehlchen.errors.asset import UnknownAsset, UnprocessableTradePair, UnsupportedAsset
+from rotkehlchen.errors.misc import RemoteError
+from rotkehlchen.errors.price import NoPriceForGivenTimestamp, PriceQueryUnsupportedAsset
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.history.price import PriceHistorian
+from rotkehlchen.history.types import HistoricalPriceOracle
+from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.types import Timestamp
+
+if TYPE_CHECKING:
+    from rotkehlchen.accounting.mixins.event import AccountingEventMixin
+    from rotkehlchen.accounting.pot import AccountingPot
+    from rotkehlchen.accounting.structures.types import ActionType
+    from rotkehlchen.assets.asset import Asset
+
+logger = logging.getLogger(__name__)
+log = RotkehlchenLogsAdapter(logger)
+
+# The lookups of a pair in the same bucket of time are served by the same oracle query
+PREFETCH_BUCKET_SECONDS = HOUR_IN_SECONDS
+# from asset identifier, to asset identifier and bucket of a price lookup
+PrefetchKey = tuple[str, str, int]
+# Max number of prices queried from the oracles at the same time
+PREFETCH_CONCURRENCY = 8
+# Min seconds between the start of two queries to an oracle while prefetching
+ORACLE_QUERY_INTERVALS = {
+    HistoricalPriceOracle.CRYPTOCOMPARE: 0.1,
+    HistoricalPriceOracle.COINGECKO: 2.0,  # the free API allows ~30 calls per minute
+    HistoricalPriceOracle.DEFILLAMA: 0.2,
+}
+
+
+class OracleRateLimiter:
+    """Spaces out the queries to an oracle so that at most one starts per interval"""
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.next_query_ts = 0.0
+
+    def wait(self) -> None:
+        """Block the greenlet until the next query to the oracle can start"""
+        now = time.monotonic()
+        query_ts = max(now, self.next_query_ts)
+        self.next_query_ts = query_ts + self.interval
+        if query_ts > now:
+            gevent.sleep(query_ts - now)
+
+
+@dataclass
+class PricesPrefetchStats:
+    lookups: int = 0  # price lookups that processing the events needs
+    unique: int = 0  # lookups of different pairs and buckets of time
+    cached: int = 0  # unique lookups found in the DB
+    queried: int = 0  # unique lookups queried from the oracles
+    found: int = 0  # queried lookups that an oracle had a price for
+    found_lookups: int = 0  # lookups whose pair and bucket an oracle had a price for
+
+    @property
+    def network_calls_saved(self) -> int:
+        """Lookups that would have queried the oracles during processing, minus the
+        queries done by the prefetching"""
+        return self.found_lookups - self.queried
+
+
+def prefetch_key(from_asset: 'Asset', to_asset: 'Asset', timestamp: Timestamp) -> PrefetchKey:
+    return from_asset.identifier, to_asset.identifier, timestamp // PREFETCH_BUCKET_SECONDS
+
+
+def _collect_lookups(
+        events: Iterable['AccountingEventMixin'],
+        accounting: 'AccountingPot',
+        start_ts: Timestamp,
+        end_ts: Timestamp,
+        calculate_past_cost_basis: bool,
+        ignored_ids_mapping: dict['ActionType', set[str]],
+        events_limit: int,
+) -> tuple[dict[PrefetchKey, tuple['Asset', Timestamp]], Counter[PrefetchKey]]:
+    """Find the assets and timestamps of the prices that processing the events looks up,
+    skipping the same events that processing skips. Returns the asset and first timestamp
+    of each pair and bucket of time along with the number of lookups of each one."""
+    lookups: dict[PrefetchKey, tuple[Asset, Timestamp]] = {}
+    counts: Counter[PrefetchKey] = Counter()
+    to_asset, events_iterator, count = accounting.profit_currency, peekable(events), 0
+    while (events_limit < 0 or count < events_limit) and (event := next(events_iterator, None)) is not None:  # noqa: E501
+        timestamp = event.get_timestamp()
+        if timestamp > end_ts:
+            break
+        count += 1
+        if not calculate_past_cost_basis and timestamp < start_ts:
+            continue
+
+        try:
+            assets = event.get_assets()
+        except (UnknownAsset, UnsupportedAsset, UnprocessableTradePair):
+            continue  # processing ignores these events too
+        if any(x.identifier in accounting.ignored_asset_ids for x in assets) or event.should_ignore(ignored_ids_mapping):  # noqa: E501
+            continue
+
+        assets, consumed_events = event.get_assets_to_price(accounting, events_iterator)
+        count += consumed_events - 1
+        for asset in assets:
+            if asset == to_asset:
+                continue
+            key = prefetch_key(asset, to_asset, timestamp)
+            counts[key] += 1
+            if key not in lookups:
+                lookups[key] = (asset, timestamp)
+
+    return lookups, counts
+
+
+def prefetch_historical_prices(
+        events: Iterable['AccountingEventMixin'],
+        accounting: 'AccountingPot',
+        start_ts: Timestamp,
+        end_ts: Timestamp,
+        calculate_past_cost_basis: bool,
+        ignored_ids_mapping: dict['ActionType', set[str]],
+        events_limit: int = -1,
+) -> PricesPrefetchStats:
+    """Make sure that the DB has the prices in the profit currency that processing the
+    events looks up, by querying the historical price oracles for each pair and bucket of
+    time that is missing from it. The events that processing skips, and those whose
+    processing looks up no price, are not prefetched for.
+    The prices are not returned. Processing looks them up at the timestamp of each event
+    as usual and finds them in the DB. Returns statistics of the lookups.
+
+    Lookups that fail are left to processing, which handles them as it would without
+    prefetching.
+    """
+    to_asset = accounting.profit_currency
+    lookups, counts = _collect_lookups(
+        events=events,
+        accounting=accounting,
+        start_ts=start_ts,
+        end_ts=end_ts,
+        calculate_past_cost_basis=calculate_past_cost_basis,
+        ignored_ids_mapping=ignored_ids_mapping,
+        events_limit=events_limit,
+    )
+    stats = PricesPrefetchStats(lookups=counts.total(), unique=len(lookups))
+    remaining = list(lookups)
+    # prices already in the DB, respecting the order of the oracles
+    for oracle, _ in PriceHistorian().get_oracles():
+        if len(remaining) == 0:
+            break
+        results = GlobalDBHandler().get_historical_prices(
+            query_data=[(lookups[x][0], to_asset, lookups[x][1]) for x in remaining],
+            max_seconds_distance=PREFETCH_BUCKET_SECONDS,
+            source=oracle,
+        )
+        remaining = [
+            key for key, result in zip(remaining, results, strict=True)
+            if result is None or result.price == ZERO_PRICE
+        ]
+
+    stats.cached = stats.unique - len(remaining)
+    limiters = {
+        oracle: OracleRateLimiter(interval)
+        for oracle, interval in ORACLE_QUERY_INTERVALS.items()
+    }
+    found: list[PrefetchKey] = []
+
+    def query_price(key: PrefetchKey) -> None:
+        asset, timestamp = lookups[key]
+        try:
+            PriceHistorian().query_historical_price(
+                from_asset=asset,
+                to_asset=to_asset,
+                timestamp=timestamp,
+                oracle_limiters=limiters,
+            )
+        except (NoPriceForGivenTimestamp, PriceQueryUnsupportedAsset, RemoteError) as e:
+            log.debug(f'Could not prefetch price of {asset} at {timestamp} due to {e!s}')
+        else:
+            found.append(key)
+
+    pool = Pool(PREFETCH_CONCURRENCY)
+    for key in remaining:
+        pool.spawn(query_price, key)
+    pool.join(raise_error=True)
+
+    stats.queried = len(remaining)
+    stats.found = len(found)
+    stats.found_lookups = sum(counts[x] for x in found)
+    return stats
@@ -1,5 +1,5 @@
 import logging
-from collections.abc import Sequence
+from collections.abc import Mapping, Sequence
 from contextlib import suppress
 from http import HTTPStatus
 from pathlib import Path
@@ -25,6 +25,7 @@ if TYPE_CHECKING:
     from rotkehlchen.externalapis.coingecko import Coingecko
     from rotkehlchen.externalapis.cryptocompare import Cryptocompare
     from rotkehlchen.externalapis.defillama import Defillama
+    from rotkehlchen.history.prefetch import OracleRateLimiter
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
@@ -116,6 +117,16 @@ class PriceHistorian:
         instance._oracles = oracles
         instance._oracle_instances = [getattr(instance, f'_{oracle!s}') for oracle in oracles]
 
+    @staticmethod
+    def get_oracles() -> list[tuple[HistoricalPriceOracle, HistoricalPriceOracleInstance]]:
+        """The historical price oracles along with their instances in the order they are
+        queried"""
+        instance = PriceHistorian()
+        assert instance._oracles is not None and instance._oracle_instances is not None, (
+            'PriceHistorian should never be called before setting the oracles'
+        )
+        return list(zip(instance._oracles, instance._oracle_instances, strict=True))
+
     @staticmethod
     def get_price_for_special_asset(
             from_asset: Asset,
@@ -158,6 +169,7 @@ class PriceHistorian:
             from_asset: Asset,
             to_asset: Asset,
             timestamp: Timestamp,
+            oracle_limiters: Mapping[HistoricalPriceOracle, 'OracleRateLimiter'] | None = None,
     ) -> Price:
         """
         Query the historical price on `timestamp` for `from_asset` in `to_asset`.
@@ -169,6 +181,7 @@ class PriceHistorian:
             to_asset: The ticker symbol of the asset against which we want to
                       know the price.
             timestamp: The timestamp at which to query the price
+            oracle_limiters: Optional rate limiters to wait on before querying each oracle
 
         May raise:
         - NoPriceForGivenTimestamp if we can't find a price for the asset in the given
@@ -205,14 +218,8 @@ class PriceHistorian:
                 return price
 
         # else cryptocompare also has historical fiat to fiat data
-        instance = PriceHistorian()
-        oracles = instance._oracles
-        oracle_instances = instance._oracle_instances
-        assert oracles is not None and oracle_instances is not None, (
-            'PriceHistorian should never be called before setting the oracles'
-        )
         rate_limited = False
-        for oracle, oracle_instance in zip(oracles, oracle_instances, strict=True):
+        for oracle, oracle_instance in PriceHistorian().get_oracles():
             can_query_history = oracle_instance.can_query_history(
                 from_asset=from_asset,
                 to_asset=to_asset,
@@ -221,6 +228,9 @@ class PriceHistorian:
             if can_query_history is False:
                 continue
 
+            if oracle_limiters is not None and (limiter := oracle_limiters.get(oracle)) is not None:  # noqa: E501
+                limiter.wait()
+
             try:
                 price = oracle_instance.query_historical_price(
                     from_asset=from_asset,
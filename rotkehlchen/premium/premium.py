@@ -3,13 +3,15 @@ import hashlib
 import hmac
 import logging
 import platform
+import secrets
 import time
 from base64 import b64decode, b64encode
 from binascii import Error as BinasciiError
-from collections.abc import Sequence
+from collections.abc import Iterator, Sequence
 from enum import Enum
 from http import HTTPStatus
 from json import JSONDecodeError
+from pathlib import Path
 from typing import Any, Literal, NamedTuple, cast
 from urllib.parse import urlencode
 
@@ -28,6 +30,7 @@ from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.types import Timestamp
 from rotkehlchen.utils.misc import set_user_agent
+from rotkehlchen.utils.network import create_session
 from rotkehlchen.utils.serialization import jsonloads_dict
 
 logger = logging.getLogger(__name__)
@@ -43,10 +46,15 @@ class RemoteMetadata(NamedTuple):
     data_hash: str
     # This is the size in bytes of the remote DB data
     data_size: int
+    # The number of deltas uploaded on top of the remote DB data. None if the server
+    # does not support syncing with deltas
+    deltas: int | None = None
 
 
 DEFAULT_ERROR_MSG = 'Failed to contact rotki server. Check logs for more details'
 DEFAULT_OK_CODES = (HTTPStatus.OK, HTTPStatus.UNAUTHORIZED, HTTPStatus.BAD_REQUEST)
+# Size of the chunks in which the DB backups are streamed to and from the server
+BACKUP_CHUNK_SIZE = 64 * 1024
 
 
 def check_response_status_code(
@@ -161,11 +169,41 @@ def _decode_premium_json(response: requests.Response) -> Any:
     return json_data
 
 
+class MultipartFileBody:
+    """Body of a multipart form with the given fields and a file that is read in chunks
+    while sending, so that the file is never fully in memory. Its length is known in
+    advance so that the request is sent with a Content-Length and not chunked."""
+
+    def __init__(self, fields: dict[str, Any], file_field: str, file_path: Path) -> None:
+        boundary = secrets.token_hex(16)
+        self.content_type = f'multipart/form-data; boundary={boundary}'
+        self.fields = fields
+        self.file_path = file_path
+        self.preamble = ''.join(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+            for name, value in fields.items()
+        ).encode() + (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; '
+            f'filename="{file_field}"\r\nContent-Type: application/octet-stream\r\n\r\n'
+        ).encode()
+        self.epilogue = f'\r\n--{boundary}--\r\n'.encode()
+
+    def __len__(self) -> int:
+        return len(self.preamble) + self.file_path.stat().st_size + len(self.epilogue)
+
+    def __iter__(self) -> Iterator[bytes]:
+        yield self.preamble
+        with open(self.file_path, 'rb') as f:
+            while chunk := f.read(BACKUP_CHUNK_SIZE):
+                yield chunk
+        yield self.epilogue
+
+
 class Premium:
 
     def __init__(self, credentials: PremiumCredentials, username: str):
         self.status = SubscriptionStatus.UNKNOWN
-        self.session = requests.session()
+        self.session = create_session()
         # Make sure to have 3 retries on read/connect/other errors for all requests
         # The reason for this is that we have noticed that in unstable/slow connections
         # rotki.com server will close/cause the connection to result to a read timeout
@@ -333,7 +371,7 @@ class Premium:
             req['nonce'] = int(1000 * time.time())
         post_data = urlencode(req)
         hashable = post_data.encode()
-        if method == 'backup':
+        if method.startswith('backup'):
             # nest uses hex for generating the signature since digest returns a string with the \x
             # format in python.
             message = urlpath.encode() + hashlib.sha256(hashable).hexdigest().encode()
@@ -347,38 +385,26 @@ class Premium:
         self.session.headers.update({'API-SIGN': base64.b64encode(signature.digest())})
         return req
 
-    def upload_data(
-            self,
-            data_blob: bytes,
-            our_hash: str,
-            last_modify_ts: Timestamp,
-            compression_type: Literal['zlib'],
-    ) -> dict:
-        """Uploads data to the server and returns the response dict. We upload the encrypted
-        database as a file in an http form.
+    def _upload_backup_file(self, method: str, data_path: Path, **kwargs: Any) -> dict:
+        """Uploads the file at data_path to the given backup endpoint of the server along
+        with the given fields and returns the response dict. The file is uploaded in an
+        http form whose body is streamed from the file.
 
         May raise:
         - RemoteError if there are problems reaching the server or if
         there is an error returned by the server
         - PremiumAuthenticationError if the given key is rejected by the Rotkehlchen server
         """
-        data = self.sign(
-            'backup',
-            original_hash=our_hash,
-            last_modify_ts=last_modify_ts,
-            index=0,
-            length=len(data_blob),
-            compression=compression_type,
-        )
-
+        data = self.sign(method, length=data_path.stat().st_size, **kwargs)
+        body = MultipartFileBody(fields=data, file_field='db_file', file_path=data_path)
         try:
             response = self.session.post(
-                self.rotki_nest + 'backup',
-                data=data,
-                files={'db_file': data_blob},
+                self.rotki_nest + method,
+                data=body,
+                headers={'Content-Type': body.content_type},
                 timeout=ROTKEHLCHEN_SERVER_BACKUP_TIMEOUT,
             )
-        except requests.exceptions.RequestException as e:
+        except (requests.exceptions.RequestException, OSError) as e:
             msg = f'Could not connect to rotki server due to {e!s}'
             log.error(msg)
             raise RemoteError(msg) from e
@@ -389,34 +415,113 @@ class Premium:
             user_msg='Size limit reached' if response.status_code == HTTPStatus.REQUEST_ENTITY_TOO_LARGE else f'Could not upload database backup due to: {response.text}',  # noqa: E501
         )
 
-    def pull_data(self) -> bytes | None:
-        """Pulls data from the server and returns the binary file with the database encrypted
+    def upload_data(
+            self,
+            data_path: Path,
+            our_hash: str,
+            last_modify_ts: Timestamp,
+            compression_type: Literal['zlib'],
+    ) -> dict:
+        """Uploads the encrypted database at data_path to the server and returns the
+        response dict. This replaces the remote DB data and any deltas on top of it.
+
+        May raise:
+        - RemoteError if there are problems reaching the server or if
+        there is an error returned by the server
+        - PremiumAuthenticationError if the given key is rejected by the Rotkehlchen server
+        """
+        return self._upload_backup_file(
+            method='backup',
+            data_path=data_path,
+            original_hash=our_hash,
+            last_modify_ts=last_modify_ts,
+            index=0,
+            compression=compression_type,
+        )
+
+    def upload_delta(
+            self,
+            data_path: Path,
+            our_hash: str,
+            parent_hash: str,
+            last_modify_ts: Timestamp,
+            compression_type: Literal['zlib'],
+    ) -> dict:
+        """Uploads the encrypted changes of the database at data_path to the server to be
+        added on top of the remote DB data and returns the response dict. The server
+        rejects them if parent_hash is not the hash of its current data.
+
+        May raise:
+        - RemoteError if there are problems reaching the server or if
+        there is an error returned by the server
+        - PremiumAuthenticationError if the given key is rejected by the Rotkehlchen server
+        """
+        return self._upload_backup_file(
+            method='backup/delta',
+            data_path=data_path,
+            original_hash=our_hash,
+            parent_hash=parent_hash,
+            last_modify_ts=last_modify_ts,
+            compression=compression_type,
+        )
 
-        Returns None if there is no DB saved in the server.
+    def _pull_backup_file(self, method: str, target_path: Path, **kwargs: Any) -> bool:
+        """Pulls a file from the given backup endpoint of the server and streams it to
+        target_path. Returns False if the server does not have it.
 
         May raise:
         - RemoteError if there are problems reaching the server or if
         there is an error returned by the server
         - PremiumAuthenticationError if the given key is rejected by the Rotkehlchen server
         """
-        data = self.sign('backup')
+        data = self.sign(method, **kwargs)
 
         try:
             response = self.session.get(
-                self.rotki_nest + 'backup',
+                self.rotki_nest + method,
                 params=data,
                 timeout=ROTKEHLCHEN_SERVER_BACKUP_TIMEOUT,
+                stream=True,
             )
+            check_response_status_code(response, (HTTPStatus.OK, HTTPStatus.NOT_FOUND))
+            if response.status_code == HTTPStatus.NOT_FOUND:
+                return False
+
+            with open(target_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=BACKUP_CHUNK_SIZE):
+                    f.write(chunk)
         except requests.exceptions.RequestException as e:
             msg = f'Could not connect to rotki server due to {e!s}'
             log.error(msg)
             raise RemoteError(msg) from e
 
-        check_response_status_code(response, (HTTPStatus.OK, HTTPStatus.NOT_FOUND))
-        if response.status_code == HTTPStatus.NOT_FOUND:
-            return None
+        return True
+
+    def pull_data(self, target_path: Path) -> bool:
+        """Pulls data from the server and streams the binary file with the database
+        encrypted to target_path.
+
+        Returns False if there is no DB saved in the server.
+
+        May raise:
+        - RemoteError if there are problems reaching the server or if
+        there is an error returned by the server
+        - PremiumAuthenticationError if the given key is rejected by the Rotkehlchen server
+        """
+        return self._pull_backup_file(method='backup', target_path=target_path)
+
+    def pull_delta(self, index: int, target_path: Path) -> bool:
+        """Pulls the encrypted changes uploaded with the given index on top of the remote
+        DB data and streams them to target_path.
 
-        return response.content
+        Returns False if the server does not have them.
+
+        May raise:
+        - RemoteError if there are problems reaching the server or if
+        there is an error returned by the server
+        - PremiumAuthenticationError if the given key is rejected by the Rotkehlchen server
+        """
+        return self._pull_backup_file(method='backup/delta', target_path=target_path, index=index)
 
     def query_last_data_metadata(self) -> RemoteMetadata:
         """Queries last metadata from the server and returns the response
@@ -447,6 +552,7 @@ class Premium:
                 last_modify_ts=Timestamp(result['last_modify_ts']),
                 data_hash=result['data_hash'],
                 data_size=result['data_size'],
+                deltas=result.get('deltas'),
             )
         except KeyError as e:
             msg = f'Problem connecting to rotki server. last_data_metadata response missing {e!s} key'  # noqa: E501
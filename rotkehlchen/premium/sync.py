@@ -1,15 +1,19 @@
 import logging
 import shutil
+import tempfile
 from enum import Enum
-from typing import Any, Literal, NamedTuple
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Literal, NamedTuple
 
 from rotkehlchen.api.websockets.typedefs import WSMessageType
 from rotkehlchen.constants.misc import USERSDIR_NAME
 from rotkehlchen.data_handler import DataHandler
 from rotkehlchen.data_migrations.manager import DataMigrationManager
 from rotkehlchen.db.cache import DBCache
+from rotkehlchen.db.sync_changes import DBSyncChanges
 from rotkehlchen.errors.api import PremiumAuthenticationError, RotkehlchenPermissionError
 from rotkehlchen.errors.misc import RemoteError, UnableToDecryptRemoteData
+from rotkehlchen.errors.serialization import DeserializationError
 from rotkehlchen.logging import RotkehlchenLogsAdapter
 from rotkehlchen.premium.premium import (
     Premium,
@@ -17,11 +21,19 @@ from rotkehlchen.premium.premium import (
     RemoteMetadata,
     premium_create_and_verify,
 )
+from rotkehlchen.types import Timestamp
 from rotkehlchen.utils.misc import ts_now
 
+if TYPE_CHECKING:
+    from rotkehlchen.db.drivers.gevent import DBCursor
+
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# After this many deltas the whole DB is uploaded again so that pulling it does not
+# need to download and apply too many of them
+MAX_DELTAS_PER_SNAPSHOT = 50
+
 
 class CanSync(Enum):
     YES = 0
@@ -39,7 +51,12 @@ class SyncCheckResult(NamedTuple):
 
 class PremiumSyncManager:
 
-    def __init__(self, migration_manager: DataMigrationManager, data: DataHandler) -> None:
+    def __init__(
+            self,
+            migration_manager: DataMigrationManager,
+            data: DataHandler,
+            sync_deltas: bool = False,
+    ) -> None:
         # Initialize this with the value saved in the DB
         with data.db.conn.read_ctx() as cursor:
             # These 2 vars contain the timestamp of our side. When did this DB try to upload
@@ -52,12 +69,18 @@ class PremiumSyncManager:
         self.data = data
         self.migration_manager = migration_manager
         self.premium: Premium | None = None
+        # Whether to sync the changes as deltas with servers that support them. This is
+        # experimental and off by default until the server side is available
+        self.sync_deltas = sync_deltas
 
     def _query_last_data_metadata(self) -> RemoteMetadata:
-        """Query remote metadata and keep up to date the last remote data upload ts"""
+        """Query remote metadata and keep up to date the last remote data upload ts.
+        The deltas of the remote data are ignored if syncing with deltas is off."""
         assert self.premium is not None, 'caller should make sure premium exists'
         metadata = self.premium.query_last_data_metadata()
         self.last_remote_data_upload_ts = metadata.upload_ts
+        if self.sync_deltas is False:
+            metadata = metadata._replace(deltas=None)
         return metadata
 
     def _can_sync_data_from_server(self, new_account: bool) -> SyncCheckResult:
@@ -119,22 +142,44 @@ class PremiumSyncManager:
         if self.premium is None:
             return False, 'Pulling failed. User does not have active premium.'
 
-        try:
-            result = self.premium.pull_data()
-        except (RemoteError, PremiumAuthenticationError) as e:
-            log.debug('sync from server -- pulling failed.', error=str(e))
-            return False, f'Pulling failed: {e!s}'
-
-        if result is None:
-            return False, 'No data found'
+        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmpdirname:  # needed on windows, see https://tinyurl.com/tmp-win-err  # noqa: E501
+            encrypted_path = Path(tmpdirname) / 'backup.bin'
+            delta_paths: list[Path] = []
+            try:
+                metadata = self._query_last_data_metadata()
+                found = self.premium.pull_data(encrypted_path)
+                for index in range(1, (metadata.deltas or 0) + 1):
+                    delta_path = Path(tmpdirname) / f'delta_{index}.bin'
+                    if self.premium.pull_delta(index=index, target_path=delta_path) is False:
+                        return False, f'Pulling failed: Could not find the changes {index} of the remote database'  # noqa: E501
+                    delta_paths.append(delta_path)
+            except (RemoteError, PremiumAuthenticationError) as e:
+                log.debug('sync from server -- pulling failed.', error=str(e))
+                return False, f'Pulling failed: {e!s}'
+
+            if found is False:
+                return False, 'No data found'
 
-        try:
-            self.data.decompress_and_decrypt_db(result)
-        except UnableToDecryptRemoteData as e:
-            raise PremiumAuthenticationError(
-                'The given password can not unlock the database that was retrieved  from '
-                'the server. Make sure to use the same password as when the account was created.',
-            ) from e
+            try:
+                head = self.data.decompress_and_decrypt_db(encrypted_path, delta_paths)
+            except UnableToDecryptRemoteData as e:
+                raise PremiumAuthenticationError(
+                    'The given password can not unlock the database that was retrieved  from '
+                    'the server. Make sure to use the same password as when the account was created.',  # noqa: E501
+                ) from e
+            except DeserializationError as e:
+                log.error(f'sync from server -- could not apply the remote database changes due to {e!s}')  # noqa: E501
+                return False, f'Pulling failed: {e!s}'
+
+        # The pulled DB may have the sync head and tracked changes of the device that
+        # uploaded it, so start tracking from the pulled data instead
+        with self.data.db.conn.write_ctx() as write_cursor:
+            self._update_sync_tracking(
+                write_cursor=write_cursor,
+                server_has_deltas=metadata.deltas is not None,
+                head=head,
+                last_change_id=None,
+            )
 
         # Need to run migrations in case the app was updated since last sync and in
         # case this is a request to sync from the API, where all modules are initialized
@@ -145,6 +190,68 @@ class PremiumSyncManager:
 
         return True, ''
 
+    def _update_sync_tracking(
+            self,
+            write_cursor: 'DBCursor',
+            server_has_deltas: bool,
+            head: str,
+            last_change_id: int | None,
+    ) -> None:
+        """After a sync with the server, track the changes of the DB on top of the data
+        with the given head if the server can receive them as deltas"""
+        if server_has_deltas:
+            DBSyncChanges(self.data.db).start_tracking(
+                write_cursor=write_cursor,
+                head=head,
+                last_change_id=last_change_id,
+            )
+        else:
+            DBSyncChanges(self.data.db).stop_tracking(write_cursor)
+
+    def _maybe_upload_delta(
+            self,
+            metadata: RemoteMetadata,
+            last_modify_ts: Timestamp,
+    ) -> tuple[str, int] | None:
+        """Uploads the changes of the DB since the last sync on top of the remote data
+        if the server supports it and the remote data is the one they were tracked from.
+
+        Returns the new hash of the remote data and the id of the last uploaded change
+        or None if the whole DB needs to be uploaded.
+
+        May raise:
+        - RemoteError if there are problems reaching the server or if
+        there is an error returned by the server
+        - PremiumAuthenticationError if the given key is rejected by the Rotkehlchen server
+        """
+        assert self.premium is not None, 'caller should make sure premium exists'
+        if metadata.deltas is None or metadata.deltas >= MAX_DELTAS_PER_SNAPSHOT:
+            return None
+
+        with self.data.db.conn.read_ctx() as cursor:
+            if DBSyncChanges(self.data.db).get_head(cursor) != metadata.data_hash:
+                return None  # remote data changed from another device or not tracking
+
+        with self.data.compress_and_encrypt_changes(parent_hash=metadata.data_hash) as result:
+            if result is None:
+                return None
+
+            data_path, new_hash, last_change_id = result
+            log.debug(
+                'upload to server -- uploading delta',
+                parent=metadata.data_hash,
+                size=data_path.stat().st_size,
+            )
+            self.premium.upload_delta(
+                data_path=data_path,
+                our_hash=new_hash,
+                parent_hash=metadata.data_hash,
+                last_modify_ts=last_modify_ts,
+                compression_type='zlib',
+            )
+
+        return new_hash, last_change_id
+
     def check_if_should_sync(self, force_upload: bool) -> bool:
         # if user has no premium do nothing
         if self.premium is None:
@@ -198,46 +305,11 @@ class PremiumSyncManager:
             self.last_upload_attempt_ts = ts_now()
             return False, message
 
-        data, our_hash = self.data.compress_and_encrypt_db()
-        log.debug(
-            'CAN_PUSH',
-            ours=our_hash,
-            theirs=metadata.data_hash,
-        )
-        if our_hash == metadata.data_hash and not force_upload:
-            log.debug('upload to server stopped -- same hash')
-            message = 'Remote database is up to date'
-            self.data.msg_aggregator.add_message(
-                message_type=WSMessageType.DATABASE_UPLOAD_RESULT,
-                data={'uploaded': False, 'actionable': True, 'message': message},
-            )
-            self.last_upload_attempt_ts = ts_now()
-            return False, message
-
-        data_bytes_size = len(data)
-        if data_bytes_size < metadata.data_size and not force_upload:
-            message = 'Remote database bigger than the local one'
-            log.debug(
-                f'upload to server stopped -- remote db({metadata.data_size}) '
-                f'bigger than local({data_bytes_size})',
-            )
-            self.data.msg_aggregator.add_message(
-                message_type=WSMessageType.DATABASE_UPLOAD_RESULT,
-                data={'uploaded': False, 'actionable': True, 'message': message},
-            )
-            self.last_upload_attempt_ts = ts_now()
-            return False, message
-
         try:
-            self.premium.upload_data(
-                data_blob=data,
-                our_hash=our_hash,
-                last_modify_ts=our_last_write_ts,
-                compression_type='zlib',
-            )
+            delta_upload = self._maybe_upload_delta(metadata=metadata, last_modify_ts=our_last_write_ts)  # noqa: E501
         except (RemoteError, PremiumAuthenticationError) as e:
             message = str(e)
-            log.debug('upload to server -- upload error', error=message)
+            log.debug('upload to server -- delta upload error', error=message)
             self.data.msg_aggregator.add_message(
                 message_type=WSMessageType.DATABASE_UPLOAD_RESULT,
                 data={'uploaded': False, 'actionable': False, 'message': message},
@@ -245,12 +317,73 @@ class PremiumSyncManager:
             self.last_upload_attempt_ts = ts_now()
             return False, message
 
+        if delta_upload is not None:
+            new_head, last_change_id = delta_upload
+        else:
+            with self.data.db.conn.read_ctx() as cursor:
+                # changes after this are also in the uploaded DB but they are tracked
+                # for the next delta anyway since deltas have the current rows
+                last_change_id = DBSyncChanges(self.data.db).get_last_change_id(cursor)
+            with self.data.compress_and_encrypt_db() as (data_path, our_hash):
+                log.debug(
+                    'CAN_PUSH',
+                    ours=our_hash,
+                    theirs=metadata.data_hash,
+                )
+                if our_hash == metadata.data_hash and not force_upload:
+                    log.debug('upload to server stopped -- same hash')
+                    message = 'Remote database is up to date'
+                    self.data.msg_aggregator.add_message(
+                        message_type=WSMessageType.DATABASE_UPLOAD_RESULT,
+                        data={'uploaded': False, 'actionable': True, 'message': message},
+                    )
+                    self.last_upload_attempt_ts = ts_now()
+                    return False, message
+
+                data_bytes_size = data_path.stat().st_size
+                if data_bytes_size < metadata.data_size and not force_upload:
+                    message = 'Remote database bigger than the local one'
+                    log.debug(
+                        f'upload to server stopped -- remote db({metadata.data_size}) '
+                        f'bigger than local({data_bytes_size})',
+                    )
+                    self.data.msg_aggregator.add_message(
+                        message_type=WSMessageType.DATABASE_UPLOAD_RESULT,
+                        data={'uploaded': False, 'actionable': True, 'message': message},
+                    )
+                    self.last_upload_attempt_ts = ts_now()
+                    return False, message
+
+                try:
+                    self.premium.upload_data(
+                        data_path=data_path,
+                        our_hash=our_hash,
+                        last_modify_ts=our_last_write_ts,
+                        compression_type='zlib',
+                    )
+                except (RemoteError, PremiumAuthenticationError) as e:
+                    message = str(e)
+                    log.debug('upload to server -- upload error', error=message)
+                    self.data.msg_aggregator.add_message(
+                        message_type=WSMessageType.DATABASE_UPLOAD_RESULT,
+                        data={'uploaded': False, 'actionable': False, 'message': message},
+                    )
+                    self.last_upload_attempt_ts = ts_now()
+                    return False, message
+            new_head = our_hash
+
         # update the last data upload value
         self.last_data_upload_ts = ts_now()
         self.last_upload_attempt_ts = self.last_data_upload_ts
         self.last_remote_data_upload_ts = self.last_data_upload_ts
         with self.data.db.user_write() as cursor:
             self.data.db.set_cache(cursor, {DBCache.LAST_DATA_UPLOAD_TS: self.last_data_upload_ts})
+            self._update_sync_tracking(
+                write_cursor=cursor,
+                server_has_deltas=metadata.deltas is not None,
+                head=new_head,
+                last_change_id=last_change_id,
+            )
 
         self.data.msg_aggregator.add_message(
             message_type=WSMessageType.DATABASE_UPLOAD_RESULT,
@@ -6,6 +6,7 @@ import logging.config
 import os
 import time
 from collections import defaultdict
+from functools import partial
 from pathlib import Path
 from types import FunctionType
 from typing import TYPE_CHECKING, Any, Literal, Optional, cast, overload
@@ -21,6 +22,7 @@ from rotkehlchen.balances.manual import (
     account_for_manually_tracked_asset_balances,
     get_manually_tracked_balances,
 )
+from rotkehlchen.balances.sources import query_balance_sources
 from rotkehlchen.chain.accounts import SingleBlockchainAccountData
 from rotkehlchen.chain.aggregator import ChainsAggregator
 from rotkehlchen.chain.arbitrum_one.manager import ArbitrumOneManager
@@ -56,7 +58,6 @@ from rotkehlchen.db.updates import RotkiDataUpdater
 from rotkehlchen.errors.api import PremiumAuthenticationError
 from rotkehlchen.errors.asset import UnknownAsset
 from rotkehlchen.errors.misc import (
-    EthSyncError,
     GreenletKilledError,
     InputError,
     RemoteError,
@@ -105,8 +106,11 @@ from rotkehlchen.utils.datadir import maybe_restructure_rotki_data_directory
 from rotkehlchen.utils.misc import combine_dicts
 
 if TYPE_CHECKING:
+    from collections.abc import Callable
+
     from rotkehlchen.chain.bitcoin.xpub import XpubData
     from rotkehlchen.db.drivers.gevent import DBCursor
+    from rotkehlchen.exchanges.exchange import ExchangeInterface, ExchangeQueryBalances
     from rotkehlchen.exchanges.kraken import KrakenAccountType
 
 logger = logging.getLogger(__name__)
@@ -304,6 +308,7 @@ class Rotkehlchen:
         self.premium_sync_manager = PremiumSyncManager(
             migration_manager=self.migration_manager,
             data=self.data,
+            sync_deltas=self.args.premium_sync_deltas,
         )
         # set the DB in the external services instances that need it
         self.cryptocompare.set_database(self.data.db)
@@ -457,6 +462,7 @@ class Rotkehlchen:
             msg_aggregator=self.msg_aggregator,
             chains_aggregator=self.chains_aggregator,
             premium=self.premium,
+            keep_processed_events=False,  # the events of the reports are read from the DB
         )
         self.history_querying_manager = HistoryQueryingManager(
             user_directory=self.user_directory,
@@ -852,7 +858,7 @@ class Rotkehlchen:
             start_ts: Timestamp,
             end_ts: Timestamp,
     ) -> tuple[int, str]:
-        error_or_empty, events = self.history_querying_manager.get_history(
+        error_or_empty, events = self.history_querying_manager.get_history_stream(
             start_ts=start_ts,
             end_ts=end_ts,
             has_premium=self.premium is not None,
@@ -893,8 +899,32 @@ class Rotkehlchen:
 
         balances: dict[str, dict[Asset, Balance]] = {}
         problem_free = True
-        for exchange in self.exchange_manager.iterate_exchanges():
-            exchange_balances, error_msg = exchange.query_balances(ignore_cache=ignore_cache)
+        exchange_results: list[tuple['ExchangeInterface', 'ExchangeQueryBalances']] = []
+        loopring_balances: dict[Asset, Balance] = {}
+
+        def query_exchange(exchange: 'ExchangeInterface') -> None:
+            exchange_results.append((exchange, exchange.query_balances(ignore_cache=ignore_cache)))
+
+        def query_loopring() -> None:
+            nonlocal loopring_balances
+            loopring_balances = self.chains_aggregator.get_loopring_balances()
+
+        # the exchanges, loopring and the chains are queried concurrently. Each source
+        # that fails is reported and the balances of the rest are still returned
+        sources: dict['ExchangeInterface | Literal["loopring"]', Callable[[], None]] = {
+            exchange: partial(query_exchange, exchange)
+            for exchange in self.exchange_manager.iterate_exchanges()
+        }
+        if self.chains_aggregator.get_module('loopring'):
+            sources['loopring'] = query_loopring
+        chains_greenlet = gevent.spawn(
+            self.chains_aggregator.query_all_chains_balances,
+            ignore_cache=ignore_cache,
+        )
+        errors = query_balance_sources(sources)
+        chain_errors = chains_greenlet.get()
+
+        for exchange, (exchange_balances, error_msg) in exchange_results:
             # If we got an error, disregard that exchange but make sure we don't save data
             if not isinstance(exchange_balances, dict):
                 problem_free = False
@@ -912,24 +942,26 @@ class Rotkehlchen:
                         exchange_balances,  # type: ignore
                     )
 
-        liabilities: dict[Asset, Balance]
-        try:
-            blockchain_result = self.chains_aggregator.query_balances(
-                blockchain=None,
-                ignore_cache=ignore_cache,
-            )  # copies below since if cache is used we end up modifying the balance sheet object
-            if len(blockchain_result.totals.assets) != 0:
-                balances[str(Location.BLOCKCHAIN)] = blockchain_result.totals.assets.copy()
-            liabilities = blockchain_result.totals.liabilities.copy()
-        except (RemoteError, EthSyncError) as e:
+        if len(loopring_balances) != 0:
+            balances[str(Location.LOOPRING)] = loopring_balances
+
+        failed_sources = [
+            (source if isinstance(source, str) else source.name, error)
+            for source, error in errors.items()
+        ] + [(f'{chain!s} balances query', error) for chain, error in chain_errors.items()]
+        for location, error in failed_sources:
             problem_free = False
-            liabilities = {}
-            log.error(f'Querying blockchain balances failed due to: {e!s}')
             self.msg_aggregator.add_message(
                 message_type=WSMessageType.BALANCE_SNAPSHOT_ERROR,
-                data={'location': 'blockchain balances query', 'error': str(e)},
+                data={'location': location, 'error': str(error)},
             )
 
+        # copies below since if cache is used we end up modifying the balance sheet object
+        blockchain_result = self.chains_aggregator.get_balances_update(chain=None)
+        if len(blockchain_result.totals.assets) != 0:
+            balances[str(Location.BLOCKCHAIN)] = blockchain_result.totals.assets.copy()
+        liabilities: dict[Asset, Balance] = blockchain_result.totals.liabilities.copy()
+
         manually_tracked_liabilities = get_manually_tracked_balances(
             db=self.data.db,
             balance_type=BalanceType.LIABILITY,
@@ -939,20 +971,6 @@ class Rotkehlchen:
             manual_liabilities_as_dict[manual_liability.asset] += manual_liability.value
 
         liabilities = combine_dicts(liabilities, manual_liabilities_as_dict)
-        # retrieve loopring balances if module is activated
-        if self.chains_aggregator.get_module('loopring'):
-            try:
-                loopring_balances = self.chains_aggregator.get_loopring_balances()
-            except RemoteError as e:
-                problem_free = False
-                self.msg_aggregator.add_message(
-                    message_type=WSMessageType.BALANCE_SNAPSHOT_ERROR,
-                    data={'location': 'loopring', 'error': str(e)},
-                )
-            else:
-                if len(loopring_balances) != 0:
-                    balances[str(Location.LOOPRING)] = loopring_balances
-
         # retrieve nft balances if module is activated
         nfts = self.chains_aggregator.get_module('nfts')
         if nfts is not None:
@@ -514,6 +514,7 @@ def deserialize_evm_transaction(
         chain_id: ChainID,
         evm_inquirer: Optional['EvmNodeInquirer'] = None,
         parent_tx_hash: Optional['EVMTxHash'] = None,
+        raw_receipt_data: dict[str, Any] | None = None,
 ) -> tuple[EvmInternalTransaction, None]:
     ...
 
@@ -525,6 +526,7 @@ def deserialize_evm_transaction(
         chain_id: ChainID,
         evm_inquirer: None,
         parent_tx_hash: Optional['EVMTxHash'] = None,
+        raw_receipt_data: dict[str, Any] | None = None,
 ) -> tuple[EvmTransaction, None]:
     ...
 
@@ -536,6 +538,7 @@ def deserialize_evm_transaction(
         chain_id: ChainID,
         evm_inquirer: 'EvmNodeInquirer',
         parent_tx_hash: Optional['EVMTxHash'] = None,
+        raw_receipt_data: dict[str, Any] | None = None,
 ) -> tuple[EvmTransaction, dict[str, Any]]:
     ...
 
@@ -547,6 +550,7 @@ def deserialize_evm_transaction(  # type: ignore[misc]
         chain_id: Literal[ChainID.OPTIMISM, ChainID.BASE],
         evm_inquirer: 'OptimismSuperchainInquirer',
         parent_tx_hash: Optional['EVMTxHash'] = None,
+        raw_receipt_data: dict[str, Any] | None = None,
 ) -> tuple[OptimismTransaction, dict[str, Any]]:
     ...
 
@@ -557,6 +561,7 @@ def deserialize_evm_transaction(
         chain_id: ChainID,
         evm_inquirer: Optional['EvmNodeInquirer'] = None,
         parent_tx_hash: Optional['EVMTxHash'] = None,
+        raw_receipt_data: dict[str, Any] | None = None,
 ) -> tuple[EvmTransaction | EvmInternalTransaction, dict[str, Any] | None]:
     """Reads dict data of a transaction and deserializes it.
     If the transaction is not from etherscan then it's missing some data
@@ -569,11 +574,13 @@ def deserialize_evm_transaction(
 
     Can raise DeserializationError if something is wrong
 
+    If the raw receipt data of the transaction has already been queried they can be
+    provided so that they are not queried again.
+
     Returns the deserialized transaction and optionally raw receipt data if it was queried
     and if this is not for an internal transaction.
     """
     source = 'etherscan' if evm_inquirer is None else 'web3'
-    raw_receipt_data = None
     try:
         tx_hash = parent_tx_hash if parent_tx_hash is not None else deserialize_evm_tx_hash(data['hash'])  # noqa: E501
         block_number = read_integer(data, 'blockNumber', source)
@@ -609,7 +616,8 @@ def deserialize_evm_transaction(
         if 'gasUsed' not in data:  # some etherscan APIs may have this
             if evm_inquirer is None:
                 raise DeserializationError('Got in deserialize evm transaction without gasUsed and without evm inquirer')  # noqa: E501
-            raw_receipt_data = evm_inquirer.get_transaction_receipt(tx_hash)
+            if raw_receipt_data is None:
+                raw_receipt_data = evm_inquirer.get_transaction_receipt(tx_hash)
             gas_used = read_integer(raw_receipt_data, 'gasUsed', source)
             if chain_id == ChainID.ARBITRUM_ONE:
                 # In Arbitrum One the gas price included in the data is the "Gas Price Bid" and not
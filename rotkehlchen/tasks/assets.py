@@ -53,6 +53,7 @@ def _add_spam_asset(
             query,
             [(SPAM_PROTOCOL, identifier) for identifier in detected_spam_assets],
         )
+    globaldb.clean_evm_tokens_cache()  # the protocol of the cached tokens changed
 
     user_db.ignore_multiple_assets(
         write_cursor=user_db_write_cursor,
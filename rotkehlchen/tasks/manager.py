@@ -54,6 +54,7 @@ from rotkehlchen.types import (
     Location,
     Optional,
     SupportedBlockchain,
+    Timestamp,
     get_args,
 )
 from rotkehlchen.utils.misc import ts_now
@@ -78,6 +79,7 @@ log = RotkehlchenLogsAdapter(logger)
 CRYPTOCOMPARE_QUERY_AFTER_SECS = 86400  # a day
 DEFAULT_MAX_TASKS_NUM = 2
 CRYPTOCOMPARE_HISTOHOUR_FREQUENCY = 240  # at least 4 mins apart
+CRYPTOCOMPARE_HISTOHOUR_PAIRS_PER_TASK = 8
 XPUB_DERIVATION_FREQUENCY = 3600  # every hour
 EVM_TX_QUERY_FREQUENCY = 3600  # every hour
 EXCHANGE_QUERY_FREQUENCY = 3600  # every hour
@@ -224,8 +226,24 @@ class TaskManager:
 
         self.prepared_cryptocompare_query = True
 
+    def _query_cryptocompare_histohour(
+            self,
+            queries: list[CCHistoQuery],
+            timestamp: Timestamp,
+    ) -> None:
+        """Queries the cryptocompare histohour data of the given pairs. The pairs that were
+        not queried due to a rate limit are queried again in a later task."""
+        not_queried = self.cryptocompare.query_and_store_historical_data_of_pairs(
+            pairs=[(x.from_asset, x.to_asset) for x in queries],
+            timestamp=timestamp,
+        )
+        self.cryptocompare_queries.update(
+            CCHistoQuery(from_asset=from_asset, to_asset=to_asset)
+            for from_asset, to_asset in not_queried
+        )
+
     def _maybe_schedule_cryptocompare_query(self) -> Optional[list[gevent.Greenlet]]:
-        """Schedules a cryptocompare query for a single asset history"""
+        """Schedules a cryptocompare query for the history of a batch of assets"""
         if self.prepared_cryptocompare_query is False:
             self._prepare_cryptocompare_queries()
 
@@ -245,16 +263,18 @@ class TaskManager:
         if now_ts - self.cryptocompare.last_histohour_query_ts <= CRYPTOCOMPARE_HISTOHOUR_FREQUENCY:  # noqa: E501
             return None
 
-        query = self.cryptocompare_queries.pop()
-        task_name = f'Cryptocompare historical prices {query.from_asset} / {query.to_asset} query'
+        queries = [
+            self.cryptocompare_queries.pop() for _ in
+            range(min(len(self.cryptocompare_queries), CRYPTOCOMPARE_HISTOHOUR_PAIRS_PER_TASK))
+        ]
+        task_name = f'Cryptocompare historical prices query of {len(queries)} asset pairs'
         log.debug(f'Scheduling task for {task_name}')
         return [self.greenlet_manager.spawn_and_track(
             after_seconds=None,
             task_name=task_name,
             exception_is_error=False,
-            method=self.cryptocompare.query_and_store_historical_data,
-            from_asset=query.from_asset,
-            to_asset=query.to_asset,
+            method=self._query_cryptocompare_histohour,
+            queries=queries,
             timestamp=now_ts,
         )]
 
@@ -1,13 +1,18 @@
 import os
 import shutil
 from http import HTTPStatus
+from io import StringIO
 from pathlib import Path
 from tempfile import TemporaryDirectory
+from unittest.mock import patch
 
 import pytest
 import requests
 
+from rotkehlchen.data_import.importers.binance import BinanceImporter
+from rotkehlchen.data_import.utils import CountedLines
 from rotkehlchen.db.filtering import AssetMovementsFilterQuery, TradesFilterQuery
+from rotkehlchen.errors.misc import InputError
 from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.api import (
     api_url_for,
@@ -491,6 +496,72 @@ def test_data_import_binance_history(rotkehlchen_api_server):
     assert_binance_import_results(rotki)
 
 
+def test_data_import_binance_resumes(rotkehlchen_api_server):
+    """Test that a binance import that fails midway keeps the rows imported in the
+    transactions before the failure and that importing the file again skips them"""
+    rotki = rotkehlchen_api_server.rest_api.rotkehlchen
+    dir_path = Path(__file__).resolve().parent.parent
+    filepath = dir_path / 'data' / 'binance_history.csv'
+    json_data = {'source': 'binance', 'file': str(filepath)}
+    original_import_entry = BinanceImporter._import_entry
+    imported_entries = 0
+
+    def failing_import_entry(self, *args, **kwargs):
+        nonlocal imported_entries
+        if (imported_entries := imported_entries + 1) == 20:
+            raise InputError('Simulated failure')
+        return original_import_entry(self, *args, **kwargs)
+
+    with (
+        patch('rotkehlchen.data_import.utils.LINES_PER_IMPORT_TRANSACTION', new=10),
+        patch.object(BinanceImporter, '_import_entry', new=failing_import_entry),
+    ):
+        response = requests.put(
+            api_url_for(rotkehlchen_api_server, 'dataimportresource'),
+            json=json_data,
+        )
+    assert_error_response(
+        response=response,
+        contained_in_msg='Simulated failure',
+        status_code=HTTPStatus.BAD_REQUEST,
+    )
+    with rotki.data.db.conn.read_ctx() as cursor:
+        assert rotki.data.db.get_trades_and_limit_info(cursor, filter_query=TradesFilterQuery.make(), has_premium=True)[1] != 0  # noqa: E501
+
+    response = requests.put(
+        api_url_for(rotkehlchen_api_server, 'dataimportresource'),
+        json=json_data,
+    )
+    assert assert_proper_response_with_result(response) is True
+    assert_binance_import_results(rotki)  # no entry was imported twice
+    with rotki.data.db.conn.read_ctx() as cursor:
+        assert cursor.execute(
+            "SELECT COUNT(*) FROM key_value_cache WHERE name LIKE 'csv_import_%'",
+        ).fetchone()[0] == 0
+
+
+def test_binance_rows_grouped_when_timestamps_return(database):
+    """Test that the rows of a timestamp are grouped together even when they come back
+    after the grouping window has moved past their timestamp"""
+    csv_data = 'User_ID,UTC_Time,Account,Operation,Coin,Change,Remark\n' + ''.join(
+        f'1,{utc_time},Spot,{operation},{coin},{change},\n'
+        for utc_time, operation, coin, change in (
+            ('2020-10-28 22:03:03', 'Buy', 'BTC', '0.1'),
+            ('2020-10-28 22:03:04', 'Deposit', 'EUR', '100'),
+            ('2020-10-28 22:03:05', 'Deposit', 'EUR', '200'),
+            ('2020-10-28 22:03:03', 'Sell', 'EUR', '-1000'),
+        )
+    )
+    with patch('rotkehlchen.data_import.importers.binance.BINANCE_GROUPING_WINDOW', new=1):
+        groups = list(BinanceImporter(database)._iterate_entries(CountedLines(StringIO(csv_data))))
+
+    assert [(timestamp, [x['Operation'] for x in rows]) for timestamp, rows in groups] == [
+        (1603922583, ['Buy', 'Sell']),
+        (1603922584, ['Deposit']),
+        (1603922585, ['Deposit']),
+    ]
+
+
 def test_data_import_rotki_generic_trades(rotkehlchen_api_server):
     """Test that data import works for rotki generic trades import csv file."""
     rotki = rotkehlchen_api_server.rest_api.rotkehlchen
@@ -8,6 +8,10 @@ import requests
 from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_CRV, A_USD
 from rotkehlchen.fval import FVal
+from rotkehlchen.tests.utils.accounting import (
+    add_accounting_snapshots,
+    get_accounting_snapshot_timestamps,
+)
 from rotkehlchen.tests.utils.api import (
     api_url_for,
     assert_error_response,
@@ -16,6 +20,7 @@ from rotkehlchen.tests.utils.api import (
     assert_simple_ok_response,
     wait_for_async_task_with_result,
 )
+from rotkehlchen.types import Timestamp
 
 
 @pytest.mark.parametrize('mocked_price_queries', [{
@@ -108,6 +113,8 @@ def _assert_expected_prices(
 
 
 def test_manual_historical_price(rotkehlchen_api_server, globaldb):
+    database = rotkehlchen_api_server.rest_api.rotkehlchen.data.db
+    add_accounting_snapshots(database, [Timestamp(1611162000), Timestamp(1611162735), Timestamp(1611166335)])  # noqa: E501
     # Test normal price
     response = requests.put(
         api_url_for(
@@ -131,6 +138,8 @@ def test_manual_historical_price(rotkehlchen_api_server, globaldb):
     assert historical_price.price == FVal(1.2)
     assert historical_price.from_asset == A_CRV.identifier
     assert historical_price.to_asset == A_USD
+    # the snapshots with events that can use the price are invalidated
+    assert get_accounting_snapshot_timestamps(database) == [1611162000, 1611162735]
     # Test with zero price
     response = requests.put(
         api_url_for(
@@ -204,6 +213,7 @@ def test_manual_historical_price(rotkehlchen_api_server, globaldb):
             'price': '1.30',
         },
     )
+    add_accounting_snapshots(database, [Timestamp(1611166000)])
     # Try to edit entry
     response = requests.patch(
         api_url_for(
@@ -217,6 +227,7 @@ def test_manual_historical_price(rotkehlchen_api_server, globaldb):
             'price': '1.50',
         },
     )
+    assert get_accounting_snapshot_timestamps(database) == [1611162000, 1611162735]
     # Try to retrieve the assets price
     response = requests.get(
         api_url_for(
@@ -273,6 +284,7 @@ def test_manual_historical_price(rotkehlchen_api_server, globaldb):
     )
     data = assert_proper_response_with_result(response)
     _assert_expected_prices(data, after_deletion=False)
+    add_accounting_snapshots(database, [Timestamp(1611166000)])
     # Delete entry
     response = requests.delete(
         api_url_for(
@@ -285,6 +297,7 @@ def test_manual_historical_price(rotkehlchen_api_server, globaldb):
             'timestamp': 1611166335,
         },
     )
+    assert get_accounting_snapshot_timestamps(database) == [1611162000, 1611162735]
     # If we query again we should only see two results
     response = requests.get(
         api_url_for(
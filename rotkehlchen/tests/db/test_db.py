@@ -1,6 +1,7 @@
 import dataclasses
 import logging
 import time
+import zlib
 from contextlib import suppress
 from copy import deepcopy
 from pathlib import Path
@@ -25,7 +26,9 @@ from rotkehlchen.constants.assets import (
     A_USDC,
 )
 from rotkehlchen.constants.misc import USERSDIR_NAME
+from rotkehlchen.crypto import decrypt
 from rotkehlchen.data_handler import DataHandler
+from rotkehlchen.db.balance_snapshots import SnapshotResolution
 from rotkehlchen.db.cache import DBCache
 from rotkehlchen.db.dbhandler import DBHandler
 from rotkehlchen.db.filtering import AssetMovementsFilterQuery, TradesFilterQuery
@@ -43,6 +46,7 @@ from rotkehlchen.db.settings import (
     DEFAULT_DATE_DISPLAY_FORMAT,
     DEFAULT_DISPLAY_DATE_IN_LOCALTIME,
     DEFAULT_ETH_STAKING_TAXABLE_AFTER_WITHDRAWAL_ENABLED,
+    DEFAULT_HEDGE_EVM_QUERIES,
     DEFAULT_HISTORICAL_PRICE_ORACLES,
     DEFAULT_INCLUDE_CRYPTO2CRYPTO,
     DEFAULT_INCLUDE_FEES_IN_COST_BASIS,
@@ -61,6 +65,7 @@ from rotkehlchen.db.settings import (
     DBSettings,
     ModifiableDBSettings,
 )
+from rotkehlchen.db.snapshots import DBSnapshot
 from rotkehlchen.db.utils import DBAssetBalance, LocationData, SingleDBAssetBalance
 from rotkehlchen.errors.api import AuthenticationError
 from rotkehlchen.errors.misc import DBSchemaError, InputError
@@ -153,6 +158,10 @@ TABLES_AT_INIT = [
     'linked_rules_properties',
     'unresolved_remote_conflicts',
     'key_value_cache',
+    'accounting_snapshots',
+    'premium_sync_changes',
+    'balance_snapshots',
+    'xpub_derived_addresses',
 ]
 
 
@@ -304,9 +313,12 @@ def test_export_import_db(data_dir: Path, username: str, sql_vm_instructions_cb:
     with data.db.user_write() as cursor:
         data.db.add_manually_tracked_balances(cursor, [starting_balance])
 
-    encoded_data, _ = data.compress_and_encrypt_db()
-    # The server would return them decoded
-    data.decompress_and_decrypt_db(encoded_data)
+    with data.compress_and_encrypt_db() as (encrypted_path, _):
+        # the streamed backup can be decrypted in one go as older versions do
+        decrypted = decrypt(b'123', encrypted_path.read_bytes())
+        assert zlib.decompress(decrypted).startswith(b'SQLite format 3\x00')
+        # The server would return them decoded
+        data.decompress_and_decrypt_db(encrypted_path)
     with data.db.user_write() as cursor:
         balances = data.db.get_manually_tracked_balances(cursor)
     assert balances == [starting_balance]
@@ -481,6 +493,7 @@ def test_writing_fetching_data(data_dir, username, sql_vm_instructions_cb):
         'query_retry_limit': DEFAULT_QUERY_RETRY_LIMIT,
         'connect_timeout': DEFAULT_CONNECT_TIMEOUT,
         'read_timeout': DEFAULT_READ_TIMEOUT,
+        'hedge_evm_queries': DEFAULT_HEDGE_EVM_QUERIES,
     }
     assert len(expected_dict) == len(dataclasses.fields(DBSettings)), 'One or more settings are missing'  # noqa: E501
 
@@ -894,6 +907,63 @@ def test_timed_balances_inferred_zero_balances(data_dir, username, sql_vm_instru
     assert len(all_data) == 319  # 5 from db + 312 ssf_graph_multiplier zeros + 2 inferred zeros  # noqa: E501
 
 
+def test_timed_balances_resolutions(data_dir, username, sql_vm_instructions_cb):
+    """Test that the balance graphs can be queried with the last snapshot of each day and
+    week and that the snapshots of each resolution are kept up to date"""
+    data = DataHandler(data_dir, MessagesAggregator(), sql_vm_instructions_cb)
+    data.unlock(username, '123', create_new=True, resume_from_backup=False)
+    # monday 1/1/24 at 00:00 and 01:00, tuesday at 01:00 and next monday at 00:00
+    timestamps = [Timestamp(1704067200), Timestamp(1704070800), Timestamp(1704157200), Timestamp(1704672000)]  # noqa: E501
+    with data.db.user_write() as write_cursor:
+        for idx, timestamp in enumerate(timestamps):
+            data.db.save_balances_data(
+                write_cursor=write_cursor,
+                data={
+                    'assets': {A_ETH: {'amount': FVal(idx + 1), 'usd_value': FVal(idx + 1)}} if idx != 2 else {},  # noqa: E501
+                    'liabilities': {},
+                    'location': {'blockchain': {'usd_value': FVal(idx + 1)}},
+                    'net_usd': FVal(idx + 1),
+                },
+                timestamp=timestamp,
+            )
+        data.db.set_settings(write_cursor, settings=ModifiableDBSettings(infer_zero_timed_balances=True))  # noqa: E501
+
+    for resolution, expected_times, expected_amounts in (
+            (SnapshotResolution.SNAPSHOT, timestamps, [1, 2, 0, 4]),
+            (SnapshotResolution.DAY, timestamps[1:], [2, 0, 4]),
+            (SnapshotResolution.WEEK, timestamps[2:], [4]),  # no zero before the first balance
+    ):
+        times, values = data.db.get_netvalue_data(from_ts=Timestamp(0), resolution=resolution)
+        assert times == expected_times
+        assert values == [str(timestamps.index(x) + 1) for x in expected_times]
+        with data.db.conn.read_ctx() as cursor:
+            balances = data.db.query_timed_balances(
+                cursor=cursor,
+                asset=A_ETH,
+                balance_type=BalanceType.ASSET,
+                resolution=resolution,
+            )
+        assert [x.amount for x in balances] == expected_amounts
+        assert [x.time for x in balances] == expected_times[-len(balances):]
+
+    # removing the last snapshot of a day makes the previous one the last of the day
+    with data.db.user_write() as write_cursor:
+        DBSnapshot(db_handler=data.db, msg_aggregator=data.msg_aggregator).delete(
+            write_cursor=write_cursor,
+            timestamp=timestamps[1],
+        )
+        assert write_cursor.execute(
+            'SELECT timestamp, resolution FROM balance_snapshots ORDER BY timestamp',
+        ).fetchall() == [
+            (timestamps[0], SnapshotResolution.DAY.value),
+            (timestamps[2], SnapshotResolution.WEEK.value),
+            (timestamps[3], SnapshotResolution.WEEK.value),
+        ]
+
+    times, _ = data.db.get_netvalue_data(from_ts=Timestamp(0), resolution=SnapshotResolution.DAY)
+    assert times == [timestamps[0], *timestamps[2:]]
+
+
 def test_query_owned_assets(data_dir, username, sql_vm_instructions_cb):
     """Test the get_owned_assets with also an unknown asset in the DB"""
     msg_aggregator = MessagesAggregator()
@@ -31,6 +31,7 @@ from rotkehlchen.tests.utils.database import (
     _use_prepared_db,
     mock_db_schema_sanity_check,
     mock_dbhandler_sync_globaldb_assets,
+    mock_dbhandler_sync_tracking,
     mock_dbhandler_update_owned_assets,
 )
 from rotkehlchen.types import Location, deserialize_evm_tx_hash
@@ -116,6 +117,8 @@ def _init_db_with_target_version(
         stack.enter_context(target_patch(target_version=target_version))
         stack.enter_context(mock_db_schema_sanity_check())
         stack.enter_context(no_tables_created_after_init)
+        if target_version <= 40:
+            stack.enter_context(mock_dbhandler_sync_tracking())
         if target_version <= 25:
             stack.enter_context(mock_dbhandler_update_owned_assets())
             stack.enter_context(mock_dbhandler_sync_globaldb_assets())
@@ -1994,8 +1997,16 @@ def test_upgrade_db_40_to_41(user_data_dir):
     with db_v40.conn.write_ctx() as cursor:
         cursor.executemany('INSERT INTO settings VALUES (?, ?)', settings.items())
         assert table_exists(cursor, 'key_value_cache') is False
+        assert table_exists(cursor, 'accounting_snapshots') is False
+        assert table_exists(cursor, 'premium_sync_changes') is False
+        assert table_exists(cursor, 'balance_snapshots') is False
+        assert table_exists(cursor, 'xpub_derived_addresses') is False
         cursor.execute('SELECT COUNT(*) FROM location WHERE location=? AND seq=?', ('m', 45))
         assert cursor.fetchone()[0] == 0
+        cursor.executemany(  # snapshots on monday 1/1/24 twice, tuesday and the next monday
+            'INSERT INTO timed_location_data(timestamp, location, usd_value) VALUES(?, ?, ?)',
+            [(1704067200, 'H', '1'), (1704070800, 'H', '2'), (1704157200, 'H', '3'), (1704672000, 'H', '4')],  # noqa: E501
+        )
     db_v40.logout()
 
     # Execute upgrade
@@ -2018,6 +2029,12 @@ def test_upgrade_db_40_to_41(user_data_dir):
 
         cursor.execute('SELECT COUNT(*) FROM location WHERE location=? AND seq=?', ('m', 45))
         assert cursor.fetchone()[0] == 1
+        assert table_exists(cursor, 'accounting_snapshots') is True
+        assert table_exists(cursor, 'premium_sync_changes') is True
+        assert table_exists(cursor, 'xpub_derived_addresses') is True
+        assert cursor.execute('SELECT timestamp, resolution FROM balance_snapshots ORDER BY timestamp').fetchall() == [  # noqa: E501
+            (1704067200, 0), (1704070800, 1), (1704157200, 2), (1704672000, 2),
+        ]
     db.logout()
 
 
@@ -2044,6 +2061,8 @@ def test_latest_upgrade_correctness(user_data_dir):
     tables_before = {x[0] for x in result}
     result = cursor.execute('SELECT name FROM sqlite_master WHERE type="view"')
     views_before = {x[0] for x in result}
+    result = cursor.execute('SELECT name FROM sqlite_master WHERE type="index"')
+    indexes_before = {x[0] for x in result}
 
     last_db.logout()
 
@@ -2064,12 +2083,16 @@ def test_latest_upgrade_correctness(user_data_dir):
     tables_after_upgrade = {x[0] for x in result}
     result = cursor.execute('SELECT name FROM sqlite_master WHERE type="view"')
     views_after_upgrade = {x[0] for x in result}
+    result = cursor.execute('SELECT name FROM sqlite_master WHERE type="index"')
+    indexes_after_upgrade = {x[0] for x in result}
     # also add latest tables (this will indicate if DB upgrade missed something
     db.conn.executescript(DB_SCRIPT_CREATE_TABLES)
     result = cursor.execute('SELECT name FROM sqlite_master WHERE type="table"')
     tables_after_creation = {x[0] for x in result}
     result = cursor.execute('SELECT name FROM sqlite_master WHERE type="view"')
     views_after_creation = {x[0] for x in result}
+    result = cursor.execute('SELECT name FROM sqlite_master WHERE type="index"')
+    indexes_after_creation = {x[0] for x in result}
 
     assert cursor.execute('SELECT value FROM settings WHERE name="version"').fetchone()[0] == '41'
     removed_tables = set()
@@ -2080,10 +2103,25 @@ def test_latest_upgrade_correctness(user_data_dir):
     assert missing_views == removed_views
     assert tables_after_creation - tables_after_upgrade == set()
     assert views_after_creation - views_after_upgrade == set()
+    assert indexes_after_creation - indexes_after_upgrade == set()
     new_tables = tables_after_upgrade - tables_before
-    assert new_tables == {'key_value_cache'}
+    assert new_tables == {'key_value_cache', 'accounting_snapshots', 'premium_sync_changes', 'balance_snapshots', 'xpub_derived_addresses'}  # noqa: E501
     new_views = views_after_upgrade - views_before
     assert new_views == set()
+    new_indexes = indexes_after_upgrade - indexes_before
+    assert new_indexes == {
+        'sqlite_autoindex_key_value_cache_1',
+        'sqlite_autoindex_accounting_snapshots_1',
+        'sqlite_autoindex_premium_sync_changes_1',
+        'sqlite_autoindex_xpub_derived_addresses_1',
+        'idx_history_events_timestamp',
+        'idx_history_events_location',
+        'idx_history_events_location_label',
+        'idx_history_events_asset',
+        'idx_history_events_type',
+        'idx_evm_events_info_tx_hash',
+        'idx_evm_events_info_counterparty',
+    }
 
 
 def test_steps_counted_properly_in_upgrades(user_data_dir):
@@ -1,34 +1,50 @@
+import re
+from collections.abc import Iterable
 from typing import Any
+from unittest.mock import patch
 
+from rotkehlchen.accounting.mixins.event import AccountingEventMixin
 from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.api.v1.types import IncludeExcludeFilterData
 from rotkehlchen.chain.evm.types import string_to_evm_address
-from rotkehlchen.constants import ONE
-from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.constants import ONE, ZERO
+from rotkehlchen.constants.assets import A_ETH, A_EUR
 from rotkehlchen.db.constants import HISTORY_MAPPING_KEY_STATE, HISTORY_MAPPING_STATE_CUSTOMIZED
 from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.db.drivers.gevent import DBCursor
 from rotkehlchen.db.filtering import (
     EthDepositEventFilterQuery,
     EvmEventFilterQuery,
     HistoryEventFilterQuery,
 )
 from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.exchanges.data_structures import AssetMovement, Trade
 from rotkehlchen.fval import FVal
 from rotkehlchen.history.events.structures.base import HistoryBaseEntryType, HistoryEvent
 from rotkehlchen.history.events.structures.eth2 import EthDepositEvent, EthWithdrawalEvent
 from rotkehlchen.history.events.structures.evm_event import EvmEvent, EvmProduct
 from rotkehlchen.history.events.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.history.manager import HistoryEventsStream, history_sort_key
+from rotkehlchen.tests.utils.accounting import (
+    add_accounting_snapshots,
+    get_accounting_snapshot_timestamps,
+)
 from rotkehlchen.tests.utils.factories import (
     make_ethereum_event,
     make_evm_address,
     make_evm_tx_hash,
 )
 from rotkehlchen.types import (
+    AssetAmount,
+    AssetMovementCategory,
     ChainID,
     EVMTxHash,
+    Fee,
     Location,
+    Price,
     Timestamp,
     TimestampMS,
+    TradeType,
     deserialize_evm_tx_hash,
 )
 
@@ -304,3 +320,131 @@ def test_delete_last_event(database):
     assert 'was the last event of a transaction' in msg
     with db.db.conn.read_ctx() as cursor:
         assert len(db.get_history_events(cursor, HistoryEventFilterQuery.make(), True)) == 1, 'EVM event should be left'  # noqa: E501
+
+
+def test_edit_event_invalidates_accounting_snapshots(database: DBHandler) -> None:
+    """Test that editing an event invalidates the snapshots from its old and new timestamp"""
+    db = DBHistoryEvents(database)
+    event = HistoryEvent(
+        event_identifier='1',
+        sequence_index=0,
+        timestamp=TimestampMS(2000000),
+        location=Location.KRAKEN,
+        event_type=HistoryEventType.TRADE,
+        event_subtype=HistoryEventSubType.SPEND,
+        asset=A_EUR,
+        balance=Balance(amount=ONE),
+    )
+    with database.user_write() as write_cursor:
+        event.identifier = db.add_history_event(write_cursor=write_cursor, event=event)
+
+    add_accounting_snapshots(database, [Timestamp(x) for x in (1000, 2000, 2500, 3500)])
+    event.timestamp = TimestampMS(3000000)
+    event.event_subtype = HistoryEventSubType.RECEIVE
+    assert db.edit_history_event(event) == (True, '')
+    assert get_accounting_snapshot_timestamps(database) == [1000, 2000]
+
+    add_accounting_snapshots(database, [Timestamp(3000), Timestamp(3500)])
+    event.balance = Balance(amount=FVal(2))
+    assert db.edit_history_event(event) == (True, '')
+    assert get_accounting_snapshot_timestamps(database) == [1000, 2000, 3000]
+
+
+def test_history_events_stream(database: DBHandler) -> None:
+    """Test that the stream used for accounting merges all the sources in the
+    same order as sorting the entire materialized history would do"""
+    trades = [Trade(
+        timestamp=Timestamp(ts),
+        location=Location.KRAKEN,
+        base_asset=A_ETH,
+        quote_asset=A_EUR,
+        trade_type=TradeType.BUY,
+        amount=AssetAmount(ONE),
+        rate=Price(ONE),
+        fee=None,
+        fee_currency=None,
+        link=str(ts),
+    ) for ts in (10, 20, 31)]
+    asset_movements = [AssetMovement(
+        timestamp=Timestamp(10),
+        location=Location.KRAKEN,
+        category=AssetMovementCategory.DEPOSIT,
+        asset=A_ETH,
+        amount=ONE,
+        fee_asset=A_ETH,
+        fee=Fee(ZERO),
+        address=None,
+        transaction_id=None,
+        link='deposit',
+    )]
+    # history events of the same second are stored in a different order than the
+    # one by which they should be processed
+    history_events = [HistoryEvent(
+        event_identifier=f'{ts_ms}_{sequence_index}',
+        sequence_index=sequence_index,
+        timestamp=TimestampMS(ts_ms),
+        location=Location.KRAKEN,
+        event_type=HistoryEventType.RECEIVE,
+        event_subtype=HistoryEventSubType.NONE,
+        asset=A_ETH,
+        balance=Balance(ONE),
+    ) for ts_ms, sequence_index in ((5000, 0), (10100, 3), (10500, 0), (10900, 1), (40000, 0))]
+    with database.user_write() as write_cursor:
+        database.add_trades(write_cursor, trades=trades)
+        database.add_asset_movements(write_cursor, asset_movements=asset_movements)
+        DBHistoryEvents(database).add_history_events(write_cursor, history=history_events)
+
+    def identifiers(events: Iterable[AccountingEventMixin]) -> list[str]:
+        return [x.event_identifier if isinstance(x, HistoryEvent) else x.identifier for x in events]  # type: ignore[attr-defined]  # noqa: E501
+
+    stream = HistoryEventsStream(db=database, end_ts=Timestamp(35), eth2_events=[])
+    expected = identifiers(sorted([*trades, *asset_movements, *history_events[:4]], key=history_sort_key))  # noqa: E501
+    assert identifiers(stream) == expected
+    assert len(stream) == len(expected) == 8
+    assert identifiers(stream) == expected, 'the stream should be iterable again'
+
+
+def test_history_events_queries_use_indexes(database: DBHandler) -> None:
+    """Test that the statements generated by the history events filters look up the
+    filtered events with an index and never scan the entire history events tables"""
+    db = DBHistoryEvents(database)
+    filter_queries = [  # the filter queries along with whether they filter the events
+        (HistoryEventFilterQuery.make(limit=10, offset=0), False),
+        (HistoryEventFilterQuery.make(limit=10, offset=0, location=Location.KRAKEN), True),
+        (HistoryEventFilterQuery.make(limit=10, offset=0, location_labels=['label']), True),
+        (HistoryEventFilterQuery.make(limit=10, offset=0, assets=(A_ETH,)), True),
+        (HistoryEventFilterQuery.make(limit=10, offset=0, assets=(A_ETH, A_EUR)), True),
+        (HistoryEventFilterQuery.make(limit=10, offset=0, event_types=[HistoryEventType.TRADE]), True),  # noqa: E501
+        (HistoryEventFilterQuery.make(limit=10, offset=0, from_ts=Timestamp(1600000000), to_ts=Timestamp(1700000000)), True),  # noqa: E501
+        (HistoryEventFilterQuery.make(event_identifiers=['identifier']), True),
+        (EvmEventFilterQuery.make(tx_hashes=[make_evm_tx_hash()]), True),
+        (EvmEventFilterQuery.make(limit=10, offset=0, counterparties=['uniswap-v2']), True),
+    ]
+    table_scan = re.compile(r'SCAN (history_events|evm_events_info|eth_staking_events_info)')
+    index_search = re.compile(r'SEARCH (history_events|evm_events_info) USING (COVERING )?INDEX')
+    original_execute = DBCursor.execute
+    for filter_query, filters_events in filter_queries:
+        for has_premium, group_by_event_ids in ((True, True), (True, False), (False, True)):
+            statements: dict[str, list[Any]] = {}
+
+            def record_execute(cursor, statement, *bindings, **kwargs):
+                statements[statement] = list(bindings[0]) if len(bindings) != 0 else []  # noqa: B023
+                return original_execute(cursor, statement, *bindings, **kwargs)
+
+            with patch.object(DBCursor, 'execute', new=record_execute), database.conn.read_ctx() as cursor:  # noqa: E501
+                db.get_history_events_and_limit_info(
+                    cursor=cursor,
+                    filter_query=filter_query,
+                    has_premium=has_premium,
+                    group_by_event_ids=group_by_event_ids,
+                    entries_limit=None if has_premium else 100,
+                )
+
+            with database.conn.read_ctx() as cursor:
+                for statement, bindings in statements.items():
+                    plan = [x[3] for x in cursor.execute(f'EXPLAIN QUERY PLAN {statement}', bindings)]  # noqa: E501
+                    assert not any(table_scan.fullmatch(x) for x in plan), f'{statement} scans a table: {plan}'  # noqa: E501
+                    # free users get the latest events before filtering them, so only
+                    # the premium queries can search the filtered events directly
+                    if filters_events and has_premium:
+                        assert any(index_search.match(x) for x in plan), f'{statement} does not use an index: {plan}'  # noqa: E501
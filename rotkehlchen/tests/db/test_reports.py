@@ -1,7 +1,16 @@
-from rotkehlchen.accounting.pnl import PnlTotals
-from rotkehlchen.db.reports import DBAccountingReports
+import pytest
+
+from rotkehlchen.accounting.mixins.event import AccountingEventType
+from rotkehlchen.accounting.pnl import PNL, PnlTotals
+from rotkehlchen.accounting.structures.processed_event import ProcessedAccountingEvent
+from rotkehlchen.constants import ONE, ZERO
+from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.db.reports import DBAccountingReports, PnlEventsWriter
 from rotkehlchen.db.settings import DBSettings
+from rotkehlchen.errors.misc import InputError
+from rotkehlchen.fval import FVal
 from rotkehlchen.tests.utils.constants import A_GBP
+from rotkehlchen.types import Location, Price, Timestamp
 
 
 def test_report_settings(database):
@@ -21,7 +30,7 @@ def test_report_settings(database):
     last_processed_timestamp = 9
     end_ts = 10
     report_id = dbreport.add_report(
-        first_processed_timestamp=first_processed_timestamp,
+        first_processed_timestamp=0,
         start_ts=start_ts,
         end_ts=end_ts,
         settings=settings,
@@ -30,6 +39,7 @@ def test_report_settings(database):
     processed_actions = 2
     dbreport.add_report_overview(
         report_id=report_id,
+        first_processed_timestamp=first_processed_timestamp,
         last_processed_timestamp=last_processed_timestamp,
         processed_actions=processed_actions,
         total_actions=total_actions,
@@ -55,3 +65,52 @@ def test_report_settings(database):
         else:
             value = getattr(settings, setting_name)
         assert returned_settings[x] == value
+
+
+def test_pnl_events_writer(database):
+    """Test that the processed events of a report are written to the DB in batches and
+    read back in the order they were processed"""
+    dbreport = DBAccountingReports(database)
+    report_id = dbreport.add_report(
+        first_processed_timestamp=0,
+        start_ts=0,
+        end_ts=10,
+        settings=DBSettings(),
+    )
+    events = [ProcessedAccountingEvent(
+        type=AccountingEventType.TRADE,
+        notes=f'event {idx}',
+        location=Location.KRAKEN,
+        timestamp=Timestamp(10 - idx),  # the order is kept even if not sorted by time
+        asset=A_ETH,
+        free_amount=FVal(idx),
+        taxable_amount=ZERO,
+        price=Price(ONE),
+        pnl=PNL(),
+        cost_basis=None,
+        index=idx,
+    ) for idx in range(5)]
+    writer = PnlEventsWriter(
+        database=database,
+        report_id=report_id,
+        ts_converter=str,
+        batch_size=2,
+        write_interval=3600,
+    )
+
+    def count_events() -> int:
+        cursor = database.conn_transient.cursor()
+        return cursor.execute('SELECT COUNT(*) FROM pnl_events WHERE report_id=?', (report_id,)).fetchone()[0]  # noqa: E501
+
+    for event in events:
+        writer.add(event)
+    assert count_events() == 4  # written in two batches
+    writer.flush()
+    assert count_events() == 5
+    assert list(dbreport.iterate_report_events(report_id)) == events
+
+    writer = PnlEventsWriter(database=database, report_id=report_id + 1, ts_converter=str)
+    writer.add(events[0])
+    with pytest.raises(InputError):  # the report does not exist
+        writer.flush()
+    assert writer.buffer == []
@@ -0,0 +1,138 @@
+import sqlite3
+from pathlib import Path
+from typing import TYPE_CHECKING
+from unittest.mock import patch
+
+import pytest
+
+from rotkehlchen.db.drivers.gevent import UNKNOWN_SYNC_CHANGE
+from rotkehlchen.db.sync_changes import DBSyncChanges, apply_delta
+from rotkehlchen.errors.serialization import DeserializationError
+
+if TYPE_CHECKING:
+    from rotkehlchen.db.dbhandler import DBHandler
+    from rotkehlchen.db.drivers.gevent import DBCursor
+
+
+def _dump_tables(cursor: 'DBCursor | sqlite3.Cursor') -> dict[str, list]:
+    return {
+        table_name: sorted(cursor.execute(f'SELECT * FROM "{table_name}"').fetchall(), key=repr)
+        for (table_name,) in cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='table' AND name NOT IN "
+            "('premium_sync_changes', 'key_value_cache', 'sqlite_sequence')",
+        ).fetchall()
+    }
+
+
+def _insert_tags(write_cursor: 'DBCursor', names: list[str]) -> None:
+    write_cursor.executemany(
+        'INSERT INTO tags(name, description, background_color, foreground_color) '
+        "VALUES(?, 'desc', 'ffffff', '000000')",
+        [(name,) for name in names],
+    )
+
+
+def test_delta_brings_synced_db_up_to_date(database: 'DBHandler', tmp_path: Path) -> None:
+    """Test that the delta of the tables changed since a sync turns a copy of the DB
+    as it was at the sync into the current DB"""
+    sync_changes = DBSyncChanges(database)
+    with database.user_write() as write_cursor:
+        _insert_tags(write_cursor, ['a', 'b', 'c'])
+        write_cursor.execute(
+            "INSERT INTO blockchain_accounts(blockchain, account, label) VALUES('ETH', '0x1', 'one')",  # noqa: E501
+        )
+        write_cursor.execute(
+            'INSERT INTO evm_transactions(identifier, tx_hash, chain_id, timestamp, '
+            'block_number, from_address, to_address, value, gas, gas_price, gas_used, '
+            "input_data, nonce) VALUES(1, ?, 1, 1, 1, '0x1', '0x2', '0', '0', '0', '0', ?, 0)",
+            (b'\x01' * 32, b'\xff\x00'),
+        )
+        write_cursor.execute(
+            'INSERT INTO evm_internal_transactions(parent_tx, trace_id, from_address, '
+            "to_address, value) VALUES(1, 0, '0x1', '0x2', '1')",
+        )
+
+    synced_path = tmp_path / 'synced.db'
+    database.export_unencrypted(synced_path)
+    with database.conn.write_ctx() as write_cursor:
+        sync_changes.start_tracking(write_cursor=write_cursor, head='hash', last_change_id=None)
+
+    with database.user_write() as write_cursor:
+        write_cursor.execute("UPDATE tags SET description='new' WHERE name='a'")
+        write_cursor.execute("UPDATE tags SET name='d' WHERE name='b'")
+        write_cursor.execute("DELETE FROM tags WHERE name='c'")
+        write_cursor.execute("DELETE FROM blockchain_accounts WHERE account='0x1'")
+        write_cursor.execute(
+            "INSERT INTO blockchain_accounts(blockchain, account, label) VALUES('ETH', '0x2', 'two')",  # noqa: E501
+        )
+        write_cursor.execute('DELETE FROM evm_transactions')  # cascades to internal txs
+
+    with database.conn.read_ctx() as cursor:
+        assert sync_changes.get_head(cursor) == 'hash'
+        assert sync_changes.get_changed_tables(cursor) == {
+            'tags', 'blockchain_accounts', 'evm_transactions', 'settings',
+        }
+        result = sync_changes.export_delta(cursor)
+        assert result is not None
+        delta, last_change_id = result
+        assert last_change_id == sync_changes.get_last_change_id(cursor)
+        expected = _dump_tables(cursor)
+
+    conn = sqlite3.connect(synced_path)
+    assert conn.execute('SELECT COUNT(*) FROM evm_internal_transactions').fetchone()[0] == 1
+    with conn:
+        apply_delta(conn.cursor(), delta)
+    assert _dump_tables(conn.cursor()) == expected
+
+    with pytest.raises(DeserializationError):
+        apply_delta(conn.cursor(), b'{"version": 0, "tables": {}}')
+    conn.close()
+
+    with database.conn.write_ctx() as write_cursor:
+        # after uploading the delta only later changes are tracked
+        sync_changes.start_tracking(write_cursor=write_cursor, head='hash2', last_change_id=last_change_id)  # noqa: E501
+        assert sync_changes.export_delta(write_cursor) is None
+        sync_changes.stop_tracking(write_cursor)
+
+    with database.user_write() as write_cursor:
+        write_cursor.execute("DELETE FROM tags WHERE name='a'")
+
+    with database.conn.read_ctx() as cursor:
+        assert sync_changes.get_head(cursor) is None
+        assert sync_changes.get_changed_tables(cursor) == set()
+
+
+def test_logged_changes(database: 'DBHandler') -> None:
+    """Test that the tables are logged again after a rollback or an export, that changes
+    of unknown tables make the whole DB sync and that big tables are not sent as a delta"""
+    sync_changes = DBSyncChanges(database)
+    with database.conn.write_ctx() as write_cursor:
+        sync_changes.start_tracking(write_cursor=write_cursor, head='hash', last_change_id=None)
+
+    def rolled_back_write() -> None:
+        with database.conn.write_ctx() as write_cursor:
+            _insert_tags(write_cursor, ['a'])
+            raise ValueError('rolls back the write')
+
+    with database.conn.write_ctx() as write_cursor:
+        write_cursor.execute("DELETE FROM tags WHERE name='nothing'")  # no rows changed
+    with pytest.raises(ValueError, match='rolls back'):
+        rolled_back_write()
+
+    with database.conn.write_ctx() as write_cursor:
+        assert sync_changes.get_changed_tables(write_cursor) == set()
+        _insert_tags(write_cursor, ['a'])
+        assert sync_changes.get_changed_tables(write_cursor) == {'tags'}
+        result = sync_changes.export_delta(write_cursor)
+        assert result is not None
+        _, last_change_id = result
+        _insert_tags(write_cursor, ['b'])  # logged again after the export
+        assert sync_changes.get_last_change_id(write_cursor) > last_change_id
+
+    with database.conn.read_ctx() as cursor, patch('rotkehlchen.db.sync_changes.MAX_DELTA_ROWS', 1):  # noqa: E501
+        assert sync_changes.export_delta(cursor) is None
+
+    with database.conn.write_ctx() as write_cursor:
+        write_cursor.executescript("DELETE FROM tags WHERE name='a';")
+        assert sync_changes.get_changed_tables(write_cursor) == {'tags', UNKNOWN_SYNC_CHANGE}
+        assert sync_changes.export_delta(write_cursor) is None
@@ -1,6 +1,7 @@
 import datetime
 import hashlib
 import hmac
+import json
 import os
 import re
 import warnings as test_warnings
@@ -15,6 +16,7 @@ from rotkehlchen.assets.asset import Asset
 from rotkehlchen.assets.converters import UNSUPPORTED_BINANCE_ASSETS, asset_from_binance
 from rotkehlchen.assets.exchanges_mappings.binance import WORLD_TO_BINANCE
 from rotkehlchen.constants.assets import A_ADA, A_BNB, A_BTC, A_DOT, A_ETH, A_EUR, A_USDT, A_WBTC
+from rotkehlchen.db.cache import DBCacheDynamic
 from rotkehlchen.db.constants import BINANCE_MARKETS_KEY
 from rotkehlchen.db.settings import CachedSettings
 from rotkehlchen.errors.asset import UnknownAsset, UnsupportedAsset
@@ -897,3 +899,84 @@ def test_binance_query_trade_history_custom_markets(function_scope_binance):
         binance.query_trade_history(start_ts=0, end_ts=1564301134, only_cache=False)
 
     assert count == len(markets)
+
+
+def test_binance_query_trade_history_from_last_ids(function_scope_binance):
+    """Test that the trades of each pair are queried after the last trade id saved for
+    it, that the last id does not move past the trades after the queried range, that it
+    is saved along with the trades, that the trades before the queried range are saved
+    too and that the last ids are deleted along with the exchange data"""
+    binance = function_scope_binance
+    binance.selected_pairs = ['ETHBTC', 'BNBBTC']
+    raw_trades = []
+    for trade_id, time_ms in ((1, 1500000000000), (2, 1600000000000)):
+        raw_trade = json.loads(BINANCE_MYTRADES_RESPONSE)[0]
+        raw_trade.update({'id': trade_id, 'time': time_ms})
+        raw_trades.append(raw_trade)
+
+    p = re.compile(r'symbol=([A-Z]*)&fromId=([0-9]*)')
+    from_ids = {}
+
+    def mock_my_trades(url, timeout):  # pylint: disable=unused-argument
+        if (match := p.search(url)) is None:
+            return MockResponse(200, '[]')
+
+        symbol, from_id = match.group(1), int(match.group(2))
+        from_ids[symbol] = from_id
+        trades = [x for x in raw_trades if x['id'] >= from_id] if symbol == 'BNBBTC' else []
+        return MockResponse(200, json.dumps(trades))
+
+    def get_last_id(symbol):
+        with binance.db.conn.read_ctx() as cursor:
+            return binance.db.get_dynamic_cache(
+                cursor=cursor,
+                name=DBCacheDynamic.BINANCE_PAIR_LAST_ID,
+                location=str(Location.BINANCE),
+                location_name=binance.name,
+                queried_pair=symbol,
+            )
+
+    with patch.object(binance.session, 'get', side_effect=mock_my_trades):
+        trades, _, last_ids = binance.query_online_trade_history_with_last_ids(
+            start_ts=Timestamp(1500000001),
+            end_ts=Timestamp(1550000000),
+        )
+        assert [x.link for x in trades] == ['1']  # returned although it's before start_ts
+        assert last_ids == {'BNBBTC': 1}
+        assert get_last_id('BNBBTC') is None  # nothing is saved before the trades are
+
+        # a later range first. The earlier trade is saved, since the last id moves past it
+        trades = binance.query_trade_history(
+            start_ts=Timestamp(1550000001),
+            end_ts=Timestamp(1650000000),
+            only_cache=False,
+        )
+        assert [x.link for x in trades] == ['2']
+        assert from_ids == {'ETHBTC': 0, 'BNBBTC': 0}
+        assert get_last_id('BNBBTC') == 2
+        assert get_last_id('ETHBTC') is None
+
+        # and the earlier range then gets the older trade back
+        trades = binance.query_trade_history(
+            start_ts=Timestamp(0),
+            end_ts=Timestamp(1550000000),
+            only_cache=False,
+        )
+        assert [x.link for x in trades] == ['1']
+        assert from_ids == {'ETHBTC': 0, 'BNBBTC': 3}
+        assert get_last_id('BNBBTC') == 2
+
+        # the trades after the queried range are queried again
+        with binance.db.user_write() as write_cursor:
+            binance.db.purge_exchange_data(write_cursor, Location.BINANCE)
+        trades = binance.query_trade_history(
+            start_ts=Timestamp(0),
+            end_ts=Timestamp(1550000000),
+            only_cache=False,
+        )
+        assert [x.link for x in trades] == ['1']
+        assert get_last_id('BNBBTC') == 1
+
+    with binance.db.user_write() as write_cursor:
+        binance.db.purge_exchange_data(write_cursor, Location.BINANCE)
+    assert get_last_id('BNBBTC') is None
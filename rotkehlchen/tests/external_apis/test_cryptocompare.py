@@ -28,6 +28,7 @@ from rotkehlchen.globaldb.handler import GlobalDBHandler
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
 from rotkehlchen.tests.utils.constants import A_DAO, A_SNGLS, A_XMR
 from rotkehlchen.types import Price, Timestamp
+from rotkehlchen.utils.misc import ts_now
 
 
 @pytest.mark.skip('They are updating their systems & cleaning inactive pairs. Check again soon')
@@ -43,20 +44,20 @@ def test_cryptocompare_query_pricehistorical(cryptocompare):
 
 
 def get_globaldb_cache_entries(from_asset: Asset, to_asset: Asset) -> list[HistoricalPrice]:
-    """TODO: This should probaly be moved in the globaldb/handler.py if we use it elsewhere
-    and made more generic (accept different sources)"""
-    connection = GlobalDBHandler().conn
-    cursor = connection.cursor()
-    query = cursor.execute(
-        'SELECT from_asset, to_asset, source_type, timestamp, price FROM '
-        'price_history WHERE from_asset=? AND to_asset=? AND source_type=? ORDER BY timestamp ASC',
-        (
-            from_asset.identifier,
-            to_asset.identifier,
-            HistoricalPriceOracle.CRYPTOCOMPARE.serialize_for_db(),  # pylint: disable=no-member
-        ),
+    timestamps, prices = GlobalDBHandler().get_historical_price_series(
+        from_asset=from_asset,
+        to_asset=to_asset,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        from_timestamp=Timestamp(0),
+        to_timestamp=ts_now(),
     )
-    return [HistoricalPrice.deserialize_from_db(x) for x in query]
+    return [HistoricalPrice(
+        from_asset=from_asset,
+        to_asset=to_asset,
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        timestamp=timestamp,
+        price=price,
+    ) for timestamp, price in zip(timestamps, prices, strict=True)]
 
 
 @pytest.mark.parametrize('use_clean_caching_directory', [True])
@@ -114,6 +114,8 @@ def _initialize_fixture_globaldb(
             stack.enter_context(
                 patch('rotkehlchen.globaldb.handler.maybe_apply_globaldb_migrations', side_effect=lambda *args: None),  # noqa: E501
             )
+            # the tables that the migrations create would be missing
+            stack.enter_context(mock_db_schema_sanity_check())
         if reload_user_assets is False:
             stack.enter_context(
                 patch('rotkehlchen.globaldb.upgrades.manager.UPGRADES_LIST', globaldb_upgrades),
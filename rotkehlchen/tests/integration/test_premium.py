@@ -11,6 +11,7 @@ import pytest
 from rotkehlchen.constants.assets import A_EUR
 from rotkehlchen.db.cache import DBCache
 from rotkehlchen.db.settings import ModifiableDBSettings
+from rotkehlchen.db.sync_changes import DBSyncChanges
 from rotkehlchen.errors.api import (
     IncorrectApiKeyFormat,
     PremiumAuthenticationError,
@@ -22,6 +23,7 @@ from rotkehlchen.tests.utils.mock import MockResponse
 from rotkehlchen.tests.utils.premium import (
     VALID_PREMIUM_KEY,
     VALID_PREMIUM_SECRET,
+    DeltasPremiumServer,
     assert_db_got_replaced,
     create_patched_requests_get_for_premium,
     get_different_hash,
@@ -67,23 +69,27 @@ def test_upload_data_to_server(
     with rotkehlchen_instance.data.db.conn.read_ctx() as cursor:
         last_write_ts = rotkehlchen_instance.data.db.get_setting(cursor, name='last_write_ts')
 
-    _, our_hash = rotkehlchen_instance.data.compress_and_encrypt_db()
-    remote_hash = get_different_hash(our_hash)
+    with rotkehlchen_instance.data.compress_and_encrypt_db() as (_, our_hash):
+        remote_hash = get_different_hash(our_hash)
 
     def mock_succesfull_upload_data_to_server(
             url,  # pylint: disable=unused-argument
             data,
-            files,
+            headers,
             timeout,  # pylint: disable=unused-argument
     ):
         # Can't compare data blobs as they are encrypted and as such can be
         # different each time
-        assert data['original_hash'] == our_hash
-        assert data['last_modify_ts'] == last_write_ts
-        assert 'index' in data
-        assert len(files['db_file']) == data['length']
-        assert 'nonce' in data
-        assert data['compression'] == 'zlib'
+        assert data.fields['original_hash'] == our_hash
+        assert data.fields['last_modify_ts'] == last_write_ts
+        assert 'index' in data.fields
+        assert data.file_path.stat().st_size == data.fields['length']
+        assert 'nonce' in data.fields
+        assert data.fields['compression'] == 'zlib'
+        body = b''.join(data)  # the streamed body is a multipart form with the file in it
+        assert len(body) == len(data)
+        assert headers['Content-Type'] == data.content_type
+        assert body.index(data.file_path.read_bytes()) == len(data.preamble)
 
         return MockResponse(200, '{"success": true}')
 
@@ -151,8 +157,8 @@ def test_upload_data_to_server_same_hash(rotkehlchen_instance):
         # Write anything in the DB to set a non-zero last_write_ts
         rotkehlchen_instance.data.db.set_settings(write_cursor, ModifiableDBSettings(main_currency=A_EUR))  # noqa: E501
 
-    _, our_hash = rotkehlchen_instance.data.compress_and_encrypt_db()
-    remote_hash = our_hash
+    with rotkehlchen_instance.data.compress_and_encrypt_db() as (_, our_hash):
+        remote_hash = our_hash
 
     patched_put = patch.object(
         rotkehlchen_instance.premium.session,
@@ -184,8 +190,8 @@ def test_upload_data_to_server_smaller_db(rotkehlchen_instance):
         assert last_ts == 0
         # Write anything in the DB to set a non-zero last_write_ts
         rotkehlchen_instance.data.db.set_settings(cursor, ModifiableDBSettings(main_currency=A_EUR))  # noqa: E501
-    _, our_hash = rotkehlchen_instance.data.compress_and_encrypt_db()
-    remote_hash = get_different_hash(our_hash)
+    with rotkehlchen_instance.data.compress_and_encrypt_db() as (_, our_hash):
+        remote_hash = get_different_hash(our_hash)
 
     patched_put = patch.object(
         rotkehlchen_instance.premium.session,
@@ -207,6 +213,54 @@ def test_upload_data_to_server_smaller_db(rotkehlchen_instance):
         assert not put_mock.called
 
 
+@pytest.mark.parametrize('start_with_valid_premium', [True])
+@pytest.mark.parametrize('db_settings', [{'premium_should_sync': True}])
+def test_sync_data_with_deltas(rotkehlchen_instance: 'Rotkehlchen') -> None:
+    """Test that with a server that supports deltas only the changes are uploaded after
+    the first upload and that pulling applies them on top of the uploaded DB, if syncing
+    with deltas is turned on"""
+    db, sync_manager = rotkehlchen_instance.data.db, rotkehlchen_instance.premium_sync_manager
+    server = DeltasPremiumServer()
+    assert rotkehlchen_instance.premium is not None
+    patched_get, patched_post = server.patch_session(rotkehlchen_instance.premium.session)
+    with patched_get, patched_post:
+        assert sync_manager.sync_deltas is False
+        assert sync_manager.maybe_upload_data_to_server(force_upload=True) == (True, None)
+        with db.conn.read_ctx() as cursor:  # changes are not tracked
+            assert DBSyncChanges(db).get_head(cursor) is None
+        assert db.conn.track_sync_changes is False
+
+        sync_manager.sync_deltas = True
+        assert sync_manager.maybe_upload_data_to_server(force_upload=True) == (True, None)
+        assert server.data is not None and len(server.deltas) == 0
+        with db.conn.read_ctx() as cursor:
+            assert DBSyncChanges(db).get_head(cursor) == server.data_hash
+
+        with db.user_write() as write_cursor:
+            db.set_settings(write_cursor, ModifiableDBSettings(main_currency=A_GBP.resolve_to_fiat_asset()))  # noqa: E501
+            write_cursor.execute(
+                'INSERT INTO tags(name, description, background_color, foreground_color) '
+                "VALUES('delta', 'tag', 'ffffff', '000000')",
+            )
+
+        assert sync_manager.maybe_upload_data_to_server(force_upload=True) == (True, None)
+        assert len(server.deltas) == 1
+        assert len(server.deltas[0]) < len(server.data) / 10
+
+        with db.user_write() as write_cursor:  # local changes that the pull should revert
+            write_cursor.execute('DELETE FROM tags')
+            db.set_settings(write_cursor, ModifiableDBSettings(main_currency=A_EUR.resolve_to_fiat_asset()))  # noqa: E501
+
+        assert sync_manager.sync_data(action='download', perform_migrations=False) == (True, '')
+
+    db = rotkehlchen_instance.data.db
+    with db.conn.read_ctx() as cursor:
+        assert db.get_setting(cursor, name='main_currency') == A_GBP
+        assert cursor.execute('SELECT name FROM tags').fetchall() == [('delta',)]
+        assert DBSyncChanges(db).get_head(cursor) == server.data_hash
+        assert DBSyncChanges(db).get_changed_tables(cursor) == set()
+
+
 @pytest.mark.parametrize('use_clean_caching_directory', [True])
 @pytest.mark.parametrize('start_with_valid_premium', [True])
 def test_try_premium_at_start_new_account_can_pull_data(
@@ -503,8 +557,8 @@ def test_upload_data_to_server_db_already_in_use(rotkehlchen_instance):
         assert last_ts == 0
         # Write anything in the DB to set a non-zero last_write_ts
         rotkehlchen_instance.data.db.set_settings(cursor, ModifiableDBSettings(main_currency=A_EUR))  # noqa: E501
-    _, our_hash = rotkehlchen_instance.data.compress_and_encrypt_db()
-    remote_hash = get_different_hash(our_hash)
+    with rotkehlchen_instance.data.compress_and_encrypt_db() as (_, our_hash):
+        remote_hash = get_different_hash(our_hash)
 
     patched_put = patch.object(
         rotkehlchen_instance.premium.session,
@@ -567,8 +621,8 @@ def test_upload_data_to_server_db_locked(rotkehlchen_instance):
         # Write anything in the DB to set a non-zero last_write_ts
         rotkehlchen_instance.data.db.set_settings(cursor, ModifiableDBSettings(main_currency=A_EUR))  # noqa: E501
 
-    _, our_hash = rotkehlchen_instance.data.compress_and_encrypt_db()
-    remote_hash = get_different_hash(our_hash)
+    with rotkehlchen_instance.data.compress_and_encrypt_db() as (_, our_hash):
+        remote_hash = get_different_hash(our_hash)
 
     patched_put = patch.object(
         rotkehlchen_instance.premium.session,
@@ -603,14 +657,14 @@ def test_error_db_too_big(rotkehlchen_instance: 'Rotkehlchen') -> None:
     def mock_error_upload_data_to_server(
             url,
             data,
-            files,
+            headers,
             timeout,
     ):  # pylint: disable=unused-argument
         return MockResponse(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, 'Payload size is too big')
 
     assert rotkehlchen_instance.premium is not None
-    _, our_hash = rotkehlchen_instance.data.compress_and_encrypt_db()
-    remote_hash = get_different_hash(our_hash)
+    with rotkehlchen_instance.data.compress_and_encrypt_db() as (_, our_hash):
+        remote_hash = get_different_hash(our_hash)
     patched_put = patch.object(
         rotkehlchen_instance.premium.session,
         'post',
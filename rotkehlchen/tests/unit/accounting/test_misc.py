@@ -7,11 +7,16 @@ from rotkehlchen.accounting.pnl import PNL, PnlTotals
 from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.constants import ONE, ZERO
 from rotkehlchen.constants.assets import A_ETH, A_ETH2, A_EUR, A_KFEE, A_USD, A_USDT
+from rotkehlchen.db.reports import DBAccountingReports
 from rotkehlchen.exchanges.data_structures import Trade
 from rotkehlchen.fval import FVal
 from rotkehlchen.history.events.structures.base import HistoryEvent
 from rotkehlchen.history.events.structures.types import HistoryEventSubType, HistoryEventType
-from rotkehlchen.tests.utils.accounting import accounting_history_process, check_pnls_and_csv
+from rotkehlchen.tests.utils.accounting import (
+    accounting_history_process,
+    assert_pnl_totals_close,
+    check_pnls_and_csv,
+)
 from rotkehlchen.tests.utils.constants import A_GBP
 from rotkehlchen.tests.utils.history import prices
 from rotkehlchen.tests.utils.messages import no_message_errors
@@ -226,3 +231,77 @@ def test_main_currency_is_respected(
     assert len(warnings) == len(errors) == 0
     # Check that the price is correctly computed in GBP
     assert accountant.pots[0].processed_events[0].price == trade_rate * mocked_price_queries['USD']['GBP'][1609537953]  # noqa: E501
+
+
+@pytest.mark.parametrize('mocked_price_queries', [prices])
+def test_report_resumes_from_snapshot(accountant: 'Accountant') -> None:
+    """Test that a report with the same settings and range resumes from the saved
+    accounting snapshot and that adding an older event invalidates the snapshots"""
+    history = [
+        Trade(
+            timestamp=Timestamp(1609537953),
+            location=Location.KRAKEN,
+            base_asset=A_ETH,
+            quote_asset=A_EUR,
+            trade_type=TradeType.BUY,
+            amount=AssetAmount(ONE),
+            rate=Price(FVal('598.26')),
+            fee=Fee(ONE),
+            fee_currency=A_EUR,
+            link=None,
+        ), Trade(
+            timestamp=Timestamp(1624395186),
+            location=Location.KRAKEN,
+            base_asset=A_ETH,
+            quote_asset=A_EUR,
+            trade_type=TradeType.SELL,
+            amount=AssetAmount(FVal('0.5')),
+            rate=Price(FVal('1862.06')),
+            fee=Fee(FVal('0.5')),
+            fee_currency=A_ETH,
+            link=None,
+        ),
+    ]
+    start_ts, end_ts = Timestamp(1436979735), Timestamp(1625001466)
+    first_report_id = accountant.process_history(
+        start_ts=start_ts,
+        end_ts=end_ts,
+        events=history,
+        snapshot_timestamps=[Timestamp(1624395186)],
+    )
+    first_pnls = PnlTotals(dict(accountant.pots[0].pnls))
+    first_events = [(x.timestamp, x.notes, x.pnl) for x in accountant.pots[0].processed_events]
+    with accountant.db.conn.read_ctx() as cursor:
+        assert cursor.execute(
+            'SELECT timestamp FROM accounting_snapshots ORDER BY timestamp',
+        ).fetchall() == [(start_ts,), (1624395186,), (end_ts + 1,)]
+
+    second_report_id = accountant.process_history(
+        start_ts=start_ts,
+        end_ts=end_ts,
+        events=history,
+    )
+    assert second_report_id != first_report_id
+    assert_pnl_totals_close(expected=first_pnls, got=accountant.pots[0].pnls)
+    assert [(x.timestamp, x.notes, x.pnl) for x in accountant.pots[0].processed_events] == first_events  # noqa: E501
+    dbpnl = DBAccountingReports(accountant.csvexporter.database)
+    reports, _ = dbpnl.get_reports(report_id=second_report_id, with_limit=False)
+    assert reports[0]['processed_actions'] == reports[0]['total_actions'] == 2
+
+    with accountant.db.user_write() as write_cursor:
+        accountant.db.add_trades(write_cursor=write_cursor, trades=[Trade(
+            timestamp=Timestamp(1609537954),
+            location=Location.KRAKEN,
+            base_asset=A_ETH,
+            quote_asset=A_EUR,
+            trade_type=TradeType.BUY,
+            amount=AssetAmount(ONE),
+            rate=Price(FVal('600')),
+            fee=None,
+            fee_currency=None,
+            link=None,
+        )])
+    with accountant.db.conn.read_ctx() as cursor:
+        assert cursor.execute(
+            'SELECT timestamp FROM accounting_snapshots ORDER BY timestamp',
+        ).fetchall() == [(start_ts,)]
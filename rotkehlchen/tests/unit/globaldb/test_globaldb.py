@@ -3,6 +3,7 @@ import sqlite3
 from pathlib import Path
 from shutil import copyfile
 from typing import TYPE_CHECKING
+from unittest.mock import patch
 from uuid import uuid4
 
 import pytest
@@ -1300,3 +1301,47 @@ def test_assets_in_same_collection(globaldb: GlobalDBHandler):
 
     # check an asset with no related assets
     assert globaldb.get_assets_in_same_collection(identifier=A_ETH.identifier) == (A_ETH,)
+
+
+def test_evm_tokens_cache(globaldb: GlobalDBHandler):
+    """Check that evm tokens and non token addresses are cached, that prefetching
+    caches them all and that modifying a token invalidates its cache entry"""
+    not_token_address, lp_address = make_evm_address(), make_evm_address()
+    dai = globaldb.get_evm_token(A_DAI.resolve_to_evm_token().evm_address, ChainID.ETHEREUM)
+    assert dai is not None
+    assert globaldb.get_evm_token(not_token_address, ChainID.ETHEREUM) is None
+    assert globaldb.get_evm_token(lp_address, ChainID.ETHEREUM) is None
+    assert (not_token_address, ChainID.ETHEREUM) in globaldb.evm_tokens_cache
+
+    # adding the token should forget that it was not a token
+    lp_token = EvmToken.initialize(
+        address=lp_address,
+        chain_id=ChainID.ETHEREUM,
+        token_kind=EvmTokenKind.ERC20,
+        name='LP token',
+        symbol='LP',
+        decimals=18,
+        underlying_tokens=[UnderlyingToken(address=dai.evm_address, token_kind=EvmTokenKind.ERC20, weight=ONE)],  # noqa: E501
+    )
+    globaldb.add_asset(lp_token)
+    assert globaldb.get_evm_token(lp_address, ChainID.ETHEREUM) == lp_token
+
+    object.__setattr__(lp_token, 'decimals', 8)
+    globaldb.edit_evm_token(lp_token)
+    assert globaldb.get_evm_token(lp_address, ChainID.ETHEREUM).decimals == 8  # type: ignore[union-attr]
+
+    # prefetching should cache everything so that no query is needed afterwards
+    globaldb.clean_evm_tokens_cache()
+    globaldb.prefetch_evm_tokens(
+        addresses=[dai.evm_address, lp_address, not_token_address, dai.evm_address],
+        chain_id=ChainID.ETHEREUM,
+    )
+    with patch.object(globaldb.conn, 'read_ctx', side_effect=AssertionError('DB was queried')):
+        assert globaldb.get_evm_token(dai.evm_address, ChainID.ETHEREUM) == dai
+        assert globaldb.get_evm_token(not_token_address, ChainID.ETHEREUM) is None
+        prefetched_lp_token = globaldb.get_evm_token(lp_address, ChainID.ETHEREUM)
+        assert prefetched_lp_token is not None
+        assert prefetched_lp_token.underlying_tokens == lp_token.underlying_tokens
+
+    globaldb.delete_evm_token(lp_address, ChainID.ETHEREUM)
+    assert globaldb.get_evm_token(lp_address, ChainID.ETHEREUM) is None
@@ -3,12 +3,16 @@ from contextlib import ExitStack
 
 import pytest
 
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.migrations.manager import (
     MIGRATIONS_LIST,
     maybe_apply_globaldb_migrations,
 )
 from rotkehlchen.globaldb.migrations.migration1 import ilk_mapping
+from rotkehlchen.history.types import HistoricalPriceOracle
 from rotkehlchen.tests.utils.globaldb import patch_for_globaldb_migrations
+from rotkehlchen.types import Timestamp
 
 
 @pytest.mark.parametrize('globaldb_upgrades', [[]])
@@ -40,3 +44,57 @@ def test_migration1(globaldb):
                 (f'MAKERDAO_VAULT_ILK{ilk}',),
             )
             assert json.loads(cursor.fetchone()[0]) == list(info)
+
+
+@pytest.mark.parametrize('run_globaldb_migrations', [False])
+def test_migration2(globaldb):
+    """Test that the 2nd globalDB data migration moves the cryptocompare prices to blocks"""
+    cryptocompare_prices = [('BTC', 'USD', 'C', 1600000000 + idx * 3600, f'{10000 + idx}.5') for idx in range(1100)]  # noqa: E501
+    other_prices = [
+        ('BTC', 'EUR', 'D', 1600000000, '9000.1'),
+        ('ETH', 'USD', 'A', 1600000000, '400'),
+    ]
+    with globaldb.conn.write_ctx() as write_cursor:
+        # the blocks table is created by the migration
+        write_cursor.execute('DROP TABLE IF EXISTS price_history_blocks')
+        write_cursor.execute('DELETE FROM price_history')
+        write_cursor.executemany(
+            'INSERT INTO price_history(from_asset, to_asset, source_type, timestamp, price) '
+            'VALUES(?, ?, ?, ?, ?)',
+            cryptocompare_prices + other_prices,
+        )
+        write_cursor.execute(
+            'INSERT OR REPLACE INTO settings(name, value) VALUES(?, ?)',
+            ('last_data_migration', '1'),
+        )
+
+    with ExitStack() as stack:
+        patch_for_globaldb_migrations(stack, MIGRATIONS_LIST[:2])
+        maybe_apply_globaldb_migrations(globaldb.conn)
+
+    assert globaldb.get_setting_value('version', None) == 6
+    assert globaldb.get_setting_value('last_data_migration', None) == 2
+    with globaldb.conn.read_ctx() as cursor:
+        # only the cryptocompare prices are moved to the blocks
+        assert cursor.execute(
+            'SELECT from_asset, to_asset, source_type, timestamp, price FROM price_history '
+            'ORDER BY from_asset, to_asset',
+        ).fetchall() == other_prices
+        assert cursor.execute(
+            'SELECT from_asset, to_asset, source_type, start_ts, end_ts, prices_num '
+            'FROM price_history_blocks ORDER BY start_ts',
+        ).fetchall() == [
+            ('BTC', 'USD', 'C', 1600000000, 1600000000 + 1023 * 3600, 1024),
+            ('BTC', 'USD', 'C', 1600000000 + 1024 * 3600, 1600000000 + 1099 * 3600, 76),
+        ]
+
+    assert globaldb.get_historical_price_series(
+        from_asset=Asset('BTC'),
+        to_asset=Asset('USD'),
+        source=HistoricalPriceOracle.CRYPTOCOMPARE,
+        from_timestamp=Timestamp(0),
+        to_timestamp=Timestamp(1600000000 + 1099 * 3600),
+    ) == (
+        [x[3] for x in cryptocompare_prices],
+        [FVal(x[4]) for x in cryptocompare_prices],
+    )
@@ -1,3 +1,4 @@
+from rotkehlchen.constants import ZERO
 from rotkehlchen.constants.assets import A_BAL, A_BTC, A_ETH, A_USD
 from rotkehlchen.fval import FVal
 from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
@@ -131,3 +132,175 @@ def test_get_historical_price(globaldb, historical_price_test_data):  # pylint:
         max_seconds_distance=3600,
     )
     assert price_entry is None
+
+
+def test_historical_price_series_cache(globaldb):
+    """Test that prices are looked up in the cached price series of their pair, with the
+    same tie breaking as the DB query, and that the series see the writes"""
+    def make_price(source: HistoricalPriceOracle, timestamp: int, price: str) -> HistoricalPrice:
+        return HistoricalPrice(
+            from_asset=A_BTC,
+            to_asset=A_EUR,
+            source=source,
+            timestamp=Timestamp(timestamp),
+            price=Price(FVal(price)),
+        )
+
+    globaldb.add_historical_prices([
+        make_price(HistoricalPriceOracle.COINGECKO, 1000, '10'),
+        make_price(HistoricalPriceOracle.COINGECKO, 1020, '12'),
+        make_price(HistoricalPriceOracle.CRYPTOCOMPARE, 1010, '11'),
+    ])
+    # equally close prices of the same source, the earliest wins
+    assert globaldb.get_historical_price(A_BTC, A_EUR, Timestamp(1010), 10, HistoricalPriceOracle.COINGECKO).price == FVal('10')  # noqa: E501
+    # exact match of another source
+    assert globaldb.get_historical_price(A_BTC, A_EUR, Timestamp(1010), 10).price == FVal('11')
+    assert globaldb.get_historical_price(A_BTC, A_EUR, Timestamp(1031), 10) is None
+    assert (A_BTC.identifier.lower(), A_EUR.identifier.lower()) in globaldb.price_series_cache
+
+    # a new price closer to the timestamp is seen after the addition
+    assert globaldb.add_single_historical_price(make_price(HistoricalPriceOracle.MANUAL, 1030, '13'))  # noqa: E501
+    assert globaldb.get_historical_price(A_BTC, A_EUR, Timestamp(1031), 10).price == FVal('13')
+    assert globaldb.edit_manual_price(make_price(HistoricalPriceOracle.MANUAL, 1030, '14'))
+    assert globaldb.get_historical_price(A_BTC, A_EUR, Timestamp(1031), 10).price == FVal('14')
+    assert globaldb.delete_manual_price(A_BTC, A_EUR, Timestamp(1030))
+    assert globaldb.get_historical_price(A_BTC, A_EUR, Timestamp(1031), 10) is None
+
+    assert globaldb.get_historical_prices(
+        query_data=[(A_BTC, A_EUR, Timestamp(1001)), (A_ETH, A_EUR, Timestamp(1001))],
+        max_seconds_distance=10,
+    ) == [make_price(HistoricalPriceOracle.COINGECKO, 1000, '10'), None]
+    globaldb.delete_historical_prices(A_BTC, A_EUR)
+    assert globaldb.get_historical_price(A_BTC, A_EUR, Timestamp(1001), 10) is None
+
+
+def test_price_series_cache_updated_on_writes(globaldb):
+    """Test that writes to a pair update its cached price series in place, leaving it equal
+    to the series loaded again from the DB, instead of discarding it"""
+    key = (A_BTC.identifier.lower(), A_EUR.identifier.lower())
+    coingecko, manual = HistoricalPriceOracle.COINGECKO, HistoricalPriceOracle.MANUAL
+
+    def make_price(source: HistoricalPriceOracle, timestamp: int, price: str) -> HistoricalPrice:
+        return HistoricalPrice(
+            from_asset=A_BTC,
+            to_asset=A_EUR,
+            source=source,
+            timestamp=Timestamp(timestamp),
+            price=Price(FVal(price)),
+        )
+
+    def assert_cached_series_is_updated() -> None:
+        series = globaldb.price_series_cache.get(key)
+        assert series is cached_series
+        globaldb.price_series_cache.remove(key)
+        globaldb.load_price_series([(A_BTC, A_EUR)])
+        assert globaldb.price_series_cache.get(key).sources == series.sources
+        assert globaldb.price_series_cache.total_size == len(series)
+        globaldb.price_series_cache.add(key, series)
+
+    globaldb.add_historical_prices([make_price(coingecko, 1000, '10'), make_price(coingecko, 1020, '12')])  # noqa: E501
+    globaldb.load_price_series([(A_BTC, A_EUR)])
+    cached_series = globaldb.price_series_cache.get(key)
+
+    # an existing price is not replaced by the insertion, the new ones are added in place
+    globaldb.add_historical_prices([make_price(coingecko, 1000, '1'), make_price(coingecko, 1010, '11')])  # noqa: E501
+    assert_cached_series_is_updated()
+    assert globaldb.get_historical_price(A_BTC, A_EUR, Timestamp(1000), 0).price == FVal('10')
+    assert globaldb.add_single_historical_price(make_price(manual, 1005, '13'))
+    assert globaldb.add_single_historical_price(make_price(coingecko, 1020, '14'))
+    assert_cached_series_is_updated()
+    assert globaldb.get_historical_price(A_BTC, A_EUR, Timestamp(1020), 0).price == FVal('14')
+    assert globaldb.edit_manual_price(make_price(manual, 1005, '15'))
+    assert_cached_series_is_updated()
+    assert globaldb.delete_manual_price(A_BTC, A_EUR, Timestamp(1005))
+    assert globaldb.delete_manual_price(A_BTC, A_EUR, Timestamp(1005)) is False
+    assert_cached_series_is_updated()
+    assert globaldb.get_historical_price(A_BTC, A_EUR, Timestamp(1005), 0) is None
+
+    # a series big enough to be merged at once, over some already stored prices
+    globaldb.add_historical_price_series(A_BTC, A_EUR, HistoricalPriceOracle.CRYPTOCOMPARE, [
+        (Timestamp(900 + idx * 60), Price(FVal(idx))) for idx in range(100)
+    ])
+    globaldb.add_historical_price_series(A_BTC, A_EUR, HistoricalPriceOracle.CRYPTOCOMPARE, [
+        (Timestamp(930 + idx * 60), Price(FVal(idx))) for idx in range(3)
+    ] + [(Timestamp(900), Price(FVal('1000')))])
+    assert_cached_series_is_updated()
+    assert globaldb.get_historical_price(A_BTC, A_EUR, Timestamp(900), 0).price == ZERO
+    globaldb.delete_historical_prices(A_BTC, A_EUR, coingecko)
+    assert_cached_series_is_updated()
+    globaldb.delete_historical_prices(A_BTC, A_EUR)
+    assert len(globaldb.price_series_cache.get(key)) == 0
+    assert globaldb.get_historical_price(A_BTC, A_EUR, Timestamp(1000), 100) is None
+
+
+def test_historical_price_series_blocks(globaldb):
+    """Test that price series are stored in blocks that are merged with new prices, and
+    that they are read together with the price_history rows"""
+    source = HistoricalPriceOracle.CRYPTOCOMPARE
+    start_ts = 1600000000
+    globaldb.add_historical_price_series(A_BTC, A_EUR, source, [
+        (Timestamp(start_ts + idx * 3600), Price(FVal(f'1{idx}.0{idx}'))) for idx in range(1500)
+    ])
+    # the series is extended past its end, and the overlapping prices are not replaced
+    globaldb.add_historical_price_series(A_BTC, A_EUR, source, [
+        (Timestamp(start_ts + idx * 3600), Price(FVal('0.000000001'))) for idx in range(1490, 1599)
+    ] + [(Timestamp(start_ts + 1599 * 3600), Price(FVal('1.5e-30')))])
+    globaldb.add_historical_prices([HistoricalPrice(
+        from_asset=A_BTC,
+        to_asset=A_EUR,
+        source=source,
+        timestamp=Timestamp(start_ts + 1800),
+        price=Price(FVal('5')),
+    )])
+    with globaldb.conn.read_ctx() as cursor:
+        assert cursor.execute(
+            'SELECT start_ts, end_ts, prices_num FROM price_history_blocks ORDER BY start_ts',
+        ).fetchall() == [
+            (start_ts, start_ts + 1023 * 3600, 1024),
+            (start_ts + 1024 * 3600, start_ts + 1599 * 3600, 576),
+        ]
+
+    timestamps, prices = globaldb.get_historical_price_series(
+        from_asset=A_BTC,
+        to_asset=A_EUR,
+        source=source,
+        from_timestamp=Timestamp(start_ts),
+        to_timestamp=Timestamp(start_ts + 1599 * 3600),
+    )
+    assert timestamps[:3] == [start_ts, start_ts + 1800, start_ts + 3600]
+    assert prices[:3] == [FVal('10.00'), FVal('5'), FVal('11.01')]
+    assert len(timestamps) == len(prices) == 1601
+    assert prices[1500] == FVal('11499.01499')
+    assert prices[1501] == FVal('0.000000001')
+    assert prices[1600] == FVal('1.5e-30')  # stored exactly, with the decimals it needs
+    assert globaldb.get_historical_price_series(
+        from_asset=A_BTC,
+        to_asset=A_EUR,
+        source=source,
+        from_timestamp=Timestamp(start_ts + 1),
+        to_timestamp=Timestamp(start_ts + 3600),
+    ) == ([start_ts + 1800, start_ts + 3600], [FVal('5'), FVal('11.01')])
+
+    assert globaldb.get_historical_price(
+        from_asset=A_BTC,
+        to_asset=A_EUR,
+        timestamp=Timestamp(start_ts + 1100 * 3600 + 10),
+        max_seconds_distance=3600,
+    ).price == FVal('11100.01100')
+    assert globaldb.get_historical_price_range(A_BTC, A_EUR, source) == (start_ts, start_ts + 1599 * 3600)  # noqa: E501
+    assert globaldb.get_historical_price_data(source) == [{
+        'from_asset': A_BTC.identifier,
+        'to_asset': A_EUR.identifier,
+        'from_timestamp': start_ts,
+        'to_timestamp': start_ts + 1599 * 3600,
+    }]
+
+    globaldb.delete_historical_prices(A_BTC, A_EUR, source)
+    assert globaldb.get_historical_price_range(A_BTC, A_EUR, source) is None
+    assert globaldb.get_historical_price_series(
+        from_asset=A_BTC,
+        to_asset=A_EUR,
+        source=source,
+        from_timestamp=Timestamp(start_ts),
+        to_timestamp=Timestamp(start_ts + 1599 * 3600),
+    ) == ([], [])
@@ -280,6 +280,20 @@ def test_zpub_to_addresses():
         assert child.address() == expected_addresses[i]
 
 
+@pytest.mark.parametrize(('xpub', 'xpub_type'), [
+    ('xpub68V4ZQQ62mea7ZUKn2urQu47Bdn2Wr7SxrBxBDDwE3kjytj361YBGSKDT4WoBrE5htrSB8eAMe59NPnKrcAbiv2veN5GQUmfdjRddD1Hxrk', None),  # noqa: E501
+    ('ypub6WkRUvNhspMCJLiLgeP7oL1pzrJ6wA2tpwsKtXnbmpdAGmHHcC6FeZeF4VurGU14dSjGpF2xLavPhgvCQeXd6JxYgSfbaD1wSUi2XmEsx33', None),  # noqa: E501
+    ('zpub6quTRdxqWmerHdiWVKZdLMp9FY641F1F171gfT2RS4D1FyHnutwFSMiab58Nbsdu4fXBaFwpy5xyGnKZ8d6xn2j4r4yNmQ3Yp3yDDxQUo3q', None),  # noqa: E501
+    ('xpub6BgBgsespWvERF3LHQu6CnqdvfEvtMcQjYrcRzx53QJjSxarj2afYWcLteoGVky7D3UKDP9QyrLprQ3VCECoY49yfdDEHGCtMMj92pReUsQ', XpubType.P2TR),  # noqa: E501
+])
+def test_derive_addresses(xpub, xpub_type):
+    """Test that deriving the addresses of a range of children at once gives the same
+    addresses as deriving each child"""
+    root = HDKey.from_xpub(xpub=xpub, xpub_type=xpub_type, path='m').derive_child(0)
+    indices = [*range(10), 25, 1000]
+    assert root.derive_addresses(indices) == [root.derive_child(idx).address() for idx in indices]
+
+
 def test_from_bad_xpub():
     with pytest.raises(XPUBError):
         HDKey.from_xpub('ddodod')
@@ -1,18 +1,32 @@
+import time
+from collections import defaultdict
 from contextlib import ExitStack
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
+from unittest.mock import patch
 
+import gevent
 import pytest
 
+from rotkehlchen.accounting.structures.balance import Balance, BalanceSheet
 from rotkehlchen.assets.asset import Asset
 from rotkehlchen.assets.utils import get_or_create_evm_token
 from rotkehlchen.chain.accounts import BlockchainAccountData
 from rotkehlchen.chain.aggregator import ChainsAggregator, _module_name_to_class
 from rotkehlchen.chain.evm.types import NodeName, WeightedNode, string_to_evm_address
+from rotkehlchen.chain.substrate.types import SubstrateAddress
 from rotkehlchen.constants import ONE
+from rotkehlchen.constants.assets import A_BTC, A_DOT, A_ETH
+from rotkehlchen.errors.misc import RemoteError
 from rotkehlchen.tests.utils.blockchain import setup_evm_addresses_activity_mock
 from rotkehlchen.tests.utils.factories import make_evm_address
 from rotkehlchen.tests.utils.polygon_pos import ALCHEMY_RPC_ENDPOINT
-from rotkehlchen.types import AVAILABLE_MODULES_MAP, SPAM_PROTOCOL, ChainID, SupportedBlockchain
+from rotkehlchen.types import (
+    AVAILABLE_MODULES_MAP,
+    SPAM_PROTOCOL,
+    BTCAddress,
+    ChainID,
+    SupportedBlockchain,
+)
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.polygon_pos.manager import PolygonPOSManager
@@ -252,3 +266,92 @@ def test_detect_evm_accounts_spam_tx(polygon_pos_manager: 'PolygonPOSManager') -
             db.add_to_ignored_assets(write_cursor=write_cursor, asset=asset)
 
     assert polygon_pos_manager.transactions.address_has_been_spammed(evm_address) is True
+
+
+def test_query_all_chains_balances_concurrently(blockchain: 'ChainsAggregator') -> None:
+    """Test that all chains are queried concurrently and that a chain whose query fails
+    or times out keeps its previous balances without affecting the rest"""
+    btc_address = BTCAddress('bc1qhkje0xfvhmgk6mvanxwy09n45df03tj3h3jtnf')
+    eth_address = make_evm_address()
+    blockchain.balances.btc = {btc_address: Balance(amount=ONE, usd_value=ONE)}
+
+    def query_btc(**kwargs: Any) -> None:  # pylint: disable=unused-argument
+        blockchain.balances.btc = {}
+        raise RemoteError('blockstream is down')
+
+    def query_eth(**kwargs: Any) -> None:  # pylint: disable=unused-argument
+        gevent.sleep(0.5)
+        blockchain.balances.eth[eth_address] = BalanceSheet(
+            assets=defaultdict(Balance, {A_ETH: Balance(amount=ONE, usd_value=ONE)}),
+        )
+
+    def query_dot(**kwargs: Any) -> None:  # pylint: disable=unused-argument
+        gevent.sleep(5)
+
+    side_effects = {
+        SupportedBlockchain.BITCOIN: query_btc,
+        SupportedBlockchain.ETHEREUM: query_eth,
+        SupportedBlockchain.POLKADOT: query_dot,
+        SupportedBlockchain.OPTIMISM: query_eth,  # all sleep at the same time
+    }
+    with ExitStack() as stack:
+        for chain in SupportedBlockchain:
+            stack.enter_context(patch.object(
+                blockchain,
+                f'query_{chain.get_key()}_balances',
+                side_effect=side_effects.get(chain),
+            ))
+        start = time.monotonic()
+        errors = blockchain.query_all_chains_balances(ignore_cache=True, source_timeout=2)
+
+    assert time.monotonic() - start < 2.5
+    assert set(errors) == {SupportedBlockchain.BITCOIN, SupportedBlockchain.POLKADOT}
+    assert str(errors[SupportedBlockchain.BITCOIN]) == 'blockstream is down'
+    assert str(errors[SupportedBlockchain.POLKADOT]) == 'Balances query timed out after 2 seconds'
+    assert blockchain.balances.btc == {btc_address: Balance(amount=ONE, usd_value=ONE)}
+    assert blockchain.totals.assets == {
+        A_BTC: Balance(amount=ONE, usd_value=ONE),
+        A_ETH: Balance(amount=ONE, usd_value=ONE),
+    }
+
+
+def test_query_all_chains_balances_timeout(blockchain: 'ChainsAggregator') -> None:
+    """Test that a chain whose query times out after changing some of its balances gets
+    back the balances it had before the query, while the balances of a chain queried at
+    the same time are updated"""
+    eth_address = make_evm_address()
+    dot_address = SubstrateAddress('5GrwvaEF5zXb26Fz9rcQpDWS57CtERHpNehXCPcNoHGKutQY')
+    blockchain.balances.dot = {dot_address: BalanceSheet(
+        assets=defaultdict(Balance, {A_DOT: Balance(amount=ONE, usd_value=ONE)}),
+    )}
+
+    def query_eth(**kwargs: Any) -> None:  # pylint: disable=unused-argument
+        blockchain.balances.eth[eth_address] = BalanceSheet(
+            assets=defaultdict(Balance, {A_ETH: Balance(amount=ONE, usd_value=ONE)}),
+        )
+
+    def query_dot(**kwargs: Any) -> None:  # pylint: disable=unused-argument
+        blockchain.balances.dot[dot_address].assets[A_DOT] = Balance()
+        gevent.sleep(5)
+
+    side_effects = {SupportedBlockchain.ETHEREUM: query_eth, SupportedBlockchain.POLKADOT: query_dot}  # noqa: E501
+    with ExitStack() as stack:
+        for chain in SupportedBlockchain:
+            stack.enter_context(patch.object(
+                blockchain,
+                f'query_{chain.get_key()}_balances',
+                side_effect=side_effects.get(chain),
+            ))
+        errors = blockchain.query_all_chains_balances(ignore_cache=True, source_timeout=1)
+
+    assert list(errors) == [SupportedBlockchain.POLKADOT]
+    assert blockchain.balances.dot == {dot_address: BalanceSheet(
+        assets=defaultdict(Balance, {A_DOT: Balance(amount=ONE, usd_value=ONE)}),
+    )}
+    assert blockchain.balances.eth == {eth_address: BalanceSheet(
+        assets=defaultdict(Balance, {A_ETH: Balance(amount=ONE, usd_value=ONE)}),
+    )}
+    assert blockchain.totals.assets == {
+        A_DOT: Balance(amount=ONE, usd_value=ONE),
+        A_ETH: Balance(amount=ONE, usd_value=ONE),
+    }
@@ -8,7 +8,13 @@ import pytest
 
 from rotkehlchen.accounting.accountant import Accountant
 from rotkehlchen.accounting.cost_basis import AssetAcquisitionEvent
-from rotkehlchen.accounting.cost_basis.base import AverageCostBasisMethod
+from rotkehlchen.accounting.cost_basis.base import (
+    AverageCostBasisMethod,
+    BaseCostBasisMethod,
+    FIFOCostBasisMethod,
+    HIFOCostBasisMethod,
+    LIFOCostBasisMethod,
+)
 from rotkehlchen.accounting.export.csv import FILENAME_ALL_CSV, CSVExporter
 from rotkehlchen.accounting.mixins.event import AccountingEventType
 from rotkehlchen.accounting.pnl import PNL, PnlTotals
@@ -1177,3 +1183,41 @@ def test_csv_exporter_settings(database: 'DBHandler') -> None:
     csv_exporter = CSVExporter(database)
     assert csv_exporter.transaction_explorers[SupportedBlockchain.ETHEREUM] == 'myexplorer.eth'
     assert csv_exporter.transaction_explorers[SupportedBlockchain.POLYGON_POS] == 'myexplorer.polygon'  # noqa: E501
+
+
+@pytest.mark.parametrize('method_class', [
+    FIFOCostBasisMethod,
+    LIFOCostBasisMethod,
+    HIFOCostBasisMethod,
+    AverageCostBasisMethod,
+])
+def test_cost_basis_method_state_roundtrip(method_class: type[BaseCostBasisMethod]) -> None:
+    """Test that restoring the serialized state of a cost basis method gives the same state
+    as the original, down to the types, and that both continue the same way"""
+    original = method_class()
+    for idx, rate in enumerate(('10', '30', '20')):
+        original.add_in_event(AssetAcquisitionEvent(
+            amount=FVal(2),
+            timestamp=Timestamp(EXAMPLE_TIMESTAMP + idx),
+            rate=Price(FVal(rate)),
+            index=idx,
+        ))
+    original.consume_result(ONE)
+
+    restored = method_class()
+    restored.deserialize_state(original.serialize_state(), keep_indices=True)
+    assert vars(restored) == vars(original)
+    assert [type(x) for x in vars(restored).values()] == [type(x) for x in vars(original).values()]
+    assert [type(x.priority) for x in restored._acquisitions_heap] == [type(x.priority) for x in original._acquisitions_heap]  # noqa: E501
+    if method_class != HIFOCostBasisMethod:  # the others count the acquisitions
+        assert isinstance(restored._count, int)  # type: ignore[attr-defined]
+
+    for method in (original, restored):
+        method.add_in_event(AssetAcquisitionEvent(
+            amount=ONE,
+            timestamp=Timestamp(EXAMPLE_TIMESTAMP + 3),
+            rate=Price(FVal(25)),
+            index=3,
+        ))
+    assert vars(restored) == vars(original)
+    assert restored.get_acquisitions() == original.get_acquisitions()
@@ -0,0 +1,34 @@
+import os
+
+import pytest
+
+from rotkehlchen.crypto import AES_BLOCK_SIZE, StreamDecryptor, StreamEncryptor, decrypt, encrypt
+from rotkehlchen.errors.misc import UnableToDecryptRemoteData
+
+
+@pytest.mark.parametrize('data_size', [0, 1, AES_BLOCK_SIZE, 1000])
+@pytest.mark.parametrize('chunk_size', [1, 7, AES_BLOCK_SIZE, 4096])
+def test_stream_encryption_in_chunks(data_size: int, chunk_size: int) -> None:
+    """Test that data encrypted and decrypted in chunks of any size is compatible with
+    the one shot encryption of the DB backups"""
+    key, data = b'password', os.urandom(data_size)
+    encryptor = StreamEncryptor(key)
+    encrypted = b''.join(
+        encryptor.update(data[idx:idx + chunk_size]) for idx in range(0, data_size, chunk_size)
+    ) + encryptor.finalize()
+    assert decrypt(key, encrypted) == data
+
+    encrypted = encrypt(key, data)
+    decryptor = StreamDecryptor(key)
+    decrypted = b''.join(
+        decryptor.update(encrypted[idx:idx + chunk_size])
+        for idx in range(0, len(encrypted), chunk_size)
+    ) + decryptor.finalize()
+    assert decrypted == data
+
+
+def test_stream_decryption_of_truncated_data() -> None:
+    decryptor = StreamDecryptor(b'password')
+    decryptor.update(encrypt(b'password', b'data')[:-1])
+    with pytest.raises(UnableToDecryptRemoteData):
+        decryptor.finalize()
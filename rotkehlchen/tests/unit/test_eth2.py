@@ -33,6 +33,10 @@ from rotkehlchen.history.events.structures.eth2 import (
 )
 from rotkehlchen.history.events.structures.evm_event import EvmEvent
 from rotkehlchen.history.events.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.tests.utils.accounting import (
+    add_accounting_snapshots,
+    get_accounting_snapshot_timestamps,
+)
 from rotkehlchen.tests.utils.factories import make_evm_address, make_evm_tx_hash
 from rotkehlchen.tests.utils.mock import MockResponse
 from rotkehlchen.types import (
@@ -725,7 +729,10 @@ def test_combine_block_with_tx_events(eth2, database):
             ),
         ])
 
+    add_accounting_snapshots(database, [Timestamp(1666693600), Timestamp(1666693607), Timestamp(1666693610)])  # noqa: E501
     eth2.combine_block_with_tx_events()
+    # the snapshots that contain the combined events are invalidated
+    assert get_accounting_snapshot_timestamps(database) == [1666693600, 1666693607]
 
     with database.conn.read_ctx() as cursor:
         events = dbevents.get_history_events(
@@ -809,7 +816,10 @@ def test_refresh_activated_validators_deposits(eth2, database):
     with database.user_write() as write_cursor:
         dbevents.add_history_events(write_cursor, starting_events)
 
+    add_accounting_snapshots(database, [Timestamp(400), Timestamp(460), Timestamp(500)])
     eth2.refresh_activated_validators_deposits()
+    # the snapshots that contain the edited deposits are invalidated
+    assert get_accounting_snapshot_timestamps(database) == [400, 460]
 
     with database.conn.read_ctx() as cursor:
         new_events = dbevents.get_history_events(cursor, HistoryEventFilterQuery.make(), True)
@@ -852,6 +862,47 @@ def test_query_chunked_endpoint_with_offset_pagination(eth2):
     assert len(result) == 474  # with the offset bug it was 251 (only first chunk worked)
 
 
+def test_validator_changes_invalidate_accounting_snapshots(database):
+    """Test that the writes of validators data used by accounting invalidate the snapshots"""
+    dbeth2 = DBEth2(database)
+    dbevents = DBHistoryEvents(database)
+    with database.user_write() as write_cursor:
+        dbeth2.add_validators(write_cursor, [Eth2Validator(index=1, public_key=Eth2PubKey('0xfoo1'))])  # noqa: E501
+        dbevents.add_history_event(write_cursor, EthWithdrawalEvent(
+            validator_index=1,
+            timestamp=ts_sec_to_ms(Timestamp(1681392599)),
+            balance=Balance(FVal('32.1')),
+            withdrawal_address=ADDR1,
+            is_exit=False,
+        ))
+
+    add_accounting_snapshots(database, [Timestamp(1607126400), Timestamp(1607212800), Timestamp(1607299200)])  # noqa: E501
+    dbeth2.add_validator_daily_stats([ValidatorDailyStats(
+        validator_index=1,
+        timestamp=Timestamp(1607212800),
+        pnl=FVal('0.01'),
+    )])
+    assert get_accounting_snapshot_timestamps(database) == [1607126400, 1607212800]
+    dbeth2.add_validator_daily_stats([ValidatorDailyStats(  # already in the DB so skipped
+        validator_index=1,
+        timestamp=Timestamp(1607212800),
+        pnl=FVal('0.01'),
+    )])
+    assert get_accounting_snapshot_timestamps(database) == [1607126400, 1607212800]
+
+    dbeth2.edit_validator(validator_index=1, ownership_proportion=FVal('0.5'))
+    assert get_accounting_snapshot_timestamps(database) == []
+
+    add_accounting_snapshots(database, [Timestamp(1607126400), Timestamp(1681392600)])
+    with database.user_write() as write_cursor:
+        dbeth2.set_validator_exit(write_cursor, index=1, exit_epoch=1)
+    assert get_accounting_snapshot_timestamps(database) == [1607126400]
+
+    with database.user_write() as write_cursor:
+        database.delete_eth2_daily_stats(write_cursor)
+    assert get_accounting_snapshot_timestamps(database) == []
+
+
 def test_validator_daily_stats_empty(database):
     dbeth2 = DBEth2(database)
     with database.conn.read_ctx() as cursor:
@@ -1,5 +1,29 @@
-from rotkehlchen.chain.evm.types import asset_id_is_evm_token, string_to_evm_address
-from rotkehlchen.types import ChainID
+import json
+from collections import defaultdict
+from unittest.mock import patch
+
+import gevent
+import requests
+from web3 import HTTPProvider, Web3
+
+from rotkehlchen.chain.ethereum.node_inquirer import EthereumInquirer
+from rotkehlchen.chain.evm.node_inquirer import DEFAULT_RPC_BATCH_SIZE
+from rotkehlchen.chain.evm.node_stats import (
+    MIN_HEDGE_DELAY,
+    MIN_NODE_STATS_SAMPLES,
+    NodeStatsTracker,
+)
+from rotkehlchen.chain.evm.types import (
+    NodeName,
+    Web3Node,
+    WeightedNode,
+    asset_id_is_evm_token,
+    string_to_evm_address,
+)
+from rotkehlchen.constants import ONE
+from rotkehlchen.db.settings import CachedSettings
+from rotkehlchen.errors.misc import RemoteError
+from rotkehlchen.types import ChainID, SupportedBlockchain
 
 
 def test_asset_id_is_evm_token():
@@ -22,3 +46,210 @@ def test_asset_id_is_evm_token():
     assert asset_id_is_evm_token('ETH') is None
     assert asset_id_is_evm_token('BTC') is None
     assert asset_id_is_evm_token('eip155:125/erc721:0xC36442b4a4522E871399CD717aBDD847Ab11FE88') is None  # noqa: E501
+
+
+def test_node_stats_tracker():
+    """Test that the call order preference and the hedging delay of the nodes follow
+    their latency and error rate"""
+    fast, slow, flaky, unknown = (
+        NodeName(name=name, endpoint=f'https://{name}', owned=False, blockchain=SupportedBlockchain.ETHEREUM)  # noqa: E501
+        for name in ('fast', 'slow', 'flaky', 'unknown')
+    )
+    tracker = NodeStatsTracker()
+    for _ in range(MIN_NODE_STATS_SAMPLES):
+        tracker.get(fast).record(latency=0.1, success=True)
+        tracker.get(slow).record(latency=0.4, success=True)
+        tracker.get(flaky).record(latency=0.2, success=None)  # abandoned queries
+        tracker.get(flaky).record(latency=0.2, success=False)
+        tracker.get(flaky).record(latency=0.2, success=True)
+
+    assert tracker.get(flaky).error_rate() == 0.5
+    assert tracker.performance_factors([fast, slow, flaky, unknown]) == [2.0, 0.5, 0.25, 1.0]
+    assert tracker.performance_factors([unknown]) == [1.0]
+    assert tracker.hedge_delay(slow) == 0.4
+    assert tracker.hedge_delay(fast) == MIN_HEDGE_DELAY
+    assert tracker.hedge_delay(unknown) is None
+    assert tracker.serialize()[0] == {
+        'name': 'fast',
+        'endpoint': 'https://fast',
+        'queries': MIN_NODE_STATS_SAMPLES,
+        'failures': 0,
+        'hedged': 0,
+        'error_rate': 0.0,
+        'latency_p50': 0.1,
+        'latency_p95': 0.1,
+    }
+
+
+def test_query_hedges_slow_node():
+    """Test that, if enabled in the settings, an idempotent read to a node slower than
+    usual is also sent to the next node and that the first successful response is used"""
+    inquirer = EthereumInquirer.__new__(EthereumInquirer)
+    inquirer.blockchain = SupportedBlockchain.ETHEREUM
+    inquirer.etherscan_node_name = 'etherscan'
+    inquirer.node_stats = NodeStatsTracker()
+    nodes = [
+        WeightedNode(
+            node_info=NodeName(name=name, endpoint=f'https://{name}', owned=False, blockchain=SupportedBlockchain.ETHEREUM),  # noqa: E501
+            active=True,
+            weight=ONE,
+        ) for name in ('slow', 'fast')
+    ]
+    inquirer.web3_mapping = {
+        x.node_info: Web3Node(web3_instance=x.node_info.name, is_pruned=False, is_archive=True)  # only the name is needed  # noqa: E501
+        for x in nodes
+    }
+    for _ in range(MIN_NODE_STATS_SAMPLES):
+        inquirer.node_stats.get(nodes[0].node_info).record(latency=0.01, success=True)
+
+    slow_delay = 0.5
+
+    # name of a method that is hedged
+    def _get_code(web3, **kwargs):  # pylint: disable=unused-argument
+        if web3 == 'slow':
+            gevent.sleep(slow_delay)
+        return web3
+
+    # hedging is off by default
+    assert inquirer._query(method=_get_code, call_order=nodes, account='0x') == 'slow'
+    slow_stats = inquirer.node_stats.get(nodes[0].node_info)
+    assert slow_stats.hedged_num == 0
+
+    slow_delay = 5
+    CachedSettings().update_entry('hedge_evm_queries', True)
+    try:
+        assert inquirer._query(method=_get_code, call_order=nodes, account='0x') == 'fast'
+    finally:
+        CachedSettings().reset()
+    assert slow_stats.hedged_num == 1
+    assert slow_stats.queries_num == MIN_NODE_STATS_SAMPLES + 2  # the abandoned query counts
+    assert inquirer.node_stats.get(nodes[1].node_info).failures_num == 0
+
+    def _get_logs(web3, **kwargs):  # not hedged  # pylint: disable=unused-argument
+        if web3 == 'slow':
+            raise RemoteError('boom')
+        return web3
+
+    assert inquirer._query(method=_get_logs, call_order=nodes) == 'fast'
+    assert slow_stats.failures_num == 1
+    assert slow_stats.hedged_num == 1
+    assert len(slow_stats.latencies) == MIN_NODE_STATS_SAMPLES + 2  # not for the failure
+
+
+def test_batch_query_adapts_size_and_falls_back():
+    """Test that JSON-RPC batches are split for nodes that reject their size and that
+    the calls failing in the batches are retried at the next node and then one by one"""
+    inquirer = EthereumInquirer.__new__(EthereumInquirer)
+    nodes = [
+        WeightedNode(
+            node_info=NodeName(name=name, endpoint=f'https://{name}', owned=False, blockchain=SupportedBlockchain.ETHEREUM),  # noqa: E501
+            active=True,
+            weight=ONE,
+        ) for name in ('limited', 'other')
+    ]
+    inquirer.web3_mapping = {
+        x.node_info: Web3Node(web3_instance=Web3(HTTPProvider(x.node_info.endpoint)), is_pruned=False, is_archive=True)  # noqa: E501
+        for x in nodes
+    }
+    inquirer.rpc_batch_sizes = {nodes[0].node_info: 4}
+    inquirer.node_stats = NodeStatsTracker()
+    inquirer.rpc_batches_accepted = {}
+    accounts = [string_to_evm_address(f'0x{idx:040x}') for idx in range(1, 6)]
+    batch_sizes = defaultdict(list)
+
+    def mock_post(endpoint_uri, data, **kwargs):  # pylint: disable=unused-argument
+        calls = json.loads(data)
+        batch_sizes[endpoint_uri].append(len(calls))
+        if endpoint_uri == 'https://limited':
+            if len(calls) > 2:
+                return b'{"jsonrpc": "2.0", "id": null, "error": {"message": "batch too large"}}'
+            # fails for the first account and has no code for the second
+            return json.dumps([
+                {'jsonrpc': '2.0', 'id': x['id'], 'error': {'message': 'boom'}} if x['params'][0] == accounts[0] else  # noqa: E501
+                {'jsonrpc': '2.0', 'id': x['id'], 'result': '0x' if x['params'][0] == accounts[1] else '0x60'}  # noqa: E501
+                for x in calls
+            ]).encode()
+        raise requests.exceptions.ConnectionError('node is down')
+
+    with (
+        patch('rotkehlchen.chain.evm.node_inquirer.make_post_request', side_effect=mock_post),
+        patch.object(inquirer, 'get_code', side_effect=RemoteError('no node')) as get_code,
+    ):
+        codes = inquirer.get_codes(accounts=accounts, call_order=nodes)
+
+    assert batch_sizes == {'https://limited': [4, 2, 2, 1], 'https://other': [1]}
+    assert inquirer.rpc_batch_sizes == {nodes[0].node_info: 2}
+    assert get_code.call_count == 1
+    assert isinstance(codes[0], RemoteError)
+    assert codes[1:] == ['0x', '0x60', '0x60', '0x60']
+
+
+def test_batch_size_grows_back():
+    """Test that the JSON-RPC batch size of a node doubles back up to the default once
+    the node has accepted enough batches in a row"""
+    inquirer = EthereumInquirer.__new__(EthereumInquirer)
+    node = WeightedNode(
+        node_info=NodeName(name='node', endpoint='https://node', owned=False, blockchain=SupportedBlockchain.ETHEREUM),  # noqa: E501
+        active=True,
+        weight=ONE,
+    )
+    inquirer.web3_mapping = {node.node_info: Web3Node(web3_instance=Web3(HTTPProvider(node.node_info.endpoint)), is_pruned=False, is_archive=True)}  # noqa: E501
+    inquirer.rpc_batch_sizes = {node.node_info: DEFAULT_RPC_BATCH_SIZE // 4}
+    inquirer.node_stats = NodeStatsTracker()
+    inquirer.rpc_batches_accepted = {}
+    batch_sizes = []
+
+    def mock_post(endpoint_uri, data, **kwargs):  # pylint: disable=unused-argument
+        calls = json.loads(data)
+        batch_sizes.append(len(calls))
+        return json.dumps([{'jsonrpc': '2.0', 'id': x['id'], 'result': '0x60'} for x in calls]).encode()  # noqa: E501
+
+    accounts = [string_to_evm_address(f'0x{idx:040x}') for idx in range(1, 5 * DEFAULT_RPC_BATCH_SIZE // 2 + 1)]  # noqa: E501
+    with (
+        patch('rotkehlchen.chain.evm.node_inquirer.make_post_request', side_effect=mock_post),
+        patch('rotkehlchen.chain.evm.node_inquirer.RPC_BATCH_SIZE_GROWTH_BATCHES', 2),
+    ):
+        codes = inquirer.get_codes(accounts=accounts, call_order=[node])
+
+    quarter, half = DEFAULT_RPC_BATCH_SIZE // 4, DEFAULT_RPC_BATCH_SIZE // 2
+    assert batch_sizes == [quarter, quarter, half, half, DEFAULT_RPC_BATCH_SIZE]
+    assert inquirer.rpc_batch_sizes == {node.node_info: DEFAULT_RPC_BATCH_SIZE}
+    assert codes == ['0x60'] * len(accounts)
+
+
+def test_batch_query_records_node_stats():
+    """Test that each JSON-RPC batch request counts as a query in the stats of its node,
+    without a latency, and that a batch rejected for its size does not count"""
+    inquirer = EthereumInquirer.__new__(EthereumInquirer)
+    nodes = [
+        WeightedNode(
+            node_info=NodeName(name=name, endpoint=f'https://{name}', owned=False, blockchain=SupportedBlockchain.ETHEREUM),  # noqa: E501
+            active=True,
+            weight=ONE,
+        ) for name in ('down', 'limited')
+    ]
+    inquirer.web3_mapping = {
+        x.node_info: Web3Node(web3_instance=Web3(HTTPProvider(x.node_info.endpoint)), is_pruned=False, is_archive=True)  # noqa: E501
+        for x in nodes
+    }
+    inquirer.rpc_batch_sizes = {nodes[1].node_info: 4}
+    inquirer.rpc_batches_accepted = {}
+    inquirer.node_stats = NodeStatsTracker()
+
+    def mock_post(endpoint_uri, data, **kwargs):  # pylint: disable=unused-argument
+        calls = json.loads(data)
+        if endpoint_uri == 'https://down':
+            raise requests.exceptions.ConnectionError('node is down')
+        if len(calls) > 2:
+            return b'{"jsonrpc": "2.0", "id": null, "error": {"message": "batch too large"}}'
+        return json.dumps([{'jsonrpc': '2.0', 'id': x['id'], 'result': '0x60'} for x in calls]).encode()  # noqa: E501
+
+    accounts = [string_to_evm_address(f'0x{idx:040x}') for idx in range(1, 5)]
+    with patch('rotkehlchen.chain.evm.node_inquirer.make_post_request', side_effect=mock_post):
+        assert inquirer.get_codes(accounts=accounts, call_order=nodes) == ['0x60'] * 4
+
+    down_stats = inquirer.node_stats.get(nodes[0].node_info)
+    assert (down_stats.queries_num, down_stats.failures_num) == (1, 1)
+    limited_stats = inquirer.node_stats.get(nodes[1].node_info)
+    assert (limited_stats.queries_num, limited_stats.failures_num) == (2, 0)
+    assert len(down_stats.latencies) == len(limited_stats.latencies) == 0
@@ -1,13 +1,15 @@
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 from unittest.mock import patch
 
 from rotkehlchen.chain.evm.types import EvmAccount
 from rotkehlchen.db.filtering import EvmTransactionsFilterQuery
-from rotkehlchen.tests.utils.factories import make_evm_address
+from rotkehlchen.errors.misc import RemoteError
+from rotkehlchen.tests.utils.factories import make_ethereum_transaction, make_evm_address
 from rotkehlchen.types import ChainID
 
 if TYPE_CHECKING:
     from rotkehlchen.chain.ethereum.transactions import EthereumTransactions
+    from rotkehlchen.types import EVMTxHash
 
 ADDR_1, ADDR_2, ADDR_3 = make_evm_address(), make_evm_address(), make_evm_address()
 
@@ -39,3 +41,93 @@ def test_query_transactions_single_chain(eth_transactions: 'EthereumTransactions
         ))
 
     assert queried_addresses == [ADDR_2, ADDR_3]
+
+
+def _make_receipt_data(tx_hash: 'EVMTxHash') -> dict[str, Any]:
+    return {
+        'transactionHash': tx_hash.hex(),
+        'contractAddress': None,
+        'status': 1,
+        'type': '0x0',
+        'logs': [],
+    }
+
+
+def test_missing_receipts_queried_in_batches(eth_transactions: 'EthereumTransactions'):
+    """Test that the missing receipts are queried in batches, that each chunk of them is
+    saved and that a receipt that fails to be queried does not stop the rest"""
+    transactions = [make_ethereum_transaction() for _ in range(3)]
+    with eth_transactions.database.user_write() as write_cursor:
+        eth_transactions.dbevmtx.add_evm_transactions(
+            write_cursor=write_cursor,
+            evm_transactions=transactions,
+            relevant_address=None,
+        )
+
+    queried_batches = []
+
+    def mock_get_transaction_receipts(tx_hashes):
+        queried_batches.append(tx_hashes)
+        return [
+            RemoteError('boom') if tx_hash == transactions[0].tx_hash else _make_receipt_data(tx_hash)  # noqa: E501
+            for tx_hash in tx_hashes
+        ]
+
+    with (
+        patch('rotkehlchen.chain.evm.transactions.RECEIPTS_CHUNK_SIZE', 2),
+        patch.object(eth_transactions.evm_inquirer, 'get_transaction_receipts', side_effect=mock_get_transaction_receipts),  # noqa: E501
+        patch.object(eth_transactions.evm_inquirer, 'get_transaction_receipt') as get_receipt,
+    ):
+        eth_transactions.get_receipts_for_transactions_missing_them()
+
+    assert [len(x) for x in queried_batches] == [2, 1]
+    assert get_receipt.call_count == 0
+    assert eth_transactions.dbevmtx.get_transaction_hashes_no_receipt(
+        tx_filter_query=None,
+        limit=None,
+    ) == [transactions[0].tx_hash]
+    assert len(eth_transactions.msg_aggregator.consume_warnings()) == 1
+
+
+def test_ensure_txs_data_exist_queries_in_batch(eth_transactions: 'EthereumTransactions'):
+    """Test that the transactions missing from the DB are queried in a single batch and
+    that the ones that failed in it are still queried on their own"""
+    transactions = [make_ethereum_transaction() for _ in range(4)]
+    with eth_transactions.database.user_write() as write_cursor:
+        eth_transactions.dbevmtx.add_evm_transactions(
+            write_cursor=write_cursor,
+            evm_transactions=transactions[:1],
+            relevant_address=None,
+        )
+        eth_transactions.dbevmtx.add_or_ignore_receipt_data(
+            write_cursor=write_cursor,
+            chain_id=ChainID.ETHEREUM,
+            data=_make_receipt_data(transactions[0].tx_hash),
+        )
+
+    queried_batches = []
+
+    def mock_get_transactions_by_hash(tx_hashes):
+        queried_batches.append(tx_hashes)
+        return [
+            RemoteError('boom') if tx.tx_hash == transactions[3].tx_hash else (tx, _make_receipt_data(tx.tx_hash))  # noqa: E501
+            for tx in transactions[1:]
+        ]
+
+    tx_hashes = [x.tx_hash for x in transactions]
+    with patch.object(eth_transactions.evm_inquirer, 'get_transactions_by_hash', side_effect=mock_get_transactions_by_hash):  # noqa: E501
+        eth_transactions.ensure_txs_data_exist(tx_hashes=tx_hashes + tx_hashes[1:2], relevant_address=ADDR_1)  # noqa: E501
+
+    assert queried_batches == [tx_hashes[1:]]
+    with (
+        patch.object(eth_transactions.evm_inquirer, 'get_transaction_by_hash', return_value=(transactions[3], _make_receipt_data(transactions[3].tx_hash))) as get_transaction,  # noqa: E501
+        eth_transactions.database.conn.read_ctx() as cursor,
+    ):
+        for tx in transactions:
+            assert eth_transactions.get_or_create_transaction(
+                cursor=cursor,
+                tx_hash=tx.tx_hash,
+                relevant_address=None,
+            )[0] == tx
+
+    assert get_transaction.call_count == 1  # only the transaction that failed in the batch
@@ -5,7 +5,7 @@ import pytest
 
 from rotkehlchen.accounting.structures.balance import Balance
 from rotkehlchen.chain.evm.constants import GENESIS_HASH
-from rotkehlchen.chain.evm.decoding.constants import CPT_GAS
+from rotkehlchen.chain.evm.decoding.constants import CPT_GAS, ERC20_OR_ERC721_TRANSFER
 from rotkehlchen.chain.evm.types import EvmAccount, string_to_evm_address
 from rotkehlchen.chain.optimism.types import OptimismTransaction
 from rotkehlchen.constants.assets import A_ETH, A_SAI
@@ -278,3 +278,61 @@ def test_genesis_remove_address(
         )
 
     assert len(genesis_tx) == 0, 'Genesis transaction should have been deleted'
+
+
+def test_event_rules_indexed_by_topic(ethereum_transaction_decoder: 'EthereumTransactionDecoder'):
+    """Test that the event rules are indexed by the topics they declare, keeping
+    the order in which they were registered, and that all rules declare topics"""
+    decoder = ethereum_transaction_decoder
+    assert decoder.catch_all_event_rules == []
+    assert all(len(rule.topics) != 0 for rule in decoder.rules.event_rules)
+    for topic, rules in decoder.event_rules_by_topic.items():
+        assert rules == [rule for rule in decoder.rules.event_rules if topic in rule.topics]
+
+    transfer_rules = decoder.event_rules_by_topic[ERC20_OR_ERC721_TRANSFER]
+    assert [x.function for x in transfer_rules] == [decoder._maybe_decode_erc20_721_transfer]
+
+
+@pytest.mark.parametrize('use_custom_database', ['ethtxs.db'])
+def test_decoded_events_saved_in_batches(ethereum_transaction_decoder, database):
+    """Test that decoded transactions are saved in batches, each in its own write
+    transaction, and that a failure in a batch only rolls back the batch itself"""
+    dbevmtx = DBEvmTx(database)
+    with database.conn.read_ctx() as cursor:
+        tx_hashes = [EVMTxHash(x[0]) for x in cursor.execute(
+            'SELECT tx_hash FROM evm_transactions WHERE chain_id=? AND identifier IN '
+            '(SELECT tx_id FROM evmtx_receipts) LIMIT 5',
+            (ChainID.ETHEREUM.serialize_for_db(),),
+        )]
+    assert len(tx_hashes) == 5, 'the test DB should contain at least 5 transactions with receipts'
+    decoder = ethereum_transaction_decoder
+    original_save = decoder._save_decoding_batch
+    save_calls = 0
+
+    def failing_save(batch):
+        nonlocal save_calls
+        save_calls += 1
+        if save_calls == 2:  # let the first batch be saved but save only part of the second
+            with database.user_write() as write_cursor:
+                transaction, events = batch.decoded[0]
+                decoder._save_decoded_transaction(write_cursor, transaction, events)
+                raise ValueError('failed to save batch')
+        original_save(batch)
+
+    with (
+        patch.object(decoder, '_save_decoding_batch', side_effect=failing_save),
+        pytest.raises(ValueError),
+    ):
+        decoder.decode_transaction_hashes(ignore_cache=True, tx_hashes=tx_hashes, batch_size=2)
+
+    assert save_calls == 2
+    not_decoded = dbevmtx.get_transaction_hashes_not_decoded(chain_id=ChainID.ETHEREUM, limit=None)
+    assert all(x not in not_decoded for x in tx_hashes[:2])
+    assert all(x in not_decoded for x in tx_hashes[2:])
+
+    with patch.object(decoder, '_save_decoding_batch', wraps=decoder._save_decoding_batch) as save_mock:  # noqa: E501
+        decoder.decode_transaction_hashes(ignore_cache=False, tx_hashes=tx_hashes, batch_size=2)
+
+    assert save_mock.call_count == 2  # only the 3 undecoded transactions are saved
+    not_decoded = dbevmtx.get_transaction_hashes_not_decoded(chain_id=ChainID.ETHEREUM, limit=None)
+    assert all(x not in not_decoded for x in tx_hashes)
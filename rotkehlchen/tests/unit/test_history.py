@@ -1,4 +1,7 @@
+from unittest.mock import MagicMock, patch
+
 import pytest
+from gevent.event import Event
 
 from rotkehlchen.accounting.mixins.event import AccountingEventType
 from rotkehlchen.accounting.pnl import PNL, PnlTotals
@@ -13,7 +16,7 @@ from rotkehlchen.history.types import HistoricalPriceOracle
 from rotkehlchen.tests.utils.accounting import accounting_history_process, check_pnls_and_csv
 from rotkehlchen.tests.utils.history import prices
 from rotkehlchen.tests.utils.messages import no_message_errors
-from rotkehlchen.types import Location
+from rotkehlchen.types import Location, Timestamp
 
 
 @pytest.mark.parametrize(('value', 'result'), [
@@ -92,3 +95,49 @@ def test_pnl_processing_with_eth2_staking_setting(accountant, db_settings):
             AccountingEventType.STAKING: PNL(taxable=FVal('20.55537445038'), free=ZERO),
         })
     check_pnls_and_csv(accountant, expected_pnls, None)
+
+
+def test_history_sources_queried_concurrently(history_querying_manager):
+    """Test that exchanges and chains are queried concurrently, that the failure or the
+    timeout of one source does not affect the rest and that progress reaches the end"""
+    records = []
+    all_started, never_set = Event(), Event()
+
+    def make_exchange(name: str, finished: Event, error: str | None = None) -> MagicMock:
+        def query_history(start_ts, end_ts, fail_callback, new_step_data):  # pylint: disable=unused-argument
+            new_step_data[0](f'Querying {name} trades history')
+            records.append(('start', name))
+            if len(records) == len(exchanges):
+                all_started.set()
+            finished.wait()  # only returns once all the exchanges are being queried
+            records.append(('finish', name))
+            if error is not None:
+                fail_callback(error)
+
+        exchange = MagicMock()
+        exchange.name = name
+        exchange.query_history_with_callbacks.side_effect = query_history
+        return exchange
+
+    exchanges = [
+        make_exchange('binance', all_started),
+        make_exchange('kraken', all_started, error='kraken is down'),
+        make_exchange('coinbase', never_set),
+    ]
+    with (
+        patch.object(history_querying_manager.exchange_manager, 'iterate_exchanges', return_value=exchanges),  # noqa: E501
+        patch.object(history_querying_manager.exchange_manager, 'connected_and_syncing_exchanges_num', return_value=len(exchanges)),  # noqa: E501
+        patch.object(history_querying_manager.chains_aggregator, 'get_chain_manager'),
+    ):
+        error, _ = history_querying_manager.get_history_stream(
+            start_ts=Timestamp(0),
+            end_ts=Timestamp(1700000000),
+            has_premium=False,
+            source_timeout=2,
+        )
+
+    # all the exchanges were started before any of them finished
+    assert sorted(records[:3]) == [('start', 'binance'), ('start', 'coinbase'), ('start', 'kraken')]  # noqa: E501
+    assert sorted(records[3:]) == [('finish', 'binance'), ('finish', 'kraken')]
+    assert error == '\nkraken is down\ncoinbase history query timed out after 2 seconds'
+    assert history_querying_manager.progress == FVal(100)
@@ -4,14 +4,15 @@ from unittest.mock import MagicMock, patch
 
 import pytest
 
-from rotkehlchen.constants.assets import A_BTC, A_USD
-from rotkehlchen.constants.timing import DAY_IN_SECONDS
+from rotkehlchen.constants.assets import A_BAL, A_BTC, A_ETH, A_USD
+from rotkehlchen.constants.timing import DAY_IN_SECONDS, HOUR_IN_SECONDS
 from rotkehlchen.errors.price import NoPriceForGivenTimestamp, PriceQueryUnsupportedAsset
 from rotkehlchen.externalapis.coingecko import Coingecko
 from rotkehlchen.externalapis.cryptocompare import Cryptocompare
 from rotkehlchen.externalapis.defillama import Defillama
 from rotkehlchen.fval import FVal
 from rotkehlchen.globaldb.manual_price_oracles import ManualPriceOracle
+from rotkehlchen.history.prefetch import prefetch_historical_prices
 from rotkehlchen.history.price import PriceHistorian
 from rotkehlchen.history.types import (
     DEFAULT_HISTORICAL_PRICE_ORACLES_ORDER,
@@ -267,3 +268,120 @@ def test_get_historical_prices(globaldb):
         max_seconds_distance=DAY_IN_SECONDS,
     )
     assert [price1, price2, price3, None, price4] == [x.price if x is not None else None for x in result]  # noqa: E501
+
+
+def test_prefetch_historical_prices(globaldb, fake_price_historian):
+    """Test that the prices needed by events are deduplicated per hour, looked up in the
+    DB and queried from the oracles, and that processing still looks up each event's
+    price at its exact timestamp"""
+    price_historian = fake_price_historian
+    globaldb.add_historical_prices([HistoricalPrice(
+        from_asset=A_BTC,
+        to_asset=A_USD,
+        source=HistoricalPriceOracle.COINGECKO,
+        timestamp=Timestamp(1611595000),
+        price=Price(FVal('30000')),
+    )])
+    oracle_instances = price_historian._oracle_instances
+    oracle_instances[1].query_historical_price.side_effect = PriceQueryUnsupportedAsset('ETH')
+    oracle_instances[2].query_historical_price.side_effect = lambda from_asset, to_asset, timestamp: Price(FVal(timestamp - 1611594000))  # noqa: E501
+    events = [MagicMock(**{
+        'get_timestamp.return_value': Timestamp(timestamp),
+        'get_assets.return_value': [asset, A_USD],
+        'get_assets_to_price.return_value': ([asset, A_USD], 1),
+        'should_ignore.return_value': False,
+    }) for timestamp, asset in (
+        (1611595100, A_BTC),
+        (1611595200, A_ETH),
+        (1611595300, A_ETH),  # same hour as the previous one
+        (1611599000, A_ETH),
+    )]
+    stats = prefetch_historical_prices(
+        events=events,
+        accounting=MagicMock(profit_currency=A_USD, ignored_asset_ids=set()),
+        start_ts=Timestamp(0),
+        end_ts=Timestamp(1611600000),
+        calculate_past_cost_basis=True,
+        ignored_ids_mapping={},
+    )
+    assert (stats.lookups, stats.unique, stats.cached, stats.queried, stats.found) == (4, 3, 1, 2, 2)  # noqa: E501
+    assert stats.network_calls_saved == 1
+    assert oracle_instances[2].query_historical_price.call_count == 2
+
+    # the later event of the hour gets the price at its own timestamp
+    assert price_historian.query_historical_price(A_ETH, A_USD, Timestamp(1611595300)) == FVal('1300')  # noqa: E501
+
+
+def test_prefetch_only_prices_that_processing_looks_up(globaldb, fake_price_historian):
+    """Test that only the prices that processing the events looks up are prefetched, so
+    that prefetching and then processing the events makes no more oracle queries than
+    processing them alone"""
+    oracle_instances = fake_price_historian._oracle_instances
+    oracle_instances[1].query_historical_price.side_effect = PriceQueryUnsupportedAsset('ETH')
+    network_queries = []
+
+    def query_price(from_asset, to_asset, timestamp):
+        """Like the oracles, return the price from the DB if it's there or query and save it"""
+        if (entry := globaldb.get_historical_price(from_asset, to_asset, timestamp, HOUR_IN_SECONDS)) is not None:  # noqa: E501
+            return entry.price
+
+        network_queries.append((from_asset, timestamp))
+        globaldb.add_historical_prices([HistoricalPrice(
+            from_asset=from_asset,
+            to_asset=to_asset,
+            source=HistoricalPriceOracle.COINGECKO,
+            timestamp=timestamp,
+            price=Price(FVal('10')),
+        )])
+        return Price(FVal('10'))
+
+    oracle_instances[2].query_historical_price.side_effect = query_price
+    swap_in_event = MagicMock(**{
+        'get_timestamp.return_value': Timestamp(1611605000),
+        'get_assets.return_value': [A_BAL],
+    })
+    events_to_price = [
+        (1611595100, [A_BTC, A_ETH], ([A_BTC], 1)),  # a fee in ETH that is zero
+        (1611595200, [A_ETH], ([], 1)),  # an event that is not taxable
+        (1611599000, [A_GBP], ([], 1)),
+        (1611605000, [A_ETH], ([A_ETH, A_BAL], 2)),  # a swap consuming the next event
+    ]
+    events = [MagicMock(**{
+        'get_timestamp.return_value': Timestamp(timestamp),
+        'get_assets.return_value': assets,
+        'get_assets_to_price.return_value': assets_to_price,
+        'should_ignore.return_value': False,
+    }) for timestamp, assets, assets_to_price in events_to_price]
+    events.append(swap_in_event)
+
+    def get_swap_assets_to_price(accounting, events_iterator):  # pylint: disable=unused-argument
+        next(events_iterator)  # the in event of the swap
+        return [A_ETH, A_BAL], 2
+
+    events[3].get_assets_to_price.side_effect = get_swap_assets_to_price
+
+    def process_events() -> None:
+        for timestamp, _, (assets_to_price, _) in events_to_price:
+            for asset in assets_to_price:
+                fake_price_historian.query_historical_price(asset, A_USD, Timestamp(timestamp))
+
+    process_events()
+    processing_queries = list(network_queries)
+    globaldb.delete_historical_prices(A_BTC, A_USD)
+    globaldb.delete_historical_prices(A_ETH, A_USD)
+    globaldb.delete_historical_prices(A_BAL, A_USD)
+    network_queries.clear()
+
+    stats = prefetch_historical_prices(
+        events=events,
+        accounting=MagicMock(profit_currency=A_USD, ignored_asset_ids=set()),
+        start_ts=Timestamp(0),
+        end_ts=Timestamp(1611610000),
+        calculate_past_cost_basis=True,
+        ignored_ids_mapping={},
+    )
+    swap_in_event.get_assets_to_price.assert_not_called()
+    assert (stats.lookups, stats.unique, stats.queried, stats.found) == (3, 3, 3, 3)
+    assert stats.network_calls_saved == 0
+    process_events()
+    assert sorted(network_queries) == sorted(processing_queries)
@@ -1,8 +1,13 @@
+import gzip
 import json
+import threading
 from datetime import datetime, timezone
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from json.decoder import JSONDecodeError
 from unittest.mock import patch
 
+import gevent
 import pytest
 from eth_typing import HexAddress, HexStr
 from eth_utils import to_checksum_address
@@ -12,9 +17,11 @@ from rotkehlchen.chain.ethereum.utils import generate_address_via_create2
 from rotkehlchen.errors.serialization import ConversionError
 from rotkehlchen.externalapis.github import Github
 from rotkehlchen.fval import FVal
+from rotkehlchen.greenlets.utils import run_with_timeouts
 from rotkehlchen.serialization.deserialize import deserialize_timestamp_from_date
 from rotkehlchen.serialization.serialize import process_result
 from rotkehlchen.tests.utils.mock import MockResponse
+from rotkehlchen.utils.data_structures import SizedLRUCache
 from rotkehlchen.utils.misc import (
     combine_dicts,
     combine_stat_dicts,
@@ -25,6 +32,7 @@ from rotkehlchen.utils.misc import (
     timestamp_to_date,
 )
 from rotkehlchen.utils.mixins.cacheable import CacheableMixIn, cache_response_timewise
+from rotkehlchen.utils.network import HTTP_METRICS, create_session
 from rotkehlchen.utils.serialization import jsonloads_dict, jsonloads_list
 from rotkehlchen.utils.version_check import get_current_version
 
@@ -388,3 +396,126 @@ def test_pairwise():
     a = [1, 2, 3, 4, 5]
     assert [x + y for x, y in pairwise(a)] == [3, 7]
     assert list(pairwise_longest(a)) == [(1, 2), (3, 4), (5, None)]
+
+
+def test_pooled_sessions():
+    """Test that the sessions of the external service clients share their connections,
+    decode compressed responses, leave 429 to the clients and record the metrics of
+    each host"""
+    body = gzip.compress(b'{"result": "ok"}')
+    client_ports = set()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'  # keep the connections alive
+        calls = 0
+
+        def do_GET(self):  # noqa: N802
+            client_ports.add(self.client_address[1])
+            Handler.calls += 1
+            if Handler.calls == 1:
+                self.send_response(429)
+                self.send_header('Retry-After', '0')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+
+            self.send_response(200)
+            self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    HTTP_METRICS.hosts.pop('127.0.0.1', None)
+    try:
+        responses = [  # a new session for each request, as for different clients
+            create_session().get(f'http://127.0.0.1:{server.server_port}/')
+            for _ in range(3)
+        ]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    assert [x.status_code for x in responses] == [429, 200, 200]
+    assert all(x.json() == {'result': 'ok'} for x in responses[1:])
+    assert Handler.calls == 3  # the 429 was not retried
+    assert len(client_ports) == 1  # all requests were made over the same connection
+    metrics = HTTP_METRICS.serialize()['127.0.0.1']
+    assert metrics['requests'] == 3
+    assert metrics['errors'] == 0
+    assert metrics['status_codes'] == {429: 1, 200: 2}
+    assert metrics['bytes_received'] == 2 * len(body)
+
+
+def test_sized_lru_cache():
+    """Test that the sized LRU cache evicts the least recently used entries once the
+    total size of its values goes over its max size"""
+    cache: SizedLRUCache[str, list[int]] = SizedLRUCache(get_size=len, maxsize=10)
+    cache.add('a', [1] * 4)
+    cache.add('b', [1] * 4)
+    assert cache.get('a') is not None  # b is now the least recently used
+    cache.add('c', [1] * 4)
+    assert 'b' not in cache
+    assert 'a' in cache
+    assert 'c' in cache
+    assert cache.total_size == 8
+
+    cache.add('a', [1] * 2)  # replacing an entry replaces its size
+    assert cache.total_size == 6
+    cache.remove('c')
+    assert cache.total_size == 2
+    cache.add('d', [1] * 20)  # an entry bigger than the max size is kept on its own
+    assert list(cache.cache) == ['d']
+    assert cache.total_size == 20
+    cache.clear()
+    assert cache.total_size == 0
+
+
+def test_run_with_timeouts():
+    """Test that the queries run concurrently, that a query that hangs is abandoned after
+    its timeout or the deadline and that unexpected errors are raised after all are done"""
+    records: list[str] = []
+    timeouts: dict[str, float] = {}
+
+    def query(name: str, sleep: float) -> None:
+        records.append(f'start {name}')
+        gevent.sleep(sleep)
+        records.append(f'finish {name}')
+
+    run_with_timeouts(
+        queries={name: partial(query, name, sleep) for name, sleep in (('a', 0.2), ('b', 10), ('c', 0.1))},  # noqa: E501
+        concurrency=3,
+        timeout=1,
+        timeout_cb=timeouts.__setitem__,
+    )
+    assert records == ['start a', 'start b', 'start c', 'finish c', 'finish a']
+    assert timeouts == {'b': 1}
+
+    timeouts.clear()
+    run_with_timeouts(  # only one query runs at a time so the second runs out of deadline
+        queries={name: partial(query, name, 10) for name in ('a', 'b')},
+        concurrency=1,
+        timeout=1,
+        timeout_cb=timeouts.__setitem__,
+        deadline=1.5,
+    )
+    assert timeouts['a'] == 1
+    assert 0 < timeouts['b'] <= 0.5
+
+    def fail() -> None:
+        raise ValueError('boom')
+
+    records.clear()
+    with pytest.raises(ValueError, match='boom'):
+        run_with_timeouts(
+            queries={'fail': fail, 'a': partial(query, 'a', 0)},
+            concurrency=2,
+            timeout=1,
+            timeout_cb=timeouts.__setitem__,
+        )
+    assert records == ['start a', 'finish a']
@@ -343,6 +343,15 @@ def assert_csv_export(
 
                 index += 1
 
+        if (report_id := accountant.pots[0].report_id) is not None:
+            # exporting the events lazily read from the report in the DB gives the same file
+            accountant.csvexporter.export(
+                events=DBAccountingReports(csvexporter.database).iterate_report_events(report_id),
+                pnls=accountant.pots[0].pnls,
+                directory=tmpdir / 'from_db',
+            )
+            assert (tmpdir / 'from_db' / FILENAME_ALL_CSV).read_bytes() == (tmpdir / FILENAME_ALL_CSV).read_bytes()  # noqa: E501
+
         if google_service is not None:
             upload_csv_and_check(
                 service=google_service,
@@ -394,3 +403,20 @@ def toggle_ignore_an_asset(
     with rotki.data.db.conn.read_ctx() as cursor:
         result = rotki.data.db.get_ignored_asset_ids(cursor)
     assert asset_to_ignore.identifier in result
+
+
+def add_accounting_snapshots(database: 'DBHandler', timestamps: Sequence[Timestamp]) -> None:
+    """Add empty accounting snapshots at the given timestamps"""
+    with database.user_write() as write_cursor:
+        write_cursor.executemany(
+            'INSERT INTO accounting_snapshots(timestamp, settings_hash, processed_actions, '
+            'state) VALUES(?, ?, ?, ?)',
+            [(timestamp, 'hash', 0, '{}') for timestamp in timestamps],
+        )
+
+
+def get_accounting_snapshot_timestamps(database: 'DBHandler') -> list[Timestamp]:
+    with database.conn.read_ctx() as cursor:
+        return [x[0] for x in cursor.execute(
+            'SELECT timestamp FROM accounting_snapshots ORDER BY timestamp',
+        )]
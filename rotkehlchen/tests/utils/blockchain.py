@@ -625,7 +625,7 @@ def setup_evm_addresses_activity_mock(
 ) -> 'ExitStack':
     saved_locals = locals()  # bit hacky, but save locals here so they can be accessed by mock_chain_has_activity  # noqa: E501
 
-    def mock_ethereum_get_code(account):
+    def mock_ethereum_get_code(account: ChecksumEvmAddress) -> str:
         if account in eth_contract_addresses:
             return '0xsomecode'
         return '0x'
@@ -649,6 +649,11 @@ def setup_evm_addresses_activity_mock(
         'get_code',
         side_effect=mock_ethereum_get_code,
     ))
+    stack.enter_context(patch.object(
+        chains_aggregator.ethereum.node_inquirer,
+        'get_codes',
+        side_effect=lambda accounts: [mock_ethereum_get_code(x) for x in accounts],
+    ))
     stack.enter_context(patch.object(
         chains_aggregator.avalanche.w3.eth,
         'get_transaction_count',
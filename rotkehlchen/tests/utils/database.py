@@ -162,6 +162,15 @@ def mock_dbhandler_sync_globaldb_assets() -> _patch:
     )
 
 
+def mock_dbhandler_sync_tracking() -> _patch:
+    """Make sure the premium sync tracking that needs tables of newer versions is not
+    started for older DB tests"""
+    return patch(
+        'rotkehlchen.db.dbhandler.DBSyncChanges.maybe_track_changes',
+        lambda x: None,
+    )
+
+
 def mock_db_schema_sanity_check() -> _patch:
     return patch(
         'rotkehlchen.db.drivers.gevent.DBConnection.schema_sanity_check',
@@ -1,5 +1,6 @@
 import json
 import re
+from collections.abc import Iterator
 from pathlib import Path
 from typing import Any, NamedTuple
 from unittest.mock import patch
@@ -34,6 +35,10 @@ class MockResponse:
     def json(self) -> dict[str, Any]:
         return json.loads(self.text)
 
+    def iter_content(self, chunk_size: int) -> Iterator[bytes]:
+        for idx in range(0, len(self.content), chunk_size):
+            yield self.content[idx:idx + chunk_size]
+
 
 class MockEth:
 
@@ -1,8 +1,11 @@
+import json
 import os
 from http import HTTPStatus
-from typing import Literal
+from typing import Any, Literal
 from unittest.mock import patch
 
+import requests
+
 from rotkehlchen.constants import ROTKEHLCHEN_SERVER_TIMEOUT
 from rotkehlchen.constants.misc import USERDB_NAME, USERSDIR_NAME
 from rotkehlchen.premium.premium import Premium, PremiumCredentials
@@ -39,7 +42,7 @@ def mock_query_last_metadata(last_modify_ts, data_hash, data_size):
 
 
 def mock_get_backup(saved_data: bytes | None):
-    def do_mock_get_backup(url, timeout, params, data=None):  # pylint: disable=unused-argument
+    def do_mock_get_backup(url, timeout, params, data=None, stream=False):  # pylint: disable=unused-argument
         if data is not None:
             assert len(data) == 1
             assert 'nonce' in data
@@ -86,6 +89,59 @@ def create_patched_requests_get_for_premium(
     return patch.object(session, 'get', side_effect=mocked_get)
 
 
+class DeltasPremiumServer:
+    """Stand-in for a premium server that keeps the uploaded DB data along with the
+    deltas uploaded on top of it"""
+
+    def __init__(self) -> None:
+        self.data: bytes | None = None
+        self.deltas: list[bytes] = []
+        self.data_hash = ''
+        self.last_modify_ts = 0
+
+    def get(self, url, params=None, data=None, timeout=None, stream=False):  # pylint: disable=unused-argument
+        if 'last_data_metadata' in url:
+            return MockResponse(HTTPStatus.OK, json.dumps({
+                'upload_ts': 1337,
+                'last_modify_ts': self.last_modify_ts,
+                'data_hash': self.data_hash,
+                'data_size': len(self.data or b''),
+                'deltas': len(self.deltas),
+            }))
+
+        if url.endswith('backup/delta'):
+            index = params['index']
+            content = self.deltas[index - 1] if 0 < index <= len(self.deltas) else None
+        elif url.endswith('backup'):
+            content = self.data
+        else:
+            raise ValueError('Unmocked url in session get for premium')
+
+        if content is None:
+            return MockResponse(HTTPStatus.NOT_FOUND, text='')
+        return MockResponse(HTTPStatus.OK, text='', content=content)
+
+    def post(self, url, data, headers, timeout):  # pylint: disable=unused-argument
+        content = data.file_path.read_bytes()
+        assert len(content) == data.fields['length']
+        if url.endswith('backup/delta'):
+            if data.fields['parent_hash'] != self.data_hash:
+                return MockResponse(HTTPStatus.CONFLICT, '{"error": "Data changed"}')
+            self.deltas.append(content)
+        else:
+            self.data, self.deltas = content, []
+
+        self.data_hash = data.fields['original_hash']
+        self.last_modify_ts = data.fields['last_modify_ts']
+        return MockResponse(HTTPStatus.OK, '{"success": true}')
+
+    def patch_session(self, session: requests.Session) -> tuple[Any, Any]:
+        return (
+            patch.object(session, 'get', side_effect=self.get),
+            patch.object(session, 'post', side_effect=self.post),
+        )
+
+
 def create_patched_premium(
         premium_credentials: PremiumCredentials,
         username: str,
@@ -155,12 +211,8 @@ def setup_starting_environment(
         our_last_write_ts = rotkehlchen_instance.data.db.get_setting(cursor, name='last_write_ts')
         assert rotkehlchen_instance.data.db.get_setting(cursor, name='main_currency') == DEFAULT_TESTS_MAIN_CURRENCY  # noqa: E501
 
-    _, our_hash = rotkehlchen_instance.data.compress_and_encrypt_db()
-
-    if same_hash_with_remote:
-        remote_hash = our_hash
-    else:
-        remote_hash = get_different_hash(our_hash)
+    with rotkehlchen_instance.data.compress_and_encrypt_db() as (_, our_hash):
+        remote_hash = our_hash if same_hash_with_remote else get_different_hash(our_hash)
 
     if newer_remote_db:
         metadata_last_modify_ts = our_last_write_ts + 10
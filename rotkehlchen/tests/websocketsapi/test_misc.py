@@ -1,8 +1,23 @@
+import json
 import platform
+from unittest.mock import patch
 
 import gevent
 import pytest
 
+from rotkehlchen.api.websockets.notifier import WS_SEND_WINDOW, RotkiNotifier
+from rotkehlchen.api.websockets.typedefs import WSMessageType
+
+
+class FakeWebsocket:
+
+    def __init__(self) -> None:
+        self.closed = False
+        self.messages: list[dict] = []
+
+    def send(self, message: str) -> None:
+        self.messages.append(json.loads(message))
+
 
 def _send_stuff(msg_aggregator, websocket_connection, string_len):
     for _ in range(10):
@@ -36,3 +51,48 @@ def test_websockets_concurrent_use(rotkehlchen_api_server, websocket_connection)
             isinstance(x.exception, gevent.exceptions.ConcurrentObjectUseError) is False
             for x in [g1, g2] + rotki.greenlet_manager.greenlets
         ), 'At least one ConcurrentObjectUseError exception happened'
+
+
+def test_websockets_progress_coalescing_and_drops():
+    """Test that only the latest queued progress update of a task is sent, that the first
+    and last messages of a task are always sent, and that the oldest messages are dropped
+    when the queue of a websocket is full"""
+    notifier, websocket = RotkiNotifier(), FakeWebsocket()
+    notifier.subscribe(websocket)
+    for processed in range(4):
+        notifier.broadcast(
+            message_type=WSMessageType.EVM_UNDECODED_TRANSACTIONS,
+            to_send_data={'evm_chain': 'ethereum', 'total': 3, 'processed': processed},
+        )
+    notifier.broadcast(message_type=WSMessageType.REFRESH_BALANCES, to_send_data={'type': 'x'})
+    gevent.sleep(WS_SEND_WINDOW * 2)
+    assert [x['data'].get('processed') for x in websocket.messages] == [0, 2, 3, None]
+    assert notifier.get_stats() == [{'queued': 0, 'max_queued': 4, 'coalesced': 1, 'dropped': 0}]
+
+    websocket.messages, failed = [], []
+
+    def fail(idx):
+        failed.append(idx)
+
+    with patch('rotkehlchen.api.websockets.notifier.MAX_QUEUED_MESSAGES', new=3):
+        for idx in range(5):
+            notifier.broadcast(
+                message_type=WSMessageType.LEGACY,
+                to_send_data={'verbosity': 'error', 'value': str(idx)},
+                failure_callback=fail,
+                failure_callback_args={'idx': idx},
+            )
+    gevent.sleep(WS_SEND_WINDOW * 2)
+    assert [x['data']['value'] for x in websocket.messages] == ['2', '3', '4']
+    assert failed == [0, 1]
+    assert notifier.get_stats()[0]['dropped'] == 2
+
+    websocket.closed = True  # closed websockets are unsubscribed and the message fails
+    notifier.broadcast(
+        message_type=WSMessageType.LEGACY,
+        to_send_data={'verbosity': 'error', 'value': 'closed'},
+        failure_callback=fail,
+        failure_callback_args={'idx': 'closed'},
+    )
+    assert failed == [0, 1, 'closed']
+    assert notifier.get_stats() == []
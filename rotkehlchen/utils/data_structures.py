@@ -65,6 +65,38 @@ class LRUCacheLowerKey(LRUCacheWithRemove[str, VT]):
         super().remove(key.lower())
 
 
+class SizedLRUCache(LRUCacheWithRemove[KT, VT]):
+    """LRU cache bounded by the total size of its values instead of their number. The
+    size of a value is given by `get_size`. The entry that is added is always kept, even
+    if it alone is bigger than maxsize."""
+
+    def __init__(self, get_size: Callable[[VT], int], maxsize: int):
+        super().__init__(maxsize)
+        self.get_size = get_size
+        self.sizes: dict[KT, int] = {}
+        self.total_size = 0
+
+    def add(self, key: KT, value: VT) -> None:
+        self.remove(key)
+        self.cache[key] = value
+        self.sizes[key] = self.get_size(value)
+        self.total_size += self.sizes[key]
+        while self.total_size > self.maxsize and len(self.cache) > 1:
+            evicted_key, _ = self.cache.popitem(last=False)
+            self.total_size -= self.sizes.pop(evicted_key)
+
+    def remove(self, key: KT) -> None:
+        if key in self.cache:
+            self.cache.pop(key)
+            self.total_size -= self.sizes.pop(key)
+
+    def clear(self) -> None:
+        """Delete all entries in the cache"""
+        self.cache.clear()
+        self.sizes.clear()
+        self.total_size = 0
+
+
 class LRUSetCache(Generic[VT]):
     """
     LRU cache that works like a set.
@@ -1,20 +1,142 @@
 import json
 import logging
+from collections import defaultdict
 from collections.abc import Callable
+from dataclasses import dataclass, field
 from http import HTTPStatus
 from typing import Any, Literal, overload
+from urllib.parse import urlparse
 
 import gevent
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 from rotkehlchen.constants import GLOBAL_REQUESTS_TIMEOUT
 from rotkehlchen.db.settings import CachedSettings
 from rotkehlchen.errors.misc import RemoteError, UnableToDecryptRemoteData
 from rotkehlchen.logging import RotkehlchenLogsAdapter
+from rotkehlchen.utils.misc import set_user_agent
 
 logger = logging.getLogger(__name__)
 log = RotkehlchenLogsAdapter(logger)
 
+# Number of hosts whose connections are kept open by the shared connection pools
+HTTP_POOL_HOSTS = 64
+# Number of connections kept open per host
+HTTP_POOL_MAXSIZE = 16
+# Retries of idempotent requests that failed to connect
+HTTP_RETRIES = 2
+HTTP_RETRY_BACKOFF_FACTOR = 0.5
+
+
+@dataclass(init=True, repr=False, eq=False, order=False, unsafe_hash=False, frozen=False)
+class HostMetrics:
+    requests_num: int = 0
+    errors_num: int = 0  # requests that got no response
+    bytes_received: int = 0  # as sent over the wire, before decompression
+    total_latency: float = 0.0
+    status_codes: dict[int, int] = field(default_factory=lambda: defaultdict(int))
+
+    def serialize(self) -> dict[str, Any]:
+        responses_num = self.requests_num - self.errors_num
+        return {
+            'requests': self.requests_num,
+            'errors': self.errors_num,
+            'bytes_received': self.bytes_received,
+            'average_latency': self.total_latency / responses_num if responses_num != 0 else None,
+            'status_codes': dict(self.status_codes),
+        }
+
+
+class HttpMetrics:
+    """Latency, size and status code metrics of the requests of the sessions created by
+    create_session, per host"""
+
+    def __init__(self) -> None:
+        self.hosts: dict[str, HostMetrics] = defaultdict(HostMetrics)
+
+    def record_response(self, host: str, latency: float, size: int, status_code: int) -> None:
+        metrics = self.hosts[host]
+        metrics.requests_num += 1
+        metrics.total_latency += latency
+        metrics.bytes_received += size
+        metrics.status_codes[status_code] += 1
+
+    def record_error(self, host: str) -> None:
+        metrics = self.hosts[host]
+        metrics.requests_num += 1
+        metrics.errors_num += 1
+
+    def serialize(self) -> dict[str, dict[str, Any]]:
+        return {host: metrics.serialize() for host, metrics in self.hosts.items()}
+
+
+HTTP_METRICS = HttpMetrics()
+
+
+class PooledSession(requests.Session):
+    """A session that uses the shared connection pools, uses the user's timeout setting
+    for requests without a timeout and records the metrics of its requests
+
+    The compressed responses are decoded as requests accepts gzip and deflate by default,
+    along with brotli if it is installed.
+    """
+
+    def request(self, method: str | bytes, url: str | bytes, *args: Any, **kwargs: Any) -> requests.Response:  # noqa: E501
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = CachedSettings().get_timeout_tuple()
+        return super().request(method, url, *args, **kwargs)
+
+    def send(self, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+        host = urlparse(str(request.url)).hostname or ''
+        try:
+            response = super().send(request, **kwargs)
+        except requests.exceptions.RequestException:
+            HTTP_METRICS.record_error(host)
+            raise
+
+        try:  # bytes read over the wire. The body is not read yet for streamed responses
+            size = response.raw.tell()
+        except AttributeError:
+            size = int(response.headers.get('Content-Length', 0))
+        HTTP_METRICS.record_response(
+            host=host,
+            latency=response.elapsed.total_seconds(),
+            size=size,
+            status_code=response.status_code,
+        )
+        return response
+
+
+def _create_adapter() -> HTTPAdapter:
+    return HTTPAdapter(
+        pool_connections=HTTP_POOL_HOSTS,
+        pool_maxsize=HTTP_POOL_MAXSIZE,
+        max_retries=Retry(
+            total=HTTP_RETRIES,
+            read=0,  # a read error may mean that the request was processed
+            backoff_factor=HTTP_RETRY_BACKOFF_FACTOR,
+            # rate limited responses are returned since each client handles them its own way
+            respect_retry_after_header=False,
+            raise_on_status=False,
+        ),
+    )
+
+
+# Shared by all sessions so that connections to the same host are reused across clients
+SHARED_HTTP_ADAPTER = _create_adapter()
+
+
+def create_session() -> PooledSession:
+    """Creates the session that clients of external services should make their requests
+    with. Its connections are kept alive in pools shared by all the sessions."""
+    session = PooledSession()
+    session.mount('https://', SHARED_HTTP_ADAPTER)
+    session.mount('http://', SHARED_HTTP_ADAPTER)
+    set_user_agent(session)
+    return session
+
 
 def request_get(
         url: str,
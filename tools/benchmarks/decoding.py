@@ -0,0 +1,81 @@
+"""Benchmark of the ethereum transaction decoding throughput on a recorded corpus.
+
+The corpus is the ethereum transactions and receipts already saved in the DB of an
+existing user. The user's data is copied to a temporary directory since decoding
+rewrites the events. No remote queries are needed as long as the receipts and the
+tokens of the transactions are already in the DBs.
+
+    python -m tools.benchmarks.decoding --data-dir ~/.local/share/rotki/data --username user --password pass --limit 2000
+
+The transactions are decoded with the event rules dispatched by log topic, as the
+decoder does, and with every rule tried for every log, as it did before rules
+declared their topics. The best of a number of alternating rounds is reported.
+"""  # noqa: E501
+import argparse
+import shutil
+import tempfile
+from pathlib import Path
+
+from rotkehlchen.chain.ethereum.decoding.decoder import EthereumTransactionDecoder
+from rotkehlchen.chain.ethereum.node_inquirer import EthereumInquirer
+from rotkehlchen.chain.ethereum.transactions import EthereumTransactions
+from rotkehlchen.chain.evm.contracts import EvmContracts
+from rotkehlchen.greenlets.manager import GreenletManager
+from rotkehlchen.types import ChainID, EVMTxHash
+
+from .utils import Timer, open_benchmark_db
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='EVM transaction decoding benchmark')
+    parser.add_argument('--data-dir', type=Path, required=True, help='The rotki data directory')
+    parser.add_argument('--username', required=True)
+    parser.add_argument('--password', required=True)
+    parser.add_argument('--limit', type=int, default=1000, help='Max transactions to decode')
+    parser.add_argument('--rounds', type=int, default=5, help='Timed decodes of each dispatch')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        data_dir = Path(tmpdir)
+        shutil.copytree(args.data_dir / 'global', data_dir / 'global')
+        shutil.copytree(args.data_dir / args.username, data_dir / args.username)
+        db = open_benchmark_db(data_dir=data_dir, username=args.username, password=args.password)
+        EvmContracts.initialize_common_abis()
+        ethereum_inquirer = EthereumInquirer(
+            greenlet_manager=GreenletManager(msg_aggregator=db.msg_aggregator),
+            database=db,
+        )
+        decoder = EthereumTransactionDecoder(
+            database=db,
+            ethereum_inquirer=ethereum_inquirer,
+            transactions=EthereumTransactions(ethereum_inquirer=ethereum_inquirer, database=db),
+        )
+        with db.conn.read_ctx() as cursor:
+            tx_hashes = [EVMTxHash(x[0]) for x in cursor.execute(
+                'SELECT tx_hash FROM evm_transactions WHERE chain_id=? AND identifier IN '
+                '(SELECT tx_id FROM evmtx_receipts) LIMIT ?',
+                (ChainID.ETHEREUM.serialize_for_db(), args.limit),
+            )]
+
+        indexed_rules = (decoder.event_rules_by_topic, decoder.catch_all_event_rules)
+        all_rules: tuple[dict, list] = ({}, list(decoder.rules.event_rules))
+        # an untimed pass so that both dispatches run with the same caches loaded
+        decoder.decode_transaction_hashes(ignore_cache=True, tx_hashes=tx_hashes)
+        timings: dict[str, list[float]] = {'all rules': [], 'by topic': []}
+        for _ in range(args.rounds):  # alternate the dispatches so that both see the same noise
+            for dispatch, rules in (('all rules', all_rules), ('by topic', indexed_rules)):
+                decoder.event_rules_by_topic, decoder.catch_all_event_rules = rules
+                timer = Timer()
+                with timer.measure():
+                    decoder.decode_transaction_hashes(ignore_cache=True, tx_hashes=tx_hashes)
+                timings[dispatch].append(timer.elapsed)
+
+        print(f'{"dispatch":>10} {"txs":>6} {"best s":>9} {"tx/s":>8}')
+        for dispatch, elapsed in timings.items():
+            print(f'{dispatch:>10} {len(tx_hashes):>6} {min(elapsed):>9.3f} {len(tx_hashes) / min(elapsed):>8.1f}')  # noqa: E501
+
+        db.logout()
+
+
+if __name__ == '__main__':
+    main()
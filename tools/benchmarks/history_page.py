@@ -0,0 +1,178 @@
+"""Benchmark of the history page queries on a big DB.
+
+Populates a user DB with history events spread over locations, assets, types and
+counterparties and times the grouped events query of the history page for a few of
+its filters. Each filter is timed with the secondary indexes of the history events
+tables and again after dropping them, to see what they save.
+
+    python -m tools.benchmarks.history_page --events 2000000
+"""
+import argparse
+import os
+import random
+import tempfile
+from pathlib import Path
+
+from rotkehlchen.accounting.constants import EVENT_CATEGORY_MAPPINGS
+from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.constants.misc import USERDB_NAME
+from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.db.filtering import (
+    EvmEventFilterQuery,
+    HistoryBaseEntryFilterQuery,
+    HistoryEventFilterQuery,
+)
+from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.history.events.structures.base import HistoryBaseEntryType
+from rotkehlchen.history.events.structures.types import HistoryEventType
+from rotkehlchen.types import Location, Timestamp
+
+from .utils import Timer, open_benchmark_db
+
+INSERT_BATCH = 50000
+EVENTS_PER_GROUP = 3
+START_TS_MS = 1500000000000
+GROUP_INTERVAL_MS = 60000
+ASSETS = [A_ETH.identifier] + [f'eip155:1/erc20:0x{idx:040x}' for idx in range(1, 500)]
+LABELS = [f'0x{idx:040x}' for idx in range(1, 21)]
+COUNTERPARTIES = [f'protocol-{idx}' for idx in range(30)]
+EVM_LOCATIONS = [Location.ETHEREUM, Location.OPTIMISM, Location.POLYGON_POS, Location.ARBITRUM_ONE]
+EXCHANGE_LOCATIONS = [Location.KRAKEN, Location.BINANCE, Location.COINBASE]
+EVENT_TYPE_PAIRS = [
+    (event_type, event_subtype)
+    for event_type, subtypes in EVENT_CATEGORY_MAPPINGS.items() for event_subtype in subtypes
+]
+
+
+def populate(db: DBHandler, events_num: int) -> None:
+    """Add events_num history events in groups of EVENTS_PER_GROUP. Three out of four
+    groups are EVM transactions and the rest exchange events."""
+    rng = random.Random(42)
+    with db.user_write() as write_cursor:
+        write_cursor.executemany(
+            'INSERT OR IGNORE INTO assets(identifier) VALUES(?)', [(x,) for x in ASSETS],
+        )
+
+    tx_hash, location, label = b'', Location.KRAKEN, None
+    for batch_start in range(0, events_num, INSERT_BATCH):
+        events, evm_infos = [], []
+        for idx in range(batch_start, min(batch_start + INSERT_BATCH, events_num)):
+            group, sequence_index = divmod(idx, EVENTS_PER_GROUP)
+            is_evm = group % 4 != 0
+            if sequence_index == 0:
+                tx_hash = rng.randbytes(32)
+                location = rng.choice(EVM_LOCATIONS if is_evm else EXCHANGE_LOCATIONS)
+                label = rng.choice(LABELS) if is_evm else None
+
+            events.append((
+                idx + 1,
+                (HistoryBaseEntryType.EVM_EVENT if is_evm else HistoryBaseEntryType.HISTORY_EVENT).serialize_for_db(),  # noqa: E501
+                f'0x{tx_hash.hex()}' if is_evm else f'exchange{group}',
+                sequence_index,
+                START_TS_MS + group * GROUP_INTERVAL_MS,
+                location.serialize_for_db(),
+                label,
+                ASSETS[0] if rng.random() < 0.2 else rng.choice(ASSETS),
+                '1',
+                '0',
+                *(x.serialize() for x in rng.choice(EVENT_TYPE_PAIRS)),
+            ))
+            if is_evm:
+                evm_infos.append((
+                    idx + 1,
+                    tx_hash,
+                    rng.choice(COUNTERPARTIES) if rng.random() < 0.5 else None,
+                ))
+
+        with db.user_write() as write_cursor:
+            write_cursor.executemany(
+                'INSERT INTO history_events(identifier, entry_type, event_identifier, '
+                'sequence_index, timestamp, location, location_label, asset, amount, '
+                'usd_value, type, subtype) VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                events,
+            )
+            write_cursor.executemany(
+                'INSERT INTO evm_events_info(identifier, tx_hash, counterparty) VALUES(?, ?, ?)',
+                evm_infos,
+            )
+
+
+def make_filter_queries(db: DBHandler) -> dict[str, HistoryBaseEntryFilterQuery]:
+    """The history page filters to time, with values taken from the populated DB"""
+    with db.conn.read_ctx() as cursor:
+        event_identifier, tx_hash = cursor.execute(
+            'SELECT event_identifier, tx_hash FROM history_events INNER JOIN evm_events_info '
+            'ON history_events.identifier=evm_events_info.identifier LIMIT 1',
+        ).fetchone()
+        max_ts = cursor.execute('SELECT MAX(timestamp) FROM history_events').fetchone()[0]
+
+    month_start = Timestamp(max_ts // 1000 // 2)
+    return {
+        'all events': HistoryEventFilterQuery.make(limit=10, offset=0),
+        'location': HistoryEventFilterQuery.make(limit=10, offset=0, location=Location.KRAKEN),
+        'account': HistoryEventFilterQuery.make(limit=10, offset=0, location_labels=[LABELS[0]]),
+        'asset': HistoryEventFilterQuery.make(limit=10, offset=0, assets=(A_ETH,)),
+        'event type': HistoryEventFilterQuery.make(limit=10, offset=0, event_types=[HistoryEventType.TRADE]),  # noqa: E501
+        'time range': HistoryEventFilterQuery.make(limit=10, offset=0, from_ts=month_start, to_ts=Timestamp(month_start + 30 * 86400)),  # noqa: E501
+        'event group': HistoryEventFilterQuery.make(event_identifiers=[event_identifier]),
+        'transaction': EvmEventFilterQuery.make(tx_hashes=[tx_hash]),
+        'counterparty': EvmEventFilterQuery.make(limit=10, offset=0, counterparties=[COUNTERPARTIES[0]]),  # noqa: E501
+    }
+
+
+def time_filter_queries(db: DBHandler, repeats: int) -> dict[str, float]:
+    """Best time in seconds of the grouped events query of the history page and its
+    counts for each of the filters"""
+    dbevents = DBHistoryEvents(db)
+    results = {}
+    for name, filter_query in make_filter_queries(db).items():
+        best = float('inf')
+        for _ in range(repeats):
+            timer = Timer()
+            with timer.measure(), db.conn.read_ctx() as cursor:
+                dbevents.get_history_events_and_limit_info(
+                    cursor=cursor,
+                    filter_query=filter_query,
+                    has_premium=True,
+                    group_by_event_ids=True,
+                )
+            best = min(best, timer.elapsed)
+        results[name] = best
+
+    return results
+
+
+def drop_indexes(db: DBHandler) -> None:
+    with db.conn.write_ctx() as write_cursor:
+        indexes = write_cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type='index' AND name LIKE 'idx\\_%' ESCAPE '\\'",  # noqa: E501
+        ).fetchall()
+        for (name,) in indexes:
+            write_cursor.execute(f'DROP INDEX {name}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='History page queries benchmark')
+    parser.add_argument('--events', type=int, default=200000)
+    parser.add_argument('--repeats', type=int, default=3)
+    args = parser.parse_args()
+    with tempfile.TemporaryDirectory() as tmpdir:
+        db = open_benchmark_db(Path(tmpdir))
+        timer = Timer()
+        with timer.measure():
+            populate(db=db, events_num=args.events)
+        size_mb = os.path.getsize(db.user_data_dir / USERDB_NAME) / 1024 / 1024
+        print(f'Populated {args.events} events in {timer.elapsed:.1f} seconds, DB size: {size_mb:.0f} MB')  # noqa: E501
+
+        with_indexes = time_filter_queries(db=db, repeats=args.repeats)
+        drop_indexes(db)
+        without_indexes = time_filter_queries(db=db, repeats=args.repeats)
+        db.logout()
+
+    print(f'{"filter":>14} {"indexes (ms)":>13} {"no indexes (ms)":>16}')
+    for name, seconds in with_indexes.items():
+        print(f'{name:>14} {seconds * 1000:>13.1f} {without_indexes[name] * 1000:>16.1f}')
+
+
+if __name__ == '__main__':
+    main()
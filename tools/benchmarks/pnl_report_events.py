@@ -0,0 +1,100 @@
+"""Benchmark of writing the processed events of a PnL report to the DB.
+
+Compares writing each event in its own transaction while keeping all of them in
+memory, as the accounting pot used to do, with the batched PnlEventsWriter that
+keeps none of them in memory. Each measurement runs in its own process so that
+peak RSS of one run does not affect the others.
+
+    python -m tools.benchmarks.pnl_report_events --events 10000 100000 400000
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from rotkehlchen.accounting.mixins.event import AccountingEventType
+from rotkehlchen.accounting.pnl import PNL
+from rotkehlchen.accounting.structures.processed_event import ProcessedAccountingEvent
+from rotkehlchen.constants import ONE, ZERO
+from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.db.reports import DBAccountingReports, PnlEventsWriter
+from rotkehlchen.db.settings import DBSettings
+from rotkehlchen.fval import FVal
+from rotkehlchen.types import Location, Price, Timestamp
+
+from .utils import Timer, open_benchmark_db, peak_rss_mb
+
+
+def make_event(idx: int) -> ProcessedAccountingEvent:
+    return ProcessedAccountingEvent(
+        type=AccountingEventType.TRADE,
+        notes=f'Benchmark event {idx}',
+        location=Location.KRAKEN,
+        timestamp=Timestamp(1600000000 + idx),
+        asset=A_ETH,
+        free_amount=FVal(idx),
+        taxable_amount=ZERO,
+        price=Price(ONE),
+        pnl=PNL(),
+        cost_basis=None,
+        index=idx,
+    )
+
+
+def run_single(data_dir: Path, mode: str, events_num: int) -> None:
+    """Processes and writes the events and prints: seconds, peak RSS in MB"""
+    db = open_benchmark_db(data_dir)
+    report_id = DBAccountingReports(db).add_report(
+        first_processed_timestamp=Timestamp(0),
+        start_ts=Timestamp(0),
+        end_ts=Timestamp(2 ** 31 - 1),
+        settings=DBSettings(),
+    )
+    timer = Timer()
+    with timer.measure():
+        if mode == 'per-event':
+            processed_events = []
+            for idx in range(events_num):
+                event = make_event(idx)
+                processed_events.append(event)
+                with db.transient_write() as cursor:
+                    cursor.execute(
+                        'INSERT INTO pnl_events(report_id, timestamp, data) VALUES(?, ?, ?)',
+                        (report_id, event.timestamp, event.serialize_for_db(str)),
+                    )
+        else:
+            writer = PnlEventsWriter(database=db, report_id=report_id, ts_converter=str)
+            for idx in range(events_num):
+                writer.add(make_event(idx))
+            writer.flush()
+
+    print(f'{timer.elapsed:.2f} {peak_rss_mb():.1f}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='PnL report events writing benchmark')
+    parser.add_argument('--events', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--run-single', choices=['per-event', 'batched'], help=argparse.SUPPRESS)
+    parser.add_argument('--data-dir', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run_single is not None:
+        run_single(data_dir=args.data_dir, mode=args.run_single, events_num=args.events[0])
+        return
+
+    print(f'{"events":>10} {"mode":>10} {"seconds":>9} {"peak RSS (MB)":>14}')
+    for events_num in args.events:
+        for mode in ('per-event', 'batched'):
+            with tempfile.TemporaryDirectory() as tmpdir:
+                result = subprocess.run(
+                    [sys.executable, '-m', 'tools.benchmarks.pnl_report_events', '--run-single', mode, '--data-dir', tmpdir, '--events', str(events_num)],  # noqa: E501, S603  # only our own script is called
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                seconds, rss = result.stdout.split()[-2:]
+                print(f'{events_num:>10} {mode:>10} {seconds:>9} {rss:>14}')
+
+
+if __name__ == '__main__':
+    main()
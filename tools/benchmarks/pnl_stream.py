@@ -0,0 +1,89 @@
+"""Benchmark of the peak memory needed to feed accounting with the history events.
+
+Compares materializing the entire history in a list, as get_history does, with
+lazily iterating the HistoryEventsStream used by PnL reports. Each measurement
+runs in its own process so that peak RSS of one run does not affect the others.
+
+    python -m tools.benchmarks.pnl_stream --events 10000 100000 1000000
+"""
+import argparse
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from rotkehlchen.accounting.structures.balance import Balance
+from rotkehlchen.constants import ONE
+from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.db.history_events import DBHistoryEvents
+from rotkehlchen.history.events.structures.base import HistoryEvent
+from rotkehlchen.history.events.structures.types import HistoryEventSubType, HistoryEventType
+from rotkehlchen.history.manager import HistoryEventsStream
+from rotkehlchen.types import Location, Timestamp, TimestampMS
+
+from .utils import Timer, open_benchmark_db, peak_rss_mb
+
+INSERT_BATCH = 10000
+END_TS = Timestamp(2 ** 31 - 1)
+
+
+def populate(data_dir: Path, events_num: int) -> None:
+    db = open_benchmark_db(data_dir)
+    dbevents = DBHistoryEvents(db)
+    for batch_start in range(0, events_num, INSERT_BATCH):
+        with db.user_write() as write_cursor:
+            dbevents.add_history_events(write_cursor, history=[HistoryEvent(
+                event_identifier=f'bench{idx}',
+                sequence_index=idx % 3,
+                timestamp=TimestampMS(1600000000000 + idx * 1000),
+                location=Location.KRAKEN,
+                event_type=HistoryEventType.RECEIVE,
+                event_subtype=HistoryEventSubType.NONE,
+                asset=A_ETH,
+                balance=Balance(amount=ONE),
+            ) for idx in range(batch_start, min(batch_start + INSERT_BATCH, events_num))])
+    db.logout()
+
+
+def run_single(data_dir: Path, mode: str) -> None:
+    """Consumes all events and prints: consumed events, seconds, peak RSS in MB"""
+    db = open_benchmark_db(data_dir)
+    stream = HistoryEventsStream(db=db, end_ts=END_TS, eth2_events=[])
+    timer, consumed = Timer(), 0
+    with timer.measure():
+        if mode == 'list':
+            consumed = len(list(stream))
+        else:
+            for _ in stream:
+                consumed += 1
+
+    print(f'{consumed} {timer.elapsed:.2f} {peak_rss_mb():.1f}')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='PnL events streaming memory benchmark')
+    parser.add_argument('--events', type=int, nargs='+', default=[10000, 100000])
+    parser.add_argument('--run-single', choices=['list', 'stream'], help=argparse.SUPPRESS)
+    parser.add_argument('--data-dir', type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.run_single is not None:
+        run_single(data_dir=args.data_dir, mode=args.run_single)
+        return
+
+    print(f'{"events":>10} {"mode":>8} {"seconds":>9} {"peak RSS (MB)":>14}')
+    for events_num in args.events:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            populate(data_dir=Path(tmpdir), events_num=events_num)
+            for mode in ('list', 'stream'):
+                result = subprocess.run(
+                    [sys.executable, '-m', 'tools.benchmarks.pnl_stream', '--run-single', mode, '--data-dir', tmpdir],  # noqa: E501, S603  # only our own script is called
+                    capture_output=True,
+                    text=True,
+                    check=True,
+                )
+                _, seconds, rss = result.stdout.split()[-3:]
+                print(f'{events_num:>10} {mode:>8} {seconds:>9} {rss:>14}')
+
+
+if __name__ == '__main__':
+    main()
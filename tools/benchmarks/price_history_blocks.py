@@ -0,0 +1,122 @@
+"""Benchmark of the storage of the cryptocompare hourly prices.
+
+Stores the same hourly price series of a number of asset pairs once as price_history rows,
+as they used to be stored, and once in the blocks of price_history_blocks. Reports the
+bytes per price of each table with its indexes, and the time to store the prices, to load
+the price series of all the pairs in memory and to read a range of each series.
+
+    python -m tools.benchmarks.price_history_blocks --pairs 20 --years 8
+"""
+import argparse
+import random
+import tempfile
+from pathlib import Path
+
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.constants.assets import A_USD
+from rotkehlchen.constants.misc import DEFAULT_SQL_VM_INSTRUCTIONS_CB
+from rotkehlchen.fval import FVal
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.history.types import HistoricalPrice, HistoricalPriceOracle
+from rotkehlchen.types import Price, Timestamp
+
+from .utils import Timer
+
+START_TS = 1500000000
+HOUR = 3600
+
+
+def make_series(rng: random.Random, prices_num: int) -> list[tuple[Timestamp, Price]]:
+    """A random walk of hourly prices with the decimals cryptocompare returns"""
+    price, series = rng.uniform(0.01, 50000), []
+    for idx in range(prices_num):
+        price *= rng.uniform(0.98, 1.02)
+        series.append((Timestamp(START_TS + idx * HOUR), Price(FVal(f'{price:.6g}'))))
+    return series
+
+
+def table_bytes(tables: tuple[str, ...]) -> int:
+    with GlobalDBHandler().conn.read_ctx() as cursor:
+        return cursor.execute(
+            f'SELECT SUM(pgsize) FROM dbstat WHERE name IN ({",".join(["?"] * len(tables))})',
+            tables,
+        ).fetchone()[0]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='price history blocks benchmark')
+    parser.add_argument('--pairs', type=int, default=20)
+    parser.add_argument('--years', type=int, default=8)
+    args = parser.parse_args()
+
+    GlobalDBHandler(
+        data_dir=Path(tempfile.mkdtemp()),
+        sql_vm_instructions_cb=DEFAULT_SQL_VM_INSTRUCTIONS_CB,
+    )
+    rng = random.Random(42)
+    prices_num = args.years * 365 * 24
+    series = [make_series(rng, prices_num) for _ in range(args.pairs)]
+    assets = {}
+    with GlobalDBHandler().conn.write_ctx() as write_cursor:
+        for storage in ('rows', 'blocks'):
+            for idx in range(args.pairs):
+                identifier = f'BENCHMARK-{storage}-{idx}'
+                write_cursor.execute(
+                    'INSERT INTO assets(identifier, name, type) VALUES(?, ?, ?)',
+                    (identifier, identifier, 'A'),
+                )
+                write_cursor.execute(
+                    'INSERT INTO common_asset_details(identifier, symbol) VALUES(?, ?)',
+                    (identifier, identifier),
+                )
+                assets[storage, idx] = Asset(identifier)
+
+    store_timers = {'rows': Timer(), 'blocks': Timer()}
+    for idx, pair_series in enumerate(series):
+        with store_timers['rows'].measure():
+            GlobalDBHandler().add_historical_prices([HistoricalPrice(
+                from_asset=assets['rows', idx],
+                to_asset=A_USD,
+                source=HistoricalPriceOracle.CRYPTOCOMPARE,
+                timestamp=timestamp,
+                price=price,
+            ) for timestamp, price in pair_series])
+        with store_timers['blocks'].measure():
+            GlobalDBHandler().add_historical_price_series(
+                from_asset=assets['blocks', idx],
+                to_asset=A_USD,
+                source=HistoricalPriceOracle.CRYPTOCOMPARE,
+                prices=pair_series,
+            )
+
+    sizes = {
+        'rows': table_bytes(('price_history', 'sqlite_autoindex_price_history_1')),
+        'blocks': table_bytes(('price_history_blocks', 'sqlite_autoindex_price_history_blocks_1')),
+    }
+    total_prices = args.pairs * prices_num
+    print(f'{args.pairs} pairs of {prices_num} hourly prices')
+    print(f'{"storage":>8} {"bytes/price":>12} {"store":>9} {"load":>9} {"range":>9}')
+    for storage in ('rows', 'blocks'):
+        pairs = [(assets[storage, idx], A_USD) for idx in range(args.pairs)]
+        load_timer, range_timer = Timer(), Timer()
+        GlobalDBHandler().clean_price_series_cache()
+        with load_timer.measure():
+            GlobalDBHandler().load_price_series(pairs)
+        with range_timer.measure():  # a month of prices of each pair
+            for from_asset, to_asset in pairs:
+                GlobalDBHandler().get_historical_price_series(
+                    from_asset=from_asset,
+                    to_asset=to_asset,
+                    source=HistoricalPriceOracle.CRYPTOCOMPARE,
+                    from_timestamp=Timestamp(START_TS + prices_num // 2 * HOUR),
+                    to_timestamp=Timestamp(START_TS + (prices_num // 2 + 720) * HOUR),
+                )
+        print(
+            f'{storage:>8} {sizes[storage] / total_prices:>12.1f} '
+            f'{store_timers[storage].elapsed:>8.2f}s {load_timer.elapsed:>8.2f}s '
+            f'{range_timer.elapsed:>8.4f}s',
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,142 @@
+"""pytest-benchmark suite for the FVal arithmetic in the hot paths of accounting
+and balance aggregation.
+
+    python -m pytest tools/benchmarks/test_arithmetic.py --benchmark-only
+
+Compare with a previous run by adding --benchmark-autosave and --benchmark-compare.
+"""
+import random
+from itertools import pairwise
+from typing import TYPE_CHECKING
+
+import pytest
+
+from rotkehlchen.accounting.cost_basis.base import (
+    AssetAcquisitionEvent,
+    AverageCostBasisMethod,
+    BaseCostBasisMethod,
+    FIFOCostBasisMethod,
+    HIFOCostBasisMethod,
+    LIFOCostBasisMethod,
+)
+from rotkehlchen.accounting.mixins.event import AccountingEventType
+from rotkehlchen.accounting.pnl import PNL, PnlTotals
+from rotkehlchen.accounting.structures.balance import Balance, BalanceSheet
+from rotkehlchen.assets.asset import Asset
+from rotkehlchen.constants import ZERO
+from rotkehlchen.constants.assets import A_ETH
+from rotkehlchen.db.settings import DBSettings
+from rotkehlchen.fval import FVal
+from rotkehlchen.types import Price, Timestamp
+
+if TYPE_CHECKING:
+    from pytest_benchmark.fixture import BenchmarkFixture
+
+ACQUISITIONS_NUM = 1000
+SPENDS_NUM = 500
+VALUES_NUM = 10000
+ASSETS_NUM = 200
+
+
+def _random_fval(rng: random.Random) -> FVal:
+    return FVal(f'{rng.uniform(0.000001, 10000):.{rng.randint(2, 18)}f}')
+
+
+@pytest.fixture(name='values')
+def fixture_values() -> list[FVal]:
+    rng = random.Random(42)
+    return [_random_fval(rng) for _ in range(VALUES_NUM)]
+
+
+def test_fval_arithmetic(benchmark: 'BenchmarkFixture', values: list[FVal]) -> None:
+    def run() -> FVal:
+        total = ZERO
+        for amount, rate in zip(values, reversed(values), strict=True):
+            total += amount * rate - amount / rate
+        return total
+
+    benchmark(run)
+
+
+def test_fval_comparisons(benchmark: 'BenchmarkFixture', values: list[FVal]) -> None:
+    def run() -> int:
+        count = 0
+        for a, b in pairwise(values):
+            if a > b or a == b or a <= ZERO:
+                count += 1
+        return count + len(sorted(values))
+
+    benchmark(run)
+
+
+@pytest.mark.parametrize('method_class', [
+    FIFOCostBasisMethod,
+    LIFOCostBasisMethod,
+    HIFOCostBasisMethod,
+    AverageCostBasisMethod,
+])
+def test_cost_basis_spends(
+        benchmark: 'BenchmarkFixture',
+        method_class: type[BaseCostBasisMethod],
+) -> None:
+    """Spend all acquired amounts of an asset in chunks, as the pot does for each sell"""
+    rng = random.Random(42)
+    acquisitions = [
+        (_random_fval(rng), Price(_random_fval(rng)))
+        for _ in range(ACQUISITIONS_NUM)
+    ]
+    spend_amount = sum((x[0] for x in acquisitions), start=ZERO) / SPENDS_NUM
+    settings = DBSettings(taxfree_after_period=86400 * 365)
+
+    def setup() -> tuple[tuple[BaseCostBasisMethod], dict]:  # new acquisitions for each round
+        method = method_class()
+        for idx, (amount, rate) in enumerate(acquisitions):
+            method.add_in_event(AssetAcquisitionEvent(
+                amount=amount,
+                timestamp=Timestamp(idx * 3600),
+                rate=rate,
+                index=idx,
+            ))
+        return (method,), {}
+
+    def run(method: BaseCostBasisMethod) -> None:
+        for idx in range(SPENDS_NUM):
+            method.calculate_spend_cost_basis(
+                spending_amount=spend_amount,
+                spending_asset=A_ETH,
+                timestamp=Timestamp(ACQUISITIONS_NUM * 3600 + idx),
+                missing_acquisitions=[],
+                used_acquisitions=[],
+                settings=settings,
+                timestamp_to_date=str,
+            )
+
+    benchmark.pedantic(run, setup=setup, rounds=10)
+
+
+def test_pot_pnl_totals(benchmark: 'BenchmarkFixture', values: list[FVal]) -> None:
+    """Accumulate the PnL of spends in the pot's totals"""
+    event_types = list(AccountingEventType)
+
+    def run() -> PnlTotals:
+        pnls = PnlTotals()
+        for idx, (amount, price) in enumerate(zip(values, reversed(values), strict=True)):
+            taxable_value = amount * price
+            pnl = PNL(taxable=taxable_value - amount, free=ZERO) - PNL(taxable=amount / 2)
+            pnls[event_types[idx % len(event_types)]] += pnl
+        return pnls
+
+    benchmark(run)
+
+
+def test_balance_sheet_aggregation(benchmark: 'BenchmarkFixture', values: list[FVal]) -> None:
+    """Sum the per account balance sheets as done when aggregating all balances"""
+    assets = [Asset(f'ASSET{idx}') for idx in range(ASSETS_NUM)]
+    sheets = []
+    for start in range(0, VALUES_NUM, ASSETS_NUM):
+        sheet = BalanceSheet()
+        for asset, amount in zip(assets, values[start:start + ASSETS_NUM], strict=True):
+            sheet.assets[asset] = Balance(amount=amount, usd_value=amount * 2)
+        sheets.append(sheet)
+
+    benchmark(sum, sheets, BalanceSheet())
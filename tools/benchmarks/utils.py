@@ -0,0 +1,61 @@
+"""Helpers shared by the benchmark scripts
+
+The benchmarks need a working rotki development environment, including the
+packaged global DB, since they operate on real user and global databases.
+"""
+import resource
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from rotkehlchen.constants.misc import DEFAULT_SQL_VM_INSTRUCTIONS_CB
+from rotkehlchen.db.dbhandler import DBHandler
+from rotkehlchen.globaldb.handler import GlobalDBHandler
+from rotkehlchen.logging import TRACE, add_logging_level
+from rotkehlchen.user_messages import MessagesAggregator
+
+add_logging_level('TRACE', TRACE)
+
+BENCHMARK_USERNAME = 'benchmark'
+BENCHMARK_PASSWORD = '123'
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of the current process in MB. ru_maxrss is in KB in linux"""
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def open_benchmark_db(
+        data_dir: Path,
+        username: str = BENCHMARK_USERNAME,
+        password: str = BENCHMARK_PASSWORD,
+) -> DBHandler:
+    """Opens, and creates if missing, the global DB and the user's DB in the given
+    data directory. By default the user is the benchmark user"""
+    GlobalDBHandler(data_dir=data_dir, sql_vm_instructions_cb=DEFAULT_SQL_VM_INSTRUCTIONS_CB)
+    user_data_dir = data_dir / username
+    user_data_dir.mkdir(parents=True, exist_ok=True)
+    return DBHandler(
+        user_data_dir=user_data_dir,
+        password=password,
+        msg_aggregator=MessagesAggregator(),
+        initial_settings=None,
+        sql_vm_instructions_cb=DEFAULT_SQL_VM_INSTRUCTIONS_CB,
+        resume_from_backup=False,
+    )
+
+
+class Timer:
+    """Accumulates the wall time spent inside its measure() context"""
+
+    def __init__(self) -> None:
+        self.elapsed = 0.0
+
+    @contextmanager
+    def measure(self) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.elapsed += time.perf_counter() - start
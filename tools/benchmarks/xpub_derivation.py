@@ -0,0 +1,49 @@
+"""Benchmark of the derivation of the addresses of an xpub.
+
+Compares the throughput in addresses per second of deriving each child HDKey and its
+address, as the xpub address discovery used to do, with deriving the addresses of a
+range of children in one call.
+
+    python -m tools.benchmarks.xpub_derivation --addresses 1000 10000
+"""
+import argparse
+
+from rotkehlchen.chain.bitcoin.hdkey import HDKey, XpubType
+
+from .utils import Timer
+
+# Test xpubs of https://iancoleman.io/bip39/ and of BIP86 for taproot
+XPUBS = {
+    'p2pkh': ('xpub68V4ZQQ62mea7ZUKn2urQu47Bdn2Wr7SxrBxBDDwE3kjytj361YBGSKDT4WoBrE5htrSB8eAMe59NPnKrcAbiv2veN5GQUmfdjRddD1Hxrk', None),  # noqa: E501
+    'p2sh_p2wpkh': ('ypub6WkRUvNhspMCJLiLgeP7oL1pzrJ6wA2tpwsKtXnbmpdAGmHHcC6FeZeF4VurGU14dSjGpF2xLavPhgvCQeXd6JxYgSfbaD1wSUi2XmEsx33', None),  # noqa: E501
+    'wpkh': ('zpub6quTRdxqWmerHdiWVKZdLMp9FY641F1F171gfT2RS4D1FyHnutwFSMiab58Nbsdu4fXBaFwpy5xyGnKZ8d6xn2j4r4yNmQ3Yp3yDDxQUo3q', None),  # noqa: E501
+    'p2tr': ('xpub6BgBgsespWvERF3LHQu6CnqdvfEvtMcQjYrcRzx53QJjSxarj2afYWcLteoGVky7D3UKDP9QyrLprQ3VCECoY49yfdDEHGCtMMj92pReUsQ', XpubType.P2TR),  # noqa: E501
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='xpub address derivation benchmark')
+    parser.add_argument('--addresses', type=int, nargs='+', default=[1000, 10000])
+    args = parser.parse_args()
+
+    print(f'{"type":>12} {"addresses":>10} {"per child":>12} {"batched":>12} {"speedup":>8}')
+    for name, (xpub, xpub_type) in XPUBS.items():
+        root = HDKey.from_xpub(xpub=xpub, xpub_type=xpub_type, path='m').derive_child(0)
+        for addresses_num in args.addresses:
+            per_child_timer, batched_timer = Timer(), Timer()
+            with per_child_timer.measure():
+                per_child = [root.derive_child(idx).address() for idx in range(addresses_num)]
+            with batched_timer.measure():
+                batched = root.derive_addresses(range(addresses_num))
+            assert per_child == batched, 'batched derivation gave different addresses'
+
+            per_child_rate = addresses_num / per_child_timer.elapsed
+            batched_rate = addresses_num / batched_timer.elapsed
+            print(
+                f'{name:>12} {addresses_num:>10} {per_child_rate:>10.0f}/s '
+                f'{batched_rate:>10.0f}/s {batched_rate / per_child_rate:>7.2f}x',
+            )
+
+
+if __name__ == '__main__':
+    main()